@@ -1,13 +1,19 @@
 import argparse
 import asyncio
 import json
+import multiprocessing
 import os
+import queue
 import sys
+import threading
 import uuid
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 from datasets import Dataset, load_dataset
 from dotenv import load_dotenv
@@ -19,13 +25,130 @@ if str(PROJECT_ROOT / "src") not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT / "src"))
 
 # Internal helper that retries failed evaluations
-from les_audits_affaires_eval.model_client import EvaluatorClient
+from les_audits_affaires_eval.judge_ensemble import create_evaluator_client
 
 # config constants needed for parsing
-from les_audits_affaires_eval.config import DETAILED_FILE, SUMMARY_FILE, OUTPUT_FILE
+from les_audits_affaires_eval.config import (
+    DETAILED_FILE,
+    JUDGE_CONCURRENCY,
+    JUDGE_MAX_ATTEMPTS,
+    JUDGE_RATE_LIMIT,
+    OUTPUT_FILE,
+    PARQUET_FILE,
+    SUMMARY_FILE,
+)
+
+# Detailed results store (plain or compressed JSON lines, indexed)
+from les_audits_affaires_eval.detailed_store import DetailedStore, IndexEntry
+
+# Columnar results store (uploader reads only the columns it needs)
+from les_audits_affaires_eval.results_store import (
+    CATEGORIES,
+    read_results_frame,
+    write_results_parquet,
+)
+
+# Async judge pool used to re-evaluate failures
+from les_audits_affaires_eval.judge_pool import AsyncJudgePool
+
+# Structured per-sample failure statuses
+from les_audits_affaires_eval.status import (
+    JUDGE_FAILURES,
+    evaluation_status,
+    failure_stage,
+    result_status,
+)
+
+# Bootstrap confidence intervals of the summary scores
+from les_audits_affaires_eval.significance import bootstrap_ci, bootstrap_settings
+
+# Lease-based claiming for the worker-pool mode
+from les_audits_affaires_eval.leases import (
+    DEFAULT_LEASE_TTL,
+    FileLeaseBackend,
+    LeaseBackend,
+    LeaseHeartbeat,
+    make_owner_id,
+)
 
 load_dotenv()
 
+# Request statuses that still need an evaluation
+OPEN_REQUEST_STATUSES = ("pending", "processing", "in_progress")
+
+
+def score_summary(scores: List[float], cat_scores: Dict[str, List[float]]) -> Dict:
+    """Mean, std and bootstrap interval of the global and per-category scores"""
+    columns = [scores, *cat_scores.values()]
+    if scores:
+        ci_low, ci_high = bootstrap_ci(np.array(columns, dtype=float).T)
+    else:
+        ci_low = ci_high = np.zeros(len(columns))
+
+    def stats(column):
+        arr = columns[column]
+        if not arr:
+            return {"mean": 0, "std": 0, "ci_low": 0, "ci_high": 0}
+        return {
+            "mean": float(np.mean(arr)),
+            "std": float(np.std(arr)),
+            "ci_low": float(ci_low[column]),
+            "ci_high": float(ci_high[column]),
+        }
+
+    overall = stats(0)
+    return {
+        "global_score_mean": overall["mean"],
+        "global_score_std": overall["std"],
+        "global_score_ci": [overall["ci_low"], overall["ci_high"]],
+        "category_scores": {k: stats(column) for column, k in enumerate(cat_scores, 1)},
+        "confidence_intervals": bootstrap_settings(),
+    }
+
+
+# Summary fields rebuilt from the detailed file; the evaluator's "global_score"
+# block is dropped too since "global_score_mean"/"_std"/"_ci" replace it
+RECOMPUTED_SUMMARY_FIELDS = (
+    "sample_count",
+    "successful_evaluations",
+    "failed_evaluations",
+    "status_counts",
+    "global_score",
+    "global_score_mean",
+    "global_score_std",
+    "global_score_ci",
+    "category_scores",
+    "confidence_intervals",
+    "last_updated",
+)
+
+
+def preserved_summary_fields(summary_path: Path) -> Dict:
+    """Blocks of an existing summary that recomputing the scores must keep
+
+    Everything but `RECOMPUTED_SUMMARY_FIELDS`: adaptive stop, subset, telemetry,
+    pre-judge, judge input, ensemble, configuration, …"""
+    try:
+        with open(summary_path) as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {key: value for key, value in previous.items() if key not in RECOMPUTED_SUMMARY_FIELDS}
+
+
+def entry_scores(summary: Dict) -> Dict[str, Optional[float]]:
+    """Rounded scores of a summary as uploaded to the results dataset"""
+    ci = summary.get("global_score_ci") or [None, None]
+    return {
+        "overall": round(summary.get("global_score_mean", 0), 1),
+        "overall_ci_low": None if ci[0] is None else round(ci[0], 1),
+        "overall_ci_high": None if ci[1] is None else round(ci[1], 1),
+        **{
+            c: round(summary.get("category_scores", {}).get(c, {}).get("mean", 0), 1)
+            for c in CATEGORIES
+        },
+    }
+
 
 class ResultsDatasetManager:
     """Encapsulates read/write operations for results + requests datasets"""
@@ -33,18 +156,55 @@ class ResultsDatasetManager:
     REQUESTS_DATASET = "legmlai/laal-requests"
     RESULTS_DATASET = "legmlai/laal-results"
 
-    def __init__(self, token: Optional[str] = None):
+    # Longest wait for another host's push of the same table before giving up
+    TABLE_LEASE_TIMEOUT = 600.0
+
+    def __init__(self, token: Optional[str] = None, lease_backend: Optional[LeaseBackend] = None):
         self.token = token or os.getenv("HF_TOKEN")
         if self.token:
             self.api = HfApi(token=self.token)
         else:
             self.api = None
+        # Updates are read-modify-write pushes of the whole table – serialise them
+        # between the workers sharing this manager, and through a lease on the
+        # table between processes and hosts sharing `lease_backend`
+        self.lease_backend = lease_backend
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _table_lock(self, dataset: str):
+        with self._lock:
+            if self.lease_backend is None:
+                yield
+                return
+            key, owner = f"table:{dataset}", make_owner_id()
+            lease = self.lease_backend.wait_acquire(
+                key, owner, DEFAULT_LEASE_TTL, timeout=self.TABLE_LEASE_TIMEOUT
+            )
+            if lease is None:
+                raise TimeoutError(f"Timed out waiting for another push to {dataset}")
+            try:
+                with LeaseHeartbeat(self.lease_backend, key, owner, DEFAULT_LEASE_TTL):
+                    yield
+            finally:
+                self.lease_backend.release(key, owner)
 
     # -------------- REQUESTS -----------------
     def load_requests(self) -> Dataset:
         return load_dataset(self.REQUESTS_DATASET, split="train", token=self.token)
 
+    def get_request_status(self, request_id: str) -> Optional[str]:
+        """Current status of `request_id` in the requests table, None if it is gone"""
+        for row in self.load_requests():
+            if row["request_id"] == request_id:
+                return row["request_status"]
+        return None
+
     def update_request_status(self, request_id: str, new_status: str):
+        with self._table_lock(self.REQUESTS_DATASET):
+            self._update_request_status(request_id, new_status)
+
+    def _update_request_status(self, request_id: str, new_status: str):
         dataset = self.load_requests()
         # Build updated table
         updated = {k: [] for k in dataset.column_names}
@@ -56,7 +216,11 @@ class ResultsDatasetManager:
                     updated[k].append(row[k])
         updated_ds = Dataset.from_dict(updated)
         if self.token:
-            updated_ds.push_to_hub(self.REQUESTS_DATASET, token=self.token, commit_message=f"Update {request_id} -> {new_status}")
+            updated_ds.push_to_hub(
+                self.REQUESTS_DATASET,
+                token=self.token,
+                commit_message=f"Update {request_id} -> {new_status}",
+            )
         print(f"📝  Request {request_id} status → {new_status}")
 
     # -------------- RESULTS -----------------
@@ -74,11 +238,9 @@ class ResultsDatasetManager:
             "model_name": [],
             "model_provider": [],
             "overall_score": [],
-            "score_action_requise": [],
-            "score_delai_legal": [],
-            "score_documents_obligatoires": [],
-            "score_impact_financier": [],
-            "score_consequences_non_conformite": [],
+            "overall_ci_low": [],
+            "overall_ci_high": [],
+            **{f"score_{c}": [] for c in CATEGORIES},
             "evaluation_timestamp": [],
             "is_published": [],
         }
@@ -87,13 +249,23 @@ class ResultsDatasetManager:
         if not self.token:
             raise RuntimeError("HF_TOKEN required to clear results table")
         empty = Dataset.from_dict(self._empty_results_schema())
-        empty.push_to_hub(self.RESULTS_DATASET, token=self.token, commit_message="Clear results table")
+        empty.push_to_hub(
+            self.RESULTS_DATASET, token=self.token, commit_message="Clear results table"
+        )
         print("🗑️  Cleared results dataset")
 
-    def upload_result_entry(self, scores: Dict[str, float], model_name: str, provider: str, request_id: str):
+    def upload_result_entry(
+        self, scores: Dict[str, float], model_name: str, provider: str, request_id: str
+    ):
         if not self.token:
             print("❌ HF_TOKEN required to push results")
             return False
+        with self._table_lock(self.RESULTS_DATASET):
+            return self._upload_result_entry(scores, model_name, provider, request_id)
+
+    def _upload_result_entry(
+        self, scores: Dict[str, float], model_name: str, provider: str, request_id: str
+    ):
         ds = self.load_results()
         # remove previous entry for same model/provider
         df = ds.to_pandas()
@@ -104,16 +276,16 @@ class ResultsDatasetManager:
             "model_name": model_name,
             "model_provider": provider,
             "overall_score": scores["overall"],
-            "score_action_requise": scores["action_requise"],
-            "score_delai_legal": scores["delai_legal"],
-            "score_documents_obligatoires": scores["documents_obligatoires"],
-            "score_impact_financier": scores["impact_financier"],
-            "score_consequences_non_conformite": scores["consequences_non_conformite"],
+            "overall_ci_low": scores.get("overall_ci_low"),
+            "overall_ci_high": scores.get("overall_ci_high"),
+            **{f"score_{c}": scores[c] for c in CATEGORIES},
             "evaluation_timestamp": datetime.now().isoformat(),
             "is_published": True,
         }
         df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-        Dataset.from_pandas(df).push_to_hub(self.RESULTS_DATASET, token=self.token, commit_message=f"Add results for {model_name}")
+        Dataset.from_pandas(df).push_to_hub(
+            self.RESULTS_DATASET, token=self.token, commit_message=f"Add results for {model_name}"
+        )
         print(f"✅ Uploaded results for {model_name}")
         return True
 
@@ -135,16 +307,86 @@ class SummaryDatasetUploader:
 
         self._uploader = _UM()
 
+    def _prediction_frame(self, results_dir: str) -> Optional[pd.DataFrame]:
+        """One row per sample with flattened scores/justifications.
+
+        Reads only the needed columns from the Parquet store when present, then
+        falls back to the detailed store and the upload manager's JSON loader."""
+        categories = list(CATEGORIES)
+        parquet_path = Path(results_dir) / PARQUET_FILE
+        if parquet_path.exists():
+            columns = ["sample_idx", "question", "model_response", "score_global", "timestamp"]
+            columns += [f"score_{cat}" for cat in categories]
+            columns += [f"justification_{cat}" for cat in categories]
+            frame = read_results_frame(str(parquet_path), columns)
+            pred_df = pd.DataFrame(
+                {
+                    "sample_id": frame["sample_idx"].astype(str),
+                    "question": frame["question"].fillna(""),
+                    "response": frame["model_response"].fillna(""),
+                    "score_global_pred": frame["score_global"],
+                    "evaluation_timestamp": frame["timestamp"].fillna(""),
+                }
+            )
+            for cat in categories:
+                pred_df[f"score_{cat}_pred"] = frame[f"score_{cat}"]
+                pred_df[f"justification_{cat}_pred"] = frame[f"justification_{cat}"].fillna("")
+            return pred_df
+
+        # Load detailed results: local store (plain or compressed), else the
+        # helper from complete_upload_manager
+        store = DetailedStore(results_dir)
+        if store.exists():
+            detailed = list(store)
+        else:
+            detailed = self._uploader.load_results(results_dir).get("detailed", [])
+        if not detailed:
+            return None
+
+        # Build DataFrame from detailed results
+        pred_rows = []
+        for itm in detailed:
+            if itm.get("response") == "Évaluation échouée":
+                continue
+
+            sample_id = itm.get("sample_id")
+            key_val = None
+            if sample_id is not None:
+                key_val = str(sample_id)
+            else:
+                key_val = str(itm.get("sample_idx", ""))
+            scores = itm.get("scores", itm.get("evaluation", {}).get("scores", {}))
+            justifs = itm.get("justifications", itm.get("evaluation", {}).get("justifications", {}))
+
+            base = {
+                "sample_id": key_val,
+                "question": itm.get("question", ""),
+                "response": itm.get("response", itm.get("model_response", "")),
+                "score_global_pred": itm.get(
+                    "score_global", itm.get("evaluation", {}).get("score_global", 0)
+                ),
+                "evaluation_timestamp": itm.get(
+                    "evaluation_timestamp",
+                    itm.get("metadata", {}).get("evaluation_timestamp", ""),
+                ),
+            }
+
+            for cat in categories:
+                base[f"score_{cat}_pred"] = scores.get(cat, 0)
+                base[f"justification_{cat}_pred"] = justifs.get(cat, "")
+
+            pred_rows.append(base)
+
+        return pd.DataFrame(pred_rows)
+
     def upload(self, results_dir: str, model_name: str):
         """Create and push a flattened summary dataset where each score/justification
         category becomes its own column.  This is now the default path, because HF
         datasets had issues with struct columns in Parquet."""
 
         try:
-            # Load detailed results (using helper from complete_upload_manager)
-            results = self._uploader.load_results(results_dir)
-            detailed = results.get("detailed", [])
-            if not detailed:
+            pred_df = self._prediction_frame(results_dir)
+            if pred_df is None or pred_df.empty:
                 print("❌ No detailed data found; skipping summary dataset upload")
                 return False
 
@@ -166,51 +408,7 @@ class SummaryDatasetUploader:
                 gt_by_idx = None
                 gt_by_question = None
 
-            categories = [
-                "action_requise",
-                "delai_legal",
-                "documents_obligatoires",
-                "impact_financier",
-                "consequences_non_conformite",
-            ]
-
-            # Build DataFrame from detailed results
-            pred_rows = []
-            for itm in detailed:
-                if itm.get("response") == "Évaluation échouée":
-                    continue
-
-                sample_id = itm.get("sample_id")
-                key_val = None
-                if sample_id is not None:
-                    key_val = str(sample_id)
-                else:
-                    key_val = str(itm.get("sample_idx", ""))
-                scores = itm.get("scores", itm.get("evaluation", {}).get("scores", {}))
-                justifs = itm.get(
-                    "justifications", itm.get("evaluation", {}).get("justifications", {})
-                )
-
-                base = {
-                    "sample_id": key_val,
-                    "question": itm.get("question", ""),
-                    "response": itm.get("response", itm.get("model_response", "")),
-                    "score_global_pred": itm.get(
-                        "score_global", itm.get("evaluation", {}).get("score_global", 0)
-                    ),
-                    "evaluation_timestamp": itm.get(
-                        "evaluation_timestamp",
-                        itm.get("metadata", {}).get("evaluation_timestamp", ""),
-                    ),
-                }
-
-                for cat in categories:
-                    base[f"score_{cat}_pred"] = scores.get(cat, 0)
-                    base[f"justification_{cat}_pred"] = justifs.get(cat, "")
-
-                pred_rows.append(base)
-
-            pred_df = pd.DataFrame(pred_rows)
+            categories = list(CATEGORIES)
 
             if gt_by_idx and gt_by_question:
                 # Convert gt_by_idx values to DataFrame
@@ -232,7 +430,10 @@ class SummaryDatasetUploader:
 
                 keep_cols = ["question"] + extra_cols + [f"ground_{cat}" for cat in categories]
                 if "question" not in gt_df_question.columns:
-                    print("⚠️  Ground truth dataset missing 'question' column; cannot join on question")
+                    print(
+                        "⚠️  Ground truth dataset missing 'question' column; "
+                        "cannot join on question"
+                    )
                     merged = pred_df
                 else:
                     gt_df_question = gt_df_question[keep_cols]
@@ -262,6 +463,7 @@ class SummaryDatasetUploader:
             if summary_path.exists():
                 try:
                     import json as _json
+
                     with open(summary_path) as _f:
                         summary = _json.load(_f)
                 except Exception as _exc:
@@ -280,20 +482,17 @@ class SummaryDatasetUploader:
                     ]
                 )
                 # Add category means
-                for cat in [
-                    "action_requise",
-                    "delai_legal",
-                    "documents_obligatoires",
-                    "impact_financier",
-                    "consequences_non_conformite",
-                ]:
+                for cat in CATEGORIES:
                     cat_mean = summary.get("category_scores", {}).get(cat, {}).get("mean", 0)
                     yaml_lines.append(f"score_{cat}: {round(cat_mean, 2)}")
-            yaml_lines.extend([
-                "benchmark_dataset: legmlai/les-audits-affaires",
-                "leaderboard_url: https://huggingface.co/spaces/legmlai/les-audites-affaires-leadboard",
-                "---",
-            ])
+            yaml_lines.extend(
+                [
+                    "benchmark_dataset: legmlai/les-audits-affaires",
+                    "leaderboard_url: "
+                    "https://huggingface.co/spaces/legmlai/les-audites-affaires-leadboard",
+                    "---",
+                ]
+            )
 
             front_matter = "\n".join(yaml_lines)
 
@@ -309,6 +508,7 @@ class SummaryDatasetUploader:
 
             if summary:
                 import json as _json
+
                 body_lines.append("\n## Evaluation Summary\n")
                 body_lines.append("```json")
                 body_lines.append(_json.dumps(summary, indent=2, ensure_ascii=False))
@@ -333,24 +533,50 @@ class SummaryDatasetUploader:
 
 
 class FailedEvaluationRetrier:
-    """Minimal retry mechanism – we only mark failures so pipeline can decide."""
-
-    def __init__(self, results_dir: Path):
+    """Re-judges failed evaluations in the detailed results file.
+
+    Failed samples are streamed through an async judge pool (continuous
+    scheduling, bounded concurrency, optional rate limit). The detailed file is
+    rewritten in `sample_idx` order through a temp file that is atomically
+    renamed, keeping at most a small reorder window of records in memory.
+    Records are read at their indexed offsets, so compressed stores work too.
+    """
+
+    def __init__(
+        self,
+        results_dir: Path,
+        max_attempts: int = JUDGE_MAX_ATTEMPTS,
+        concurrency: int = JUDGE_CONCURRENCY,
+        rate_limit: Optional[float] = JUDGE_RATE_LIMIT,
+    ):
         self.results_dir = results_dir
-        self.detailed_file = results_dir / DETAILED_FILE
-        self.evaluator = EvaluatorClient()
+        self.store = DetailedStore(str(results_dir))
+        self.evaluator = create_evaluator_client()
+        self.max_attempts = max_attempts
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
 
     def has_failures(self) -> bool:
-        if not self.detailed_file.exists():
+        if not self.store.exists():
             return False
-        for line in self.detailed_file.open():
-            if "Évaluation échouée" in line:
-                return True
-        return False
+        return any(self._is_failed(sample) for sample in self._iter_samples())
+
+    @staticmethod
+    def _is_failed(sample: Dict) -> bool:
+        # Only judge-stage failures can be fixed by re-judging; generation failures
+        # need `lae-eval rerun --only generation`
+        return result_status(sample) in JUDGE_FAILURES
+
+    def _index_by_sample_idx(self) -> List[IndexEntry]:
+        """Return the index entry of every record, ordered by sample_idx (stable)."""
+        return sorted(
+            self.store.index(),
+            key=lambda entry: entry.sample_idx if entry.sample_idx is not None else float("inf"),
+        )
 
     def retry(self):
-        if not self.detailed_file.exists():
-            print("ℹ️  No detailed_results.jsonl file – nothing to retry")
+        if not self.store.exists():
+            print("ℹ️  No detailed results file – nothing to retry")
             return
 
         # Load ground-truth dataset for questions/answers
@@ -368,105 +594,116 @@ class FailedEvaluationRetrier:
             print(f"⚠️  Could not load ground-truth dataset – retry aborted: {e}")
             return
 
-        updated_lines = []
-        re_evaluated = 0
-        failed_cases = []
-
-        import jsonlines as jl
-        # ----------------- Scan detailed file and collect failed samples -----------------
-        with jl.open(self.detailed_file, "r") as reader:
-            for sample in reader:
-                eval_data = sample.get("evaluation", {})
-                fail_cond_global = eval_data.get("score_global", 0) == 0 and any(
-                    "échouée" in str(just).lower() for just in eval_data.get("justifications", {}).values()
-                )
-                fail_cond_resp = sample.get("response") == "Évaluation échouée" or sample.get("model_response") == "Évaluation échouée"
-
-                if fail_cond_global or fail_cond_resp:
-                    # Locate ground-truth row
-                    gt_row = None
-                    sidx = sample.get("sample_idx")
-                    if sidx is not None and int(sidx) in gt_by_idx:
-                        gt_row = gt_by_idx[int(sidx)]
-                    if gt_row is None:
-                        gt_row = gt_by_question.get(sample.get("question"))
-
-                    if gt_row is None:
-                        updated_lines.append(sample)  # cannot re-evaluate without GT
-                    else:
-                        failed_cases.append((sample, gt_row))
-                else:
-                    updated_lines.append(sample)
-
-        total_failed = len(failed_cases)
-        if total_failed == 0:
+        if not self.has_failures():
             print("ℹ️  No failed evaluations found to retry")
             return
 
-        print(f"🔄 Found {total_failed} failed evaluations – re-evaluating in batches of 100 …")
-
-        from datetime import datetime as _dt
-        import concurrent.futures
-
-        # --------------- Re-evaluate in batches of 100 concurrently ----------------
-        for i in range(0, total_failed, 100):
-            batch = failed_cases[i : i + 100]
-
-            def _process(item):
-                samp, gt = item
-                try:
-                    new_eval = self.evaluator.evaluate_response(
-                        question=samp.get("question", gt.get("question", "")),
-                        model_response=samp.get("response") or samp.get("model_response") or "",
-                        ground_truth=gt,
-                    )
-                    samp["evaluation"] = new_eval
-                    samp["evaluation_timestamp"] = _dt.now().isoformat()
-                    samp["score_global"] = new_eval.get("score_global", 0)
-                    samp["scores"] = new_eval.get("scores", {})
-                    samp["justifications"] = new_eval.get("justifications", {})
-                except Exception as exc:
-                    print(
-                        f"⚠️  Re-evaluation failed for sample idx={samp.get('sample_idx')}: {exc}"
-                    )
-                return samp
-
-            with concurrent.futures.ThreadPoolExecutor(
-                max_workers=min(100, len(batch))
-            ) as executor:
-                futures = [executor.submit(_process, itm) for itm in batch]
-                for fut in concurrent.futures.as_completed(futures):
-                    updated_lines.append(fut.result())
-                    re_evaluated += 1
+        stats = asyncio.run(self._retry_streaming(gt_by_idx, gt_by_question))
+        print(
+            f"✅ Retried {stats['retried']} failed evaluations "
+            f"({stats['recovered']} recovered, {stats['skipped']} skipped – "
+            "attempts exhausted or no GT)"
+        )
 
-            print(f"  ✅ Batch {i // 100 + 1}: processed {len(batch)} samples")
+        # Recompute summary and the columnar copy (the detailed file is in sample_idx order)
+        self._recompute_summary(self.store.iter_scores())
+        write_results_parquet(self._iter_samples(), str(self.results_dir / PARQUET_FILE))
 
-        # Write back updated detailed file
-        import jsonlines, shutil, datetime as dt
-        backup = self.detailed_file.with_suffix(".bak_" + dt.datetime.now().strftime("%Y%m%d%H%M%S"))
-        shutil.copy2(self.detailed_file, backup)
-        with jsonlines.open(self.detailed_file, mode="w") as writer:
-            for itm in updated_lines:
-                writer.write(itm)
+    def _iter_samples(self):
+        yield from self.store
 
-        print(f"✅ Retried {re_evaluated} failed evaluations and updated detailed results")
+    async def _rejudge(self, pool: AsyncJudgePool, sample: Dict, gt: Dict, stats: Dict) -> Dict:
+        """Re-judge one sample until it succeeds or its attempt budget is spent."""
+        metadata = sample.setdefault("metadata", {})
+        attempts = int(metadata.get("judge_retry_attempts", 0))
+        stats["retried"] += 1
+        while attempts < self.max_attempts:
+            attempts += 1
+            try:
+                new_eval = await pool.evaluate(
+                    sample.get("question", gt.get("question", "")),
+                    sample.get("response") or sample.get("model_response") or "",
+                    gt,
+                )
+            except Exception as exc:
+                print(f"⚠️  Re-evaluation failed for sample idx={sample.get('sample_idx')}: {exc}")
+                continue
+            metadata["judge_usage"] = new_eval.pop("usage", {})
+            sample["evaluation"] = new_eval
+            sample["evaluation_timestamp"] = datetime.now().isoformat()
+            sample["score_global"] = new_eval.get("score_global", 0)
+            sample["scores"] = new_eval.get("scores", {})
+            sample["justifications"] = new_eval.get("justifications", {})
+            sample["status"] = evaluation_status(new_eval)
+            sample["failure_stage"] = failure_stage(sample["status"])
+            if not self._is_failed(sample):
+                stats["recovered"] += 1
+                break
+        metadata["judge_retry_attempts"] = attempts
+        return sample
+
+    async def _retry_streaming(self, gt_by_idx: Dict, gt_by_question: Dict) -> Dict[str, int]:
+        stats = {"retried": 0, "recovered": 0, "skipped": 0}
+        entries = self._index_by_sample_idx()
+        # Records waiting to be written, in output order. A failed record sits
+        # here as a task until its re-judge finishes; the window bounds memory.
+        window = deque()
+        max_window = max(self.concurrency * 4, 16)
+
+        async def _flush(out, force: bool = False):
+            while window and (
+                force
+                or len(window) >= max_window
+                or not isinstance(window[0], asyncio.Task)
+                or window[0].done()
+            ):
+                item = window.popleft()
+                if isinstance(item, asyncio.Task):
+                    item = await item
+                out.write(item)
 
-        # Recompute summary
-        self._recompute_summary(updated_lines)
+        print(
+            f"🔄 Re-evaluating failed samples (concurrency={self.concurrency}, "
+            f"rate_limit={self.rate_limit or 'none'}/s, max_attempts={self.max_attempts}) …"
+        )
+        # Keep a backup of the previous file; the new one is swapped in atomically
+        self.store.backup(datetime.now().strftime("%Y%m%d%H%M%S"))
+        async with AsyncJudgePool(self.evaluator, self.concurrency, self.rate_limit) as pool:
+            with self.store.rewriter() as out:
+                for sample in self.store.read(entries):
+                    if self._is_failed(sample):
+                        gt_row = None
+                        sidx = sample.get("sample_idx")
+                        if sidx is not None and int(sidx) in gt_by_idx:
+                            gt_row = gt_by_idx[int(sidx)]
+                        if gt_row is None:
+                            gt_row = gt_by_question.get(sample.get("question"))
+                        attempts = int(sample.get("metadata", {}).get("judge_retry_attempts", 0))
+                        if gt_row is not None and attempts < self.max_attempts:
+                            window.append(
+                                asyncio.ensure_future(self._rejudge(pool, sample, gt_row, stats))
+                            )
+                        else:
+                            stats["skipped"] += 1  # cannot re-evaluate without GT / budget spent
+                            window.append(sample)
+                    else:
+                        window.append(sample)
+                    await _flush(out)
+                await _flush(out, force=True)
+        return stats
 
     def _recompute_summary(self, all_samples):
-        # Compute new summary similar to earlier script
+        # Compute new summary similar to earlier script (streams over all_samples)
+        sample_count = 0
         scores = []
-        cat_scores = {
-            "action_requise": [],
-            "delai_legal": [],
-            "documents_obligatoires": [],
-            "impact_financier": [],
-            "consequences_non_conformite": [],
-        }
+        cat_scores = {c: [] for c in CATEGORIES}
 
         succ = 0
+        status_counts: Dict[str, int] = {}
         for s in all_samples:
+            sample_count += 1
+            status = result_status(s)
+            status_counts[status] = status_counts.get(status, 0) + 1
             ev = s.get("evaluation", {})
             if ev.get("score_global", 0) > 0:
                 succ += 1
@@ -474,19 +711,13 @@ class FailedEvaluationRetrier:
                 for k in cat_scores.keys():
                     cat_scores[k].append(ev.get("scores", {}).get(k, 0))
 
-        def stats(arr):
-            import numpy as np
-            if not arr:
-                return {"mean": 0, "std": 0}
-            return {"mean": float(np.mean(arr)), "std": float(np.std(arr))}
-
         summary = {
-            "sample_count": len(all_samples),
+            **preserved_summary_fields(self.results_dir / SUMMARY_FILE),
+            "sample_count": sample_count,
             "successful_evaluations": succ,
-            "failed_evaluations": len(all_samples) - succ,
-            "global_score_mean": stats(scores)["mean"],
-            "global_score_std": stats(scores)["std"],
-            "category_scores": {k: stats(v) for k, v in cat_scores.items()},
+            "failed_evaluations": sample_count - succ,
+            "status_counts": status_counts,
+            **score_summary(scores, cat_scores),
             "last_updated": datetime.now().isoformat(),
         }
 
@@ -499,22 +730,53 @@ class FailedEvaluationRetrier:
 class EvaluationPipeline:
     """Main orchestrator"""
 
-    def __init__(self, dry_run: bool = False, max_requests: Optional[int] = None):
+    def __init__(
+        self,
+        dry_run: bool = False,
+        max_requests: Optional[int] = None,
+        retry_options: Optional[Dict] = None,
+        adaptive: bool = False,
+    ):
         self.dry_run = dry_run
         self.max_requests = max_requests
+        # Stop each evaluation early once its score / leaderboard rank is settled
+        self.adaptive = adaptive
+        # max_attempts / concurrency / rate_limit forwarded to FailedEvaluationRetrier
+        self.retry_options = retry_options or {}
         self.token = os.getenv("HF_TOKEN")
         self.manager = ResultsDatasetManager(self.token)
         self.summary_uploader = SummaryDatasetUploader()
 
     # -------------------------- Public entrypoints ----------------------------
-    def process_requests(self, retry_failures: bool = True):
+    def process_requests(
+        self,
+        retry_failures: bool = True,
+        workers: int = 1,
+        lease_backend: Optional[LeaseBackend] = None,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+    ):
         requests_ds = self.manager.load_requests()
-        pending = [r for r in requests_ds if r["request_status"] in ("pending", "processing", "in_progress")]
+        pending = [r for r in requests_ds if r["request_status"] in OPEN_REQUEST_STATUSES]
+        if lease_backend is not None:
+            # Requests held by a live lease are being processed by another worker;
+            # stale "in_progress" rows (expired or missing lease) are picked up again
+            pending = [r for r in pending if not lease_backend.is_leased(r["request_id"])]
         if self.max_requests:
             pending = pending[: self.max_requests]
         print(f"📥 Found {len(pending)} requests to process")
-        for req in pending:
-            self._process_single_request(req, retry_failures)
+
+        if workers <= 1 and lease_backend is None:
+            for req in pending:
+                self._process_single_request(req, retry_failures)
+            return
+
+        if lease_backend is None:
+            lease_backend = FileLeaseBackend(default_lease_dir())
+        # Other hosts draining the same queue push to the same tables
+        self.manager.lease_backend = lease_backend
+        self._process_with_workers(
+            pending, retry_failures, max(workers, 1), lease_backend, lease_ttl
+        )
 
     def process_local_results(self, path: str):
         results_dir = Path(path).expanduser()
@@ -522,7 +784,7 @@ class EvaluationPipeline:
             print(f"❌ Results path not found: {results_dir}")
             return
         # --- First, retry failed evaluations if any ---
-        retrier = FailedEvaluationRetrier(results_dir)
+        retrier = FailedEvaluationRetrier(results_dir, **self.retry_options)
         retrier.retry()
 
         summary_path = results_dir / SUMMARY_FILE
@@ -534,19 +796,20 @@ class EvaluationPipeline:
         model_name = summary.get("model_name", results_dir.name)
         provider = summary.get("model_provider", "unknown")
         dummy_request_id = f"local_{uuid.uuid4().hex[:6]}"
-        scores = {
-            "overall": round(summary.get("global_score_mean", 0), 1),
-            "action_requise": round(summary.get("category_scores", {}).get("action_requise", {}).get("mean", 0), 1),
-            "delai_legal": round(summary.get("category_scores", {}).get("delai_legal", {}).get("mean", 0), 1),
-            "documents_obligatoires": round(summary.get("category_scores", {}).get("documents_obligatoires", {}).get("mean", 0), 1),
-            "impact_financier": round(summary.get("category_scores", {}).get("impact_financier", {}).get("mean", 0), 1),
-            "consequences_non_conformite": round(summary.get("category_scores", {}).get("consequences_non_conformite", {}).get("mean", 0), 1),
-        }
+        scores = entry_scores(summary)
         if not self.dry_run:
             self.manager.upload_result_entry(scores, model_name, provider, dummy_request_id)
             self.summary_uploader.upload(str(results_dir), model_name)
         print("✅ Local results uploaded")
 
+    def retry_failed(self, path: str):
+        """Re-judge failed evaluations of a local results directory."""
+        results_dir = Path(path).expanduser()
+        if not results_dir.exists():
+            print(f"❌ Results path not found: {results_dir}")
+            return
+        FailedEvaluationRetrier(results_dir, **self.retry_options).retry()
+
     def clear_results_table(self):
         if self.dry_run:
             print("🔍 DRY RUN: would clear results table")
@@ -556,17 +819,15 @@ class EvaluationPipeline:
     def refresh_summary(self, path: str):
         """Recompute evaluation_summary.json (and evaluation_results.json) from detailed file only."""
         results_dir = Path(path).expanduser()
-        detailed_file = results_dir / DETAILED_FILE
-        if not detailed_file.exists():
+        store = DetailedStore(str(results_dir))
+        if not store.exists():
             print(f"❌ {DETAILED_FILE} introuvable dans {results_dir}")
             return
 
-        # Charger toutes les lignes
-        import jsonlines, json, numpy as np
-        all_samples = []
-        with jsonlines.open(detailed_file) as reader:
-            for itm in reader:
-                all_samples.append(itm)
+        # Charger toutes les lignes (fichier brut ou compressé)
+        import json
+
+        all_samples = list(store)
 
         if not all_samples:
             print("❌ Aucun échantillon trouvé dans le fichier détaillé – abandon")
@@ -574,15 +835,12 @@ class EvaluationPipeline:
 
         # Statistiques
         scores = []
-        cat_scores = {
-            "action_requise": [],
-            "delai_legal": [],
-            "documents_obligatoires": [],
-            "impact_financier": [],
-            "consequences_non_conformite": [],
-        }
+        cat_scores = {c: [] for c in CATEGORIES}
         succ = 0
+        status_counts: Dict[str, int] = {}
         for s in all_samples:
+            status = result_status(s)
+            status_counts[status] = status_counts.get(status, 0) + 1
             ev = s.get("evaluation", {})
             if ev.get("score_global", 0) > 0:
                 succ += 1
@@ -590,18 +848,13 @@ class EvaluationPipeline:
                 for k in cat_scores:
                     cat_scores[k].append(ev.get("scores", {}).get(k, 0))
 
-        def stats(arr):
-            if not arr:
-                return {"mean": 0, "std": 0}
-            return {"mean": float(np.mean(arr)), "std": float(np.std(arr))}
-
         summary = {
+            **preserved_summary_fields(results_dir / SUMMARY_FILE),
             "sample_count": len(all_samples),
             "successful_evaluations": succ,
             "failed_evaluations": len(all_samples) - succ,
-            "global_score_mean": stats(scores)["mean"],
-            "global_score_std": stats(scores)["std"],
-            "category_scores": {k: stats(v) for k, v in cat_scores.items()},
+            "status_counts": status_counts,
+            **score_summary(scores, cat_scores),
             "last_updated": datetime.now().isoformat(),
         }
 
@@ -610,6 +863,11 @@ class EvaluationPipeline:
             json.dump(summary, f, indent=2)
         print("✅ evaluation_summary.json mis à jour")
 
+        # Copie colonnaire (Parquet) alignée sur le fichier détaillé
+        all_samples.sort(key=lambda itm: itm.get("sample_idx", 0))
+        write_results_parquet(all_samples, str(results_dir / PARQUET_FILE))
+        print(f"✅ {PARQUET_FILE} mis à jour")
+
         # Mettre aussi à jour evaluation_results.json (si existant)
         output_file = results_dir / OUTPUT_FILE
         if output_file.exists():
@@ -624,20 +882,96 @@ class EvaluationPipeline:
                 print(f"⚠️  Impossible de mettre à jour {OUTPUT_FILE}: {exc}")
 
     # -------------------------- Internal methods -----------------------------
-    def _process_single_request(self, req: Dict, retry_failures: bool):
+    def _process_with_workers(
+        self,
+        pending: List[Dict],
+        retry_failures: bool,
+        workers: int,
+        lease_backend: LeaseBackend,
+        lease_ttl: float,
+    ):
+        """Drain `pending` with `workers` threads, each request claimed through a lease.
+
+        Every evaluation runs in its own spawned process: the evaluator reads its
+        configuration (RESULTS_DIR, MODEL_NAME, …) at import time, so concurrent
+        evaluations cannot share one interpreter.
+        """
+        # Prompt for missing variables up-front – workers must not block on input()
+        for provider in sorted({r["model_provider"] for r in pending}):
+            self._ensure_env_variables(provider)
+
+        work: "queue.Queue[Dict]" = queue.Queue()
+        for req in pending:
+            work.put(req)
+
+        def _worker():
+            owner = make_owner_id()
+            while True:
+                try:
+                    req = work.get_nowait()
+                except queue.Empty:
+                    return
+                request_id = req["request_id"]
+                lease = lease_backend.acquire(request_id, owner, lease_ttl)
+                if lease is None:
+                    print(f"⏭️  Request {request_id} already claimed by another worker")
+                    continue
+                try:
+                    # Another worker may have finished the request since the queue was
+                    # read (its lease is released once the status is written)
+                    status = self.manager.get_request_status(request_id)
+                    if status not in OPEN_REQUEST_STATUSES:
+                        print(f"⏭️  Request {request_id} already {status or 'removed'}")
+                        continue
+                    with LeaseHeartbeat(lease_backend, request_id, owner, lease_ttl) as heartbeat:
+                        self._process_single_request(
+                            req, retry_failures, isolated=True, lease_lost=heartbeat.lost
+                        )
+                except Exception as exc:
+                    print(f"❌ Worker error on request {request_id}: {exc}")
+                finally:
+                    lease_backend.release(request_id, owner)
+
+        print(f"👷 Starting {workers} workers")
+        threads = [
+            threading.Thread(target=_worker, name=f"laal-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def _process_single_request(
+        self,
+        req: Dict,
+        retry_failures: bool,
+        isolated: bool = False,
+        lease_lost: Optional[threading.Event] = None,
+    ):
         request_id = req["request_id"]
         model_name = req["model_name"]
         provider = req["model_provider"]
 
         # ------------------- Check required env variables -------------------
-        self._ensure_env_variables(provider)
+        if not isolated:
+            self._ensure_env_variables(provider)
 
         print(f"\n🚀 Processing request {request_id} – {model_name} ({provider})")
         if not self.dry_run:
             self.manager.update_request_status(request_id, "in_progress")
 
         # Run evaluation
-        results_dir = self._run_evaluation(model_name, provider)
+        if isolated:
+            results_dir = self._run_evaluation_isolated(model_name, provider, lease_lost)
+            if lease_lost is not None and lease_lost.is_set():
+                print(
+                    f"⚠️  Lease on {request_id} lost – another worker owns it now, "
+                    "evaluation stopped"
+                )
+                return
+        else:
+            results_dir = self._run_evaluation(model_name, provider)
         if results_dir is None:
             print("❌ Evaluation failed – aborting request")
             if not self.dry_run:
@@ -646,7 +980,7 @@ class EvaluationPipeline:
 
         # Retry failures if any
         if retry_failures:
-            retrier = FailedEvaluationRetrier(results_dir)
+            retrier = FailedEvaluationRetrier(results_dir, **self.retry_options)
             if retrier.has_failures():
                 retrier.retry()
 
@@ -659,14 +993,10 @@ class EvaluationPipeline:
             return
         with open(summary_file) as f:
             summary = json.load(f)
-        scores = {
-            "overall": round(summary.get("global_score_mean", 0), 1),
-            "action_requise": round(summary.get("category_scores", {}).get("action_requise", {}).get("mean", 0), 1),
-            "delai_legal": round(summary.get("category_scores", {}).get("delai_legal", {}).get("mean", 0), 1),
-            "documents_obligatoires": round(summary.get("category_scores", {}).get("documents_obligatoires", {}).get("mean", 0), 1),
-            "impact_financier": round(summary.get("category_scores", {}).get("impact_financier", {}).get("mean", 0), 1),
-            "consequences_non_conformite": round(summary.get("category_scores", {}).get("consequences_non_conformite", {}).get("mean", 0), 1),
-        }
+        scores = entry_scores(summary)
+        if lease_lost is not None and lease_lost.is_set():
+            print(f"⚠️  Lease on {request_id} lost – another worker owns it now, skipping upload")
+            return
         # Upload results + summary dataset
         if not self.dry_run:
             self.manager.upload_result_entry(scores, model_name, provider, request_id)
@@ -676,32 +1006,50 @@ class EvaluationPipeline:
 
     def _run_evaluation(self, model_name: str, provider: str) -> Optional[Path]:
         """Run evaluation harness and return path to results directory."""
-        # Prepare env so evaluator writes to unique dir
-        safe_name = model_name.replace("/", "_").replace("-", "_")
-        results_dir = PROJECT_ROOT / "results" / safe_name
-        os.environ["RESULTS_DIR"] = str(results_dir)
-        os.environ["MODEL_NAME"] = model_name
-        # External model provider config may be needed by user environment
-        # We'll forward provider via EXTERNAL_PROVIDER/EXTERNAL_MODEL for remote providers
-        if provider.lower() in ("openai", "mistral", "claude", "gemini"):
-            os.environ["EXTERNAL_PROVIDER"] = provider.lower()
-            os.environ["EXTERNAL_MODEL"] = model_name
-        else:
-            os.environ.pop("EXTERNAL_PROVIDER", None)
-            # user should set MODEL_ENDPOINT for local models
+        results_dir = _prepare_evaluation_env(model_name, provider)
 
         # NOTE: LesAuditsAffairesEvaluator is imported inside _run_evaluation after env vars are set,
         # to ensure it picks up dynamic RESULT_DIR and MODEL_NAME.
         from les_audits_affaires_eval.evaluator import LesAuditsAffairesEvaluator
+
         evaluator = LesAuditsAffairesEvaluator()
         try:
             # Run async evaluation fully
-            asyncio.run(evaluator.run_evaluation())
+            asyncio.run(
+                evaluator.run_evaluation(adaptive=_adaptive_for(results_dir, self.adaptive))
+            )
             return Path(str(results_dir))
         except Exception as ex:
             print(f"❌ Evaluation error: {ex}")
             return None
 
+    def _run_evaluation_isolated(
+        self, model_name: str, provider: str, lease_lost: Optional[threading.Event] = None
+    ) -> Optional[Path]:
+        """Run the evaluation in a freshly spawned process (used by the worker pool).
+
+        The process is terminated as soon as `lease_lost` is set: the request now
+        belongs to another worker and the run would only spend API budget."""
+        ctx = multiprocessing.get_context("spawn")
+        proc = ctx.Process(
+            target=_evaluation_process_main,
+            args=(model_name, provider, self.adaptive),
+            name=f"laal-eval-{model_name}",
+        )
+        proc.start()
+        while proc.is_alive():
+            if lease_lost is not None and lease_lost.wait(timeout=1.0):
+                print(f"🛑 Lease lost – terminating evaluation of {model_name}")
+                proc.terminate()
+                proc.join()
+                return None
+            proc.join(timeout=0 if lease_lost is not None else None)
+        proc.join()
+        if proc.exitcode != 0:
+            print(f"❌ Evaluation process for {model_name} exited with code {proc.exitcode}")
+            return None
+        return _results_dir_for(model_name)
+
     # -------------------------- Utility methods -----------------------------
     def _ensure_env_variables(self, provider: str):
         """Prompt user for missing critical environment variables based on provider."""
@@ -735,7 +1083,9 @@ class EvaluationPipeline:
             return
 
         print(
-            "❗ Variables d'environnement manquantes : " + ", ".join(missing) + " – saisissez-les maintenant."
+            "❗ Variables d'environnement manquantes : "
+            + ", ".join(missing)
+            + " – saisissez-les maintenant."
         )
         for var in missing:
             try:
@@ -749,8 +1099,57 @@ class EvaluationPipeline:
                 sys.exit(1)
 
 
+# --------------------------- Worker helpers ---------------------------------
+
+
+def default_lease_dir() -> str:
+    return os.getenv("LAAL_LEASE_DIR", str(PROJECT_ROOT / "results" / ".leases"))
+
+
+def _results_dir_for(model_name: str) -> Path:
+    safe_name = model_name.replace("/", "_").replace("-", "_")
+    return PROJECT_ROOT / "results" / safe_name
+
+
+def _prepare_evaluation_env(model_name: str, provider: str) -> Path:
+    """Set the env so the evaluator writes to a unique dir; return that dir."""
+    results_dir = _results_dir_for(model_name)
+    os.environ["RESULTS_DIR"] = str(results_dir)
+    os.environ["MODEL_NAME"] = model_name
+    # External model provider config may be needed by user environment
+    # We'll forward provider via EXTERNAL_PROVIDER/EXTERNAL_MODEL for remote providers
+    if provider.lower() in ("openai", "mistral", "claude", "gemini"):
+        os.environ["EXTERNAL_PROVIDER"] = provider.lower()
+        os.environ["EXTERNAL_MODEL"] = model_name
+    else:
+        os.environ.pop("EXTERNAL_PROVIDER", None)
+        # user should set MODEL_ENDPOINT for local models
+    return results_dir
+
+
+def _adaptive_for(results_dir: Path, adaptive: bool):
+    """Adaptive stopping rule ranked against the other models under results/, or None."""
+    if not adaptive:
+        return None
+    from les_audits_affaires_eval.adaptive import AdaptiveStopping, leaderboard_scores
+
+    reference_scores = leaderboard_scores(str(results_dir.parent), exclude=str(results_dir))
+    return AdaptiveStopping(reference_scores=reference_scores)
+
+
+def _evaluation_process_main(model_name: str, provider: str, adaptive: bool = False):
+    """Entry point of the spawned evaluation process (must stay module-level)."""
+    results_dir = _prepare_evaluation_env(model_name, provider)
+    from les_audits_affaires_eval.evaluator import LesAuditsAffairesEvaluator
+
+    asyncio.run(
+        LesAuditsAffairesEvaluator().run_evaluation(adaptive=_adaptive_for(results_dir, adaptive))
+    )
+
+
 # ------------------------------- CLI ----------------------------------------
 
+
 def build_arg_parser():
     p = argparse.ArgumentParser(
         description=(
@@ -770,28 +1169,96 @@ def build_arg_parser():
     req_cmd = sub.add_parser("requests", help="Process pending requests (default)")
     req_cmd.add_argument("--max", type=int, help="Maximum requests to process")
     req_cmd.add_argument("--no-retry", action="store_true", help="Do not retry failed evaluations")
+    req_cmd.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of requests evaluated concurrently (default 1)",
+    )
+    req_cmd.add_argument(
+        "--lease-dir",
+        help="Shared directory for request leases (default $LAAL_LEASE_DIR or results/.leases). "
+        "Enables lease-based claiming even with a single worker.",
+    )
+    req_cmd.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=DEFAULT_LEASE_TTL,
+        help="Lease expiry in seconds; renewed by a heartbeat every ttl/3",
+    )
+    req_cmd.add_argument(
+        "--adaptive",
+        action="store_true",
+        help=(
+            "Stop each evaluation once the score interval is narrow "
+            "or the leaderboard rank settled"
+        ),
+    )
 
     # local processing
     local_cmd = sub.add_parser("local", help="Upload results from local path")
-    local_cmd.add_argument("path", help="Path to results directory (containing evaluation_summary.json)")
+    local_cmd.add_argument(
+        "path", help="Path to results directory (containing evaluation_summary.json)"
+    )
 
     # refresh summary
-    refresh_cmd = sub.add_parser("refresh", help="Recompute evaluation_summary.json from detailed_results.jsonl")
+    refresh_cmd = sub.add_parser(
+        "refresh", help="Recompute evaluation_summary.json from detailed_results.jsonl"
+    )
     refresh_cmd.add_argument("path", help="Path to results directory")
 
+    # retry failed evaluations
+    retry_cmd = sub.add_parser(
+        "retry", help="Re-judge failed evaluations in detailed_results.jsonl"
+    )
+    retry_cmd.add_argument("path", help="Path to results directory")
+
     # clear
     clear_cmd = sub.add_parser("clear-results", help="Clear the results dataset table")
 
     p.add_argument("--dry-run", action="store_true", help="Run without pushing changes")
+    p.add_argument(
+        "--max-attempts",
+        type=int,
+        default=JUDGE_MAX_ATTEMPTS,
+        help="Judge attempts per failed sample, counted across retry runs",
+    )
+    p.add_argument(
+        "--judge-concurrency",
+        type=int,
+        default=JUDGE_CONCURRENCY,
+        help="Concurrent judge calls when retrying",
+    )
+    p.add_argument(
+        "--judge-rate-limit",
+        type=float,
+        default=JUDGE_RATE_LIMIT,
+        help="Maximum judge calls per second when retrying (0 = unlimited)",
+    )
     return p
 
 
 def main(argv: Optional[List[str]] = None):
     args = build_arg_parser().parse_args(argv)
-    pipeline = EvaluationPipeline(dry_run=args.dry_run, max_requests=getattr(args, "max", None))
+    pipeline = EvaluationPipeline(
+        dry_run=args.dry_run,
+        max_requests=getattr(args, "max", None),
+        retry_options={
+            "max_attempts": args.max_attempts,
+            "concurrency": args.judge_concurrency,
+            "rate_limit": args.judge_rate_limit,
+        },
+        adaptive=getattr(args, "adaptive", False),
+    )
 
     if args.command in (None, "requests"):
-        pipeline.process_requests(retry_failures=not getattr(args, "no_retry", False))
+        lease_dir = getattr(args, "lease_dir", None)
+        pipeline.process_requests(
+            retry_failures=not getattr(args, "no_retry", False),
+            workers=getattr(args, "workers", 1),
+            lease_backend=FileLeaseBackend(lease_dir) if lease_dir else None,
+            lease_ttl=getattr(args, "lease_ttl", DEFAULT_LEASE_TTL),
+        )
 
     elif args.command == "local":
         pipeline.process_local_results(args.path)
@@ -799,6 +1266,9 @@ def main(argv: Optional[List[str]] = None):
     elif args.command == "refresh":
         pipeline.refresh_summary(args.path)
 
+    elif args.command == "retry":
+        pipeline.retry_failed(args.path)
+
     elif args.command == "clear-results":
         pipeline.clear_results_table()
     else:
@@ -806,4 +1276,4 @@ def main(argv: Optional[List[str]] = None):
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,189 @@
+"""
+Adaptive evaluation: stop once the global score is pinned down
+
+Samples are visited in a stratified random order: questions are split into
+strata by length, shuffled within each stratum and interleaved so that every
+prefix of the order keeps the strata proportions. After each batch, a
+confidence interval on the mean global score over the whole dataset is
+updated (normal approximation with a finite-population correction). Each
+interval is computed at confidence 1 - alpha / looks, where `looks` is the
+number of batches after which the run may stop, so the interval holds at
+every stopping point at once (Bonferroni). The run stops when the interval is
+narrower than the target width, or when no other leaderboard model's score
+falls inside it, so the rank can no longer change.
+"""
+
+import logging
+import math
+import os
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .config import (
+    ADAPTIVE_CONFIDENCE,
+    ADAPTIVE_LEADERBOARD_ROOT,
+    ADAPTIVE_MIN_SAMPLES,
+    ADAPTIVE_SEED,
+    ADAPTIVE_TARGET_WIDTH,
+    BATCH_SIZE,
+    RESULTS_DIR,
+)
+from .records import SampleResult, as_record
+
+logger = logging.getLogger(__name__)
+
+TARGET_WIDTH = "target_width"
+RANK_SETTLED = "rank_settled"
+EXHAUSTED = "dataset_exhausted"
+
+
+def stratified_order(keys: Sequence[float], strata: int = 5, seed: int = 0) -> np.ndarray:
+    """Positions of `keys` in a random order whose prefixes are stratified by key quantile
+
+    Each item gets slot (rank within its shuffled stratum + u) / stratum size,
+    with one random offset u per stratum; sorting the slots interleaves the
+    strata in proportion to their sizes.
+    """
+    keys = np.asarray(keys, dtype=np.float64)
+    if not len(keys):
+        return np.empty(0, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    edges = np.quantile(keys, np.linspace(0, 1, strata + 1)[1:-1])
+    stratum = np.searchsorted(edges, keys, side="right")
+    # Shuffle, then stable-sort by stratum: a random order inside each stratum
+    shuffled = rng.permutation(len(keys))
+    shuffled = shuffled[np.argsort(stratum[shuffled], kind="stable")]
+    sizes = np.bincount(stratum[shuffled], minlength=strata)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.arange(len(keys)) - starts[stratum[shuffled]]
+    offsets = rng.random(strata)
+    slots = (rank + offsets[stratum[shuffled]]) / sizes[stratum[shuffled]]
+    return shuffled[np.argsort(slots, kind="stable")]
+
+
+def leaderboard_scores(
+    results_root: str = ADAPTIVE_LEADERBOARD_ROOT, exclude: Optional[str] = RESULTS_DIR
+) -> List[float]:
+    """Mean global score of every other model found under `results_root`"""
+    from .compare import find_models, load_model_scores
+
+    excluded = os.path.abspath(exclude) if exclude else None
+    scores = []
+    for name, path in find_models(results_root).items():
+        if os.path.abspath(path) == excluded:
+            continue
+        try:
+            _, values = load_model_scores(path)
+        except Exception as e:
+            logger.warning(f"Skipping leaderboard model {name}: {e}")
+            continue
+        if len(values) and not np.isnan(values).all():
+            scores.append(float(np.nanmean(values)))
+    return scores
+
+
+class AdaptiveStopping:
+    """Sequential confidence bound on the global score and the stopping rule"""
+
+    def __init__(
+        self,
+        target_width: float = ADAPTIVE_TARGET_WIDTH,
+        confidence: float = ADAPTIVE_CONFIDENCE,
+        min_samples: int = ADAPTIVE_MIN_SAMPLES,
+        reference_scores: Optional[Sequence[float]] = None,
+        batch_size: int = BATCH_SIZE,
+        strata: int = 5,
+        seed: int = ADAPTIVE_SEED,
+    ):
+        self.target_width = target_width
+        self.confidence = confidence
+        self.min_samples = min_samples
+        self.reference_scores = np.sort(np.asarray(reference_scores or [], dtype=np.float64))
+        self.batch_size = batch_size
+        self.strata = strata
+        self.seed = seed
+        self.population = 0
+        self.scores: List[float] = []
+        self.looks = 0
+        self.reason: Optional[str] = None
+
+    def order(self, dataset: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Stratified evaluation order of `dataset` (strata by question length)"""
+        self.population = len(dataset)
+        return stratified_order(
+            [len(sample.get("question") or "") for sample in dataset], self.strata, self.seed
+        )
+
+    @property
+    def max_looks(self) -> int:
+        """Batches after which the run may stop (the Bonferroni divisor)"""
+        remaining = max(0, self.population - self.min_samples)
+        return 1 + math.ceil(remaining / max(1, self.batch_size))
+
+    def interval(self) -> Tuple[float, float, float]:
+        """(mean, low, high) of the global score over the whole dataset"""
+        n = len(self.scores)
+        if not n:
+            return math.nan, 0.0, 100.0
+        scores = np.asarray(self.scores)
+        mean = float(scores.mean())
+        if n == 1 or n >= self.population:
+            half_width = 0.0 if n >= self.population else math.inf
+        else:
+            alpha = (1 - self.confidence) / self.max_looks
+            z = NormalDist().inv_cdf(1 - alpha / 2)
+            correction = math.sqrt((self.population - n) / (self.population - 1))
+            half_width = z * scores.std(ddof=1) / math.sqrt(n) * correction
+        return mean, float(max(0.0, mean - half_width)), float(min(100.0, mean + half_width))
+
+    def rank_range(self, low: float, high: float) -> Tuple[int, int]:
+        """Best and worst leaderboard rank (1 = best) compatible with [low, high]"""
+        reference = self.reference_scores
+        best = 1 + len(reference) - int(np.searchsorted(reference, high, side="right"))
+        worst = 1 + len(reference) - int(np.searchsorted(reference, low, side="left"))
+        return best, worst
+
+    def update(self, results: Sequence[Union[SampleResult, Dict[str, Any]]]) -> bool:
+        """Add a batch of results; True once the run can stop"""
+        for result in results:
+            record = as_record(result)
+            # Failed evaluations count as zeros, as in the final metrics
+            self.scores.append(record.score_global if record.scored else 0.0)
+        if len(self.scores) >= self.population:
+            self.reason = EXHAUSTED
+        elif len(self.scores) >= self.min_samples:
+            self.looks += 1
+            _, low, high = self.interval()
+            best, worst = self.rank_range(low, high)
+            if high - low <= self.target_width:
+                self.reason = TARGET_WIDTH
+            elif len(self.reference_scores) and best == worst:
+                self.reason = RANK_SETTLED
+        return self.reason is not None
+
+    def summary(self) -> Dict[str, Any]:
+        """Stopping decision and the guarantee behind it, for the evaluation summary"""
+        mean, low, high = self.interval()
+        best, worst = self.rank_range(low, high)
+        return {
+            "stopped_early": self.reason in (TARGET_WIDTH, RANK_SETTLED),
+            "stop_reason": self.reason,
+            "evaluated_samples": len(self.scores),
+            "population": self.population,
+            "global_score_mean": None if math.isnan(mean) else mean,
+            "global_score_interval": [low, high],
+            "confidence": self.confidence,
+            "target_width": self.target_width,
+            "min_samples": self.min_samples,
+            "looks": self.looks,
+            "max_looks": self.max_looks,
+            "leaderboard_models": len(self.reference_scores),
+            "rank_range": [best, worst] if len(self.reference_scores) else None,
+            "order": {"strata": self.strata, "stratified_by": "question_length", "seed": self.seed},
+            "method": (
+                "normal interval with finite-population correction at confidence "
+                "1 - (1 - confidence) / max_looks, valid at every stopping point"
+            ),
+        }
@@ -0,0 +1,332 @@
+"""
+Load-testing benchmark of the evaluator against the bundled mock LLM server
+
+Each concurrency level runs in a fresh spawned process configured through the
+environment (like the pipeline workers), so its CPU time and peak RSS belong to
+the evaluator alone; the mock server runs in the parent process.
+
+`run_storage_benchmark` compares the detailed results formats (plain JSONL,
+gzip and zstd frames) on size, write time, full reads and random reads, and
+`run_json_benchmark` the JSON backends on encoding and decoding result records.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from .detailed_store import COMPRESSIONS, DetailedStore
+from .mock_server import _ANSWER_BULLETS, _FILLER, RUBRICS, MockLLMServer, MockServerConfig
+from .serialization import BACKENDS, decode_scores, make_codec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY_LEVELS = (1, 8, 32, 128)
+
+_QUESTION = (
+    "Une SARL souhaite transférer son siège social dans un autre département. "
+    "Quelles démarches doit-elle accomplir et dans quels délais ? (cas {idx})"
+)
+
+
+def _bench_samples(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "question": _QUESTION.format(idx=idx),
+            "action_requise": "Modifier les statuts et déclarer le transfert",
+            "delai_legal": "Un mois",
+            "documents_obligatoires": "Procès-verbal, statuts mis à jour",
+            "impact_financier": "Frais de greffe et d'annonce légale",
+            "consequences_non_conformite": "Amende et inopposabilité",
+        }
+        for idx in range(count)
+    ]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def _run_level(samples: int, use_chat: bool, queue) -> None:
+    """Child process: evaluate `samples` synthetic samples and report measurements"""
+    import asyncio
+
+    try:
+        from .evaluator import LesAuditsAffairesEvaluator
+        from .metrics import GENERATION, JUDGE, QUEUE_WAIT, WRITE
+        from .model_client import ChatModelClient, ModelClient
+
+        logging.getLogger().setLevel(logging.WARNING)
+        evaluator = LesAuditsAffairesEvaluator(use_chat_endpoint=use_chat)
+        dataset = _bench_samples(samples)
+
+        async def run():
+            client_class = ChatModelClient if use_chat else ModelClient
+            async with client_class() as client:
+                evaluator.model_client = client
+                return await evaluator.evaluate_batch(dataset, 0)
+
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        wall_time = time.perf_counter() - start
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+        cpu_time = (usage_after.ru_utime - usage_before.ru_utime) + (
+            usage_after.ru_stime - usage_before.ru_stime
+        )
+        stages = {
+            stage: evaluator.metrics.stage(stage).summary()
+            for stage in (QUEUE_WAIT, GENERATION, JUDGE, WRITE)
+        }
+        queue.put(
+            {
+                "samples": len(results),
+                "failed": sum(1 for r in results if r.failure_stage),
+                "wall_time_s": wall_time,
+                "samples_per_sec": len(results) / wall_time if wall_time else 0,
+                "cpu_time_s": cpu_time,
+                "cpu_percent": 100 * cpu_time / wall_time if wall_time else 0,
+                "peak_rss_mb": _peak_rss_mb(),
+                "p95_s": {stage: summary["p95"] for stage, summary in stages.items()},
+            }
+        )
+    except Exception as e:  # report instead of hanging the parent
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_benchmark(
+    concurrency_levels: Sequence[int] = DEFAULT_CONCURRENCY_LEVELS,
+    samples: int = 200,
+    server_config: Optional[MockServerConfig] = None,
+    use_chat: bool = False,
+    timeout: float = 1800,
+) -> List[Dict[str, Any]]:
+    """Benchmark the evaluator at each concurrency level against a mock server"""
+    results = []
+    ctx = mp.get_context("spawn")
+    with MockLLMServer(server_config) as server, tempfile.TemporaryDirectory() as workdir:
+        logger.info(f"Mock LLM server listening on {server.url}")
+        for concurrency in concurrency_levels:
+            env = {
+                "MODEL_ENDPOINT": f"{server.url}/generate",
+                "EVALUATOR_PROVIDER": "local",
+                "EVALUATOR_ENDPOINT": server.url,
+                "CONCURRENT_REQUESTS": str(concurrency),
+                "BATCH_SIZE": str(samples),
+                "RESULTS_DIR": os.path.join(workdir, f"c{concurrency}"),
+                "METRICS_FILE": "",
+                "TQDM_DISABLE": "1",
+            }
+            saved = {key: os.environ.get(key) for key in env}
+            os.environ.update(env)
+            cwd = os.getcwd()
+            # The evaluator logs to evaluation.log in the working directory
+            os.chdir(workdir)
+            try:
+                queue = ctx.Queue()
+                process = ctx.Process(target=_run_level, args=(samples, use_chat, queue))
+                process.start()
+                try:
+                    level = queue.get(timeout=timeout)
+                finally:
+                    process.join(timeout=30)
+            finally:
+                os.chdir(cwd)
+                for key, value in saved.items():
+                    if value is None:
+                        os.environ.pop(key, None)
+                    else:
+                        os.environ[key] = value
+            level["concurrency"] = concurrency
+            results.append(level)
+            logger.info(f"Concurrency {concurrency}: {level}")
+    return results
+
+
+def format_benchmark(results: List[Dict[str, Any]]) -> str:
+    """Plain-text table of benchmark results"""
+    header = (
+        f"{'conc':>5} {'samples/s':>10} {'cpu%':>7} {'rss MB':>8} {'failed':>7} "
+        f"{'p95 queue':>10} {'p95 gen':>8} {'p95 judge':>10} {'p95 write':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for level in results:
+        if "error" in level:
+            lines.append(f"{level['concurrency']:>5} ❌ {level['error']}")
+            continue
+        p95 = level["p95_s"]
+        lines.append(
+            f"{level['concurrency']:>5} {level['samples_per_sec']:>10.2f} "
+            f"{level['cpu_percent']:>7.1f} {level['peak_rss_mb']:>8.1f} {level['failed']:>7} "
+            f"{p95['queue_wait']:>10.3f} {p95['generation']:>8.3f} {p95['judge']:>10.3f} "
+            f"{p95['write'] * 1000:>8.1f}ms"
+        )
+    return "\n".join(lines)
+
+
+def _storage_records(count: int, response_tokens: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic detailed results with long responses
+
+    Words are drawn at random (with article numbers and amounts mixed in) rather
+    than repeated, so compression ratios are not flattered by the mock answer.
+    """
+    rng = random.Random(seed)
+    vocabulary = sorted(set((_FILLER + _ANSWER_BULLETS).split()))
+    records = []
+    for idx in range(count):
+        words = [
+            rng.choice(vocabulary) if rng.random() < 0.9 else str(rng.randint(1, 99999))
+            for _ in range(response_tokens)
+        ]
+        records.append(
+            {
+                "sample_idx": idx,
+                "question": _QUESTION.format(idx=idx),
+                "model_response": " ".join(words),
+                "status": "ok",
+                "failure_stage": None,
+                "evaluation": {
+                    "score_global": rng.uniform(0, 100),
+                    "scores": {rubric: rng.uniform(0, 100) for rubric in RUBRICS},
+                    "justifications": {
+                        rubric: " ".join(rng.choices(vocabulary, k=60)) for rubric in RUBRICS
+                    },
+                },
+                "metadata": {"generation_time": rng.uniform(1, 60), "evaluation_time": 2.0},
+            }
+        )
+    return records
+
+
+def run_storage_benchmark(
+    samples: int = 200, response_tokens: int = 32000, random_reads: int = 50
+) -> List[Dict[str, Any]]:
+    """Size and read/write speed of each detailed results format"""
+    records = _storage_records(samples, response_tokens)
+    rng = random.Random(1)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for compression in COMPRESSIONS:
+            try:
+                store = DetailedStore(os.path.join(workdir, compression or "plain"), compression)
+            except ImportError as e:
+                results.append({"compression": compression, "error": str(e)})
+                continue
+            start = time.perf_counter()
+            for record in records:
+                store.append(record)
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            read_count = sum(1 for _ in store)
+            read_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            picked = rng.sample(store.index(), min(random_reads, samples))
+            list(store.read(picked))
+            random_time = time.perf_counter() - start
+
+            results.append(
+                {
+                    "compression": compression or "none",
+                    "records": read_count,
+                    "size_mb": os.path.getsize(store.path) / 1024**2,
+                    "write_s": write_time,
+                    "read_all_s": read_time,
+                    "random_read_ms": 1000 * random_time / len(picked),
+                }
+            )
+    plain_size = results[0]["size_mb"]
+    for level in results:
+        if "size_mb" in level:
+            level["ratio"] = plain_size / level["size_mb"]
+    return results
+
+
+def format_storage_benchmark(results: List[Dict[str, Any]]) -> str:
+    """Plain-text table of storage benchmark results"""
+    header = (
+        f"{'format':>7} {'size MB':>9} {'ratio':>6} {'write s':>8} {'read s':>7} "
+        f"{'random read':>12}"
+    )
+    lines = [header, "-" * len(header)]
+    for level in results:
+        if "error" in level:
+            lines.append(f"{level['compression']:>7} ❌ {level['error']}")
+            continue
+        lines.append(
+            f"{level['compression']:>7} {level['size_mb']:>9.1f} {level['ratio']:>5.1f}x "
+            f"{level['write_s']:>8.2f} {level['read_all_s']:>7.2f} "
+            f"{level['random_read_ms']:>10.2f}ms"
+        )
+    return "\n".join(lines)
+
+
+def run_json_benchmark(samples: int = 200, response_tokens: int = 32000) -> List[Dict[str, Any]]:
+    """Encode/decode time of result records with each installed JSON backend"""
+    records = _storage_records(samples, response_tokens)
+    results = []
+    for backend in BACKENDS:
+        try:
+            dumps, loads = make_codec(backend)
+        except ImportError:
+            results.append({"backend": backend, "error": f"{backend} not installed"})
+            continue
+        start = time.perf_counter()
+        encoded = [dumps(record) for record in records]
+        encode_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for data in encoded:
+            loads(data)
+        decode_time = time.perf_counter() - start
+        results.append(
+            {
+                "backend": backend,
+                "mb": sum(map(len, encoded)) / 1024**2,
+                "encode_s": encode_time,
+                "decode_s": decode_time,
+            }
+        )
+
+    # Scores-only decoding, as used by summaries (typed structs with msgspec)
+    encoded = [make_codec("json")[0](record) for record in records]
+    start = time.perf_counter()
+    for data in encoded:
+        decode_scores(data)
+    results.append({"backend": "scores", "decode_s": time.perf_counter() - start, "encode_s": None})
+
+    baseline = next(level for level in results if level["backend"] == "json")
+    for level in results:
+        if level.get("decode_s"):
+            level["decode_speedup"] = baseline["decode_s"] / level["decode_s"]
+        if level.get("encode_s"):
+            level["encode_speedup"] = baseline["encode_s"] / level["encode_s"]
+    return results
+
+
+def format_json_benchmark(results: List[Dict[str, Any]]) -> str:
+    """Plain-text table of JSON backend benchmark results"""
+    header = f"{'backend':>8} {'encode s':>9} {'speedup':>8} {'decode s':>9} {'speedup':>8}"
+    lines = [header, "-" * len(header)]
+    for level in results:
+        if "error" in level:
+            lines.append(f"{level['backend']:>8} ❌ {level['error']}")
+            continue
+        encode = (
+            f"{level['encode_s']:>9.3f} {level['encode_speedup']:>7.1f}x"
+            if level["encode_s"]
+            else f"{'-':>9} {'-':>8}"
+        )
+        lines.append(
+            f"{level['backend']:>8} {encode} "
+            f"{level['decode_s']:>9.3f} {level['decode_speedup']:>7.1f}x"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,222 @@
+"""
+Completion budget (max_tokens) of each request from the prompt length
+
+Every request used to reserve a fixed number of completion tokens whatever its
+prompt. `TokenBudget` counts the prompt tokens with a local tokenizer and
+gives each request
+
+    min(cap, learned cap, context window - prompt tokens - margin)
+
+- `cap`: the configured maximum (MAX_TOKENS for the evaluated model,
+  EXTERNAL_MAX_TOKENS for external providers, JUDGE_MAX_TOKENS for the
+  judge), lowered to the model's maximum output when `MODEL_LIMITS` knows it;
+- learned cap (TOKEN_BUDGET=learned): TOKEN_BUDGET_MARGIN times the
+  TOKEN_BUDGET_QUANTILE of the model's past response lengths, once
+  TOKEN_BUDGET_MIN_HISTORY of them are recorded in TOKEN_BUDGET_FILE;
+- context window: MODEL_CONTEXT_WINDOW for the evaluated model, else
+  `MODEL_LIMITS` (exact or aliased ids); the term is skipped when the window is
+  unknown.
+
+The margin covers the gap between the local tokenizer and the model's own.
+Smaller reservations let servers such as vLLM or TGI batch more requests at
+once. `record_response_lengths` adds the completion tokens of a finished run
+to the history.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .config import (
+    TOKEN_BUDGET,
+    TOKEN_BUDGET_FILE,
+    TOKEN_BUDGET_HISTORY,
+    TOKEN_BUDGET_MARGIN,
+    TOKEN_BUDGET_MIN_HISTORY,
+    TOKEN_BUDGET_QUANTILE,
+    TOKENIZER,
+)
+from .records import SampleResult, as_record
+from .serialization import dump_file, load_file
+from .tokenizer import get_tokenizer
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "context", "learned")
+
+# (context window, maximum output tokens or None) of known models
+MODEL_LIMITS: Dict[str, Tuple[int, Optional[int]]] = {
+    "gpt-4o": (128_000, 16_384),
+    "gpt-4o-2024-05-13": (128_000, 4_096),
+    "gpt-4o-mini": (128_000, 16_384),
+    "gpt-4.1": (1_047_576, 32_768),
+    "gpt-4.1-mini": (1_047_576, 32_768),
+    "gpt-4.1-nano": (1_047_576, 32_768),
+    "gpt-4-turbo": (128_000, 4_096),
+    "gpt-3.5-turbo": (16_385, 4_096),
+    "o1": (200_000, 100_000),
+    "o3": (200_000, 100_000),
+    "o3-mini": (200_000, 100_000),
+    "o4-mini": (200_000, 100_000),
+    "mistral-large-latest": (131_072, None),
+    "mistral-medium-latest": (131_072, None),
+    "mistral-small-latest": (32_768, None),
+    "claude-3-5-sonnet-20241022": (200_000, 8_192),
+    "claude-3-5-sonnet-20240620": (200_000, 4_096),
+    "claude-3-5-haiku-20241022": (200_000, 8_192),
+    "claude-3-7-sonnet-20250219": (200_000, 64_000),
+    "claude-3-opus-20240229": (200_000, 4_096),
+    "claude-3-haiku-20240307": (200_000, 4_096),
+    "claude-sonnet-4-20250514": (200_000, 64_000),
+    "claude-opus-4-20250514": (200_000, 32_000),
+    "gemini-1.5-pro": (2_097_152, 8_192),
+    "gemini-1.5-flash": (1_048_576, 8_192),
+    "gemini-2.0-flash": (1_048_576, 8_192),
+    "gemini-2.5-pro": (1_048_576, 65_536),
+    "gemini-2.5-flash": (1_048_576, 65_536),
+}
+
+# Model ids with the limits of a MODEL_LIMITS entry. Like prices, limits only apply
+# to exact or aliased ids: a prefix match would give e.g. "claude-3-5-sonnet-20240620"
+# the 8192-token output of its successor.
+MODEL_LIMIT_ALIASES = {
+    "gpt-4o-2024-08-06": "gpt-4o",
+    "gpt-4o-2024-11-20": "gpt-4o",
+    "gpt-4o-mini-2024-07-18": "gpt-4o-mini",
+    "gpt-4.1-2025-04-14": "gpt-4.1",
+    "gpt-4.1-mini-2025-04-14": "gpt-4.1-mini",
+    "gpt-4.1-nano-2025-04-14": "gpt-4.1-nano",
+    "gpt-4-turbo-2024-04-09": "gpt-4-turbo",
+    "gpt-3.5-turbo-0125": "gpt-3.5-turbo",
+    "o1-2024-12-17": "o1",
+    "o3-2025-04-16": "o3",
+    "o3-mini-2025-01-31": "o3-mini",
+    "o4-mini-2025-04-16": "o4-mini",
+    "mistral-large-2411": "mistral-large-latest",
+    "claude-3-5-sonnet-latest": "claude-3-5-sonnet-20241022",
+    "claude-3-5-haiku-latest": "claude-3-5-haiku-20241022",
+    "claude-3-7-sonnet-latest": "claude-3-7-sonnet-20250219",
+    "claude-3-opus-latest": "claude-3-opus-20240229",
+    "claude-sonnet-4-0": "claude-sonnet-4-20250514",
+    "claude-opus-4-0": "claude-opus-4-20250514",
+    "gemini-1.5-pro-002": "gemini-1.5-pro",
+    "gemini-1.5-flash-002": "gemini-1.5-flash",
+    "gemini-2.0-flash-001": "gemini-2.0-flash",
+}
+
+# Chat formatting tokens per message (role markers, separators)
+MESSAGE_OVERHEAD = 4
+# Margin for the local tokenizer counting differently from the model's
+PROMPT_MARGIN = 0.05
+MIN_MARGIN = 64
+
+
+def model_limits(model: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """(context window, maximum output) of `model`, None when unknown"""
+    if not model:
+        return None, None
+    limits = MODEL_LIMITS.get(model) or MODEL_LIMITS.get(MODEL_LIMIT_ALIASES.get(model, ""))
+    return limits or (None, None)
+
+
+def load_history(path: str = TOKEN_BUDGET_FILE) -> Dict[str, List[int]]:
+    """Past response lengths per model ({} when there are none yet)"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        return load_file(path)
+    except Exception as e:  # pragma: no cover – a bad history must not break runs
+        logger.warning(f"Could not load response lengths {path}: {e}")
+        return {}
+
+
+def quantile(values: Sequence[int], q: float) -> int:
+    """Nearest-rank quantile of `values`"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(q * len(ordered) + 0.5) - 1))]
+
+
+class TokenBudget:
+    """max_tokens of the requests sent to one model"""
+
+    def __init__(
+        self,
+        model: Optional[str],
+        max_tokens: int,
+        mode: str = TOKEN_BUDGET,
+        context_window: int = 0,
+        tokenizer: Union[str, Any, None] = None,
+        history_file: str = TOKEN_BUDGET_FILE,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown TOKEN_BUDGET mode {mode!r}, expected {MODES}")
+        self.model = model
+        self.mode = mode
+        window, max_output = model_limits(model)
+        self.context_window = context_window or window
+        self.max_tokens = min(max_tokens, max_output) if max_output else max_tokens
+        self.learned_tokens = None
+        if mode == "learned":
+            lengths = load_history(history_file).get(model or "", [])
+            if len(lengths) >= TOKEN_BUDGET_MIN_HISTORY:
+                learned = int(quantile(lengths, TOKEN_BUDGET_QUANTILE) * TOKEN_BUDGET_MARGIN)
+                self.learned_tokens = max(1, learned)
+        # Named tokenizers are built once per process; "off" never counts tokens
+        if isinstance(tokenizer, str) or tokenizer is None:
+            tokenizer = None if mode == "off" else get_tokenizer(tokenizer or TOKENIZER)
+        self.tokenizer = tokenizer
+        logger.debug(
+            f"Token budget for {model}: mode={mode}, cap={self.max_tokens}, "
+            f"learned={self.learned_tokens}, context={self.context_window}"
+        )
+
+    def prompt_tokens(self, prompt: Union[str, Sequence[Dict[str, Any]]]) -> int:
+        """Tokens of a prompt string or of chat messages"""
+        if isinstance(prompt, str):
+            return self.tokenizer.count(prompt)
+        return sum(
+            self.tokenizer.count(str(message.get("content", ""))) + MESSAGE_OVERHEAD
+            for message in prompt
+        )
+
+    def completion_tokens(self, prompt: Union[str, Sequence[Dict[str, Any]]]) -> int:
+        """max_tokens for a request sending `prompt`"""
+        if self.mode == "off":
+            return self.max_tokens
+        budget = self.max_tokens
+        if self.learned_tokens:
+            budget = min(budget, self.learned_tokens)
+        if self.context_window:
+            used = self.prompt_tokens(prompt)
+            room = self.context_window - used - max(MIN_MARGIN, int(used * PROMPT_MARGIN))
+            budget = min(budget, room)
+        return max(1, budget)
+
+
+def record_response_lengths(
+    results: Iterable[Union[SampleResult, Dict[str, Any]]],
+    models: Dict[str, Optional[str]],
+    path: str = TOKEN_BUDGET_FILE,
+    keep: int = TOKEN_BUDGET_HISTORY,
+) -> Dict[str, int]:
+    """Add the completion tokens of `results` to the history, per model
+
+    `models` maps a usage block of the metadata (`generation_usage`,
+    `judge_usage`) to the model that produced it; None skips the block.
+    Returns the number of lengths recorded per model.
+    """
+    lengths: Dict[str, List[int]] = {}
+    for result in results:
+        metadata = as_record(result).metadata
+        for usage_key, model in models.items():
+            completion = (metadata.get(usage_key) or {}).get("completion_tokens")
+            if model and completion:
+                lengths.setdefault(model, []).append(int(completion))
+    if not lengths:
+        return {}
+
+    history = load_history(path)
+    for model, values in lengths.items():
+        history[model] = (history.get(model, []) + values)[-keep:]
+    dump_file(history, path)
+    return {model: len(values) for model, values in lengths.items()}
@@ -0,0 +1,453 @@
+"""
+Record/replay of HTTP traffic for deterministic, offline runs
+
+A `Cassette` patches the three HTTP stacks used by the clients – `requests`
+(judge calls), `aiohttp` (local and external model clients) and the httpx
+transports under the OpenAI/Azure SDK – so every request/response pair can be
+recorded to a compact JSON-lines file (gzip when the path ends in `.gz`) and
+served back later. Requests are keyed by a hash of method, URL and canonical
+body; credentials are never part of the key or the file (headers are not
+recorded and the Gemini `key` query parameter is dropped).
+
+Modes: `record` always hits the network and appends, `replay` never does (a
+missing request raises `CassetteMiss`), `auto` replays what it has and records
+the rest. Replay can wait the recorded latency, scaled by `speed`, or answer
+immediately.
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .config import CASSETTE_FILE, CASSETTE_MODE, CASSETTE_SPEED
+
+logger = logging.getLogger(__name__)
+
+MODES = ("record", "replay", "auto")
+
+# Query parameters that carry credentials
+_SECRET_PARAMS = {"key", "api_key", "api-key", "access_token"}
+# Response headers worth keeping (everything else is dropped for compactness)
+_KEPT_HEADERS = {"content-type", "retry-after"}
+# Dataset downloads go to the network (HF has its own cache / offline mode)
+PASSTHROUGH_HOSTS = ("huggingface.co", "hf.co")
+
+
+class CassetteMiss(RuntimeError):
+    """Raised in replay mode for a request that was never recorded"""
+
+
+def _canonical_url(url: str) -> str:
+    parts = urlsplit(str(url))
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k.lower() not in _SECRET_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ""))
+
+
+def _canonical_body(body: Any) -> bytes:
+    if body is None:
+        return b""
+    if not isinstance(body, (bytes, bytearray)):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        else:
+            body = json.dumps(body, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    try:
+        # Same JSON with different key order or spacing must hash the same
+        return json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False).encode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        return bytes(body)
+
+
+def request_key(method: str, url: str, body: Any = None) -> str:
+    """Stable hash identifying a request"""
+    digest = hashlib.sha256()
+    digest.update(method.upper().encode())
+    digest.update(b" ")
+    digest.update(_canonical_url(url).encode())
+    digest.update(b"\n")
+    digest.update(_canonical_body(body))
+    return digest.hexdigest()[:32]
+
+
+def _encode_body(body: bytes) -> Dict[str, str]:
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(entry: Dict[str, Any]) -> bytes:
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry.get("body", "").encode("utf-8")
+
+
+def _kept_headers(headers: Any) -> Dict[str, str]:
+    return {k.lower(): v for k, v in dict(headers or {}).items() if k.lower() in _KEPT_HEADERS}
+
+
+class Cassette:
+    """Recorded request/response pairs plus the patches that use them"""
+
+    def __init__(self, path: str, mode: str = "replay", speed: Optional[float] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}. Available: {', '.join(MODES)}")
+        self.path = path
+        self.mode = mode
+        # None/0 = answer immediately, 1.0 = recorded timing, 10 = ten times faster
+        self.speed = speed
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"recorded": 0, "replayed": 0}
+        if mode != "record" and os.path.exists(path):
+            self._load()
+
+    # ----------------------------------------------------------- storage
+
+    def _open(self, mode: str):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def _load(self):
+        with self._open("r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+        logger.info(f"Loaded {sum(map(len, self._entries.values()))} recordings from {self.path}")
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        request_body: Any,
+        status: int,
+        headers: Any,
+        body: bytes,
+        elapsed: float,
+    ):
+        entry = {
+            "key": request_key(method, url, request_body),
+            "method": method.upper(),
+            "url": _canonical_url(url),
+            "status": status,
+            "headers": _kept_headers(headers),
+            "elapsed": round(elapsed, 4),
+            **_encode_body(body),
+        }
+        with self._lock:
+            self._entries.setdefault(entry["key"], []).append(entry)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Append immediately so an interrupted run keeps what it recorded
+            with self._open("a") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.stats["recorded"] += 1
+
+    def lookup(self, method: str, url: str, request_body: Any) -> Optional[Dict[str, Any]]:
+        """Next recording for this request (repeats cycle on the last one)"""
+        if self.mode == "record":
+            return None
+        key = request_key(method, url, request_body)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                if self.mode == "replay":
+                    raise CassetteMiss(f"No recording for {method.upper()} {_canonical_url(url)}")
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self.stats["replayed"] += 1
+            return entries[min(cursor, len(entries) - 1)]
+
+    def handles(self, url: Any) -> bool:
+        """Whether `url` goes through the cassette (dataset hosts pass through)"""
+        host = (urlsplit(str(url)).hostname or "").lower()
+        return not any(host == h or host.endswith("." + h) for h in PASSTHROUGH_HOSTS)
+
+    def _delay(self, entry: Dict[str, Any]) -> float:
+        return entry.get("elapsed", 0) / self.speed if self.speed else 0.0
+
+    # ----------------------------------------------------------- patching
+
+    @contextmanager
+    def activate(self) -> Iterator["Cassette"]:
+        """Route requests, aiohttp and httpx traffic through the cassette"""
+        patches = _requests_patches(self) + _aiohttp_patches(self) + _httpx_patches(self)
+        originals = []
+        for owner, name, replacement in patches:
+            originals.append((owner, name, getattr(owner, name)))
+            setattr(owner, name, replacement)
+        logger.info(f"Cassette {self.mode} mode active: {self.path}")
+        try:
+            yield self
+        finally:
+            for owner, name, original in reversed(originals):
+                setattr(owner, name, original)
+            logger.info(
+                f"Cassette closed: {self.stats['recorded']} recorded, "
+                f"{self.stats['replayed']} replayed"
+            )
+
+
+def cassette_from_env() -> Optional[Cassette]:
+    """Cassette configured by CASSETTE_FILE / CASSETTE_MODE / CASSETTE_SPEED, if any"""
+    if not CASSETTE_FILE:
+        return None
+    return Cassette(CASSETTE_FILE, CASSETTE_MODE, CASSETTE_SPEED)
+
+
+@contextmanager
+def maybe_activate(cassette: Optional[Cassette]) -> Iterator[Optional[Cassette]]:
+    if cassette is None:
+        yield None
+        return
+    with cassette.activate():
+        yield cassette
+
+
+# --------------------------------------------------------------- requests
+
+
+def _requests_patches(cassette: Cassette) -> List[Tuple[Any, str, Any]]:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+
+    original_send = HTTPAdapter.send
+
+    def send(adapter, request, *args, **kwargs):
+        if not cassette.handles(request.url):
+            return original_send(adapter, request, *args, **kwargs)
+        entry = cassette.lookup(request.method, request.url, request.body)
+        if entry is not None:
+            time.sleep(cassette._delay(entry))
+            response = requests.Response()
+            response.status_code = entry["status"]
+            response.headers = CaseInsensitiveDict(entry["headers"])
+            response._content = _decode_body(entry)
+            response.url = request.url
+            response.request = request
+            response.encoding = "utf-8"
+            response.reason = "Replayed"
+            return response
+
+        start = time.perf_counter()
+        response = original_send(adapter, request, *args, **kwargs)
+        body = response.content  # read now; cached on the response for the caller
+        cassette.record(
+            request.method,
+            request.url,
+            request.body,
+            response.status_code,
+            response.headers,
+            body,
+            time.perf_counter() - start,
+        )
+        return response
+
+    return [(HTTPAdapter, "send", send)]
+
+
+# ---------------------------------------------------------------- aiohttp
+
+
+class _ReplayedAiohttpResponse:
+    """Minimal stand-in for `aiohttp.ClientResponse` serving a recorded body"""
+
+    def __init__(self, method: str, url: str, entry: Dict[str, Any]):
+        from multidict import CIMultiDict
+
+        self.method = method
+        self.url = url
+        self.status = entry["status"]
+        self.reason = "Replayed"
+        self.headers = CIMultiDict(entry["headers"])
+        self._body = _decode_body(entry)
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: Optional[str] = None, errors: str = "strict") -> str:
+        return self._body.decode(encoding or "utf-8", errors)
+
+    async def json(self, *args, **kwargs) -> Any:
+        loads = kwargs.get("loads") or json.loads
+        return loads(self._body.decode("utf-8"))
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            import aiohttp
+
+            raise aiohttp.ClientResponseError(
+                None, (), status=self.status, message=self.reason, headers=self.headers
+            )
+
+    def release(self):
+        pass
+
+    def close(self):
+        pass
+
+    async def wait_for_close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+def _aiohttp_body(kwargs: Dict[str, Any]) -> Any:
+    if kwargs.get("json") is not None:
+        return kwargs["json"]
+    return kwargs.get("data")
+
+
+def _aiohttp_url(url: Any, params: Any) -> str:
+    url = str(url)
+    if params:
+        url += ("&" if "?" in url else "?") + urlencode(params)
+    return url
+
+
+def _aiohttp_patches(cassette: Cassette) -> List[Tuple[Any, str, Any]]:
+    try:
+        import aiohttp
+    except ImportError:  # pragma: no cover
+        return []
+
+    original_request = aiohttp.ClientSession._request
+
+    async def _request(session, method, str_or_url, **kwargs):
+        if not cassette.handles(str_or_url):
+            return await original_request(session, method, str_or_url, **kwargs)
+        url = _aiohttp_url(str_or_url, kwargs.get("params"))
+        body = _aiohttp_body(kwargs)
+        entry = cassette.lookup(method, url, body)
+        if entry is not None:
+            await asyncio.sleep(cassette._delay(entry))
+            return _ReplayedAiohttpResponse(method, url, entry)
+
+        start = time.perf_counter()
+        response = await original_request(session, method, str_or_url, **kwargs)
+        payload = await response.read()  # cached on the response for the caller
+        cassette.record(
+            method,
+            url,
+            body,
+            response.status,
+            response.headers,
+            payload,
+            time.perf_counter() - start,
+        )
+        return response
+
+    return [(aiohttp.ClientSession, "_request", _request)]
+
+
+# ------------------------------------------------------------------ httpx
+
+
+def _httpx_patches(cassette: Cassette) -> List[Tuple[Any, str, Any]]:
+    """Patch the httpx transports (OpenAI/Azure SDK); newer SDKs vendor it as httpx2"""
+    patches = []
+    for module_name in ("httpx", "httpx2"):
+        try:
+            httpx = __import__(module_name)
+        except ImportError:
+            continue
+        patches.extend(_httpx_module_patches(cassette, httpx))
+    return patches
+
+
+def _decoded_headers(headers) -> List[Tuple[str, str]]:
+    # The payload is already decompressed and fully read
+    dropped = {"content-encoding", "content-length", "transfer-encoding"}
+    return [(k, v) for k, v in headers.items() if k.lower() not in dropped]
+
+
+def _httpx_module_patches(cassette: Cassette, httpx) -> List[Tuple[Any, str, Any]]:
+    original_sync = httpx.HTTPTransport.handle_request
+    original_async = httpx.AsyncHTTPTransport.handle_async_request
+
+    def replayed(request, entry):
+        return httpx.Response(
+            entry["status"], headers=entry["headers"], content=_decode_body(entry), request=request
+        )
+
+    def handle_request(transport, request):
+        if not cassette.handles(request.url):
+            return original_sync(transport, request)
+        body = request.read()
+        entry = cassette.lookup(request.method, str(request.url), body)
+        if entry is not None:
+            time.sleep(cassette._delay(entry))
+            return replayed(request, entry)
+        start = time.perf_counter()
+        response = original_sync(transport, request)
+        payload = response.read()
+        cassette.record(
+            request.method,
+            str(request.url),
+            body,
+            response.status_code,
+            response.headers,
+            payload,
+            time.perf_counter() - start,
+        )
+        return httpx.Response(
+            response.status_code,
+            headers=_decoded_headers(response.headers),
+            content=payload,
+            request=request,
+        )
+
+    async def handle_async_request(transport, request):
+        if not cassette.handles(request.url):
+            return await original_async(transport, request)
+        body = await request.aread()
+        entry = cassette.lookup(request.method, str(request.url), body)
+        if entry is not None:
+            await asyncio.sleep(cassette._delay(entry))
+            return replayed(request, entry)
+        start = time.perf_counter()
+        response = await original_async(transport, request)
+        payload = await response.aread()
+        cassette.record(
+            request.method,
+            str(request.url),
+            body,
+            response.status_code,
+            response.headers,
+            payload,
+            time.perf_counter() - start,
+        )
+        return httpx.Response(
+            response.status_code,
+            headers=_decoded_headers(response.headers),
+            content=payload,
+            request=request,
+        )
+
+    return [
+        (httpx.HTTPTransport, "handle_request", handle_request),
+        (httpx.AsyncHTTPTransport, "handle_async_request", handle_async_request),
+    ]
@@ -7,44 +7,251 @@ from pathlib import Path
 from typing import Optional
 
 from .evaluation import LesAuditsAffairesEvaluator
+from .compare import METRICS
+from .config import ADAPTIVE_LEADERBOARD_ROOT, ADAPTIVE_TARGET_WIDTH, DIFFICULTY_INDEX_FILE
+from .results_store import ANALYSIS_COLUMNS
+from .status import FAILURE_STATUSES, STAGE_GENERATION, STAGE_JUDGE
 
 # Setup logging
 logger = logging.getLogger(__name__)
 from .utils import (
-    create_correlation_heatmap,
-    create_score_distribution_plot,
+    PLOT_FORMATS,
     export_results_to_excel,
     generate_analysis_report,
     load_evaluation_results,
+    render_all_plots,
+    render_plots,
 )
 
 
+def _quiet_console_logging() -> None:
+    """Keep only warnings on the console so the live view stays readable (file log unchanged)"""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler) and not isinstance(
+            handler, logging.FileHandler
+        ):
+            handler.setLevel(logging.WARNING)
+
+
+def _cassette_from_args(args: argparse.Namespace):
+    """Cassette selected by --record / --replay, falling back to CASSETTE_FILE"""
+    from .cassette import Cassette, cassette_from_env
+
+    if args.record:
+        return Cassette(args.record, "record")
+    if args.replay:
+        return Cassette(args.replay, "replay", args.replay_speed)
+    return cassette_from_env()
+
+
+def _add_cassette_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--record", type=str, help="Record all HTTP traffic to this cassette")
+    parser.add_argument(
+        "--replay", type=str, help="Serve HTTP traffic from this cassette (offline, no cost)"
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=0,
+        help="Replay timing: 0 = instant, 1 = recorded latency, 10 = ten times faster",
+    )
+
+
+def _shard_env(args: argparse.Namespace) -> dict:
+    """Tracing and cassette flags, passed to shard workers through their environment"""
+    env = {}
+    if args.trace:
+        env["TRACING_EXPORTER"] = args.trace
+        if args.trace_file:
+            env["TRACE_FILE"] = os.path.abspath(args.trace_file)
+    if args.record or args.replay:
+        env["CASSETTE_FILE"] = os.path.abspath(args.record or args.replay)
+        env["CASSETTE_MODE"] = "record" if args.record else "replay"
+        env["CASSETTE_SPEED"] = str(args.replay_speed)
+    return env
+
+
 def _cmd_run(args: argparse.Namespace) -> None:
     """Run the full evaluation based on CLI flags"""
+    if args.shards > 1 and args.sync:
+        print("❌ --shards cannot be combined with --sync")
+        sys.exit(2)
+    for option in ("adaptive", "subset"):
+        if getattr(args, option) and (args.sync or args.shards > 1 or args.start_from):
+            print(f"❌ --{option} cannot be combined with --sync, --shards or --start-from")
+            sys.exit(2)
+    evaluator_kwargs = {"live": args.live}
+    if args.metrics_file:
+        evaluator_kwargs["metrics_file"] = args.metrics_file
     evaluator = LesAuditsAffairesEvaluator(
         use_chat_endpoint=args.chat,
         use_strict_mode=args.strict,
+        **evaluator_kwargs,
     )
+    if args.live:
+        _quiet_console_logging()
+    if args.trace:
+        from .tracing import configure_tracing
 
-    try:
-        if args.sync:
-            # Run synchronous evaluation
-            logger.info("Running evaluation in synchronous mode")
-            evaluator.run_evaluation_sync(
+        configure_tracing(args.trace, args.trace_file)
+
+    if args.shards > 1:
+        from .sharding import run_sharded_evaluation
+
+        try:
+            run_sharded_evaluation(
+                evaluator,
+                args.shards,
                 max_samples=args.max_samples,
                 start_from=args.start_from,
+                extra_env=_shard_env(args),
             )
-        else:
-            # Run asynchronous evaluation (default)
-            logger.info("Running evaluation in asynchronous mode")
-            asyncio.run(
-                evaluator.run_evaluation(
+        except KeyboardInterrupt:
+            sys.exit(130)
+        return
+
+    adaptive = None
+    if args.adaptive:
+        from .adaptive import AdaptiveStopping, leaderboard_scores
+
+        reference_scores = leaderboard_scores(args.leaderboard_root)
+        adaptive = AdaptiveStopping(
+            target_width=args.target_width, reference_scores=reference_scores
+        )
+        print(
+            f"🎯 Adaptive run: stop at a {args.target_width:g}-point interval "
+            f"or a settled rank among {len(reference_scores)} models"
+        )
+
+    subset = sample_indices = None
+    if args.subset:
+        from .subsets import load_index, subset_indices
+
+        if not os.path.exists(args.index_file):
+            print(
+                f"❌ Difficulty index not found: {args.index_file} (build it with `lae-eval index`)"
+            )
+            sys.exit(1)
+        index = load_index(args.index_file)
+        try:
+            sample_indices = subset_indices(args.subset, index)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(2)
+        correlation = index.get("subsets", {}).get(args.subset, {}).get("correlation_with_full")
+        subset = {
+            "name": args.subset,
+            "index_file": args.index_file,
+            "samples": len(sample_indices),
+            "correlation_with_full": correlation,
+        }
+        quality = "" if correlation is None else f", r = {correlation:.3f} with full runs"
+        print(f"🎯 Subset {args.subset}: {len(sample_indices)} samples{quality}")
+
+    from .cassette import maybe_activate
+
+    try:
+        with maybe_activate(_cassette_from_args(args)):
+            if args.sync:
+                # Run synchronous evaluation
+                logger.info("Running evaluation in synchronous mode")
+                evaluator.run_evaluation_sync(
                     max_samples=args.max_samples,
                     start_from=args.start_from,
                 )
-            )
+            else:
+                # Run asynchronous evaluation (default)
+                logger.info("Running evaluation in asynchronous mode")
+                asyncio.run(
+                    evaluator.run_evaluation(
+                        max_samples=args.max_samples,
+                        start_from=args.start_from,
+                        adaptive=adaptive,
+                        sample_indices=sample_indices,
+                        subset=subset,
+                    )
+                )
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+def _cmd_rerun(args: argparse.Namespace) -> None:
+    """Re-run only the failed stage of failed samples"""
+    evaluator = LesAuditsAffairesEvaluator(
+        use_chat_endpoint=args.chat,
+        use_strict_mode=args.strict,
+    )
+
+    from .cassette import maybe_activate
+
+    try:
+        with maybe_activate(_cassette_from_args(args)):
+            asyncio.run(evaluator.rerun_failures(stage=args.only, statuses=args.status))
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+def _cmd_coordinator(args: argparse.Namespace) -> None:
+    """Queue a run on the broker and aggregate results streamed back by workers"""
+    from .distributed import DistributedCoordinator, create_broker
+
+    evaluator_kwargs = {"live": args.live}
+    if args.metrics_file:
+        evaluator_kwargs["metrics_file"] = args.metrics_file
+    evaluator = LesAuditsAffairesEvaluator(**evaluator_kwargs)
+    if args.live:
+        _quiet_console_logging()
+    try:
+        broker = create_broker(args.broker, run_id=args.run_id)
+        coordinator = DistributedCoordinator(broker, evaluator)
+        final_results = coordinator.run(max_samples=args.max_samples, start_from=args.start_from)
+    except (ValueError, ImportError) as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    print(
+        f"✅ {final_results['sample_count']} samples, "
+        f"global score {final_results['global_score']['mean']:.2f}"
+    )
+
+
+def _cmd_worker(args: argparse.Namespace) -> None:
+    """Lease samples from the broker and evaluate them until the queue is drained"""
+    from .distributed import DistributedWorker, create_broker
+
+    evaluator = LesAuditsAffairesEvaluator(
+        use_chat_endpoint=args.chat, use_strict_mode=args.strict, metrics_file=None
+    )
+    try:
+        broker = create_broker(args.broker, run_id=args.run_id)
+        worker_kwargs = {}
+        if args.concurrency:
+            worker_kwargs["concurrency"] = args.concurrency
+        if args.lease_ttl:
+            worker_kwargs["ttl"] = args.lease_ttl
+        worker = DistributedWorker(broker, evaluator, **worker_kwargs)
+        completed = asyncio.run(worker.run())
+    except (ValueError, ImportError) as e:
+        print(f"❌ {e}")
+        sys.exit(2)
     except KeyboardInterrupt:
         sys.exit(130)
+    print(f"✅ Worker done: {completed} samples evaluated")
+
+
+def _add_broker_arguments(parser: argparse.ArgumentParser) -> None:
+    from .config import BROKER_URL
+
+    parser.add_argument(
+        "--broker",
+        default=BROKER_URL,
+        help="sqlite:///path.db (shared FS), redis://host:6379/0 or memory:// (or BROKER_URL)",
+    )
+    parser.add_argument("--run-id", default="default", help="Run name (Redis key prefix)")
 
 
 def _cmd_test_providers(args: argparse.Namespace) -> None:
@@ -102,6 +309,10 @@ def _cmd_test_providers(args: argparse.Namespace) -> None:
 
 def _cmd_analyze(args: argparse.Namespace) -> None:
     """Analyze existing evaluation results"""
+    if args.all:
+        _cmd_analyze_all(args)
+        return
+
     results_file = args.results_file
     if not results_file:
         # Try to find results file automatically
@@ -119,7 +330,10 @@ def _cmd_analyze(args: argparse.Namespace) -> None:
         sys.exit(1)
 
     print(f"📊 Analyzing results from: {results_file}")
-    results = load_evaluation_results(results_file)
+    # Reports and plots only need scores; the Excel export also needs the text columns
+    results = load_evaluation_results(
+        results_file, columns=None if args.excel else ANALYSIS_COLUMNS
+    )
 
     if args.report:
         print("📝 Generating analysis report...")
@@ -128,9 +342,14 @@ def _cmd_analyze(args: argparse.Namespace) -> None:
 
     if args.plots:
         print("📈 Creating plots...")
-        create_score_distribution_plot(results)
-        create_correlation_heatmap(results)
-        print("✅ Plots created")
+        paths = render_plots(
+            results,
+            os.path.dirname(results_file) or ".",
+            dpi=args.dpi,
+            fmt=args.format,
+            workers=args.workers,
+        )
+        print(f"✅ Plots created: {', '.join(paths)}")
 
     if args.excel:
         print("📋 Exporting to Excel...")
@@ -138,16 +357,90 @@ def _cmd_analyze(args: argparse.Namespace) -> None:
         print("✅ Excel export completed")
 
 
+def _cmd_analyze_all(args: argparse.Namespace) -> None:
+    """Render the plots of every model directory under --results-root"""
+    print(f"📊 Rendering plots for every model under: {args.results_root}")
+    rendered = render_all_plots(
+        args.results_root, dpi=args.dpi, fmt=args.format, workers=args.workers
+    )
+    if not rendered:
+        print(f"❌ No results found under {args.results_root}")
+        sys.exit(1)
+    failed = 0
+    for directory, paths in rendered.items():
+        if isinstance(paths, str):
+            failed += 1
+            print(f"❌ {directory}: {paths}")
+        else:
+            print(f"✅ {directory}: {len(paths)} plots")
+    if failed:
+        sys.exit(1)
+
+
+def _cmd_compare(args: argparse.Namespace) -> None:
+    """Compare every model under --results-root on a per-sample score matrix"""
+    import json
+
+    from .compare import compare_models, format_comparison
+
+    comparison = compare_models(
+        args.results_root,
+        metric=args.metric,
+        resamples=args.bootstrap,
+        seed=args.seed,
+        models=args.models,
+    )
+    if not comparison["models"]:
+        print(f"❌ No results found under {args.results_root}")
+        sys.exit(1)
+    print(
+        f"📊 {len(comparison['models'])} models × {comparison['sample_count']} samples "
+        f"({args.metric}, {args.bootstrap} bootstrap resamples)"
+    )
+    print(format_comparison(comparison, top=args.top))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(comparison, f, indent=2, ensure_ascii=False)
+        print(f"💾 Comparison saved to {args.output}")
+
+
+def _cmd_index(args: argparse.Namespace) -> None:
+    """Build the difficulty / diversity index behind `run --subset`"""
+    from datasets import load_dataset
+
+    from .config import DATASET_NAME, DATASET_SPLIT
+    from .subsets import build_difficulty_index, save_index
+
+    questions = [sample["question"] for sample in load_dataset(DATASET_NAME, split=DATASET_SPLIT)]
+    index = build_difficulty_index(
+        questions,
+        results_root=args.results_root,
+        clusters=args.clusters,
+        seed=args.seed,
+        subsets=args.subsets,
+    )
+    save_index(index, args.output)
+    print(
+        f"📇 {len(questions)} samples, {args.clusters} question clusters, "
+        f"history from {len(index['models'])} models"
+    )
+    for name, subset in index["subsets"].items():
+        correlation = subset["correlation_with_full"]
+        quality = "n/a" if correlation is None else f"{correlation:.3f}"
+        print(f"   {name}: {len(subset['sample_idx'])} samples, r with full runs = {quality}")
+    print(f"💾 Index saved to {args.output}")
+
+
 def _cmd_test_evaluator(args: argparse.Namespace) -> None:
     """Test evaluator connection"""
     print("🏛️ Testing Evaluator Connection")
     print("=" * 50)
 
     try:
-        from .model_client import EvaluatorClient
+        from .judge_ensemble import create_evaluator_client
 
-        # Create evaluator instance
-        evaluator = EvaluatorClient()
+        # Create evaluator instance (a judge ensemble when JUDGE_ENSEMBLE is set)
+        evaluator = create_evaluator_client()
         print(
             f"✅ Evaluator initialized: {evaluator.evaluator_provider} ({evaluator.evaluator_model})"
         )
@@ -177,6 +470,103 @@ def _cmd_test_evaluator(args: argparse.Namespace) -> None:
         print(f"❌ Evaluator test failed: {e}")
 
 
+def _mock_config_from_args(args: argparse.Namespace):
+    from .mock_server import MockServerConfig
+
+    return MockServerConfig(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_sigma=args.latency_sigma,
+        tokens_per_sec=args.tokens_per_sec,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+
+
+def _cmd_mock_server(args: argparse.Namespace) -> None:
+    """Serve the mock LLM API in the foreground"""
+    from .mock_server import MockLLMServer
+
+    server = MockLLMServer(_mock_config_from_args(args), host=args.host, port=args.port)
+    print(f"🧪 Mock LLM server on {server.url}")
+    print(f"   MODEL_ENDPOINT={server.url}/generate  EVALUATOR_ENDPOINT={server.url}")
+    server.run()
+
+
+def _cmd_bench(args: argparse.Namespace) -> None:
+    """Benchmark the evaluator against the mock server at several concurrency levels"""
+    import json
+
+    from .bench import format_benchmark, run_benchmark
+
+    print(f"⏱️  Benchmarking {args.samples} samples at concurrency {args.concurrency}")
+    results = run_benchmark(
+        concurrency_levels=args.concurrency,
+        samples=args.samples,
+        server_config=_mock_config_from_args(args),
+        use_chat=args.chat,
+    )
+    print(format_benchmark(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+
+def _cmd_bench_storage(args: argparse.Namespace) -> None:
+    """Compare detailed results formats on size and read/write speed"""
+    import json
+
+    from .bench import format_storage_benchmark, run_storage_benchmark
+
+    print(f"⏱️  Benchmarking storage of {args.samples} records of {args.response_tokens} tokens")
+    results = run_storage_benchmark(samples=args.samples, response_tokens=args.response_tokens)
+    print(format_storage_benchmark(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+
+def _cmd_bench_json(args: argparse.Namespace) -> None:
+    """Compare JSON backends on encoding and decoding result records"""
+    import json
+
+    from .bench import format_json_benchmark, run_json_benchmark
+
+    print(f"⏱️  Benchmarking JSON on {args.samples} records of {args.response_tokens} tokens")
+    results = run_json_benchmark(samples=args.samples, response_tokens=args.response_tokens)
+    print(format_json_benchmark(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+
+def _add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    from .mock_server import LATENCY_DISTRIBUTIONS
+
+    parser.add_argument(
+        "--latency",
+        choices=LATENCY_DISTRIBUTIONS,
+        default="lognormal",
+        help="Distribution of the time to first token",
+    )
+    parser.add_argument("--latency-mean", type=float, default=0.2, help="Mean latency (s)")
+    parser.add_argument(
+        "--latency-sigma", type=float, default=0.5, help="Lognormal sigma / uniform spread"
+    )
+    parser.add_argument(
+        "--tokens-per-sec", type=float, default=0.0, help="Decode rate, 0 = instant"
+    )
+    parser.add_argument("--output-tokens", type=int, default=400, help="Answer length")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 500s")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of HTTP 429s")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+
+
 def _cmd_info(args: argparse.Namespace) -> None:
     """Show information about the library and configuration"""
     from . import __version__
@@ -186,11 +576,14 @@ def _cmd_info(args: argparse.Namespace) -> None:
         EVALUATOR_ENDPOINT,
         EVALUATOR_MODEL,
         EVALUATOR_PROVIDER,
+        JUDGE_ENSEMBLE,
+        JUDGE_ESCALATION,
         MAX_SAMPLES,
         MAX_TOKENS,
         MODEL_ENDPOINT,
         MODEL_NAME,
         TEMPERATURE,
+        TOKEN_BUDGET,
     )
 
     # Check evaluator configuration
@@ -208,8 +601,7 @@ def _cmd_info(args: argparse.Namespace) -> None:
     elif EVALUATOR_PROVIDER == "local" and EVALUATOR_ENDPOINT:
         evaluator_status = f"✅ Local ({EVALUATOR_ENDPOINT})"
 
-    print(
-        f"""
+    print(f"""
 🏛️  Les Audits-Affaires Evaluation Harness v{__version__}
 ════════════════════════════════════════════════════════
 
@@ -222,12 +614,15 @@ def _cmd_info(args: argparse.Namespace) -> None:
   Provider:           {EVALUATOR_PROVIDER}
   Model:              {EVALUATOR_MODEL}
   Status:             {evaluator_status}
+  Judge Ensemble:     {JUDGE_ENSEMBLE or 'None'}
+  Escalation Judges:  {JUDGE_ESCALATION or 'None'}
   
 📊 Evaluation Settings:
   Max Samples:        {MAX_SAMPLES}
   Batch Size:         {BATCH_SIZE}
   Temperature:        {TEMPERATURE}
   Max Tokens:         {MAX_TOKENS}
+  Token Budget:       {TOKEN_BUDGET}
 
 🔌 Available Providers (Model):
   OpenAI:            {'✅' if os.getenv('OPENAI_API_KEY') else '❌'} {'(API key set)' if os.getenv('OPENAI_API_KEY') else '(no API key)'}
@@ -243,8 +638,7 @@ def _cmd_info(args: argparse.Namespace) -> None:
   lae-eval test-evaluator                      # Test evaluator connection
   lae-eval analyze --plots --report           # Generate analysis and plots
   lae-eval info                               # Show this information
-    """
-    )
+    """)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -257,9 +651,22 @@ Examples:
   lae-eval run --chat --max-samples 50        # Run evaluation with chat endpoint (async)
   lae-eval run --sync --strict                # Run evaluation synchronously with strict mode
   lae-eval run --strict --start-from 100      # Resume from sample 100 with strict mode (async)
+  lae-eval run --live --metrics-file m.prom   # Live dashboard + Prometheus metrics file
+  lae-eval run --record run.cassette.gz       # Record HTTP traffic, then --replay it offline
+  lae-eval run --shards 4                     # Four worker processes, results merged
+  lae-eval run --adaptive --target-width 4    # Stop early once the score is pinned down
+  lae-eval index && lae-eval run --subset fast-100   # Representative 100-sample smoke run
+  lae-eval coordinator --broker sqlite:////shared/run.db   # Distributed run, then on each host:
+  lae-eval worker --broker sqlite:////shared/run.db
+  lae-eval rerun --only judge                 # Re-judge samples whose judge call failed
+  lae-eval rerun --status timeout             # Regenerate + judge timed-out samples only
   lae-eval test-providers                      # Test external provider connections
+  lae-eval mock-server --port 8000            # Local mock LLM API for load tests
+  lae-eval bench --concurrency 1 16 64        # Samples/sec, CPU and RSS per concurrency
   lae-eval analyze --plots --report           # Generate analysis plots and report
   lae-eval analyze --excel results.json       # Export specific results to Excel
+  lae-eval analyze --all --format svg         # Plots for every model under results/
+  lae-eval compare --output compare.json      # Win rates and rank intervals across models
   lae-eval info                               # Show configuration info
         """,
     )
@@ -277,8 +684,118 @@ Examples:
     run_p.add_argument("--max-samples", type=int, help="Limit number of samples")
     run_p.add_argument("--start-from", type=int, default=0, help="Dataset index to resume from")
     run_p.add_argument("--sync", action="store_true", help="Run evaluation synchronously")
+    run_p.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Split the dataset across N worker processes and merge their results",
+    )
+    run_p.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Stratified random order; stop once the global score interval is narrow "
+        "enough or the leaderboard rank is settled",
+    )
+    run_p.add_argument(
+        "--target-width",
+        type=float,
+        default=ADAPTIVE_TARGET_WIDTH,
+        help="Adaptive mode: stop when the confidence interval is this many points wide",
+    )
+    run_p.add_argument(
+        "--leaderboard-root",
+        default=ADAPTIVE_LEADERBOARD_ROOT,
+        help="Adaptive mode: results of the other models (one directory per model)",
+    )
+    run_p.add_argument(
+        "--subset",
+        help="Only evaluate a representative subset from the difficulty index (e.g. fast-100)",
+    )
+    run_p.add_argument(
+        "--index-file",
+        default=DIFFICULTY_INDEX_FILE,
+        help="Difficulty index used by --subset (built by `lae-eval index`)",
+    )
+    run_p.add_argument(
+        "--live",
+        action="store_true",
+        help="Show a live dashboard (samples/sec, ETA, in-flight, p95 latencies) instead of bars",
+    )
+    run_p.add_argument(
+        "--metrics-file",
+        type=str,
+        help="Periodically write Prometheus text-format metrics to this file (or METRICS_FILE)",
+    )
+    run_p.add_argument(
+        "--trace",
+        choices=["console", "otlp-json"],
+        help="Record per-sample/per-stage spans (or set TRACING_EXPORTER)",
+    )
+    run_p.add_argument("--trace-file", type=str, help="OTLP/JSON output file (default: TRACE_FILE)")
+    _add_cassette_arguments(run_p)
     run_p.set_defaults(func=_cmd_run)
 
+    # rerun command
+    rerun_p = sub.add_parser(
+        "rerun", help="Re-run only failed samples, paying only for the stage that failed"
+    )
+    rerun_p.add_argument(
+        "--only",
+        choices=[STAGE_GENERATION, STAGE_JUDGE],
+        help="Re-run only generation failures (regenerate + judge) or only judge failures",
+    )
+    rerun_p.add_argument(
+        "--status",
+        nargs="+",
+        choices=list(FAILURE_STATUSES),
+        help="Restrict to these failure classes",
+    )
+    rerun_p.add_argument(
+        "--chat", action="store_true", help="Use /chat endpoint instead of /generate"
+    )
+    rerun_p.add_argument(
+        "--strict", action="store_true", help="Strict formatting + repetition handling mode"
+    )
+    _add_cassette_arguments(rerun_p)
+    rerun_p.set_defaults(func=_cmd_rerun)
+
+    # distributed run: coordinator + workers
+    coordinator_p = sub.add_parser(
+        "coordinator", help="Queue a distributed run and aggregate results from workers"
+    )
+    _add_broker_arguments(coordinator_p)
+    coordinator_p.add_argument("--max-samples", type=int, help="Limit number of samples")
+    coordinator_p.add_argument(
+        "--start-from", type=int, default=0, help="First dataset index to queue"
+    )
+    coordinator_p.add_argument("--live", action="store_true", help="Show a live dashboard")
+    coordinator_p.add_argument(
+        "--metrics-file", type=str, help="Periodically write Prometheus text-format metrics"
+    )
+    coordinator_p.set_defaults(func=_cmd_coordinator)
+
+    worker_p = sub.add_parser("worker", help="Evaluate samples leased from a distributed run")
+    _add_broker_arguments(worker_p)
+    worker_p.add_argument(
+        "--chat", action="store_true", help="Use /chat endpoint instead of /generate"
+    )
+    worker_p.add_argument(
+        "--strict", action="store_true", help="Strict formatting + repetition handling mode"
+    )
+    worker_p.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Samples in flight on this worker (default: CONCURRENT_REQUESTS)",
+    )
+    worker_p.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=None,
+        help="Lease duration in seconds, renewed while a sample runs (default: LEASE_TTL)",
+    )
+    worker_p.set_defaults(func=_cmd_worker)
+
     # test-providers command
     test_p = sub.add_parser("test-providers", help="Test external provider connections")
     test_p.set_defaults(func=_cmd_test_providers)
@@ -293,8 +810,109 @@ Examples:
     analyze_p.add_argument("--plots", action="store_true", help="Generate visualization plots")
     analyze_p.add_argument("--report", action="store_true", help="Generate analysis report")
     analyze_p.add_argument("--excel", action="store_true", help="Export to Excel format")
+    analyze_p.add_argument(
+        "--all",
+        action="store_true",
+        help="Render the plots of every model directory under --results-root",
+    )
+    analyze_p.add_argument(
+        "--results-root", default="results", help="Directory holding one folder per model"
+    )
+    analyze_p.add_argument("--dpi", type=int, default=300, help="Resolution of PNG plots")
+    analyze_p.add_argument(
+        "--format", choices=PLOT_FORMATS, default="png", help="Image format of the plots"
+    )
+    analyze_p.add_argument(
+        "--workers", type=int, help="Processes drawing plots (default: one per CPU)"
+    )
     analyze_p.set_defaults(func=_cmd_analyze)
 
+    # mock-server command
+    mock_p = sub.add_parser("mock-server", help="Run a local mock LLM server for load tests")
+    mock_p.add_argument("--host", default="127.0.0.1", help="Bind address")
+    mock_p.add_argument("--port", type=int, default=8000, help="Port")
+    _add_mock_arguments(mock_p)
+    mock_p.set_defaults(func=_cmd_mock_server)
+
+    # bench command
+    bench_p = sub.add_parser(
+        "bench", help="Benchmark evaluator throughput, CPU and RSS against the mock server"
+    )
+    bench_p.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 8, 32, 128],
+        help="Concurrency levels to measure",
+    )
+    bench_p.add_argument("--samples", type=int, default=200, help="Samples per level")
+    bench_p.add_argument(
+        "--chat", action="store_true", help="Use /chat endpoint instead of /generate"
+    )
+    bench_p.add_argument("--output", type=str, help="Write results as JSON to this file")
+    _add_mock_arguments(bench_p)
+    bench_p.set_defaults(func=_cmd_bench)
+
+    bench_storage_p = sub.add_parser(
+        "bench-storage", help="Compare detailed results formats (JSONL, gzip, zstd)"
+    )
+    bench_storage_p.add_argument("--samples", type=int, default=200, help="Records to write")
+    bench_storage_p.add_argument(
+        "--response-tokens", type=int, default=32000, help="Words per model response"
+    )
+    bench_storage_p.add_argument("--output", type=str, help="Write results as JSON to this file")
+    bench_storage_p.set_defaults(func=_cmd_bench_storage)
+
+    bench_json_p = sub.add_parser(
+        "bench-json", help="Compare JSON backends (json, orjson, msgspec) on result records"
+    )
+    bench_json_p.add_argument("--samples", type=int, default=200, help="Records to encode")
+    bench_json_p.add_argument(
+        "--response-tokens", type=int, default=32000, help="Words per model response"
+    )
+    bench_json_p.add_argument("--output", type=str, help="Write results as JSON to this file")
+    bench_json_p.set_defaults(func=_cmd_bench_json)
+
+    # compare command
+    compare_p = sub.add_parser(
+        "compare", help="Compare models: paired differences, win rates, rank stability"
+    )
+    compare_p.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory holding one folder (or Parquet file) per model",
+    )
+    compare_p.add_argument(
+        "--metric", choices=METRICS, default="score_global", help="Score to compare"
+    )
+    compare_p.add_argument("--models", nargs="+", help="Only compare these models")
+    compare_p.add_argument(
+        "--bootstrap", type=int, default=1000, help="Resamples for the rank intervals"
+    )
+    compare_p.add_argument("--seed", type=int, default=0, help="Bootstrap random seed")
+    compare_p.add_argument("--top", type=int, help="Only print the first N models")
+    compare_p.add_argument(
+        "--output", type=str, help="Write the leaderboard and pairwise matrices as JSON"
+    )
+    compare_p.set_defaults(func=_cmd_compare)
+
+    # index command
+    index_p = sub.add_parser(
+        "index", help="Build the difficulty/diversity index used by run --subset"
+    )
+    index_p.add_argument(
+        "--results-root",
+        default="results",
+        help="Directory holding one folder (or Parquet file) per model, for per-sample history",
+    )
+    index_p.add_argument("--clusters", type=int, default=10, help="Question clusters")
+    index_p.add_argument("--seed", type=int, default=0, help="Clustering and tie-break seed")
+    index_p.add_argument(
+        "--subsets", nargs="+", default=["fast-100"], help="Subsets to precompute (fast-<N>)"
+    )
+    index_p.add_argument("--output", default=DIFFICULTY_INDEX_FILE, help="Index file to write")
+    index_p.set_defaults(func=_cmd_index)
+
     # info command
     info_p = sub.add_parser("info", help="Show library information and configuration")
     info_p.set_defaults(func=_cmd_info)
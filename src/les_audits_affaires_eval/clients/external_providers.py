@@ -6,6 +6,7 @@ import asyncio
 import json
 import logging
 import os
+import time
 from typing import Any, Dict, List, Optional
 
 import aiohttp
@@ -13,6 +14,12 @@ import requests
 from openai import AsyncOpenAI, OpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from ..budget import TokenBudget
+from ..config import EXTERNAL_MAX_TOKENS
+from ..serialization import loads
+from ..telemetry import ModelResponse, usage_from_anthropic, usage_from_gemini, usage_from_openai
+from ..tracing import trace_retry
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +29,7 @@ class OpenAIClient:
     def __init__(self, api_key: str = None, model: str = "gpt-4o"):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
+        self.budget = TokenBudget(model, EXTERNAL_MAX_TOKENS)
         self.client = None
         self.async_client = None
 
@@ -52,7 +60,11 @@ Utilise des références légales différentes pour chaque catégorie et sois pr
 
         return [{"role": "system", "content": system_prompt}, {"role": "user", "content": question}]
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=trace_retry,
+    )
     async def generate_response(self, question: str) -> str:
         """Generate response using OpenAI API"""
         if not self.async_client:
@@ -61,11 +73,20 @@ Utilise des références légales différentes pour chaque catégorie et sois pr
         messages = self._format_legal_prompt(question)
 
         try:
+            start_time = time.time()
             response = await self.async_client.chat.completions.create(
-                model=self.model, messages=messages, temperature=0.1, max_tokens=4000
+                model=self.model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=self.budget.completion_tokens(messages),
             )
 
-            return response.choices[0].message.content.strip()
+            return ModelResponse(
+                response.choices[0].message.content.strip(),
+                usage=usage_from_openai(response.usage),
+                latency=time.time() - start_time,
+                model=self.model,
+            )
 
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
@@ -79,11 +100,20 @@ Utilise des références légales différentes pour chaque catégorie et sois pr
         messages = self._format_legal_prompt(question)
 
         try:
+            start_time = time.time()
             response = self.client.chat.completions.create(
-                model=self.model, messages=messages, temperature=0.1, max_tokens=4000
+                model=self.model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=self.budget.completion_tokens(messages),
             )
 
-            return response.choices[0].message.content.strip()
+            return ModelResponse(
+                response.choices[0].message.content.strip(),
+                usage=usage_from_openai(response.usage),
+                latency=time.time() - start_time,
+                model=self.model,
+            )
 
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
@@ -96,6 +126,7 @@ class MistralClient:
     def __init__(self, api_key: str = None, model: str = "mistral-large-latest"):
         self.api_key = api_key or os.getenv("MISTRAL_API_KEY")
         self.model = model
+        self.budget = TokenBudget(model, EXTERNAL_MAX_TOKENS)
         self.endpoint = "https://api.mistral.ai/v1/chat/completions"
         self.session = None
 
@@ -125,7 +156,11 @@ Réponds à la question juridique ci-dessous, puis termine ta réponse par un r
 
         return [{"role": "system", "content": system_prompt}, {"role": "user", "content": question}]
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=trace_retry,
+    )
     async def generate_response(self, question: str) -> str:
         """Generate response using Mistral API"""
         if not self.session:
@@ -137,18 +172,24 @@ Réponds à la question juridique ci-dessous, puis termine ta réponse par un r
             "model": self.model,
             "messages": messages,
             "temperature": 0.1,
-            "max_tokens": 4000,
+            "max_tokens": self.budget.completion_tokens(messages),
         }
 
         try:
+            start_time = time.time()
             async with self.session.post(self.endpoint, json=payload) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     logger.error(f"Mistral API error {response.status}: {error_text}")
                     raise Exception(f"Mistral API error {response.status}: {error_text}")
 
-                result = await response.json()
-                return result["choices"][0]["message"]["content"].strip()
+                result = await response.json(loads=loads)
+                return ModelResponse(
+                    result["choices"][0]["message"]["content"].strip(),
+                    usage=usage_from_openai(result.get("usage")),
+                    latency=time.time() - start_time,
+                    model=self.model,
+                )
 
         except Exception as e:
             logger.error(f"Mistral API error: {e}")
@@ -161,6 +202,7 @@ class ClaudeClient:
     def __init__(self, api_key: str = None, model: str = "claude-3-5-sonnet-20241022"):
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         self.model = model
+        self.budget = TokenBudget(model, EXTERNAL_MAX_TOKENS)
         self.endpoint = "https://api.anthropic.com/v1/messages"
         self.session = None
 
@@ -196,7 +238,11 @@ Réponds à la question juridique ci-dessous, puis termine ta réponse par un r
 
 Question: {question}"""
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=trace_retry,
+    )
     async def generate_response(self, question: str) -> str:
         """Generate response using Claude API"""
         if not self.session:
@@ -206,20 +252,26 @@ Question: {question}"""
 
         payload = {
             "model": self.model,
-            "max_tokens": 4000,
+            "max_tokens": self.budget.completion_tokens(prompt),
             "temperature": 0.1,
             "messages": [{"role": "user", "content": prompt}],
         }
 
         try:
+            start_time = time.time()
             async with self.session.post(self.endpoint, json=payload) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     logger.error(f"Claude API error {response.status}: {error_text}")
                     raise Exception(f"Claude API error {response.status}: {error_text}")
 
-                result = await response.json()
-                return result["content"][0]["text"].strip()
+                result = await response.json(loads=loads)
+                return ModelResponse(
+                    result["content"][0]["text"].strip(),
+                    usage=usage_from_anthropic(result.get("usage")),
+                    latency=time.time() - start_time,
+                    model=self.model,
+                )
 
         except Exception as e:
             logger.error(f"Claude API error: {e}")
@@ -232,6 +284,7 @@ class GeminiClient:
     def __init__(self, api_key: str = None, model: str = "gemini-1.5-pro"):
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
         self.model = model
+        self.budget = TokenBudget(model, EXTERNAL_MAX_TOKENS)
         self.session = None
 
         if not self.api_key:
@@ -263,7 +316,11 @@ Réponds à la question juridique ci-dessous, puis termine ta réponse par un r
 
 Question: {question}"""
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=trace_retry,
+    )
     async def generate_response(self, question: str) -> str:
         """Generate response using Gemini API"""
         if not self.session:
@@ -273,20 +330,29 @@ Question: {question}"""
 
         payload = {
             "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {"temperature": 0.1, "maxOutputTokens": 4000},
+            "generationConfig": {
+                "temperature": 0.1,
+                "maxOutputTokens": self.budget.completion_tokens(prompt),
+            },
         }
 
         params = {"key": self.api_key}
 
         try:
+            start_time = time.time()
             async with self.session.post(self.endpoint, json=payload, params=params) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     logger.error(f"Gemini API error {response.status}: {error_text}")
                     raise Exception(f"Gemini API error {response.status}: {error_text}")
 
-                result = await response.json()
-                return result["candidates"][0]["content"]["parts"][0]["text"].strip()
+                result = await response.json(loads=loads)
+                return ModelResponse(
+                    result["candidates"][0]["content"]["parts"][0]["text"].strip(),
+                    usage=usage_from_gemini(result.get("usageMetadata")),
+                    latency=time.time() - start_time,
+                    model=self.model,
+                )
 
         except Exception as e:
             logger.error(f"Gemini API error: {e}")
@@ -0,0 +1,188 @@
+"""
+Compaction of the model response before it is embedded in the judge prompt
+
+Responses without solution tags carry the whole reasoning trace, often tens
+of thousands of tokens. The configured steps (`JUDGE_COMPACTION`, none by
+default since the judge then scores a shortened answer) run in order:
+
+- `dedupe`: drop paragraphs already seen (whitespace and case ignored);
+- `sections`: when the response is still over `JUDGE_INPUT_MAX_TOKENS`, keep
+  the five-section summary (from the last occurrence of the first section
+  heading, see `FORMAT_SECTIONS`) whole and shorten the analysis before it;
+- `truncate`: cap whatever is left at `JUDGE_INPUT_MAX_TOKENS`, keeping the
+  head and the tail (`JUDGE_INPUT_HEAD_SHARE` of the budget goes to the head).
+
+Omitted spans are replaced by a marker giving their token count. Each
+evaluation records the original and compacted token counts under
+`compaction`; the results keep the full response.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .config import JUDGE_COMPACTION, JUDGE_INPUT_HEAD_SHARE, JUDGE_INPUT_MAX_TOKENS
+from .model_client import FORMAT_SECTIONS
+from .records import SampleResult, as_record
+from .tokenizer import get_tokenizer
+
+STEPS = ("dedupe", "sections", "truncate")
+
+OMISSION_MARKER = "\n[... {count} tokens omis ...]\n"
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def parse_steps(spec: Union[str, Iterable[str]]) -> tuple:
+    """Steps of a comma-separated policy (empty or `off` = none)"""
+    if isinstance(spec, str):
+        spec = [] if spec.strip().lower() in ("", "off", "none") else spec.split(",")
+    steps = tuple(step.strip().lower() for step in spec if step.strip())
+    unknown = set(steps) - set(STEPS)
+    if unknown:
+        raise ValueError(f"Unknown compaction step(s) {sorted(unknown)}, expected {STEPS}")
+    return steps
+
+
+def dedupe_paragraphs(text: str) -> str:
+    """`text` without the paragraphs that repeat an earlier one"""
+    paragraphs = _PARAGRAPH_BREAK.split(text)
+    seen, kept = set(), []
+    for paragraph in paragraphs:
+        key = " ".join(paragraph.split()).lower()
+        if key and key in seen:
+            continue
+        seen.add(key)
+        kept.append(paragraph)
+    return text if len(kept) == len(paragraphs) else "\n\n".join(kept)
+
+
+def summary_start(text: str) -> Optional[int]:
+    """Offset of the five-section summary (the last heading of each section found)"""
+    positions = []
+    for pattern in FORMAT_SECTIONS.values():
+        matches = list(pattern.finditer(text))
+        if matches:
+            positions.append(matches[-1].start())
+    return min(positions) if positions else None
+
+
+def head_tail_truncate(text: str, max_tokens: int, tokenizer, head_share: float = 0.25) -> str:
+    """`text` cut to `max_tokens` tokens, keeping its head and its tail"""
+    tokens = tokenizer.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    # Room for the marker, plus a little for tokens merging across the cuts
+    budget = max(0, max_tokens - tokenizer.count(OMISSION_MARKER.format(count=len(tokens))) - 2)
+    head = int(budget * head_share)
+    tail = budget - head
+    omitted = OMISSION_MARKER.format(count=len(tokens) - head - tail)
+    return (
+        tokenizer.decode(tokens[:head])
+        + omitted
+        + (tokenizer.decode(tokens[-tail:]) if tail else "")
+    )
+
+
+def compact_response(
+    text: str,
+    steps: Sequence[str] = STEPS,
+    max_tokens: int = JUDGE_INPUT_MAX_TOKENS,
+    head_share: float = JUDGE_INPUT_HEAD_SHARE,
+    tokenizer=None,
+) -> Tuple[str, Dict[str, Any]]:
+    """(compacted text, token counts and steps applied)"""
+    tokenizer = tokenizer or get_tokenizer()
+    original_tokens = tokenizer.count(text)
+    applied: List[str] = []
+    if "dedupe" in steps:
+        deduped = dedupe_paragraphs(text)
+        if deduped != text:
+            text = deduped
+            applied.append("dedupe")
+
+    if max_tokens and tokenizer.count(text) > max_tokens:
+        start = summary_start(text) if "sections" in steps else None
+        if start:
+            summary, analysis = text[start:], text[:start]
+            room = max_tokens - tokenizer.count(summary)
+            if room > 0:
+                analysis = head_tail_truncate(analysis, room, tokenizer, head_share)
+            else:
+                analysis = OMISSION_MARKER.format(count=tokenizer.count(analysis)).lstrip()
+            text = analysis + summary
+            applied.append("sections")
+        if "truncate" in steps and tokenizer.count(text) > max_tokens:
+            text = head_tail_truncate(text, max_tokens, tokenizer, head_share)
+            applied.append("truncate")
+
+    return text, {
+        "original_tokens": original_tokens,
+        "compacted_tokens": tokenizer.count(text) if applied else original_tokens,
+        "steps": applied,
+    }
+
+
+class CompactingJudge:
+    """Judge client compacting the model response before the wrapped judge sees it
+
+    Exposes `evaluate_response` like `EvaluatorClient`; everything else is
+    delegated to the wrapped client.
+    """
+
+    def __init__(
+        self,
+        judge: Any,
+        steps: Union[str, Iterable[str]] = JUDGE_COMPACTION,
+        max_tokens: int = JUDGE_INPUT_MAX_TOKENS,
+        head_share: float = JUDGE_INPUT_HEAD_SHARE,
+        tokenizer=None,
+    ):
+        self.judge = judge
+        self.steps = parse_steps(steps)
+        self.max_tokens = max_tokens
+        self.head_share = head_share
+        self.tokenizer = tokenizer or get_tokenizer()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "judge":
+            raise AttributeError(name)
+        return getattr(self.judge, name)
+
+    def evaluate_response(
+        self, question: str, model_response: str, ground_truth: Dict[str, str]
+    ) -> Dict[str, Any]:
+        compacted, stats = compact_response(
+            str(model_response), self.steps, self.max_tokens, self.head_share, self.tokenizer
+        )
+        evaluation = self.judge.evaluate_response(question, compacted, ground_truth)
+        evaluation["compaction"] = stats
+        return evaluation
+
+
+def summarize_compaction(
+    results: Iterable[Union[SampleResult, Dict[str, Any]]],
+) -> Optional[Dict[str, Any]]:
+    """Token totals of the judge inputs before and after compaction, None without data"""
+    samples = compacted = original_tokens = compacted_tokens = 0
+    by_step = {step: 0 for step in STEPS}
+    for result in results:
+        stats = (as_record(result).evaluation_extra or {}).get("compaction")
+        if not stats:
+            continue
+        samples += 1
+        compacted += bool(stats["steps"])
+        original_tokens += stats["original_tokens"]
+        compacted_tokens += stats["compacted_tokens"]
+        for step in stats["steps"]:
+            by_step[step] = by_step.get(step, 0) + 1
+    if not samples:
+        return None
+    return {
+        "samples": samples,
+        "compacted_samples": compacted,
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "reduction": 1 - compacted_tokens / original_tokens if original_tokens else 0,
+        "by_step": by_step,
+        "tokenizer": get_tokenizer().name,
+    }
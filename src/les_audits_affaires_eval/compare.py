@@ -0,0 +1,276 @@
+"""
+Cross-model comparison over many results directories
+
+Every model under a results root (one directory per model, or one Parquet file
+per model) is read one at a time, keeping only `sample_idx` and the compared
+score column, into a models x samples float32 matrix (NaN where a model has no
+result for a sample). Pairwise statistics are computed on that matrix with
+NumPy: mean paired differences with two matrix products, win rates in blocks
+of rows so the models x models x samples comparison never sits in memory at
+once, rank stability and mean intervals from bootstrap resamples, and paired
+permutation tests between neighbours in the ranking (see `significance`).
+"""
+
+import os
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import OUTPUT_FILE, PARQUET_FILE
+from .detailed_store import DetailedStore
+from .records import RUBRICS
+from .results_store import read_results_frame
+from .serialization import load_file
+from .significance import bootstrap_means, paired_permutation_test
+
+METRICS = ("score_global",) + RUBRICS
+
+# Elements of the (block, models, samples) comparison array built per step
+_BLOCK_ELEMENTS = 1 << 24
+
+
+def _column(metric: str) -> str:
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+    return metric if metric == "score_global" else f"score_{metric}"
+
+
+def find_models(results_root: str = "results") -> Dict[str, str]:
+    """{model name: results directory or Parquet file} under `results_root`"""
+    models = {}
+    if not os.path.isdir(results_root):
+        return models
+    for name in sorted(os.listdir(results_root)):
+        path = os.path.join(results_root, name)
+        if os.path.isdir(path):
+            if (
+                os.path.exists(os.path.join(path, PARQUET_FILE))
+                or DetailedStore(path).exists()
+                or os.path.exists(os.path.join(path, OUTPUT_FILE))
+            ):
+                models[name] = path
+        elif name.endswith(".parquet"):
+            models[name[: -len(".parquet")]] = path
+    return models
+
+
+def load_model_scores(path: str, metric: str = "score_global") -> Tuple[np.ndarray, np.ndarray]:
+    """(sample_idx, score) arrays of one model, reading only what the metric needs
+
+    Sources, first found: the Parquet store (two columns), the detailed results
+    store (scores decoded record by record), then `evaluation_results.json`.
+    The last record of a sample wins.
+    """
+    column = _column(metric)
+    parquet_file = path if path.endswith(".parquet") else os.path.join(path, PARQUET_FILE)
+    if os.path.exists(parquet_file):
+        frame = read_results_frame(parquet_file, ["sample_idx", column])
+        scores = dict(zip(frame["sample_idx"].tolist(), frame[column].tolist()))
+    else:
+        store = DetailedStore(path)
+        if store.exists():
+            records = store.iter_scores()
+        else:
+            records = load_file(os.path.join(path, OUTPUT_FILE)).get("detailed_results", [])
+        scores = {}
+        for record in records:
+            evaluation = record.get("evaluation") or {}
+            if metric == "score_global":
+                value = evaluation.get("score_global")
+            else:
+                value = (evaluation.get("scores") or {}).get(metric)
+            scores[record["sample_idx"]] = np.nan if value is None else value
+    sample_idx = np.fromiter(scores.keys(), dtype=np.int64, count=len(scores))
+    values = np.fromiter(scores.values(), dtype=np.float32, count=len(scores))
+    return sample_idx, values
+
+
+class ScoreMatrix:
+    """Scores of several models on a shared sample axis
+
+    `scores[m, s]` is the score of `models[m]` on sample `sample_idx[s]`, NaN
+    when missing.
+    """
+
+    def __init__(self, models: List[str], sample_idx: np.ndarray, scores: np.ndarray):
+        self.models = models
+        self.sample_idx = sample_idx
+        self.scores = scores
+
+    @classmethod
+    def from_results(cls, sources: Dict[str, str], metric: str = "score_global") -> "ScoreMatrix":
+        """Read each model in turn and align them on the union of their samples"""
+        per_model = [load_model_scores(path, metric) for path in sources.values()]
+        sample_idx = np.unique(
+            np.concatenate([idx for idx, _ in per_model]) if per_model else np.empty(0, np.int64)
+        )
+        scores = np.full((len(per_model), len(sample_idx)), np.nan, dtype=np.float32)
+        for row, (idx, values) in enumerate(per_model):
+            scores[row, np.searchsorted(sample_idx, idx)] = values
+        return cls(list(sources), sample_idx, scores)
+
+    @property
+    def present(self) -> np.ndarray:
+        return ~np.isnan(self.scores)
+
+    def means(self) -> np.ndarray:
+        """Mean score of each model over the samples it has"""
+        counts = self.present.sum(axis=1)
+        totals = np.nan_to_num(self.scores).sum(axis=1, dtype=np.float64)
+        return np.divide(totals, counts, out=np.full(len(counts), np.nan), where=counts > 0)
+
+    def pairwise(self) -> Dict[str, np.ndarray]:
+        """models x models matrices over the samples both models have
+
+        `mean_difference[i, j]` is the mean of (score_i - score_j), `win_rate[i, j]`
+        the share of those samples where i scores higher (ties count half) and
+        `common_samples[i, j]` their number.
+        """
+        present = self.present.astype(np.float64)
+        filled = np.nan_to_num(self.scores).astype(np.float64)
+        common = present @ present.T
+        # sum(s_i - s_j) over common samples = sum(s_i * p_j) - sum(p_i * s_j)
+        difference_sum = filled @ present.T - present @ filled.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_difference = difference_sum / common
+
+        n_models, n_samples = self.scores.shape
+        wins = np.zeros((n_models, n_models))
+        ties = np.zeros((n_models, n_models))
+        block = max(1, _BLOCK_ELEMENTS // max(1, n_models * n_samples))
+        for start in range(0, n_models, block):
+            rows = self.scores[start : start + block, None, :]
+            wins[start : start + block] = (rows > self.scores[None, :, :]).sum(axis=2)
+            ties[start : start + block] = (rows == self.scores[None, :, :]).sum(axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            win_rate = (wins + 0.5 * ties) / common
+        return {
+            "mean_difference": mean_difference,
+            "win_rate": win_rate,
+            "common_samples": common.astype(np.int64),
+        }
+
+    def rank_stability(self, resamples: int = 1000, seed: int = 0) -> Dict[str, np.ndarray]:
+        """Ranks and means of the models under bootstrap resampling of the samples
+
+        Returns the point rank (1 = best), the 2.5/97.5 percentile ranks, the
+        share of resamples that reproduce the point rank and the 2.5/97.5
+        percentile means.
+        """
+        means = bootstrap_means(self.scores.T, resamples, seed).T
+        ranks = _ranks(means)
+        point = _ranks(self.means()[:, None])[:, 0]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean_low, mean_high = np.nanpercentile(means, [2.5, 97.5], axis=1)
+        return {
+            "rank": point,
+            "rank_low": np.percentile(ranks, 2.5, axis=1, method="lower").astype(np.int64),
+            "rank_high": np.percentile(ranks, 97.5, axis=1, method="higher").astype(np.int64),
+            "rank_stability": (ranks == point[:, None]).mean(axis=1),
+            "mean_low": mean_low,
+            "mean_high": mean_high,
+        }
+
+    def adjacent_p_values(self, order: np.ndarray, resamples: int = 1000, seed: int = 0):
+        """Paired permutation p-value of each model against the next one in `order`"""
+        differences = self.scores[order[:-1]].T.astype(np.float64) - self.scores[order[1:]].T
+        return paired_permutation_test(differences, resamples, seed)
+
+
+def _ranks(means: np.ndarray) -> np.ndarray:
+    """Rank (1 = highest, models without scores last) of each row within every column"""
+    keys = np.where(np.isnan(means), np.inf, -means)
+    return keys.argsort(axis=0, kind="stable").argsort(axis=0, kind="stable") + 1
+
+
+def compare_models(
+    results_root: str = "results",
+    metric: str = "score_global",
+    resamples: int = 1000,
+    seed: int = 0,
+    models: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Leaderboard and pairwise statistics of every model under `results_root`"""
+    sources = find_models(results_root)
+    if models:
+        sources = {name: path for name, path in sources.items() if name in models}
+    matrix = ScoreMatrix.from_results(sources, metric)
+    if not matrix.models:
+        return {"metric": metric, "models": [], "sample_count": 0, "leaderboard": []}
+    pairwise = matrix.pairwise()
+    ranking = matrix.rank_stability(resamples=resamples, seed=seed)
+    means = matrix.means()
+    samples = matrix.present.sum(axis=1)
+
+    win_rate = pairwise["win_rate"].copy()
+    np.fill_diagonal(win_rate, np.nan)
+    with np.errstate(invalid="ignore"):
+        mean_win_rate = (
+            np.nanmean(win_rate, axis=1) if len(matrix.models) > 1 else np.full(1, np.nan)
+        )
+
+    leaderboard = [
+        {
+            "model": model,
+            "samples": int(samples[row]),
+            "mean": _number(means[row]),
+            "mean_low": _number(ranking["mean_low"][row]),
+            "mean_high": _number(ranking["mean_high"][row]),
+            "rank": int(ranking["rank"][row]),
+            "rank_low": int(ranking["rank_low"][row]),
+            "rank_high": int(ranking["rank_high"][row]),
+            "rank_stability": float(ranking["rank_stability"][row]),
+            "mean_win_rate": _number(mean_win_rate[row]),
+        }
+        for row, model in enumerate(matrix.models)
+    ]
+    order = np.argsort(ranking["rank"], kind="stable")
+    p_values = matrix.adjacent_p_values(order, resamples=resamples, seed=seed)
+    leaderboard = [leaderboard[row] for row in order]
+    for entry, p_value in zip(leaderboard, [*p_values, np.nan]):
+        entry["p_value_vs_next"] = _number(p_value)
+    return {
+        "metric": metric,
+        "models": matrix.models,
+        "sample_count": len(matrix.sample_idx),
+        "resamples": resamples,
+        "leaderboard": leaderboard,
+        "pairwise": {name: _matrix(values) for name, values in pairwise.items()},
+    }
+
+
+def _number(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def _matrix(values: np.ndarray) -> List[List[Optional[float]]]:
+    if values.dtype.kind == "i":
+        return values.tolist()
+    return [[_number(value) for value in row] for row in values]
+
+
+def format_comparison(comparison: Dict[str, Any], top: Optional[int] = None) -> str:
+    """Plain-text leaderboard with rank intervals"""
+    header = (
+        f"{'rank':>4}  {'model':<40} {'mean':>7} {'mean 95%':>13} {'samples':>8} "
+        f"{'rank 95%':>9} {'stable':>7} {'win rate':>9} {'p next':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    for entry in comparison["leaderboard"][:top]:
+        mean = "n/a" if entry["mean"] is None else f"{entry['mean']:.2f}"
+        win_rate = "n/a" if entry["mean_win_rate"] is None else f"{entry['mean_win_rate']:.1%}"
+        interval = f"{entry['rank_low']}-{entry['rank_high']}"
+        mean_interval = (
+            "n/a"
+            if entry["mean_low"] is None
+            else f"{entry['mean_low']:.2f}-{entry['mean_high']:.2f}"
+        )
+        p_value = "" if entry["p_value_vs_next"] is None else f"{entry['p_value_vs_next']:.3f}"
+        lines.append(
+            f"{entry['rank']:>4}  {entry['model'][:40]:<40} {mean:>7} {mean_interval:>13} "
+            f"{entry['samples']:>8} {interval:>9} {entry['rank_stability']:>7.0%} {win_rate:>9} "
+            f"{p_value:>7}"
+        )
+    return "\n".join(lines)
@@ -30,6 +30,61 @@ EVALUATOR_ANTHROPIC_API_KEY = os.getenv("EVALUATOR_ANTHROPIC_API_KEY") or os.get
 EVALUATOR_GOOGLE_API_KEY = os.getenv("EVALUATOR_GOOGLE_API_KEY") or os.getenv("GOOGLE_API_KEY")
 EVALUATOR_ENDPOINT = os.getenv("EVALUATOR_ENDPOINT")  # For local evaluator models
 
+# Judge pool (re-evaluation of failed samples)
+JUDGE_CONCURRENCY = int(os.getenv("JUDGE_CONCURRENCY", "100"))
+# Judge calls per second, 0 = unlimited
+JUDGE_RATE_LIMIT = float(os.getenv("JUDGE_RATE_LIMIT", "0"))
+JUDGE_MAX_ATTEMPTS = int(os.getenv("JUDGE_MAX_ATTEMPTS", "3"))  # judge retries per failed sample
+
+# Judge ensemble: comma-separated provider:model judges run concurrently on every sample,
+# escalation judges only when they disagree (empty = the single EVALUATOR_PROVIDER judge)
+JUDGE_ENSEMBLE = os.getenv("JUDGE_ENSEMBLE", "")
+JUDGE_ESCALATION = os.getenv("JUDGE_ESCALATION", "")
+JUDGE_AGGREGATION = os.getenv("JUDGE_AGGREGATION", "median").lower()  # mean, median, trimmed
+# Spread in points (global score or any rubric) above which the judges disagree
+JUDGE_DISAGREEMENT_THRESHOLD = float(os.getenv("JUDGE_DISAGREEMENT_THRESHOLD", "20"))
+
+# Rule-based pre-judge (opt-in): responses matching these rules are scored 0 without a judge
+# call (error, empty, repetition, no_sections; empty or "off" = judge every response)
+PREJUDGE_RULES = os.getenv("PREJUDGE_RULES", "")
+PREJUDGE_MIN_CHARS = int(os.getenv("PREJUDGE_MIN_CHARS", "20"))  # shorter responses are "empty"
+
+# Judge input compaction of the model response (opt-in, e.g. "dedupe,sections,truncate"): dedupe
+# repeated paragraphs, keep the five summary sections whole, then head/tail truncation
+# (empty or "off" = send the response whole)
+JUDGE_COMPACTION = os.getenv("JUDGE_COMPACTION", "")
+JUDGE_INPUT_MAX_TOKENS = int(os.getenv("JUDGE_INPUT_MAX_TOKENS", "8000"))
+JUDGE_INPUT_HEAD_SHARE = float(os.getenv("JUDGE_INPUT_HEAD_SHARE", "0.25"))  # of the budget
+
+# Local tokenizer: a tiktoken encoding ("auto" = o200k_base when tiktoken is installed) or approx
+TOKENIZER = os.getenv("TOKENIZER", "auto")
+# Hugging Face tokenizer.json of the evaluated model (needs `tokenizers`), used for its prompts
+TOKENIZER_FILE = os.getenv("TOKENIZER_FILE", "")
+
+# Completion budget (max_tokens) per request: off (fixed cap), context (cap within the context
+# window left by the prompt) or learned (also capped near the longest responses of past runs)
+TOKEN_BUDGET = os.getenv("TOKEN_BUDGET", "context").lower()
+MODEL_CONTEXT_WINDOW = int(os.getenv("MODEL_CONTEXT_WINDOW", "0"))  # 0 = known model table
+JUDGE_MAX_TOKENS = int(os.getenv("JUDGE_MAX_TOKENS", "12000"))
+EXTERNAL_MAX_TOKENS = int(os.getenv("EXTERNAL_MAX_TOKENS", "4000"))  # external providers' cap
+TOKEN_BUDGET_QUANTILE = float(os.getenv("TOKEN_BUDGET_QUANTILE", "0.99"))  # of past lengths
+TOKEN_BUDGET_MARGIN = float(os.getenv("TOKEN_BUDGET_MARGIN", "1.5"))  # x the quantile
+TOKEN_BUDGET_MIN_HISTORY = int(os.getenv("TOKEN_BUDGET_MIN_HISTORY", "50"))  # responses
+TOKEN_BUDGET_HISTORY = int(os.getenv("TOKEN_BUDGET_HISTORY", "2000"))  # kept per model
+
+# Generation rate limit (calls per second, 0 = unlimited)
+MODEL_RATE_LIMIT = float(os.getenv("MODEL_RATE_LIMIT", "0"))
+# Shared rate-limiter state; set for shard workers so limits hold across processes
+RATE_LIMIT_DIR = os.getenv("RATE_LIMIT_DIR")
+
+# Distributed runs: work-queue broker (sqlite:///path.db, redis://host:6379/0, memory://)
+BROKER_URL = os.getenv("BROKER_URL")
+WORK_MAX_ATTEMPTS = int(os.getenv("WORK_MAX_ATTEMPTS", "3"))  # lease attempts per sample
+
+# Metrics export (Prometheus text format, written periodically during runs)
+METRICS_FILE = os.getenv("METRICS_FILE")
+METRICS_EXPORT_INTERVAL = float(os.getenv("METRICS_EXPORT_INTERVAL", "15"))
+
 # Model to Evaluate Configuration
 MODEL_ENDPOINT = os.getenv("MODEL_ENDPOINT")
 MODEL_NAME = os.getenv("MODEL_NAME", "legml-d_affairs-14b")
@@ -65,7 +120,11 @@ Format requis:
 <|end_of_solution|>"""
 
 # Evaluation Prompt Template
-LLM_EVALUATION_PROMPT = """
+# The rubric head is the same for every sample and comes first, so local servers with
+# prefix caching (vLLM, SGLang) reuse it across judge calls. The per-sample fields stay
+# between the rubric and the output schema: moving the schema ahead of them changes what
+# the judge sees, and its scores.
+LLM_EVALUATION_PREFIX = """
 Tu es un juriste-expert français, spécialiste du Code civil et du droit des affaires.  
 Ta mission : évaluer la qualité d'une réponse LLM dans le cadre du benchmark « Les Audits-Affaires ».
 
@@ -80,7 +139,9 @@ Barème d'évaluation :
 - Pour chaque rubrique, évalue selon : exactitude juridique, concordance avec le ground truth, clarté et justification (article cité + explication).
 
 ---
+"""
 
+LLM_EVALUATION_PROMPT = LLM_EVALUATION_PREFIX + """
 "question": "{user_question}",
 
 "model_response": "{model_response}",
@@ -116,6 +177,11 @@ Donne ta réponse STRICTEMENT dans ce format JSON :
 }}
 """
 
+# Bootstrap confidence intervals and permutation tests written to summaries
+BOOTSTRAP_RESAMPLES = int(os.getenv("BOOTSTRAP_RESAMPLES", "10000"))
+BOOTSTRAP_CONFIDENCE = float(os.getenv("BOOTSTRAP_CONFIDENCE", "0.95"))
+BOOTSTRAP_SEED = int(os.getenv("BOOTSTRAP_SEED", "0"))
+
 
 # Dynamic Results Directory Configuration
 def get_safe_model_name(model_name: str) -> str:
@@ -139,6 +205,45 @@ else:
 OUTPUT_FILE = "evaluation_results.json"
 SUMMARY_FILE = "evaluation_summary.json"
 DETAILED_FILE = "detailed_results.jsonl"
+PARQUET_FILE = "detailed_results.parquet"  # columnar copy: scores/timings apart from text
+
+# Detailed results compression: "" (plain JSONL), "zstd" (needs zstandard) or "gzip".
+# Records are compressed one frame each, so single records stay randomly readable
+DETAILED_COMPRESSION = os.getenv("DETAILED_COMPRESSION", "").lower()
+
+# JSON backend for results and API bodies: auto (msgspec, then orjson, then json) or one of them
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto").lower()
+
+# Tracing (off unless set): "console" or "otlp-json" (OTLP/JSON lines in TRACE_FILE)
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "")
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(RESULTS_DIR, "traces.otlp.jsonl"))
+
+# Adaptive evaluation (run --adaptive, or ADAPTIVE_EVALUATION=true): stop once the global
+# score interval is narrower than ADAPTIVE_TARGET_WIDTH points or the leaderboard rank is settled
+ADAPTIVE_EVALUATION = os.getenv("ADAPTIVE_EVALUATION", "false").lower() in ("true", "1", "yes", "y")
+ADAPTIVE_TARGET_WIDTH = float(os.getenv("ADAPTIVE_TARGET_WIDTH", "5"))
+ADAPTIVE_CONFIDENCE = float(os.getenv("ADAPTIVE_CONFIDENCE", "0.95"))
+ADAPTIVE_MIN_SAMPLES = int(os.getenv("ADAPTIVE_MIN_SAMPLES", "100"))
+ADAPTIVE_SEED = int(os.getenv("ADAPTIVE_SEED", "0"))
+# Other models' results (one directory per model); defaults to the siblings of RESULTS_DIR
+ADAPTIVE_LEADERBOARD_ROOT = os.getenv(
+    "ADAPTIVE_LEADERBOARD_ROOT", os.path.dirname(os.path.abspath(RESULTS_DIR))
+)
+
+# Difficulty / diversity index behind `run --subset fast-100` (built by `lae-eval index`)
+DIFFICULTY_INDEX_FILE = os.getenv(
+    "DIFFICULTY_INDEX_FILE", os.path.join(ADAPTIVE_LEADERBOARD_ROOT, "difficulty_index.json")
+)
+
+# Response lengths (completion tokens) of past runs per model, behind TOKEN_BUDGET=learned
+TOKEN_BUDGET_FILE = os.getenv(
+    "TOKEN_BUDGET_FILE", os.path.join(ADAPTIVE_LEADERBOARD_ROOT, "response_lengths.json")
+)
+
+# HTTP record/replay (off unless CASSETTE_FILE is set); mode: record | replay | auto
+CASSETTE_FILE = os.getenv("CASSETTE_FILE")
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "replay")
+CASSETTE_SPEED = float(os.getenv("CASSETTE_SPEED", "0"))  # 0 = instant, 1 = recorded timing
 
 # Solution Extraction Configuration
 EXTRACT_SOLUTION_TAGS = os.getenv("EXTRACT_SOLUTION_TAGS", "true").lower() in (
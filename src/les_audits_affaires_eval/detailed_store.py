@@ -0,0 +1,311 @@
+"""
+Per-sample detailed results store (JSON lines, optionally compressed)
+
+With DETAILED_COMPRESSION set to "zstd" (needs the `zstandard` package) or
+"gzip", every record is written as its own compressed frame. Concatenated
+frames are still a valid .zst/.gz file (`zstdcat`, `zcat` work), and a sidecar
+index of `sample_idx offset length` lines lets single records be read without
+decompressing the rest. The index is rebuilt by a scan when missing or stale
+(e.g. after a crash between the two writes); a truncated last record is ignored.
+
+Readers pick whichever format is on disk, so plain JSONL results keep working.
+"""
+
+import gzip
+import os
+import shutil
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .config import DETAILED_COMPRESSION, DETAILED_FILE, RESULTS_DIR
+from .serialization import decode_scores, dumps, loads
+
+COMPRESSIONS = ("", "zstd", "gzip")
+INDEX_SUFFIX = ".idx"
+
+_SCAN_CHUNK = 1 << 16
+
+
+class IndexEntry(NamedTuple):
+    sample_idx: Optional[int]
+    offset: int
+    length: int
+
+
+class _Codec:
+    """Plain JSON lines: a frame is one line"""
+
+    def encode(self, data: bytes) -> bytes:
+        return data
+
+    def decode(self, frame: bytes) -> bytes:
+        return frame
+
+    def scan(self, f) -> Iterator[Tuple[int, int, bytes]]:
+        """Yield (offset, length, line) for every complete frame
+
+        Blank lines are counted in the next frame so frames stay contiguous.
+        """
+        start = end = 0
+        for line in iter(f.readline, b""):
+            if not line.endswith(b"\n"):
+                break  # truncated by a crash mid-write
+            end += len(line)
+            if line.strip():
+                yield start, end - start, line
+                start = end
+
+
+class _FramedCodec(_Codec):
+    """One compressed frame per record"""
+
+    def _decompressobj(self):
+        raise NotImplementedError
+
+    def scan(self, f) -> Iterator[Tuple[int, int, bytes]]:
+        offset = 0
+        pending = b""
+        while True:
+            decompressor = self._decompressobj()
+            parts = []
+            consumed = 0
+            while not decompressor.eof:
+                chunk = pending or f.read(_SCAN_CHUNK)
+                pending = b""
+                if not chunk:
+                    return  # end of file, or a truncated last frame
+                parts.append(decompressor.decompress(chunk))
+                consumed += len(chunk)
+            pending = decompressor.unused_data
+            length = consumed - len(pending)
+            yield offset, length, b"".join(parts)
+            offset += length
+
+
+class _GzipCodec(_FramedCodec):
+    def encode(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=6, mtime=0)
+
+    def decode(self, frame: bytes) -> bytes:
+        return gzip.decompress(frame)
+
+    def _decompressobj(self):
+        return zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+
+
+class _ZstdCodec(_FramedCodec):
+    def __init__(self):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                "zstd compression needs the zstandard package: pip install zstandard"
+            ) from e
+        self._compressor = zstandard.ZstdCompressor(level=3, write_content_size=True)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def encode(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decode(self, frame: bytes) -> bytes:
+        return self._decompressor.decompress(frame)
+
+    def _decompressobj(self):
+        return self._decompressor.decompressobj()
+
+
+_SUFFIXES = {"": "", "zstd": ".zst", "gzip": ".gz"}
+
+
+def _codec(compression: str) -> _Codec:
+    if compression == "zstd":
+        return _ZstdCodec()
+    if compression == "gzip":
+        return _GzipCodec()
+    if compression:
+        raise ValueError(
+            f"Unknown DETAILED_COMPRESSION {compression!r}, expected one of {COMPRESSIONS}"
+        )
+    return _Codec()
+
+
+def _encode_record(record: Dict[str, Any]) -> bytes:
+    return dumps(record) + b"\n"
+
+
+class DetailedStore:
+    """The detailed results file of one results directory
+
+    Writes use the format already on disk, or `compression` (DETAILED_COMPRESSION
+    by default) for a new file.
+    """
+
+    def __init__(self, results_dir: str = RESULTS_DIR, compression: Optional[str] = None):
+        self.results_dir = results_dir
+        self._new_compression = DETAILED_COMPRESSION if compression is None else compression
+        self.compression = self._new_compression
+        for candidate in (self.compression,) + COMPRESSIONS:
+            if os.path.exists(self._path_for(candidate)):
+                self.compression = candidate
+                break
+        self.codec = _codec(self.compression)
+
+    def _path_for(self, compression: str) -> str:
+        return os.path.join(self.results_dir, DETAILED_FILE + _SUFFIXES[compression])
+
+    @property
+    def path(self) -> str:
+        return self._path_for(self.compression)
+
+    @property
+    def index_path(self) -> str:
+        return self.path + INDEX_SUFFIX
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def append(self, record: Dict[str, Any]):
+        """Append one record (and its index entry)"""
+        os.makedirs(self.results_dir, exist_ok=True)
+        frame = self.codec.encode(_encode_record(record))
+        if self.exists() and not os.path.exists(self.index_path):
+            self._write_index(self.index())  # file from an older version
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write(frame)
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(_index_line(record.get("sample_idx"), offset, len(frame)))
+
+    @contextmanager
+    def rewriter(self):
+        """Write a replacement file through `writer.write(record)`
+
+        The new file and index are swapped in atomically when the block exits
+        without an error; otherwise the current file is left untouched.
+        """
+        os.makedirs(self.results_dir, exist_ok=True)
+        tmp_path, tmp_index = self.path + ".tmp", self.index_path + ".tmp"
+        writer = _Rewriter(self.codec, tmp_path, tmp_index)
+        try:
+            with writer:
+                yield writer
+        except BaseException:
+            for path in (tmp_path, tmp_index):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        os.replace(tmp_path, self.path)
+        os.replace(tmp_index, self.index_path)
+
+    def rewrite(self, records: Iterable[Dict[str, Any]]):
+        """Atomically replace the file with `records`"""
+        with self.rewriter() as writer:
+            for record in records:
+                writer.write(record)
+
+    def remove(self):
+        """Delete the detailed file in every format; the next write uses `compression`"""
+        for compression in COMPRESSIONS:
+            for path in (self._path_for(compression), self._path_for(compression) + INDEX_SUFFIX):
+                if os.path.exists(path):
+                    os.remove(path)
+        self.compression = self._new_compression
+        self.codec = _codec(self.compression)
+
+    def backup(self, suffix: str) -> str:
+        """Copy the detailed file next to itself, return the copy's path"""
+        backup_path = f"{self.path}.bak_{suffix}"
+        shutil.copy2(self.path, backup_path)
+        return backup_path
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Every complete record, in file order"""
+        if not self.exists():
+            return
+        with open(self.path, "rb") as f:
+            for _, _, line in self.codec.scan(f):
+                yield loads(line)
+
+    def iter_scores(self) -> Iterator[Dict[str, Any]]:
+        """sample_idx, status and evaluation scores of every record (see `decode_scores`)"""
+        if not self.exists():
+            return
+        with open(self.path, "rb") as f:
+            for _, _, line in self.codec.scan(f):
+                yield decode_scores(line)
+
+    def index(self) -> List[IndexEntry]:
+        """Position of every record in file order (sidecar index, or a scan)"""
+        if not self.exists():
+            return []
+        entries = self._read_index()
+        if entries is not None:
+            return entries
+        with open(self.path, "rb") as f:
+            return [
+                IndexEntry(loads(line).get("sample_idx"), offset, length)
+                for offset, length, line in self.codec.scan(f)
+            ]
+
+    def _read_index(self) -> Optional[List[IndexEntry]]:
+        """The sidecar index, or None when it is missing or does not match the file"""
+        if not os.path.exists(self.index_path):
+            return None
+        entries = []
+        end = 0
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    sample_idx, offset, length = line.split()
+                    entry = IndexEntry(
+                        None if sample_idx == "-" else int(sample_idx), int(offset), int(length)
+                    )
+                except ValueError:
+                    return None
+                if entry.offset != end:
+                    return None
+                end += entry.length
+                entries.append(entry)
+        return entries if end == os.path.getsize(self.path) else None
+
+    def _write_index(self, entries: List[IndexEntry]):
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            f.writelines(_index_line(*entry) for entry in entries)
+
+    def read(self, entries: Iterable[IndexEntry]) -> Iterator[Dict[str, Any]]:
+        """Random reads: the records at `entries`, in the order given"""
+        with open(self.path, "rb") as f:
+            for entry in entries:
+                f.seek(entry.offset)
+                yield loads(self.codec.decode(f.read(entry.length)))
+
+    def get(self, sample_idx: int) -> Optional[Dict[str, Any]]:
+        """The last record written for `sample_idx`, or None"""
+        matches = [entry for entry in self.index() if entry.sample_idx == sample_idx]
+        return next(self.read(matches[-1:]), None)
+
+
+class _Rewriter:
+    def __init__(self, codec: _Codec, path: str, index_path: str):
+        self.codec = codec
+        self.path = path
+        self.index_path = index_path
+
+    def __enter__(self):
+        self._data = open(self.path, "wb")
+        self._index = open(self.index_path, "w", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc_info):
+        self._data.close()
+        self._index.close()
+
+    def write(self, record: Dict[str, Any]):
+        frame = self.codec.encode(_encode_record(record))
+        self._index.write(_index_line(record.get("sample_idx"), self._data.tell(), len(frame)))
+        self._data.write(frame)
+
+
+def _index_line(sample_idx: Optional[int], offset: int, length: int) -> str:
+    return f"{'-' if sample_idx is None else int(sample_idx)} {offset} {length}\n"
@@ -0,0 +1,622 @@
+"""
+Distributed evaluation: a coordinator queues sample indices, workers lease them
+
+Work items (one per sample, keyed by `sample_idx`) live in a broker. Workers on
+any number of hosts lease items, renew their leases while the sample is being
+generated and judged, and push results back; the coordinator streams results
+as they arrive, writes them to the detailed JSONL file, updates the metrics and
+finally writes the usual summary/CSV outputs.
+
+An item whose lease expires (worker crash, lost host) is re-queued by the next
+`lease()` call; after WORK_MAX_ATTEMPTS it is marked dead and reported missing.
+
+Brokers are selected by URL:
+  sqlite:////shared/fs/run.db  SQLite file (shared filesystem, no server)
+  redis://host:6379/0          Redis-compatible server (needs the `redis` package)
+  memory://                    in-process, for tests and single-host runs
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from .config import (
+    BROKER_URL,
+    CONCURRENT_REQUESTS,
+    RESULTS_DIR,
+    WORK_MAX_ATTEMPTS,
+)
+from .detailed_store import DetailedStore
+from .leases import DEFAULT_LEASE_TTL, make_owner_id
+from .serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+DEAD = "dead"
+
+
+@dataclass
+class WorkItem:
+    """One sample to evaluate, as handed out by a broker"""
+
+    idx: int
+    payload: Dict[str, Any]
+    attempts: int = 0
+
+
+class WorkBroker:
+    """Interface shared by every work-queue broker"""
+
+    def submit(self, items: List[Tuple[int, Dict[str, Any]]]):
+        """Replace the queue with `items` (sample_idx, sample) and clear old results"""
+        raise NotImplementedError
+
+    def lease(self, owner: str, count: int, ttl: float = DEFAULT_LEASE_TTL) -> List[WorkItem]:
+        """Claim up to `count` queued items, re-queueing expired leases first"""
+        raise NotImplementedError
+
+    def renew(self, idx: int, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        """Extend a lease held by `owner`; return False if it was lost"""
+        raise NotImplementedError
+
+    def complete(self, idx: int, owner: str, result: Dict[str, Any]) -> bool:
+        """Store the result of a leased item; return False if the lease was lost"""
+        raise NotImplementedError
+
+    def release(self, idx: int, owner: str, failed: bool = False) -> bool:
+        """Give a leased item back to the queue (`failed` counts it as an attempt)"""
+        raise NotImplementedError
+
+    def results_since(self, cursor: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Results stored after `cursor`, and the cursor to use next time"""
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """Number of items per state (queued, leased, done, dead)"""
+        raise NotImplementedError
+
+    def is_finished(self) -> bool:
+        counts = self.counts()
+        return counts.get(QUEUED, 0) == 0 and counts.get(LEASED, 0) == 0
+
+    def close(self):
+        pass
+
+
+class InProcessBroker(WorkBroker):
+    """Broker kept in memory, shared by the threads/tasks of one process"""
+
+    def __init__(self, max_attempts: int = WORK_MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._items: Dict[int, Dict[str, Any]] = {}
+        self._results: List[Dict[str, Any]] = []
+
+    def submit(self, items: List[Tuple[int, Dict[str, Any]]]):
+        with self._lock:
+            self._items = {
+                idx: {
+                    "payload": payload,
+                    "state": QUEUED,
+                    "owner": None,
+                    "expires_at": 0.0,
+                    "attempts": 0,
+                }
+                for idx, payload in items
+            }
+            self._results = []
+
+    def _requeue_expired(self, now: float):
+        for item in self._items.values():
+            if item["state"] == LEASED and item["expires_at"] <= now:
+                self._give_back(item, failed=True)
+
+    def _give_back(self, item: Dict[str, Any], failed: bool):
+        item["owner"] = None
+        item["attempts"] += 1 if failed else 0
+        item["state"] = DEAD if item["attempts"] >= self.max_attempts else QUEUED
+
+    def lease(self, owner: str, count: int, ttl: float = DEFAULT_LEASE_TTL) -> List[WorkItem]:
+        with self._lock:
+            now = time.time()
+            self._requeue_expired(now)
+            leased = []
+            for idx, item in sorted(self._items.items()):
+                if len(leased) >= count:
+                    break
+                if item["state"] == QUEUED:
+                    item.update(state=LEASED, owner=owner, expires_at=now + ttl)
+                    leased.append(WorkItem(idx, item["payload"], item["attempts"]))
+            return leased
+
+    def _held(self, idx: int, owner: str) -> Optional[Dict[str, Any]]:
+        item = self._items.get(idx)
+        if item is None or item["state"] != LEASED or item["owner"] != owner:
+            return None
+        return item
+
+    def renew(self, idx: int, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        with self._lock:
+            item = self._held(idx, owner)
+            if item is None:
+                return False
+            item["expires_at"] = time.time() + ttl
+            return True
+
+    def complete(self, idx: int, owner: str, result: Dict[str, Any]) -> bool:
+        with self._lock:
+            item = self._held(idx, owner)
+            if item is None:
+                return False
+            item.update(state=DONE, owner=None)
+            self._results.append(result)
+            return True
+
+    def release(self, idx: int, owner: str, failed: bool = False) -> bool:
+        with self._lock:
+            item = self._held(idx, owner)
+            if item is None:
+                return False
+            self._give_back(item, failed)
+            return True
+
+    def results_since(self, cursor: int) -> Tuple[List[Dict[str, Any]], int]:
+        with self._lock:
+            return self._results[cursor:], len(self._results)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {QUEUED: 0, LEASED: 0, DONE: 0, DEAD: 0}
+            for item in self._items.values():
+                counts[item["state"]] += 1
+            return counts
+
+
+class SQLiteBroker(WorkBroker):
+    """Broker stored in a SQLite file, usable from several hosts on a shared filesystem
+
+    Every operation opens its own connection and runs in an IMMEDIATE transaction,
+    so leasing is atomic across processes. The default rollback journal is kept
+    (WAL needs shared memory, which network filesystems do not provide).
+    """
+
+    def __init__(self, path: str, max_attempts: int = WORK_MAX_ATTEMPTS, timeout: float = 60.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._transaction() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS items (idx INTEGER PRIMARY KEY, payload TEXT NOT NULL,"
+                " state TEXT NOT NULL, owner TEXT, expires_at REAL, attempts INTEGER NOT NULL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results"
+                " (seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " idx INTEGER NOT NULL, result TEXT NOT NULL)"
+            )
+
+    def _transaction(self):
+        return _SQLiteTransaction(self.path, self.timeout)
+
+    def submit(self, items: List[Tuple[int, Dict[str, Any]]]):
+        with self._transaction() as db:
+            db.execute("DELETE FROM items")
+            db.execute("DELETE FROM results")
+            db.executemany(
+                "INSERT INTO items VALUES (?, ?, ?, NULL, NULL, 0)",
+                [(idx, dumps(payload).decode("utf-8"), QUEUED) for idx, payload in items],
+            )
+
+    def lease(self, owner: str, count: int, ttl: float = DEFAULT_LEASE_TTL) -> List[WorkItem]:
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE items SET attempts = attempts + 1, owner = NULL,"
+                " state = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END"
+                " WHERE state = ? AND expires_at <= ?",
+                (self.max_attempts, DEAD, QUEUED, LEASED, now),
+            )
+            rows = db.execute(
+                "SELECT idx, payload, attempts FROM items WHERE state = ? ORDER BY idx LIMIT ?",
+                (QUEUED, count),
+            ).fetchall()
+            db.executemany(
+                "UPDATE items SET state = ?, owner = ?, expires_at = ? WHERE idx = ?",
+                [(LEASED, owner, now + ttl, idx) for idx, _, _ in rows],
+            )
+        return [WorkItem(idx, loads(payload), attempts) for idx, payload, attempts in rows]
+
+    def renew(self, idx: int, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE items SET expires_at = ? WHERE idx = ? AND state = ? AND owner = ?",
+                (time.time() + ttl, idx, LEASED, owner),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, idx: int, owner: str, result: Dict[str, Any]) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE items SET state = ?, owner = NULL"
+                " WHERE idx = ? AND state = ? AND owner = ?",
+                (DONE, idx, LEASED, owner),
+            )
+            if cursor.rowcount != 1:
+                return False
+            db.execute(
+                "INSERT INTO results (idx, result) VALUES (?, ?)",
+                (idx, dumps(result).decode("utf-8")),
+            )
+            return True
+
+    def release(self, idx: int, owner: str, failed: bool = False) -> bool:
+        increment = 1 if failed else 0
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE items SET attempts = attempts + ?, owner = NULL,"
+                " state = CASE WHEN attempts + ? >= ? THEN ? ELSE ? END"
+                " WHERE idx = ? AND state = ? AND owner = ?",
+                (increment, increment, self.max_attempts, DEAD, QUEUED, idx, LEASED, owner),
+            )
+            return cursor.rowcount == 1
+
+    def results_since(self, cursor: int) -> Tuple[List[Dict[str, Any]], int]:
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT seq, result FROM results WHERE seq > ? ORDER BY seq", (cursor,)
+            ).fetchall()
+        if not rows:
+            return [], cursor
+        return [loads(result) for _, result in rows], rows[-1][0]
+
+    def counts(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, DEAD: 0}
+        with self._transaction() as db:
+            for state, count in db.execute("SELECT state, COUNT(*) FROM items GROUP BY state"):
+                counts[state] = count
+        return counts
+
+
+class _SQLiteTransaction:
+    """Connection + BEGIN IMMEDIATE … COMMIT (ROLLBACK on error), closed on exit"""
+
+    def __init__(self, path: str, timeout: float):
+        self.path = path
+        self.timeout = timeout
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.db.close()
+
+
+# Lua scripts keep each Redis operation atomic
+_REDIS_REQUEUE = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, idx in ipairs(expired) do
+  redis.call('ZREM', KEYS[2], idx)
+  redis.call('HDEL', KEYS[3], idx)
+  if redis.call('HINCRBY', KEYS[4], idx, 1) >= tonumber(ARGV[2]) then
+    redis.call('SADD', KEYS[5], idx)
+  else
+    redis.call('RPUSH', KEYS[1], idx)
+  end
+end
+local leased = {}
+for i = 1, tonumber(ARGV[3]) do
+  local idx = redis.call('LPOP', KEYS[1])
+  if not idx then break end
+  redis.call('ZADD', KEYS[2], ARGV[4], idx)
+  redis.call('HSET', KEYS[3], idx, ARGV[5])
+  table.insert(leased, idx)
+end
+return leased
+"""
+
+_REDIS_RENEW = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
+
+_REDIS_COMPLETE = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('SADD', KEYS[3], ARGV[1])
+redis.call('RPUSH', KEYS[4], ARGV[3])
+return 1
+"""
+
+_REDIS_RELEASE = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+if redis.call('HINCRBY', KEYS[4], ARGV[1], tonumber(ARGV[3])) >= tonumber(ARGV[4]) then
+  redis.call('SADD', KEYS[5], ARGV[1])
+else
+  redis.call('RPUSH', KEYS[3], ARGV[1])
+end
+return 1
+"""
+
+
+class RedisBroker(WorkBroker):
+    """Broker on a Redis-compatible server (Redis, Valkey, KeyDB, Dragonfly)"""
+
+    def __init__(self, url: str, run_id: str = "default", max_attempts: int = WORK_MAX_ATTEMPTS):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("The Redis broker needs the redis package: pip install redis") from e
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.max_attempts = max_attempts
+        prefix = f"lae:{run_id}"
+        self.keys = {
+            name: f"{prefix}:{name}"
+            for name in (
+                "payloads",
+                "queue",
+                "leases",
+                "owners",
+                "attempts",
+                "done",
+                "dead",
+                "results",
+            )
+        }
+        self._requeue_and_lease = self.client.register_script(_REDIS_REQUEUE)
+        self._renew = self.client.register_script(_REDIS_RENEW)
+        self._complete = self.client.register_script(_REDIS_COMPLETE)
+        self._release = self.client.register_script(_REDIS_RELEASE)
+
+    def submit(self, items: List[Tuple[int, Dict[str, Any]]]):
+        k = self.keys
+        pipe = self.client.pipeline()
+        pipe.delete(*k.values())
+        if items:
+            pipe.hset(
+                k["payloads"],
+                mapping={idx: dumps(payload).decode("utf-8") for idx, payload in items},
+            )
+            pipe.rpush(k["queue"], *[idx for idx, _ in items])
+        pipe.execute()
+
+    def lease(self, owner: str, count: int, ttl: float = DEFAULT_LEASE_TTL) -> List[WorkItem]:
+        k = self.keys
+        now = time.time()
+        leased = self._requeue_and_lease(
+            keys=[k["queue"], k["leases"], k["owners"], k["attempts"], k["dead"]],
+            args=[now, self.max_attempts, count, now + ttl, owner],
+        )
+        if not leased:
+            return []
+        payloads = self.client.hmget(k["payloads"], leased)
+        attempts = self.client.hmget(k["attempts"], leased)
+        return [
+            WorkItem(int(idx), loads(payload), int(attempt or 0))
+            for idx, payload, attempt in zip(leased, payloads, attempts)
+        ]
+
+    def renew(self, idx: int, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        k = self.keys
+        return bool(
+            self._renew(keys=[k["leases"], k["owners"]], args=[idx, owner, time.time() + ttl])
+        )
+
+    def complete(self, idx: int, owner: str, result: Dict[str, Any]) -> bool:
+        k = self.keys
+        return bool(
+            self._complete(
+                keys=[k["leases"], k["owners"], k["done"], k["results"]],
+                args=[idx, owner, dumps(result).decode("utf-8")],
+            )
+        )
+
+    def release(self, idx: int, owner: str, failed: bool = False) -> bool:
+        k = self.keys
+        return bool(
+            self._release(
+                keys=[k["leases"], k["owners"], k["queue"], k["attempts"], k["dead"]],
+                args=[idx, owner, 1 if failed else 0, self.max_attempts],
+            )
+        )
+
+    def results_since(self, cursor: int) -> Tuple[List[Dict[str, Any]], int]:
+        rows = self.client.lrange(self.keys["results"], cursor, -1)
+        return [loads(row) for row in rows], cursor + len(rows)
+
+    def counts(self) -> Dict[str, int]:
+        k = self.keys
+        pipe = self.client.pipeline()
+        pipe.llen(k["queue"])
+        pipe.zcard(k["leases"])
+        pipe.scard(k["done"])
+        pipe.scard(k["dead"])
+        queued, leased, done, dead = pipe.execute()
+        return {QUEUED: queued, LEASED: leased, DONE: done, DEAD: dead}
+
+    def close(self):
+        self.client.close()
+
+
+def create_broker(url: Optional[str] = BROKER_URL, run_id: str = "default") -> WorkBroker:
+    """Broker for `url` (sqlite:///path.db, redis://host:port/db or memory://)"""
+    if not url:
+        raise ValueError("No broker configured: pass --broker or set BROKER_URL")
+    if url.startswith("sqlite://"):
+        # sqlite:///relative.db or sqlite:////absolute/path.db, as in SQLAlchemy
+        return SQLiteBroker(url[len("sqlite:///") :])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBroker(url, run_id=run_id)
+    if url.startswith("memory://"):
+        return InProcessBroker()
+    raise ValueError(f"Unknown broker URL: {url}. Use sqlite:///path, redis://host or memory://")
+
+
+class DistributedWorker:
+    """Leases samples from a broker and evaluates them with a local evaluator"""
+
+    def __init__(
+        self,
+        broker: WorkBroker,
+        evaluator,
+        concurrency: int = CONCURRENT_REQUESTS,
+        ttl: float = DEFAULT_LEASE_TTL,
+        poll_interval: float = 2.0,
+    ):
+        self.broker = broker
+        self.evaluator = evaluator
+        self.concurrency = max(1, concurrency)
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.owner = make_owner_id()
+        self.held: Dict[int, WorkItem] = {}
+        self.completed = 0
+
+    async def _call(self, method, *args):
+        # Broker calls are blocking I/O (SQLite file locks, Redis round trips)
+        return await asyncio.to_thread(method, *args)
+
+    async def _renew_leases(self):
+        while True:
+            await asyncio.sleep(max(self.ttl / 3, 0.1))
+            for idx in list(self.held):
+                if not await self._call(self.broker.renew, idx, self.owner, self.ttl):
+                    logger.warning(f"Lost lease on sample {idx} (owner {self.owner})")
+
+    async def _process(self, item: WorkItem):
+        try:
+            result = await self.evaluator.evaluate_single_sample(item.payload, item.idx)
+        except Exception as e:
+            logger.error(f"Sample {item.idx} failed on {self.owner}: {e}")
+            await self._call(self.broker.release, item.idx, self.owner, True)
+            return
+        finally:
+            self.held.pop(item.idx, None)
+        if await self._call(self.broker.complete, item.idx, self.owner, result.to_dict()):
+            self.completed += 1
+        else:
+            logger.warning(f"Dropping result for sample {item.idx}: lease was lost")
+
+    async def run(self) -> int:
+        """Evaluate until the queue is drained; returns the number of completed samples"""
+        logger.info(f"Worker {self.owner} started (concurrency {self.concurrency})")
+        async with self.evaluator._create_model_client() as model_client:
+            self.evaluator.model_client = model_client
+            renewer = asyncio.create_task(self._renew_leases())
+            tasks = set()
+            try:
+                while True:
+                    free = self.concurrency - len(tasks)
+                    if free > 0:
+                        for item in await self._call(self.broker.lease, self.owner, free, self.ttl):
+                            self.held[item.idx] = item
+                            tasks.add(asyncio.create_task(self._process(item)))
+                    if not tasks:
+                        counts = await self._call(self.broker.counts)
+                        # Wait for the coordinator when nothing has been queued yet
+                        if any(counts.values()) and not counts[QUEUED] and not counts[LEASED]:
+                            break
+                        await asyncio.sleep(self.poll_interval)
+                        continue
+                    _, tasks = await asyncio.wait(
+                        tasks, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED
+                    )
+            finally:
+                renewer.cancel()
+                for task in tasks:
+                    task.cancel()
+                # Hand unfinished items straight back instead of waiting for expiry
+                for idx in list(self.held):
+                    self.broker.release(idx, self.owner)
+        logger.info(f"Worker {self.owner} finished: {self.completed} samples")
+        return self.completed
+
+
+class DistributedCoordinator:
+    """Queues a run on the broker and aggregates worker results as they arrive"""
+
+    def __init__(self, broker: WorkBroker, evaluator, poll_interval: float = 2.0):
+        self.broker = broker
+        self.evaluator = evaluator
+        self.poll_interval = poll_interval
+
+    def submit(self, max_samples: Optional[int] = None, start_from: int = 0) -> int:
+        dataset = self.evaluator.load_dataset()[start_from:]
+        if max_samples:
+            dataset = dataset[:max_samples]
+        self.broker.submit([(start_from + i, sample) for i, sample in enumerate(dataset)])
+        logger.info(f"Queued {len(dataset)} samples (starting from index {start_from})")
+        return len(dataset)
+
+    def run(self, max_samples: Optional[int] = None, start_from: int = 0) -> Dict[str, Any]:
+        """Queue the samples, collect results until every item is done or dead"""
+        run_start_time = time.time()
+        total = self.submit(max_samples, start_from)
+        DetailedStore(RESULTS_DIR).remove()
+
+        results = []
+        cursor = 0
+        score_sum = 0.0
+        with (
+            self.evaluator._monitor(total),
+            tqdm(
+                total=total, desc="Collecting results", **self.evaluator._progress_options
+            ) as progress,
+        ):
+            while True:
+                new_results, cursor = self.broker.results_since(cursor)
+                for result in new_results:
+                    self._record(result)
+                    score_sum += result["evaluation"].get("score_global", 0)
+                results.extend(new_results)
+                progress.update(len(new_results))
+                if results:
+                    progress.set_postfix(mean_score=f"{score_sum / len(results):.1f}")
+                if not new_results and self.broker.is_finished():
+                    break
+                if not new_results:
+                    time.sleep(self.poll_interval)
+
+        dead = self.broker.counts().get(DEAD, 0)
+        if dead:
+            logger.warning(
+                f"{dead} samples exhausted {WORK_MAX_ATTEMPTS} lease attempts and are missing"
+            )
+        results.sort(key=lambda result: result["sample_idx"])
+        self.evaluator.rewrite_detailed_results(results)
+        final_results = self.evaluator.compute_final_metrics(
+            results, wall_time=time.time() - run_start_time
+        )
+        self.evaluator.save_final_results(final_results, results)
+        return final_results
+
+    def _record(self, result: Dict[str, Any]):
+        """Persist one streamed result and feed it to the run metrics"""
+        from .metrics import GENERATION, JUDGE
+
+        metadata = result.get("metadata", {})
+        self.evaluator.save_intermediate_result(result)
+        self.evaluator.metrics.stage(GENERATION).observe(metadata.get("generation_time", 0))
+        self.evaluator.metrics.stage(JUDGE).observe(metadata.get("evaluation_time", 0))
+        self.evaluator._record_result_metrics(result)
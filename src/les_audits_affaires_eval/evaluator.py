@@ -3,21 +3,53 @@ Main evaluation harness for Les Audits-Affaires LLM benchmark
 """
 
 import asyncio
-import json
 import logging
 import os
 import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
-import jsonlines
-import pandas as pd
+import numpy as np
 from datasets import load_dataset
 from tqdm import tqdm
 from tqdm.asyncio import tqdm as atqdm
 
+from .adaptive import AdaptiveStopping, leaderboard_scores
+from .budget import record_response_lengths
 from .config import *
-from .model_client import ChatModelClient, EvaluatorClient, ModelClient, StrictChatModelClient
+from .detailed_store import DetailedStore
+from .serialization import dump_file
+from .compaction import summarize_compaction
+from .judge_ensemble import create_evaluator_client, summarize_ensemble
+from .prejudge import summarize_prejudge
+from .metrics import (
+    GENERATION,
+    JUDGE,
+    QUEUE_WAIT,
+    SAMPLES_DONE,
+    SAMPLES_TARGET,
+    WRITE,
+    LiveView,
+    MetricsFileExporter,
+    MetricsRegistry,
+)
+from .model_client import ChatModelClient, ModelClient, StrictChatModelClient
+from .rate_limit import create_rate_limiter
+from .records import RUBRICS, SampleResult, as_dict, as_record
+from .results_store import SCORE_COLUMNS, read_results_frame, write_results_parquet
+from .significance import bootstrap_ci, bootstrap_settings
+from .telemetry import summarize_telemetry
+from .tracing import span
+from .status import (
+    REPETITION_ABORT,
+    STAGE_GENERATION,
+    classify_exception,
+    evaluation_status,
+    failure_stage,
+    result_status,
+    select_statuses,
+)
 
 # Setup logging
 logging.basicConfig(
@@ -31,12 +63,24 @@ logger = logging.getLogger(__name__)
 class LesAuditsAffairesEvaluator:
     """Main evaluator class for the Les Audits-Affaires benchmark"""
 
-    def __init__(self, use_chat_endpoint: bool = False, use_strict_mode: bool = False):
+    def __init__(
+        self,
+        use_chat_endpoint: bool = False,
+        use_strict_mode: bool = False,
+        live: bool = False,
+        metrics_file: Optional[str] = METRICS_FILE,
+    ):
         self.model_client = None
-        self.evaluator_client = EvaluatorClient()
+        self.evaluator_client = create_evaluator_client()
         self.results = []
         self.use_chat_endpoint = use_chat_endpoint
         self.use_strict_mode = use_strict_mode
+        self.live = live
+        self.metrics_file = metrics_file
+        # Per-evaluator so a second run in the same process starts from zero
+        self.metrics = MetricsRegistry()
+        self.generation_limiter = create_rate_limiter(MODEL_RATE_LIMIT, "generation")
+        self.judge_limiter = create_rate_limiter(JUDGE_RATE_LIMIT, "judge")
 
         # Ensure results directory exists
         os.makedirs(RESULTS_DIR, exist_ok=True)
@@ -61,182 +105,223 @@ class LesAuditsAffairesEvaluator:
             logger.error(f"Error loading dataset: {e}")
             raise
 
-    async def evaluate_single_sample(
-        self, sample: Dict[str, Any], sample_idx: int
-    ) -> Dict[str, Any]:
+    async def evaluate_single_sample(self, sample: Dict[str, Any], sample_idx: int) -> SampleResult:
         """Evaluate a single sample from the dataset (async version)"""
         question = sample["question"]
 
         # Extract ground truth
-        ground_truth = {
-            "action_requise": sample.get("action_requise", ""),
-            "delai_legal": sample.get("delai_legal", ""),
-            "documents_obligatoires": sample.get("documents_obligatoires", ""),
-            "impact_financier": sample.get("impact_financier", ""),
-            "consequences_non_conformite": sample.get("consequences_non_conformite", ""),
-        }
+        ground_truth = {rubric: sample.get(rubric, "") for rubric in RUBRICS}
 
         logger.info(f"Evaluating sample {sample_idx}: {question[:100]}...")
 
         try:
             # Generate response from the model being evaluated
-            start_time = time.time()
-            model_response = await self.model_client.generate_response(question)
-            generation_time = time.time() - start_time
+            await self.generation_limiter.acquire()
+            start_time = time.perf_counter()
+            with (
+                self.metrics.in_flight(GENERATION).track(),
+                span(
+                    "generate", {"sample_idx": sample_idx, "provider": self._generation_provider()}
+                ) as generate_span,
+            ):
+                model_response = await self.model_client.generate_response(question)
+                generate_span.set_attributes(self._usage_attributes(model_response))
+            generation_time = time.perf_counter() - start_time
+            self.metrics.stage(GENERATION).observe(generation_time)
 
             logger.debug(f"Model response for sample {sample_idx}: {model_response[:200]}...")
 
             # Evaluate the response using Azure OpenAI
-            eval_start_time = time.time()
-            evaluation = self.evaluator_client.evaluate_response(
-                question, model_response, ground_truth
-            )
-            evaluation_time = time.time() - eval_start_time
+            await self.judge_limiter.acquire()
+            eval_start_time = time.perf_counter()
+            with (
+                self.metrics.in_flight(JUDGE).track(),
+                span(
+                    "judge", {"sample_idx": sample_idx, "provider": EVALUATOR_PROVIDER}
+                ) as judge_span,
+            ):
+                evaluation = self.evaluator_client.evaluate_response(
+                    question, model_response, ground_truth
+                )
+                judge_usage = evaluation.pop("usage", {})
+                judge_span.set_attributes(
+                    {
+                        **self._usage_attributes(judge_usage),
+                        "status": evaluation.get("status"),
+                        "score_global": evaluation.get("score_global"),
+                    }
+                )
+            evaluation_time = time.perf_counter() - eval_start_time
+            self.metrics.stage(JUDGE).observe(evaluation_time)
+            status = self._result_status(model_response, evaluation)
 
             # Compile result
-            result = {
-                "sample_idx": sample_idx,
-                "question": question,
-                "ground_truth": ground_truth,
-                "model_response": model_response,
-                "evaluation": evaluation,
-                "metadata": {
+            result = SampleResult.from_evaluation(
+                sample_idx,
+                question,
+                ground_truth.values(),
+                model_response,
+                status,
+                evaluation,
+                metadata={
                     "generation_time": generation_time,
                     "evaluation_time": evaluation_time,
                     "total_time": generation_time + evaluation_time,
                     "timestamp": datetime.utcnow().isoformat(),
+                    "generation_usage": getattr(model_response, "usage", {}),
+                    "judge_usage": judge_usage,
                 },
-            }
-
-            logger.info(
-                f"Sample {sample_idx} completed - Global Score: {evaluation.get('score_global', 0)}"
             )
+
+            logger.info(f"Sample {sample_idx} completed - Global Score: {result.score_global}")
             return result
 
         except Exception as e:
             logger.error(f"Error evaluating sample {sample_idx}: {e}")
+            status = classify_exception(e)
             # Return error result
-            return {
-                "sample_idx": sample_idx,
-                "question": question,
-                "ground_truth": ground_truth,
-                "model_response": f"ERROR: {str(e)}",
-                "evaluation": {
-                    "score_global": 0,
-                    "scores": {
-                        "action_requise": 0,
-                        "delai_legal": 0,
-                        "documents_obligatoires": 0,
-                        "impact_financier": 0,
-                        "consequences_non_conformite": 0,
-                    },
-                    "justifications": {
-                        "action_requise": f"Erreur: {str(e)}",
-                        "delai_legal": f"Erreur: {str(e)}",
-                        "documents_obligatoires": f"Erreur: {str(e)}",
-                        "impact_financier": f"Erreur: {str(e)}",
-                        "consequences_non_conformite": f"Erreur: {str(e)}",
-                    },
-                },
-                "metadata": {
+            return SampleResult(
+                sample_idx,
+                question,
+                ground_truth.values(),
+                f"ERROR: {str(e)}",
+                status,
+                scores=[0.0] * len(RUBRICS),
+                justifications=[f"Erreur: {str(e)}"] * len(RUBRICS),
+                metadata={
                     "generation_time": 0,
                     "evaluation_time": 0,
                     "total_time": 0,
                     "timestamp": datetime.utcnow().isoformat(),
                     "error": str(e),
                 },
-            }
+            )
 
-    def evaluate_single_sample_sync(
-        self, sample: Dict[str, Any], sample_idx: int
-    ) -> Dict[str, Any]:
+    def evaluate_single_sample_sync(self, sample: Dict[str, Any], sample_idx: int) -> SampleResult:
         """Evaluate a single sample from the dataset (sync version)"""
         question = sample["question"]
 
         # Extract ground truth
-        ground_truth = {
-            "action_requise": sample.get("action_requise", ""),
-            "delai_legal": sample.get("delai_legal", ""),
-            "documents_obligatoires": sample.get("documents_obligatoires", ""),
-            "impact_financier": sample.get("impact_financier", ""),
-            "consequences_non_conformite": sample.get("consequences_non_conformite", ""),
-        }
+        ground_truth = {rubric: sample.get(rubric, "") for rubric in RUBRICS}
 
         logger.info(f"Evaluating sample {sample_idx}: {question[:100]}...")
 
         try:
             # Generate response from the model being evaluated
-            start_time = time.time()
-            model_response = self.model_client.generate_response_sync(question)
-            generation_time = time.time() - start_time
+            start_time = time.perf_counter()
+            with (
+                self.metrics.in_flight(GENERATION).track(),
+                span(
+                    "generate", {"sample_idx": sample_idx, "provider": self._generation_provider()}
+                ) as generate_span,
+            ):
+                model_response = self.model_client.generate_response_sync(question)
+                generate_span.set_attributes(self._usage_attributes(model_response))
+            generation_time = time.perf_counter() - start_time
+            self.metrics.stage(GENERATION).observe(generation_time)
 
             logger.debug(f"Model response for sample {sample_idx}: {model_response[:200]}...")
 
             # Evaluate the response using Azure OpenAI
-            eval_start_time = time.time()
-            evaluation = self.evaluator_client.evaluate_response(
-                question, model_response, ground_truth
-            )
-            evaluation_time = time.time() - eval_start_time
+            eval_start_time = time.perf_counter()
+            with (
+                self.metrics.in_flight(JUDGE).track(),
+                span(
+                    "judge", {"sample_idx": sample_idx, "provider": EVALUATOR_PROVIDER}
+                ) as judge_span,
+            ):
+                evaluation = self.evaluator_client.evaluate_response(
+                    question, model_response, ground_truth
+                )
+                judge_usage = evaluation.pop("usage", {})
+                judge_span.set_attributes(
+                    {
+                        **self._usage_attributes(judge_usage),
+                        "status": evaluation.get("status"),
+                        "score_global": evaluation.get("score_global"),
+                    }
+                )
+            evaluation_time = time.perf_counter() - eval_start_time
+            self.metrics.stage(JUDGE).observe(evaluation_time)
+            status = self._result_status(model_response, evaluation)
 
             # Compile result
-            result = {
-                "sample_idx": sample_idx,
-                "question": question,
-                "ground_truth": ground_truth,
-                "model_response": model_response,
-                "evaluation": evaluation,
-                "metadata": {
+            result = SampleResult.from_evaluation(
+                sample_idx,
+                question,
+                ground_truth.values(),
+                model_response,
+                status,
+                evaluation,
+                metadata={
                     "generation_time": generation_time,
                     "evaluation_time": evaluation_time,
                     "total_time": generation_time + evaluation_time,
                     "timestamp": datetime.utcnow().isoformat(),
+                    "generation_usage": getattr(model_response, "usage", {}),
+                    "judge_usage": judge_usage,
                 },
-            }
-
-            logger.info(
-                f"Sample {sample_idx} completed - Global Score: {evaluation.get('score_global', 0)}"
             )
+
+            logger.info(f"Sample {sample_idx} completed - Global Score: {result.score_global}")
             return result
 
         except Exception as e:
             logger.error(f"Error evaluating sample {sample_idx}: {e}")
+            status = classify_exception(e)
             # Return error result
-            return {
-                "sample_idx": sample_idx,
-                "question": question,
-                "ground_truth": ground_truth,
-                "model_response": f"ERROR: {str(e)}",
-                "evaluation": {
-                    "score_global": 0,
-                    "scores": {
-                        "action_requise": 0,
-                        "delai_legal": 0,
-                        "documents_obligatoires": 0,
-                        "impact_financier": 0,
-                        "consequences_non_conformite": 0,
-                    },
-                    "justifications": {
-                        "action_requise": f"Erreur: {str(e)}",
-                        "delai_legal": f"Erreur: {str(e)}",
-                        "documents_obligatoires": f"Erreur: {str(e)}",
-                        "impact_financier": f"Erreur: {str(e)}",
-                        "consequences_non_conformite": f"Erreur: {str(e)}",
-                    },
-                },
-                "metadata": {
+            return SampleResult(
+                sample_idx,
+                question,
+                ground_truth.values(),
+                f"ERROR: {str(e)}",
+                status,
+                scores=[0.0] * len(RUBRICS),
+                justifications=[f"Erreur: {str(e)}"] * len(RUBRICS),
+                metadata={
                     "generation_time": 0,
                     "evaluation_time": 0,
                     "total_time": 0,
                     "timestamp": datetime.utcnow().isoformat(),
                     "error": str(e),
                 },
-            }
+            )
+
+    @property
+    def _progress_options(self) -> Dict[str, Any]:
+        """tqdm options – bars are hidden under the live view (TQDM_* env vars apply otherwise)"""
+        return {"disable": True} if self.live else {}
+
+    @staticmethod
+    def _generation_provider() -> str:
+        return os.getenv("EXTERNAL_PROVIDER") or "local"
+
+    @staticmethod
+    def _usage_attributes(source: Any) -> Dict[str, Any]:
+        """Span attributes for the token usage of a ModelResponse or a usage dict"""
+        usage = source if isinstance(source, dict) else getattr(source, "usage", {})
+        attributes = {f"tokens.{key.replace('_tokens', '')}": value for key, value in usage.items()}
+        model = getattr(source, "model", None)
+        if model:
+            attributes["model"] = model
+        return attributes
+
+    def _result_status(self, model_response: str, evaluation: Dict[str, Any]) -> str:
+        """Status of a completed sample – repetition aborts take precedence over judge status"""
+        if getattr(model_response, "repetition_abort", False):
+            return REPETITION_ABORT
+        return evaluation_status(evaluation)
 
     async def evaluate_batch(
-        self, samples: List[Dict[str, Any]], start_idx: int = 0
-    ) -> List[Dict[str, Any]]:
-        """Evaluate a batch of samples with controlled concurrency - optimized for high throughput (async version)"""
+        self,
+        samples: List[Dict[str, Any]],
+        start_idx: int = 0,
+        sample_indices: Optional[List[int]] = None,
+    ) -> List[SampleResult]:
+        """Evaluate a batch of samples concurrently for high throughput (async version)
+
+        Samples are numbered from `start_idx`, or by `sample_indices` when given.
+        """
         # Use a larger semaphore for high-throughput processing
         # But reduce concurrency slightly for longer responses (10K tokens)
         max_concurrent = min(CONCURRENT_REQUESTS, 150)  # Reduced cap for 10K token responses
@@ -246,61 +331,118 @@ class LesAuditsAffairesEvaluator:
             f"Processing batch with {max_concurrent} max concurrent requests (10K token support)"
         )
 
-        async def evaluate_with_semaphore(sample, idx):
-            async with semaphore:
-                return await self.evaluate_single_sample(sample, start_idx + idx)
+        sample_spans = {}
 
-        tasks = [evaluate_with_semaphore(sample, idx) for idx, sample in enumerate(samples)]
+        async def evaluate_with_semaphore(sample, idx):
+            queued_at = time.perf_counter()
+            with span("sample", {"sample_idx": idx}) as sample_span:
+                async with semaphore:
+                    queue_wait = time.perf_counter() - queued_at
+                    self.metrics.stage(QUEUE_WAIT).observe(queue_wait)
+                    sample_span.set_attribute("queue_wait_s", queue_wait)
+                    result = await self.evaluate_single_sample(sample, idx)
+                    result.metadata["queue_wait_time"] = queue_wait
+                    sample_span.set_attribute("status", result.status)
+                    sample_spans[result.sample_idx] = sample_span
+                    return result
+
+        if sample_indices is None:
+            sample_indices = range(start_idx, start_idx + len(samples))
+        tasks = [
+            evaluate_with_semaphore(sample, idx) for sample, idx in zip(samples, sample_indices)
+        ]
 
         # Use tqdm for progress tracking with better batch info
         results = []
         batch_desc = f"Batch {start_idx//BATCH_SIZE + 1} (concurrent: {max_concurrent})"
 
-        for task in atqdm(asyncio.as_completed(tasks), total=len(tasks), desc=batch_desc):
+        for task in atqdm(
+            asyncio.as_completed(tasks), total=len(tasks), desc=batch_desc, **self._progress_options
+        ):
             result = await task
             results.append(result)
 
             # Save intermediate results
-            self.save_intermediate_result(result)
+            with span(
+                "persist",
+                {"sample_idx": result.sample_idx},
+                parent=sample_spans.pop(result.sample_idx, None),
+            ):
+                self.save_intermediate_result(result)
+            self._record_result_metrics(result)
 
         return results
 
     def evaluate_batch_sync(
         self, samples: List[Dict[str, Any]], start_idx: int = 0
-    ) -> List[Dict[str, Any]]:
+    ) -> List[SampleResult]:
         """Evaluate a batch of samples sequentially (sync version)"""
         logger.info(f"Processing batch sequentially (sync mode)")
 
         results = []
         batch_desc = f"Batch {start_idx//BATCH_SIZE + 1} (sync mode)"
 
-        for idx, sample in enumerate(tqdm(samples, desc=batch_desc)):
-            result = self.evaluate_single_sample_sync(sample, start_idx + idx)
-            results.append(result)
+        for idx, sample in enumerate(tqdm(samples, desc=batch_desc, **self._progress_options)):
+            with span("sample", {"sample_idx": start_idx + idx}) as sample_span:
+                result = self.evaluate_single_sample_sync(sample, start_idx + idx)
+                sample_span.set_attribute("status", result.status)
+                results.append(result)
 
-            # Save intermediate results
-            self.save_intermediate_result(result)
+                # Save intermediate results
+                with span("persist", {"sample_idx": result.sample_idx}):
+                    self.save_intermediate_result(result)
+            self._record_result_metrics(result)
 
         return results
 
-    def save_intermediate_result(self, result: Dict[str, Any]):
-        """Save intermediate result to JSONL file"""
-        detailed_file_path = os.path.join(RESULTS_DIR, DETAILED_FILE)
-        with jsonlines.open(detailed_file_path, mode="a") as writer:
-            writer.write(result)
+    def save_intermediate_result(self, result: Union[SampleResult, Dict[str, Any]]):
+        """Append an intermediate result to the detailed results store"""
+        start_time = time.perf_counter()
+        DetailedStore(RESULTS_DIR).append(as_dict(result))
+        self.metrics.stage(WRITE).observe(time.perf_counter() - start_time)
+
+    def _record_result_metrics(self, result: Union[SampleResult, Dict[str, Any]]):
+        """Count a finished sample and, when it failed, its failure class"""
+        self.metrics.counter(SAMPLES_DONE, "Samples evaluated and written").inc()
+        if isinstance(result, dict):
+            stage, status = result.get("failure_stage"), result.get("status")
+        else:
+            stage, status = result.failure_stage, result.status
+        if stage:
+            self.metrics.error(stage, status).inc()
+
+    @contextmanager
+    def _monitor(self, total: int):
+        """Live terminal view and metrics file export for the duration of a run"""
+        self.metrics.reset()
+        self.metrics.gauge(SAMPLES_TARGET, "Samples scheduled in this run").set(total)
+        monitors = []
+        if self.live:
+            monitors.append(LiveView(total, registry=self.metrics))
+        if self.metrics_file:
+            monitors.append(
+                MetricsFileExporter(
+                    self.metrics_file, registry=self.metrics, interval=METRICS_EXPORT_INTERVAL
+                )
+            )
+        for monitor in monitors:
+            monitor.start()
+        try:
+            yield
+        finally:
+            for monitor in monitors:
+                monitor.stop()
 
     def load_existing_results(self) -> List[Dict[str, Any]]:
         """Load existing results from detailed results file"""
-        detailed_file_path = os.path.join(RESULTS_DIR, DETAILED_FILE)
+        store = DetailedStore(RESULTS_DIR)
         results = []
 
-        if not os.path.exists(detailed_file_path):
+        if not store.exists():
             return results
 
         try:
-            with jsonlines.open(detailed_file_path, mode="r") as reader:
-                for result in reader:
-                    results.append(result)
+            results = list(store)
             logger.info(f"Loaded {len(results)} existing results")
         except Exception as e:
             logger.error(f"Error loading existing results: {e}")
@@ -308,27 +450,128 @@ class LesAuditsAffairesEvaluator:
         return results
 
     async def run_evaluation(
-        self, max_samples: Optional[int] = None, start_from: int = 0
+        self,
+        max_samples: Optional[int] = None,
+        start_from: int = 0,
+        adaptive: Optional[AdaptiveStopping] = None,
+        sample_indices: Optional[List[int]] = None,
+        subset: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        """Run the complete evaluation (async version)"""
+        """Run the complete evaluation (async version)
+
+        With `adaptive` (or ADAPTIVE_EVALUATION set), samples are evaluated in a
+        stratified random order and the run stops as soon as the global score
+        interval is narrow enough or the leaderboard rank is settled.
+        `sample_indices` restricts the run to those dataset rows (a named subset,
+        described by `subset` in the summary).
+        """
         logger.info("Starting Les Audits-Affaires evaluation (async mode)")
+        run_start_time = time.time()
+        if adaptive is None and ADAPTIVE_EVALUATION:
+            adaptive = AdaptiveStopping(reference_scores=leaderboard_scores())
+        if (adaptive is not None or sample_indices is not None) and start_from > 0:
+            raise ValueError("Adaptive and subset evaluations cannot resume from a sample index")
 
         # Load dataset
         full_dataset = self.load_dataset()
 
-        # Slice dataset based on start_from and max_samples
-        if start_from > 0:
+        # Slice dataset based on sample_indices, or start_from and max_samples
+        if sample_indices is not None:
+            indices = list(sample_indices)
+            dataset = [full_dataset[idx] for idx in indices]
+        elif start_from > 0:
             logger.info(f"Resuming from sample {start_from}")
             dataset = full_dataset[start_from:]
+            indices = list(range(start_from, len(full_dataset)))
         else:
             dataset = full_dataset
+            indices = list(range(len(full_dataset)))
 
         if max_samples:
             dataset = dataset[:max_samples]
+            indices = indices[:max_samples]
 
         logger.info(f"Processing {len(dataset)} samples (starting from index {start_from})")
 
-        # Initialize model client (check for external provider first, then local endpoints)
+        model_client = self._create_model_client()
+
+        with self._monitor(len(dataset)):
+            async with model_client as model_client:
+                self.model_client = model_client
+
+                # Only clear previous detailed results if starting from beginning
+                store = DetailedStore(RESULTS_DIR)
+                if start_from == 0 and store.exists():
+                    logger.info("Clearing previous results (starting from beginning)")
+                    store.remove()
+                elif start_from > 0:
+                    logger.info(f"Appending to existing results (resuming from {start_from})")
+
+                # Evaluate in batches
+                all_results = []
+                total_batches = (len(dataset) + BATCH_SIZE - 1) // BATCH_SIZE
+                order = adaptive.order(dataset) if adaptive is not None else None
+
+                for batch_idx in tqdm(
+                    range(total_batches), desc="Processing batches", **self._progress_options
+                ):
+                    batch_start_idx = batch_idx * BATCH_SIZE
+                    batch_end_idx = min(batch_start_idx + BATCH_SIZE, len(dataset))
+                    if order is None:
+                        positions = range(batch_start_idx, batch_end_idx)
+                    else:
+                        positions = order[batch_start_idx:batch_end_idx].tolist()
+                    batch_samples = [dataset[position] for position in positions]
+                    batch_indices = [indices[position] for position in positions]
+
+                    # Adjust sample indices to account for start_from offset
+                    actual_start_idx = start_from + batch_start_idx
+                    actual_end_idx = start_from + batch_end_idx - 1
+
+                    logger.info(
+                        f"Processing batch {batch_idx + 1}/{total_batches} "
+                        f"(samples {actual_start_idx}-{actual_end_idx})"
+                    )
+
+                    batch_results = await self.evaluate_batch(
+                        batch_samples, actual_start_idx, sample_indices=batch_indices
+                    )
+                    all_results.extend(batch_results)
+
+                    # Save progress periodically
+                    if (batch_idx + 1) % 5 == 0:  # Every 5 batches
+                        self.save_progress(all_results, f"batch_{batch_idx+1}_from_{start_from}")
+
+                    if adaptive is not None and adaptive.update(batch_results):
+                        _, low, high = adaptive.interval()
+                        logger.info(
+                            f"Adaptive stop after {len(all_results)}/{len(dataset)} samples "
+                            f"({adaptive.reason}, global score in [{low:.2f}, {high:.2f}])"
+                        )
+                        break
+
+        # Load existing results if resuming
+        if start_from > 0:
+            logger.info("Loading existing results to compute final metrics")
+            existing_results = self.load_existing_results()
+            all_results = existing_results + all_results
+
+        # Compile final results
+        final_results = self.compute_final_metrics(
+            all_results, wall_time=time.time() - run_start_time
+        )
+        if adaptive is not None:
+            final_results["adaptive"] = adaptive.summary()
+        if subset is not None:
+            final_results["subset"] = subset
+
+        # Save final results
+        self.save_final_results(final_results, all_results)
+
+        return final_results
+
+    def _create_model_client(self):
+        """Initialize model client (check for external provider first, then local endpoints)"""
         external_provider = os.getenv("EXTERNAL_PROVIDER")
         external_model = os.getenv("EXTERNAL_MODEL", "gpt-4o")
 
@@ -339,71 +582,112 @@ class LesAuditsAffairesEvaluator:
             )
             from .clients.external_providers import create_client
 
-            model_client = create_client(external_provider.lower(), model=external_model)
-        else:
-            # Use local model client (choose between generate, chat, or strict chat endpoint)
-            if self.use_strict_mode:
-                client_class = StrictChatModelClient
-            elif self.use_chat_endpoint:
-                client_class = ChatModelClient
-            else:
-                client_class = ModelClient
-            model_client = client_class()
-
-        async with model_client as model_client:
-            self.model_client = model_client
-
-            # Only clear previous detailed results if starting from beginning
-            detailed_file_path = os.path.join(RESULTS_DIR, DETAILED_FILE)
-            if start_from == 0 and os.path.exists(detailed_file_path):
-                logger.info("Clearing previous results (starting from beginning)")
-                os.remove(detailed_file_path)
-            elif start_from > 0:
-                logger.info(f"Appending to existing results (resuming from {start_from})")
-
-            # Evaluate in batches
-            all_results = []
-            total_batches = (len(dataset) + BATCH_SIZE - 1) // BATCH_SIZE
-
-            for batch_idx in tqdm(range(total_batches), desc="Processing batches"):
-                batch_start_idx = batch_idx * BATCH_SIZE
-                batch_end_idx = min(batch_start_idx + BATCH_SIZE, len(dataset))
-                batch_samples = dataset[batch_start_idx:batch_end_idx]
-
-                # Adjust sample indices to account for start_from offset
-                actual_start_idx = start_from + batch_start_idx
-                actual_end_idx = start_from + batch_end_idx - 1
-
-                logger.info(
-                    f"Processing batch {batch_idx + 1}/{total_batches} (samples {actual_start_idx}-{actual_end_idx})"
-                )
+            return create_client(external_provider.lower(), model=external_model)
 
-                batch_results = await self.evaluate_batch(batch_samples, actual_start_idx)
-                all_results.extend(batch_results)
-
-                # Save progress periodically
-                if (batch_idx + 1) % 5 == 0:  # Every 5 batches
-                    self.save_progress(all_results, f"batch_{batch_idx+1}_from_{start_from}")
+        # Use local model client (choose between generate, chat, or strict chat endpoint)
+        if self.use_strict_mode:
+            client_class = StrictChatModelClient
+        elif self.use_chat_endpoint:
+            client_class = ChatModelClient
+        else:
+            client_class = ModelClient
+        return client_class()
 
-        # Load existing results if resuming
-        if start_from > 0:
-            logger.info("Loading existing results to compute final metrics")
-            existing_results = self.load_existing_results()
-            all_results = existing_results + all_results
+    async def rerun_failures(
+        self, stage: Optional[str] = None, statuses: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Re-run only the failed stage of failed samples in the detailed results
+
+        Generation failures (generation_error, timeout, repetition_abort) are
+        regenerated and judged again; judge failures (judge_error, parse_error,
+        partial_rubric) only get a new judge call on the stored response.
+        `stage` ("generation" / "judge") and `statuses` narrow the selection.
+        """
+        from .judge_pool import AsyncJudgePool
+
+        selected = select_statuses(stage, statuses)
+        all_results = self.load_existing_results()
+        targets = [r for r in all_results if result_status(r) in selected]
+        logger.info(
+            f"Re-running {len(targets)} of {len(all_results)} samples "
+            f"(statuses: {', '.join(selected)})"
+        )
+        if not targets:
+            return self.compute_final_metrics(all_results)
+
+        generation_targets = [
+            r for r in targets if failure_stage(result_status(r)) == STAGE_GENERATION
+        ]
+        judge_targets = [r for r in targets if r not in generation_targets]
+        rerun_results = {}
+
+        if generation_targets:
+            async with self._create_model_client() as model_client:
+                self.model_client = model_client
+                semaphore = asyncio.Semaphore(min(CONCURRENT_REQUESTS, 150))
+
+                async def regenerate(record):
+                    sample = {"question": record["question"], **record.get("ground_truth", {})}
+                    async with semaphore:
+                        return await self.evaluate_single_sample(sample, record["sample_idx"])
+
+                for task in atqdm(
+                    asyncio.as_completed([regenerate(r) for r in generation_targets]),
+                    total=len(generation_targets),
+                    desc="Re-running generation",
+                ):
+                    result = await task
+                    rerun_results[result.sample_idx] = result.to_dict()
+
+        if judge_targets:
+            async with AsyncJudgePool(self.evaluator_client) as pool:
+
+                async def rejudge(record):
+                    start_time = time.time()
+                    evaluation = await pool.evaluate(
+                        record["question"], record["model_response"], record.get("ground_truth", {})
+                    )
+                    status = evaluation_status(evaluation)
+                    metadata = dict(record.get("metadata", {}))
+                    metadata["judge_usage"] = evaluation.pop("usage", {})
+                    metadata["evaluation_time"] = time.time() - start_time
+                    metadata["total_time"] = (
+                        metadata.get("generation_time", 0) + metadata["evaluation_time"]
+                    )
+                    metadata["rerun_timestamp"] = datetime.utcnow().isoformat()
+                    return {
+                        **record,
+                        "evaluation": evaluation,
+                        "status": status,
+                        "failure_stage": failure_stage(status),
+                        "metadata": metadata,
+                    }
+
+                for task in atqdm(
+                    asyncio.as_completed([rejudge(r) for r in judge_targets]),
+                    total=len(judge_targets),
+                    desc="Re-running judge",
+                ):
+                    result = await task
+                    rerun_results[result["sample_idx"]] = result
+
+        all_results = [rerun_results.get(r["sample_idx"], r) for r in all_results]
+        self.rewrite_detailed_results(all_results)
 
-        # Compile final results
         final_results = self.compute_final_metrics(all_results)
-
-        # Save final results
         self.save_final_results(final_results, all_results)
-
         return final_results
 
+    def rewrite_detailed_results(self, results: List[Dict[str, Any]]):
+        """Atomically replace the detailed results file with `results`"""
+        DetailedStore(RESULTS_DIR).rewrite(results)
+
     def run_evaluation_sync(
         self, max_samples: Optional[int] = None, start_from: int = 0
     ) -> Dict[str, Any]:
         """Run the complete evaluation (sync version)"""
         logger.info("Starting Les Audits-Affaires evaluation (sync mode)")
+        run_start_time = time.time()
 
         # Load dataset
         full_dataset = self.load_dataset()
@@ -447,44 +731,48 @@ class LesAuditsAffairesEvaluator:
 
                 self.model_client = ModelClient()
 
-        try:
-            # Only clear previous detailed results if starting from beginning
-            detailed_file_path = os.path.join(RESULTS_DIR, DETAILED_FILE)
-            if start_from == 0 and os.path.exists(detailed_file_path):
-                logger.info("Clearing previous results (starting from beginning)")
-                os.remove(detailed_file_path)
-            elif start_from > 0:
-                logger.info(f"Appending to existing results (resuming from {start_from})")
-
-            # Evaluate in batches
-            all_results = []
-            total_batches = (len(dataset) + BATCH_SIZE - 1) // BATCH_SIZE
-
-            for batch_idx in tqdm(range(total_batches), desc="Processing batches"):
-                batch_start_idx = batch_idx * BATCH_SIZE
-                batch_end_idx = min(batch_start_idx + BATCH_SIZE, len(dataset))
-                batch_samples = dataset[batch_start_idx:batch_end_idx]
-
-                # Adjust sample indices to account for start_from offset
-                actual_start_idx = start_from + batch_start_idx
-                actual_end_idx = start_from + batch_end_idx - 1
-
-                logger.info(
-                    f"Processing batch {batch_idx + 1}/{total_batches} (samples {actual_start_idx}-{actual_end_idx})"
-                )
-
-                batch_results = self.evaluate_batch_sync(batch_samples, actual_start_idx)
-                all_results.extend(batch_results)
-
-                # Save progress periodically
-                if (batch_idx + 1) % 5 == 0:  # Every 5 batches
-                    self.save_progress(all_results, f"batch_{batch_idx+1}_from_{start_from}")
-
-        finally:
-            # Clean up model client if needed
-            if hasattr(self.model_client, "session") and self.model_client.session:
-                # For sync version, we don't need to close session as it's not used
-                pass
+        with self._monitor(len(dataset)):
+            try:
+                # Only clear previous detailed results if starting from beginning
+                store = DetailedStore(RESULTS_DIR)
+                if start_from == 0 and store.exists():
+                    logger.info("Clearing previous results (starting from beginning)")
+                    store.remove()
+                elif start_from > 0:
+                    logger.info(f"Appending to existing results (resuming from {start_from})")
+
+                # Evaluate in batches
+                all_results = []
+                total_batches = (len(dataset) + BATCH_SIZE - 1) // BATCH_SIZE
+
+                for batch_idx in tqdm(
+                    range(total_batches), desc="Processing batches", **self._progress_options
+                ):
+                    batch_start_idx = batch_idx * BATCH_SIZE
+                    batch_end_idx = min(batch_start_idx + BATCH_SIZE, len(dataset))
+                    batch_samples = dataset[batch_start_idx:batch_end_idx]
+
+                    # Adjust sample indices to account for start_from offset
+                    actual_start_idx = start_from + batch_start_idx
+                    actual_end_idx = start_from + batch_end_idx - 1
+
+                    logger.info(
+                        f"Processing batch {batch_idx + 1}/{total_batches} "
+                        f"(samples {actual_start_idx}-{actual_end_idx})"
+                    )
+
+                    batch_results = self.evaluate_batch_sync(batch_samples, actual_start_idx)
+                    all_results.extend(batch_results)
+
+                    # Save progress periodically
+                    if (batch_idx + 1) % 5 == 0:  # Every 5 batches
+                        self.save_progress(all_results, f"batch_{batch_idx+1}_from_{start_from}")
+
+            finally:
+                # Clean up model client if needed
+                if hasattr(self.model_client, "session") and self.model_client.session:
+                    # For sync version, we don't need to close session as it's not used
+                    pass
 
         # Load existing results if resuming
         if start_from > 0:
@@ -493,58 +781,61 @@ class LesAuditsAffairesEvaluator:
             all_results = existing_results + all_results
 
         # Compile final results
-        final_results = self.compute_final_metrics(all_results)
+        final_results = self.compute_final_metrics(
+            all_results, wall_time=time.time() - run_start_time
+        )
 
         # Save final results
         self.save_final_results(final_results, all_results)
 
         return final_results
 
-    def compute_final_metrics(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def compute_final_metrics(
+        self,
+        results: List[Union[SampleResult, Dict[str, Any]]],
+        wall_time: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """Compute final evaluation metrics"""
         logger.info("Computing final metrics")
 
-        # Extract scores
-        global_scores = []
-        category_scores = {
-            "action_requise": [],
-            "delai_legal": [],
-            "documents_obligatoires": [],
-            "impact_financier": [],
-            "consequences_non_conformite": [],
-        }
-
-        successful_evaluations = 0
-        failed_evaluations = 0
-
-        for result in results:
-            evaluation = result["evaluation"]
-            if evaluation["score_global"] > 0 or any(
-                score > 0 for score in evaluation["scores"].values()
-            ):
-                successful_evaluations += 1
-                global_scores.append(evaluation["score_global"])
-
-                for category, score in evaluation["scores"].items():
-                    if category in category_scores:
-                        category_scores[category].append(score)
-            else:
-                failed_evaluations += 1
-                # Add zeros for failed evaluations
-                global_scores.append(0)
-                for category in category_scores:
-                    category_scores[category].append(0)
+        records = [as_record(result) for result in results]
+
+        # One row per sample, rubric columns in RUBRICS order (NaN = rubric not scored)
+        global_scores = np.fromiter((r.score_global for r in records), float, len(records))
+        category_scores = np.zeros((len(records), len(RUBRICS)))
+        for row, record in zip(category_scores, records):
+            row[:] = record.scores
+        # Failed evaluations count as zeros
+        scored = (global_scores > 0) | (np.nan_to_num(category_scores) > 0).any(axis=1)
+        global_scores[~scored] = 0
+        category_scores[~scored] = 0
+        successful_evaluations = int(scored.sum())
+        failed_evaluations = len(records) - successful_evaluations
+
+        status_counts = {}
+        judge_prompt_tokens = 0
+        judge_cached_tokens = 0
+        for record in records:
+            status_counts[record.status] = status_counts.get(record.status, 0) + 1
+            judge_usage = record.metadata.get("judge_usage") or {}
+            judge_prompt_tokens += judge_usage.get("prompt_tokens", 0) or 0
+            judge_cached_tokens += judge_usage.get("cached_tokens", 0) or 0
+
+        # Bootstrap intervals of the global score (column 0) and of each rubric
+        ci_low, ci_high = bootstrap_ci(np.column_stack([global_scores, category_scores]))
 
         # Compute statistics
-        def compute_stats(scores):
-            if not scores:
-                return {"mean": 0, "std": 0, "min": 0, "max": 0}
+        def compute_stats(scores, column):
+            scores = scores[~np.isnan(scores)]
+            if not scores.size:
+                return {"mean": 0, "std": 0, "min": 0, "max": 0, "ci_low": 0, "ci_high": 0}
             return {
-                "mean": sum(scores) / len(scores),
-                "std": (sum((x - sum(scores) / len(scores)) ** 2 for x in scores) / len(scores))
-                ** 0.5,
-                "min": min(scores),
-                "max": max(scores),
+                "mean": float(scores.mean()),
+                "std": float(scores.std()),
+                "min": float(scores.min()),
+                "max": float(scores.max()),
+                "ci_low": float(ci_low[column]),
+                "ci_high": float(ci_high[column]),
             }
 
         final_metrics = {
@@ -554,65 +845,132 @@ class LesAuditsAffairesEvaluator:
             "sample_count": len(results),
             "successful_evaluations": successful_evaluations,
             "failed_evaluations": failed_evaluations,
-            "global_score": compute_stats(global_scores),
+            "status_counts": status_counts,
+            "judge_prompt_cache": {
+                "prompt_tokens": judge_prompt_tokens,
+                "cached_tokens": judge_cached_tokens,
+                "cache_hit_rate": (
+                    judge_cached_tokens / judge_prompt_tokens if judge_prompt_tokens else 0
+                ),
+            },
+            "telemetry": summarize_telemetry(
+                records,
+                generation_model=(
+                    os.getenv("EXTERNAL_MODEL") if os.getenv("EXTERNAL_PROVIDER") else MODEL_NAME
+                ),
+                # An ensemble mixes judge models, so one price table entry cannot cost it
+                judge_model=(
+                    None
+                    if JUDGE_ENSEMBLE
+                    else (
+                        AZURE_OPENAI_DEPLOYMENT_NAME
+                        if EVALUATOR_PROVIDER == "azure"
+                        else EVALUATOR_MODEL
+                    )
+                ),
+                wall_time=wall_time,
+            ),
+            "global_score": compute_stats(global_scores, 0),
             "category_scores": {
-                category: compute_stats(scores) for category, scores in category_scores.items()
+                category: compute_stats(category_scores[:, column], column + 1)
+                for column, category in enumerate(RUBRICS)
             },
+            "confidence_intervals": bootstrap_settings(),
+            "prejudge": summarize_prejudge(records),
             "configuration": {
                 "max_tokens": MAX_TOKENS,
+                "token_budget": TOKEN_BUDGET,
                 "temperature": TEMPERATURE,
                 "batch_size": BATCH_SIZE,
                 "concurrent_requests": CONCURRENT_REQUESTS,
             },
         }
 
-        logger.info(f"Final global score: {final_metrics['global_score']['mean']:.2f}")
+        skipped = final_metrics["prejudge"]["skipped_judge_calls"]
+        if skipped:
+            logger.info(f"Pre-judge: {skipped}/{len(records)} judge calls skipped")
+        judge_input = summarize_compaction(records)
+        if judge_input:
+            final_metrics["judge_input"] = judge_input
+            logger.info(
+                f"Judge input: {judge_input['compacted_tokens']}/{judge_input['original_tokens']} "
+                f"tokens after compaction"
+            )
+        judge_ensemble = summarize_ensemble(records)
+        if judge_ensemble:
+            final_metrics["judge_ensemble"] = judge_ensemble
+            logger.info(
+                f"Judge ensemble: {judge_ensemble['escalated']}/{judge_ensemble['samples']} "
+                f"samples escalated"
+            )
+
+        global_score = final_metrics["global_score"]
+        logger.info(
+            f"Final global score: {global_score['mean']:.2f} "
+            f"({BOOTSTRAP_CONFIDENCE:.0%} CI "
+            f"{global_score['ci_low']:.2f}-{global_score['ci_high']:.2f})"
+        )
+        total_cost = final_metrics["telemetry"]["total_cost_usd"]
+        if total_cost is not None:
+            logger.info(f"Estimated API cost: ${total_cost:.4f}")
         return final_metrics
 
-    def save_progress(self, results: List[Dict[str, Any]], suffix: str = ""):
+    def save_progress(self, results: List[Union[SampleResult, Dict[str, Any]]], suffix: str = ""):
         """Save intermediate progress"""
         progress_file = os.path.join(RESULTS_DIR, f"progress_{suffix}.json")
-        with open(progress_file, "w", encoding="utf-8") as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        dump_file([as_dict(result) for result in results], progress_file)
         logger.info(f"Progress saved to {progress_file}")
 
     def save_final_results(
-        self, final_metrics: Dict[str, Any], detailed_results: List[Dict[str, Any]]
+        self,
+        final_metrics: Dict[str, Any],
+        detailed_results: List[Union[SampleResult, Dict[str, Any]]],
     ):
         """Save final evaluation results"""
+        detailed_results = [as_dict(result) for result in detailed_results]
 
         # Save summary
         summary_file = os.path.join(RESULTS_DIR, SUMMARY_FILE)
-        with open(summary_file, "w", encoding="utf-8") as f:
-            json.dump(final_metrics, f, ensure_ascii=False, indent=2)
+        dump_file(final_metrics, summary_file)
 
         # Save complete results
         complete_results = {"summary": final_metrics, "detailed_results": detailed_results}
 
         results_file = os.path.join(RESULTS_DIR, OUTPUT_FILE)
-        with open(results_file, "w", encoding="utf-8") as f:
-            json.dump(complete_results, f, ensure_ascii=False, indent=2)
-
-        # Create CSV summary for easy analysis
-        csv_data = []
-        for result in detailed_results:
-            row = {
-                "sample_idx": result["sample_idx"],
-                "global_score": result["evaluation"]["score_global"],
-                "generation_time": result["metadata"]["generation_time"],
-                "evaluation_time": result["metadata"]["evaluation_time"],
-            }
-            row.update({f"score_{k}": v for k, v in result["evaluation"]["scores"].items()})
-            csv_data.append(row)
+        dump_file(complete_results, results_file)
+
+        # Columnar store: analysis reads scores/timings without the response text
+        parquet_file = os.path.join(RESULTS_DIR, PARQUET_FILE)
+        write_results_parquet(
+            sorted(detailed_results, key=lambda result: result["sample_idx"]), parquet_file
+        )
 
-        df = pd.DataFrame(csv_data)
+        # Create CSV summary for easy analysis (read back from the score columns only)
+        csv_columns = ["sample_idx", "score_global", "status", "generation_time", "evaluation_time"]
+        csv_columns += [c for c in SCORE_COLUMNS if c != "score_global"]
         csv_file = os.path.join(RESULTS_DIR, "evaluation_summary.csv")
-        df.to_csv(csv_file, index=False)
+        read_results_frame(parquet_file, csv_columns).rename(
+            columns={"score_global": "global_score"}
+        ).to_csv(csv_file, index=False)
+
+        # Response lengths per model, behind TOKEN_BUDGET=learned
+        telemetry = final_metrics.get("telemetry") or {}
+        try:
+            record_response_lengths(
+                detailed_results,
+                {
+                    "generation_usage": (telemetry.get("generation") or {}).get("model"),
+                    "judge_usage": (telemetry.get("judge") or {}).get("model"),
+                },
+            )
+        except OSError as e:
+            logger.warning(f"Could not record response lengths in {TOKEN_BUDGET_FILE}: {e}")
 
         logger.info(f"Results saved to:")
         logger.info(f"  Summary: {summary_file}")
         logger.info(f"  Complete: {results_file}")
-        logger.info(f"  Detailed: {os.path.join(RESULTS_DIR, DETAILED_FILE)}")
+        logger.info(f"  Detailed: {DetailedStore(RESULTS_DIR).path}")
+        logger.info(f"  Parquet: {parquet_file}")
         logger.info(f"  CSV: {csv_file}")
 
 
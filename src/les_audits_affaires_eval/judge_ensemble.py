@@ -0,0 +1,288 @@
+"""
+Judge ensemble: several judges per sample, escalation on disagreement
+
+The first-tier judges (`JUDGE_ENSEMBLE`, usually cheap models) judge every
+sample concurrently. When their verdicts differ by more than
+`JUDGE_DISAGREEMENT_THRESHOLD` points on the global score or on any rubric, or
+when fewer than two of them answered, the escalation judges
+(`JUDGE_ESCALATION`, usually one top-tier model) are called as well. The
+usable verdicts are then aggregated rubric by rubric (mean, median or trimmed
+mean). The ensemble exposes the `EvaluatorClient.evaluate_response` interface
+so the evaluator and the judge pool use it unchanged; each evaluation carries
+the per-judge scores under `ensemble`, from which `summarize_ensemble` builds
+the agreement statistics of the summary.
+"""
+
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .compaction import CompactingJudge, parse_steps
+from .config import (
+    JUDGE_AGGREGATION,
+    JUDGE_COMPACTION,
+    JUDGE_CONCURRENCY,
+    JUDGE_DISAGREEMENT_THRESHOLD,
+    JUDGE_ENSEMBLE,
+    JUDGE_ESCALATION,
+    PREJUDGE_RULES,
+)
+from .model_client import EvaluatorClient
+from .prejudge import PreJudge, parse_rules
+from .records import RUBRICS, SampleResult, as_record
+from .status import PARTIAL_RUBRIC, STATUS_OK
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+AGGREGATIONS = ("mean", "median", "trimmed")
+
+
+def parse_judges(spec: str) -> List[Tuple[str, str]]:
+    """(provider, model) pairs of a comma-separated `provider:model` list"""
+    judges = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        provider, _, model = entry.partition(":")
+        if not provider or not model:
+            raise ValueError(f"Invalid judge {entry!r}, expected provider:model")
+        judges.append((provider.lower(), model))
+    return judges
+
+
+def aggregate(values: Sequence[float], method: str = "median") -> float:
+    """Aggregate the scores of several judges
+
+    `trimmed` drops the lowest and the highest score when there are at least
+    three, then averages the rest.
+    """
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    if method == "median":
+        return float(np.median(values))
+    if method == "trimmed":
+        return float(values[1:-1].mean() if len(values) >= 3 else values.mean())
+    if method == "mean":
+        return float(values.mean())
+    raise ValueError(f"Unknown aggregation {method!r}, expected one of {AGGREGATIONS}")
+
+
+def _usable(evaluation: Dict[str, Any]) -> bool:
+    return evaluation.get("status") in (STATUS_OK, PARTIAL_RUBRIC)
+
+
+def _rubric_scores(evaluation: Dict[str, Any]) -> Dict[str, float]:
+    """Rubric scores the judge actually gave (rubrics it left out are not zeros)"""
+    missing = set(evaluation.get("missing_rubrics") or ())
+    scores = evaluation.get("scores") or {}
+    return {
+        rubric: scores[rubric] for rubric in RUBRICS if rubric in scores and rubric not in missing
+    }
+
+
+def disagreement(evaluations: Sequence[Dict[str, Any]]) -> Optional[float]:
+    """Largest spread between judges on the global score or any rubric"""
+    if len(evaluations) < 2:
+        return None
+    columns = [[evaluation["score_global"] for evaluation in evaluations]]
+    for rubric in RUBRICS:
+        column = [scores[rubric] for scores in map(_rubric_scores, evaluations) if rubric in scores]
+        if len(column) >= 2:
+            columns.append(column)
+    return float(max(max(column) - min(column) for column in columns))
+
+
+class JudgeEnsemble:
+    """Several judges behind the `EvaluatorClient.evaluate_response` interface
+
+    `judges` and `escalation` map a judge name to a client with an
+    `evaluate_response` method.
+    """
+
+    def __init__(
+        self,
+        judges: Dict[str, Any],
+        escalation: Optional[Dict[str, Any]] = None,
+        method: str = JUDGE_AGGREGATION,
+        threshold: float = JUDGE_DISAGREEMENT_THRESHOLD,
+        concurrency: int = JUDGE_CONCURRENCY,
+    ):
+        if not judges:
+            raise ValueError("A judge ensemble needs at least one judge")
+        if method not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation {method!r}, expected one of {AGGREGATIONS}")
+        self.judges = judges
+        self.escalation = escalation or {}
+        self.method = method
+        self.threshold = threshold
+        # Each concurrent evaluation fans out to every judge of a tier
+        workers = max(1, concurrency) * max(len(self.judges), len(self.escalation))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ensemble")
+
+    @classmethod
+    def from_config(
+        cls,
+        ensemble: str = JUDGE_ENSEMBLE,
+        escalation: str = JUDGE_ESCALATION,
+        **kwargs,
+    ) -> "JudgeEnsemble":
+        """Ensemble of `EvaluatorClient`s from `provider:model` lists"""
+
+        def clients(spec: str) -> Dict[str, EvaluatorClient]:
+            return {
+                f"{provider}:{model}": EvaluatorClient(provider, model)
+                for provider, model in parse_judges(spec)
+            }
+
+        return cls(clients(ensemble), clients(escalation), **kwargs)
+
+    @property
+    def evaluator_provider(self) -> str:
+        return "ensemble"
+
+    @property
+    def evaluator_model(self) -> str:
+        names = ",".join(self.judges)
+        return f"{names}|{','.join(self.escalation)}" if self.escalation else names
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def _fan_out(
+        self, judges: Dict[str, Any], question: str, model_response: str, ground_truth: Dict
+    ) -> Dict[str, Dict[str, Any]]:
+        """Verdict of every judge of a tier, judged concurrently"""
+
+        def judge(name: str, client: Any) -> Dict[str, Any]:
+            with span("ensemble_judge", {"judge": name}):
+                return client.evaluate_response(question, model_response, ground_truth)
+
+        futures = {
+            # Carry the caller's context (e.g. the active tracing span) into each thread
+            name: self._executor.submit(contextvars.copy_context().run, judge, name, client)
+            for name, client in judges.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+    def evaluate_response(
+        self, question: str, model_response: str, ground_truth: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """Judge one response with the ensemble; same result dict as `EvaluatorClient`"""
+        verdicts = self._fan_out(self.judges, question, model_response, ground_truth)
+        usable = [evaluation for evaluation in verdicts.values() if _usable(evaluation)]
+        spread = disagreement(usable)
+        escalated = bool(self.escalation) and (spread is None or spread > self.threshold)
+        if escalated:
+            logger.debug(f"Judges disagree by {spread} points, escalating")
+            verdicts.update(self._fan_out(self.escalation, question, model_response, ground_truth))
+            usable = [evaluation for evaluation in verdicts.values() if _usable(evaluation)]
+
+        usage: Dict[str, int] = {}
+        for evaluation in verdicts.values():
+            for key, value in (evaluation.pop("usage", None) or {}).items():
+                usage[key] = usage.get(key, 0) + (value or 0)
+
+        result = self._combine(usable) if usable else dict(next(iter(verdicts.values())))
+        result["usage"] = usage
+        result["ensemble"] = {
+            "judges": {
+                name: evaluation["score_global"] if _usable(evaluation) else None
+                for name, evaluation in verdicts.items()
+            },
+            "escalated": escalated,
+            "disagreement": spread,
+        }
+        return result
+
+    def _combine(self, evaluations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Rubric-by-rubric aggregate, justified by the judge closest to it"""
+        rubric_scores = [_rubric_scores(evaluation) for evaluation in evaluations]
+        scores, missing = {}, []
+        for rubric in RUBRICS:
+            values = [scores_[rubric] for scores_ in rubric_scores if rubric in scores_]
+            if values:
+                scores[rubric] = aggregate(values, self.method)
+            else:
+                scores[rubric] = 0
+                missing.append(rubric)
+        score_global = aggregate(
+            [evaluation["score_global"] for evaluation in evaluations], self.method
+        )
+        closest = min(
+            evaluations, key=lambda evaluation: abs(evaluation["score_global"] - score_global)
+        )
+        result = {
+            "status": PARTIAL_RUBRIC if missing else STATUS_OK,
+            "score_global": score_global,
+            "scores": scores,
+            "justifications": dict(closest.get("justifications") or {}),
+        }
+        if missing:
+            result["missing_rubrics"] = missing
+        return result
+
+
+def create_evaluator_client() -> Union[EvaluatorClient, JudgeEnsemble, PreJudge, CompactingJudge]:
+    """The configured judge client
+
+    An ensemble when `JUDGE_ENSEMBLE` is set, a single `EvaluatorClient`
+    otherwise, behind the input compaction and the pre-judge when enabled.
+    """
+    judge = JudgeEnsemble.from_config() if JUDGE_ENSEMBLE else EvaluatorClient()
+    if parse_steps(JUDGE_COMPACTION):
+        judge = CompactingJudge(judge)
+    return PreJudge(judge) if parse_rules(PREJUDGE_RULES) else judge
+
+
+def summarize_ensemble(
+    results: Sequence[Union[SampleResult, Dict[str, Any]]],
+    threshold: float = JUDGE_DISAGREEMENT_THRESHOLD,
+    method: str = JUDGE_AGGREGATION,
+) -> Optional[Dict[str, Any]]:
+    """Per-judge agreement with the aggregated score, None without ensemble results
+
+    For every judge: the samples it scored and failed, its mean absolute
+    deviation from the final global score, the share of samples within
+    `threshold` points of it and the correlation with it across samples.
+    """
+    per_judge: Dict[str, List[Tuple[Optional[float], float]]] = {}
+    samples = escalated = 0
+    spreads = []
+    for result in results:
+        record = as_record(result)
+        ensemble = (record.evaluation_extra or {}).get("ensemble")
+        if not ensemble:
+            continue
+        samples += 1
+        escalated += bool(ensemble.get("escalated"))
+        if ensemble.get("disagreement") is not None:
+            spreads.append(ensemble["disagreement"])
+        for name, score in ensemble["judges"].items():
+            per_judge.setdefault(name, []).append((score, record.score_global))
+    if not samples:
+        return None
+
+    judges = {}
+    for name, pairs in per_judge.items():
+        scored = np.array([pair for pair in pairs if pair[0] is not None], dtype=np.float64)
+        stats = {"samples": len(pairs), "failed": len(pairs) - len(scored)}
+        if len(scored):
+            deviation = np.abs(scored[:, 0] - scored[:, 1])
+            stats["mean_absolute_deviation"] = float(deviation.mean())
+            stats["agreement_rate"] = float((deviation <= threshold).mean())
+            stats["correlation"] = (
+                float(np.corrcoef(scored[:, 0], scored[:, 1])[0, 1])
+                if len(scored) >= 3 and scored[:, 0].std() > 0 and scored[:, 1].std() > 0
+                else None
+            )
+        judges[name] = stats
+    return {
+        "samples": samples,
+        "escalated": escalated,
+        "escalation_rate": escalated / samples,
+        "mean_disagreement": float(np.mean(spreads)) if spreads else None,
+        "aggregation": method,
+        "threshold": threshold,
+        "judges": judges,
+    }
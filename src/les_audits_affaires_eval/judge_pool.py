@@ -0,0 +1,71 @@
+"""
+Async pool running judge calls concurrently with continuous scheduling and a rate limit
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from .config import JUDGE_CONCURRENCY, JUDGE_RATE_LIMIT
+from .model_client import EvaluatorClient
+from .rate_limit import create_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncJudgePool:
+    """Runs the blocking `EvaluatorClient.evaluate_response` from asyncio
+
+    Calls are admitted as soon as a slot frees up (no batch barriers), at most
+    `concurrency` at a time and at most `rate_limit` per second. The evaluator
+    clients are synchronous, so each call runs on a dedicated thread pool sized
+    to the concurrency (the default executor would cap it at ~32 threads).
+    """
+
+    def __init__(
+        self,
+        evaluator_client: Optional[EvaluatorClient] = None,
+        concurrency: int = JUDGE_CONCURRENCY,
+        rate_limit: Optional[float] = JUDGE_RATE_LIMIT,
+    ):
+        self.evaluator_client = evaluator_client or EvaluatorClient()
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = create_rate_limiter(rate_limit, "judge")
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="judge"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    async def evaluate(
+        self, question: str, model_response: str, ground_truth: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """Judge one response; returns the evaluator's result dict"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            await self.rate_limiter.acquire()
+            loop = asyncio.get_running_loop()
+            # Carry the caller's context (e.g. the active tracing span) into the thread
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(
+                    context.run,
+                    self.evaluator_client.evaluate_response,
+                    question,
+                    model_response,
+                    ground_truth,
+                ),
+            )
@@ -0,0 +1,281 @@
+"""
+Lease-based claiming so several workers (threads, processes or machines) can drain
+a shared queue without processing the same item twice.
+
+A lease is a time-limited claim on a key. The holder must renew it (heartbeat)
+before it expires; an expired lease can be taken over by any other worker.
+"""
+
+import abc
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_TTL = float(os.getenv("LEASE_TTL", "300"))
+
+
+def make_owner_id() -> str:
+    """Build an owner id that is unique across hosts, processes and threads"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class Lease:
+    """A claim held by `owner` on `key` until `expires_at` (epoch seconds)"""
+
+    key: str
+    owner: str
+    expires_at: float
+    acquired_at: float
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) >= self.expires_at
+
+
+class LeaseBackend(abc.ABC):
+    """Interface shared by every lease backend"""
+
+    @abc.abstractmethod
+    def acquire(self, key: str, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> Optional[Lease]:
+        """Claim `key` for `owner`; return None if another owner holds a live lease"""
+
+    @abc.abstractmethod
+    def renew(self, key: str, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        """Extend a lease held by `owner`; return False if the lease was lost"""
+
+    @abc.abstractmethod
+    def release(self, key: str, owner: str) -> bool:
+        """Drop a lease held by `owner`"""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Lease]:
+        """Return the current lease on `key` (expired or not), if any"""
+
+    def wait_acquire(
+        self,
+        key: str,
+        owner: str,
+        ttl: float = DEFAULT_LEASE_TTL,
+        timeout: Optional[float] = None,
+        poll: float = 0.5,
+    ) -> Optional[Lease]:
+        """Block until `key` is claimed for `owner`; None once `timeout` seconds pass"""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            lease = self.acquire(key, owner, ttl)
+            if lease is not None:
+                return lease
+            if deadline is not None and time.time() >= deadline:
+                return None
+            time.sleep(poll)
+
+    def is_leased(self, key: str) -> bool:
+        """True when `key` is held by a live lease"""
+        lease = self.get(key)
+        return lease is not None and not lease.is_expired()
+
+
+class FileLeaseBackend(LeaseBackend):
+    """Lease backend storing one JSON file per key in a (possibly shared) directory
+
+    Mutations are serialised per key with an O_EXCL lock file holding a unique token,
+    and lease files are written through a temp file + os.replace so readers never see
+    a partial file.
+    """
+
+    def __init__(self, lease_dir: str, lock_timeout: float = 10.0, stale_lock_after: float = 30.0):
+        self.lease_dir = Path(lease_dir)
+        self.lease_dir.mkdir(parents=True, exist_ok=True)
+        self.lock_timeout = lock_timeout
+        self.stale_lock_after = stale_lock_after
+
+    def _safe_key(self, key: str) -> str:
+        return "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
+
+    def _lease_path(self, key: str) -> Path:
+        return self.lease_dir / f"{self._safe_key(key)}.lease"
+
+    def _lock_path(self, key: str) -> Path:
+        return self.lease_dir / f"{self._safe_key(key)}.lock"
+
+    def _read_token(self, path: Path) -> Optional[str]:
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def _lock(self, key: str) -> Optional[str]:
+        """Take the lock on `key`; return its token, or None after `lock_timeout`"""
+        lock_path = self._lock_path(key)
+        token = make_owner_id()
+        deadline = time.time() + self.lock_timeout
+        while True:
+            try:
+                fd = os.open(str(lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, token.encode())
+                os.close(fd)
+                return token
+            except FileExistsError:
+                # A crashed holder can leave the lock file behind
+                if self._break_stale_lock(lock_path):
+                    continue
+            if time.time() > deadline:
+                logger.warning(f"Timed out waiting for lease lock on {key}")
+                return None
+            time.sleep(0.05)
+
+    def _break_stale_lock(self, lock_path: Path) -> bool:
+        """Remove `lock_path` if it is stale; True when the lock may be retried at once
+
+        The lock is renamed to a unique name before being deleted: only one contender
+        can win the rename, and a lock taken in the meantime by a live holder (it has
+        another token) is put back instead of being deleted.
+        """
+        try:
+            stat = lock_path.stat()
+        except FileNotFoundError:
+            return True
+        if time.time() - stat.st_mtime <= self.stale_lock_after:
+            return False
+        stale_token = self._read_token(lock_path)
+        moved = lock_path.with_name(f"{lock_path.name}.stale_{uuid.uuid4().hex}")
+        try:
+            os.rename(lock_path, moved)
+        except FileNotFoundError:
+            return True
+        if self._read_token(moved) == stale_token:
+            logger.warning(f"Removed stale lease lock {lock_path}")
+        else:
+            try:
+                os.link(moved, lock_path)
+            except FileExistsError:
+                logger.warning(f"Lease lock {lock_path} was replaced while breaking it")
+        moved.unlink()
+        return True
+
+    def _unlock(self, key: str, token: str):
+        lock_path = self._lock_path(key)
+        # Never remove a lock that was broken as stale and taken by another holder
+        if self._read_token(lock_path) == token:
+            try:
+                lock_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _read(self, key: str) -> Optional[Lease]:
+        try:
+            with open(self._lease_path(key), "r", encoding="utf-8") as f:
+                return Lease(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring corrupt lease file for {key}: {e}")
+            return None
+
+    def _write(self, lease: Lease):
+        path = self._lease_path(lease.key)
+        tmp_path = path.with_suffix(f".tmp_{os.getpid()}_{threading.get_ident()}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(lease), f)
+        os.replace(tmp_path, path)
+
+    def acquire(self, key: str, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> Optional[Lease]:
+        token = self._lock(key)
+        if token is None:
+            return None
+        try:
+            now = time.time()
+            current = self._read(key)
+            if current is not None and current.owner != owner and not current.is_expired(now):
+                return None
+            if current is not None and current.owner != owner:
+                logger.info(f"Taking over expired lease on {key} from {current.owner}")
+            lease = Lease(key=key, owner=owner, expires_at=now + ttl, acquired_at=now)
+            self._write(lease)
+            return lease
+        finally:
+            self._unlock(key, token)
+
+    def renew(self, key: str, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        while True:
+            token = self._lock(key)
+            if token is not None:
+                break
+            # A busy lock does not mean the lease is gone: keep trying while it is ours
+            current = self._read(key)
+            if current is None or current.owner != owner:
+                return False
+            logger.warning(f"Lease lock on {key} busy, retrying renewal")
+        try:
+            current = self._read(key)
+            if current is None or current.owner != owner:
+                return False
+            current.expires_at = time.time() + ttl
+            self._write(current)
+            return True
+        finally:
+            self._unlock(key, token)
+
+    def release(self, key: str, owner: str) -> bool:
+        token = self._lock(key)
+        if token is None:
+            return False
+        try:
+            current = self._read(key)
+            if current is None or current.owner != owner:
+                return False
+            self._lease_path(key).unlink()
+            return True
+        finally:
+            self._unlock(key, token)
+
+    def get(self, key: str) -> Optional[Lease]:
+        return self._read(key)
+
+
+class LeaseHeartbeat:
+    """Background thread renewing a lease every `ttl / 3` seconds
+
+    Use as a context manager around the work protected by the lease. `lost` is set
+    once another owner holds the lease, so long-running work can check it and bail
+    out; errors while renewing are retried at the next beat.
+    """
+
+    def __init__(self, backend: LeaseBackend, key: str, owner: str, ttl: float = DEFAULT_LEASE_TTL):
+        self.backend = backend
+        self.key = key
+        self.owner = owner
+        self.ttl = ttl
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{key}", daemon=True)
+
+    def _run(self):
+        interval = max(self.ttl / 3, 0.1)
+        while not self._stop.wait(interval):
+            try:
+                renewed = self.backend.renew(self.key, self.owner, self.ttl)
+            except Exception as e:
+                logger.warning(f"Lease heartbeat error on {self.key}: {e}")
+                continue
+            if not renewed:
+                logger.warning(f"Lost lease on {self.key} (owner {self.owner})")
+                self.lost.set()
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,408 @@
+"""
+In-process metrics: stage latency histograms, in-flight gauges and error counters
+
+Metrics live in a `MetricsRegistry` (each evaluator owns one; the module-level
+`REGISTRY` is the default of standalone exporters) and can be rendered in the
+Prometheus text exposition format, written to a file for a textfile scraper,
+or shown live in the terminal with `LiveView`.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages timed per sample
+QUEUE_WAIT = "queue_wait"
+GENERATION = "generation"
+JUDGE = "judge"
+WRITE = "write"
+STAGES = (QUEUE_WAIT, GENERATION, JUDGE, WRITE)
+
+# Metric names
+STAGE_LATENCY = "lae_stage_latency_seconds"
+IN_FLIGHT = "lae_in_flight_requests"
+ERRORS = "lae_errors_total"
+SAMPLES_DONE = "lae_samples_completed_total"
+SAMPLES_TARGET = "lae_samples_target"
+
+# `le` bounds (seconds) used when exporting histograms to Prometheus
+EXPORT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of durations (seconds, microsecond resolution)
+
+    Values below 2**significant_bits µs are counted exactly; larger values keep
+    their top `significant_bits` bits, i.e. a relative error below
+    2 / 2**significant_bits (~1.6% with the default 7 bits). Buckets are stored
+    sparsely, so memory grows with the spread of values, not their number.
+    """
+
+    def __init__(self, significant_bits: int = 7):
+        self.significant_bits = significant_bits
+        self._sub_buckets = 1 << significant_bits
+        self._counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def _index(self, micros: int) -> int:
+        if micros < self._sub_buckets:
+            return micros
+        shift = micros.bit_length() - self.significant_bits
+        return shift * self._sub_buckets + (micros >> shift)
+
+    def _bucket_bounds(self, index: int) -> Tuple[int, int]:
+        shift, top = divmod(index, self._sub_buckets)
+        return top << shift, ((top + 1) << shift) - 1
+
+    def observe(self, seconds: float):
+        """Record one duration"""
+        seconds = max(seconds, 0.0)
+        index = self._index(int(seconds * 1_000_000))
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            self.count += 1
+            self.sum += seconds
+            self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Value (seconds) at percentile `q` in [0, 100]"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = max(1, int(round(q / 100 * self.count)))
+            seen = 0
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= target:
+                    low, high = self._bucket_bounds(index)
+                    return min((low + high) / 2 / 1_000_000, self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds=EXPORT_BUCKETS) -> List[int]:
+        """Number of observations <= each bound
+
+        Buckets entirely below a bound count in full; the bucket straddling it
+        counts for the share of its width below the bound (linear interpolation).
+        """
+        with self._lock:
+            items = sorted(self._counts.items())
+        counts = []
+        for bound in bounds:
+            limit = int(bound * 1_000_000)
+            total = 0.0
+            for index, count in items:
+                low, high = self._bucket_bounds(index)
+                if high <= limit:
+                    total += count
+                elif low <= limit:
+                    total += count * (limit - low + 1) / (high - low + 1)
+            counts.append(int(round(total)))
+        return counts
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class Counter:
+    """Monotonic counter"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Value that goes up and down (e.g. requests in flight)"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Count the enclosed block as in flight"""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class MetricsRegistry:
+    """Named metric families keyed by label set"""
+
+    _TYPES = {LatencyHistogram: "histogram", Counter: "counter", Gauge: "gauge"}
+
+    def __init__(self):
+        self._families: Dict[str, Tuple[type, str, Dict[Labels, Any]]] = {}
+        self._lock = threading.Lock()
+        self.start_time = time.time()
+
+    def _get(self, cls: type, name: str, help: str, labels: Dict[str, Any]):
+        key = _labels(labels)
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = (cls, help, {})
+            elif family[0] is not cls:
+                raise ValueError(f"Metric {name} already registered as {family[0].__name__}")
+            metrics = family[2]
+            if key not in metrics:
+                metrics[key] = cls()
+            return metrics[key]
+
+    def histogram(self, name: str, help: str = "", **labels) -> LatencyHistogram:
+        return self._get(LatencyHistogram, name, help, labels)
+
+    def counter(self, name: str, help: str = "", **labels) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str = "", **labels) -> Gauge:
+        return self._get(Gauge, name, help, labels)
+
+    # Shorthands for the evaluation pipeline
+    def stage(self, stage: str) -> LatencyHistogram:
+        return self.histogram(
+            STAGE_LATENCY, "Per-sample latency of each pipeline stage", stage=stage
+        )
+
+    def in_flight(self, stage: str) -> Gauge:
+        return self.gauge(IN_FLIGHT, "Requests currently in flight", stage=stage)
+
+    def error(self, stage: str, status: str) -> Counter:
+        return self.counter(
+            ERRORS, "Failed samples by stage and status", stage=stage, status=status
+        )
+
+    def collect(self, name: str) -> Dict[Labels, Any]:
+        """All metrics of a family, keyed by label set"""
+        with self._lock:
+            family = self._families.get(name)
+            return dict(family[2]) if family else {}
+
+    def reset(self):
+        with self._lock:
+            self._families.clear()
+        self.start_time = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view of every metric"""
+        with self._lock:
+            families = {
+                name: (cls, dict(metrics)) for name, (cls, _, metrics) in self._families.items()
+            }
+        snapshot = {}
+        for name, (cls, metrics) in families.items():
+            snapshot[name] = {
+                _format_labels(labels)
+                or "_": (metric.summary() if cls is LatencyHistogram else metric.value)
+                for labels, metric in metrics.items()
+            }
+        return snapshot
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            families = sorted(self._families.items())
+        lines = []
+        for name, (cls, help, metrics) in families:
+            if help:
+                lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {self._TYPES[cls]}")
+            for labels, metric in sorted(metrics.items()):
+                if cls is LatencyHistogram:
+                    counts = metric.cumulative_counts()
+                    for bound, count in zip(EXPORT_BUCKETS, counts):
+                        lines.append(
+                            f"{name}_bucket{_format_labels(labels, ('le', str(bound)))} {count}"
+                        )
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {metric.count}"
+                    )
+                    lines.append(f"{name}_sum{_format_labels(labels)} {metric.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Atomically write the exposition text to `path` (textfile collector style)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _PeriodicThread:
+    """Runs `tick()` every `interval` seconds in a daemon thread until stopped"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def tick(self):  # pragma: no cover – overridden
+        raise NotImplementedError
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                logger.warning(f"{type(self).__name__} tick failed: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+        self.tick()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class MetricsFileExporter(_PeriodicThread):
+    """Periodically writes the registry to a Prometheus/OpenMetrics text file"""
+
+    def __init__(self, path: str, registry: MetricsRegistry = REGISTRY, interval: float = 15.0):
+        super().__init__(interval)
+        self.path = path
+        self.registry = registry
+
+    def tick(self):
+        self.registry.write_prometheus(self.path)
+
+
+class LiveView(_PeriodicThread):
+    """One-line terminal dashboard: progress, samples/sec, ETA, in-flight and p95s"""
+
+    def __init__(
+        self,
+        total: int,
+        registry: MetricsRegistry = REGISTRY,
+        interval: float = 1.0,
+        window: float = 30.0,
+        stream=None,
+    ):
+        super().__init__(interval)
+        self.total = total
+        self.registry = registry
+        self.window = window
+        self.stream = stream or sys.stderr
+        # (time, samples done) points of the sliding window used for the rate
+        self._history = deque([(time.time(), registry.counter(SAMPLES_DONE).value)])
+
+    def _rate(self, done: float) -> float:
+        now = time.time()
+        self._history.append((now, done))
+        while len(self._history) > 2 and now - self._history[0][0] > self.window:
+            self._history.popleft()
+        elapsed = now - self._history[0][0]
+        if elapsed <= 0:
+            return 0.0
+        return (done - self._history[0][1]) / elapsed
+
+    def render(self) -> str:
+        registry = self.registry
+        done = registry.counter(SAMPLES_DONE).value
+        rate = self._rate(done)
+        remaining = max(self.total - done, 0)
+        eta = _format_duration(remaining / rate) if rate > 0 else "--"
+        in_flight = " ".join(
+            f"{labels[0][1]}={int(gauge.value)}"
+            for labels, gauge in sorted(registry.collect(IN_FLIGHT).items())
+        )
+        p95s = " ".join(
+            f"{labels[0][1]}={_format_duration(hist.percentile(95))}"
+            for labels, hist in sorted(registry.collect(STAGE_LATENCY).items())
+            if hist.count
+        )
+        errors = int(sum(c.value for c in registry.collect(ERRORS).values()))
+        return (
+            f"{int(done)}/{self.total} samples | {rate:.2f}/s | ETA {eta} | "
+            f"in flight {in_flight or '-'} | p95 {p95s or '-'} | errors {errors}"
+        )
+
+    def tick(self):
+        line = self.render()
+        if self.stream.isatty():
+            self.stream.write(f"\r\x1b[K{line}")
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def stop(self):
+        super().stop()
+        if self.stream.isatty():
+            self.stream.write("\n")
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(seconds), 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
@@ -0,0 +1,423 @@
+"""
+Local mock LLM server for load-testing the harness without real endpoints
+
+Speaks the request/response shapes used by the clients: local `/generate` and
+`/chat`, OpenAI chat-completions (also used by Mistral), Anthropic messages and
+Gemini `generateContent` / `streamGenerateContent`. Judge prompts (recognised by
+the JSON schema they contain) get a valid evaluation JSON back; everything else
+gets a structured legal answer. Latency, token rate, error/429 injection and
+streaming are configurable.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+from .records import RUBRICS
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+_ANSWER_BULLETS = "\n" + "\n".join(
+    (
+        "• Action Requise: déposer une déclaration auprès du greffe parce que "
+        "l'article L. 123-1 du Code de commerce l'exige",
+        "• Délai Legal: un mois à compter de l'événement parce que "
+        "l'article R. 123-5 du Code de commerce le prévoit",
+        "• Documents Obligatoires: statuts mis à jour et procès-verbal parce que "
+        "l'article R. 123-105 du Code de commerce les impose",
+        "• Impact Financier: frais de greffe d'environ 200 euros parce que "
+        "l'arrêté du 10 février 2021 fixe ces émoluments",
+        "• Conséquences Non-Conformité: amende de 4 500 euros parce que "
+        "l'article L. 123-4 du Code de commerce la prévoit",
+    )
+)
+
+_FILLER = (
+    "En application du droit des affaires français, la société doit analyser sa situation "
+    "au regard des textes applicables et de la jurisprudence de la Cour de cassation. "
+)
+
+
+@dataclass
+class MockServerConfig:
+    """Behaviour of the mock server"""
+
+    latency: str = "lognormal"  # distribution of the time to first token
+    latency_mean: float = 0.2  # seconds
+    latency_sigma: float = 0.5  # lognormal shape; spread (fraction of mean) for uniform
+    tokens_per_sec: float = 0.0  # output decode rate, 0 = whole answer at once
+    output_tokens: int = 400  # approximate answer length (1 token ~ 1 word)
+    error_rate: float = 0.0  # fraction of requests answered with HTTP 500
+    rate_limit_rate: float = 0.0  # fraction of requests answered with HTTP 429
+    stream_chunk_tokens: int = 8  # tokens per streamed chunk
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution: {self.latency}. "
+                f"Available: {', '.join(LATENCY_DISTRIBUTIONS)}"
+            )
+
+
+class MockLLMServer:
+    """aiohttp application emulating the provider APIs the harness talks to
+
+    `start()` runs it on a background thread with its own event loop, so the
+    harness (including its blocking judge calls) can be driven from the caller's
+    loop; `run()` serves in the foreground.
+    """
+
+    def __init__(
+        self,
+        config: Optional[MockServerConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.config = config or MockServerConfig()
+        self.host = host
+        self.port = port
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "streamed": 0}
+        self._rng = random.Random(self.config.seed)
+        self._answer_words = self._build_answer(self.config.output_tokens)
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # ------------------------------------------------------------------ app
+
+    def create_app(self) -> web.Application:
+        app = web.Application(client_max_size=16 * 1024**2)
+        app.router.add_get("/health", self._health)
+        app.router.add_get("/stats", self._stats)
+        app.router.add_post("/generate", self._generate)
+        app.router.add_post("/chat", self._chat)
+        app.router.add_post("/chat/completions", self._openai)
+        app.router.add_post("/v1/chat/completions", self._openai)
+        app.router.add_post("/v1/messages", self._anthropic)
+        app.router.add_post("/v1beta/models/{target}", self._gemini)
+        return app
+
+    def run(self):
+        """Serve in the foreground until interrupted"""
+        web.run_app(self.create_app(), host=self.host, port=self.port or 8000, print=None)
+
+    def start(self) -> "MockLLMServer":
+        """Serve on a background thread; returns once the port is bound"""
+        self._thread = threading.Thread(target=self._serve_in_thread, daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout=10):
+            raise RuntimeError("Mock server did not start")
+        return self
+
+    def stop(self):
+        if self._loop and self._runner:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout=10)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _serve_in_thread(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self.host, self.port)
+        self._loop.run_until_complete(site.start())
+        # Resolve port 0 to the port actually bound
+        self.port = self._runner.addresses[0][1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    # ------------------------------------------------------------ behaviour
+
+    def _build_answer(self, tokens: int) -> List[str]:
+        bullets = _ANSWER_BULLETS.split(" ")
+        filler = _FILLER.split(" ")
+        words = []
+        while len(words) + len(bullets) < tokens:
+            words.extend(filler)
+        return words + bullets
+
+    def _ttft(self) -> float:
+        config, rng = self.config, self._rng
+        mean = max(config.latency_mean, 0.0)
+        if config.latency == "fixed" or mean == 0:
+            return mean
+        if config.latency == "uniform":
+            spread = mean * config.latency_sigma
+            return max(rng.uniform(mean - spread, mean + spread), 0.0)
+        if config.latency == "exponential":
+            return rng.expovariate(1 / mean)
+        # lognormal parameterised so that its mean is `latency_mean`
+        sigma = config.latency_sigma
+        return rng.lognormvariate(_log_mean(mean, sigma), sigma)
+
+    def _fault(self) -> Optional[web.Response]:
+        """Injected 429 / 500 for this request, if any"""
+        roll = self._rng.random()
+        if roll < self.config.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return web.json_response(
+                {"error": {"type": "rate_limit_error", "message": "Rate limit exceeded (mock)"}},
+                status=429,
+                headers={"Retry-After": "1"},
+            )
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self.stats["errors"] += 1
+            return web.json_response(
+                {"error": {"type": "server_error", "message": "Injected failure (mock)"}},
+                status=500,
+            )
+        return None
+
+    def _completion(self, prompt_text: str) -> str:
+        if "score_global" in prompt_text:
+            scores = {rubric: self._rng.choice(range(0, 101, 5)) for rubric in RUBRICS}
+            return json.dumps(
+                {
+                    "score_global": sum(scores.values()) / len(scores),
+                    "scores": scores,
+                    "justifications": {rubric: "Évaluation simulée." for rubric in RUBRICS},
+                },
+                ensure_ascii=False,
+            )
+        return " ".join(self._answer_words)
+
+    async def _respond(self, request: web.Request, prompt_text: str, stream: bool, shape: str):
+        self.stats["requests"] += 1
+        fault = self._fault()
+        await asyncio.sleep(self._ttft())
+        if fault is not None:
+            return fault
+
+        text = self._completion(prompt_text)
+        words = text.split(" ")
+        prompt_tokens = len(prompt_text.split())
+        if stream:
+            self.stats["streamed"] += 1
+            return await self._stream(request, words, prompt_tokens, shape)
+
+        if self.config.tokens_per_sec > 0:
+            await asyncio.sleep(len(words) / self.config.tokens_per_sec)
+        return web.json_response(_shape_body(shape, text, prompt_tokens, len(words)))
+
+    async def _stream(self, request: web.Request, words: List[str], prompt_tokens: int, shape):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        chunk = max(1, self.config.stream_chunk_tokens)
+        delay = chunk / self.config.tokens_per_sec if self.config.tokens_per_sec > 0 else 0
+        for event in _stream_prelude(shape):
+            await response.write(event)
+        for start in range(0, len(words), chunk):
+            if delay:
+                await asyncio.sleep(delay)
+            piece = " ".join(words[start : start + chunk])
+            if start:
+                piece = " " + piece
+            await response.write(_stream_chunk(shape, piece))
+        for event in _stream_epilogue(shape, prompt_tokens, len(words)):
+            await response.write(event)
+        await response.write_eof()
+        return response
+
+    # ------------------------------------------------------------- handlers
+
+    async def _health(self, request: web.Request):
+        return web.json_response({"status": "ok"})
+
+    async def _stats(self, request: web.Request):
+        return web.json_response({**self.stats, "config": asdict(self.config)})
+
+    async def _generate(self, request: web.Request):
+        body = await request.json()
+        return await self._respond(
+            request, body.get("prompt", ""), bool(body.get("stream")), "generate"
+        )
+
+    async def _chat(self, request: web.Request):
+        body = await request.json()
+        return await self._respond(
+            request, _messages_text(body.get("messages", [])), bool(body.get("stream")), "chat"
+        )
+
+    async def _openai(self, request: web.Request):
+        body = await request.json()
+        return await self._respond(
+            request, _messages_text(body.get("messages", [])), bool(body.get("stream")), "openai"
+        )
+
+    async def _anthropic(self, request: web.Request):
+        body = await request.json()
+        system = body.get("system", "")
+        if isinstance(system, list):
+            system = " ".join(block.get("text", "") for block in system)
+        prompt_text = f"{system} {_messages_text(body.get('messages', []))}"
+        return await self._respond(request, prompt_text, bool(body.get("stream")), "anthropic")
+
+    async def _gemini(self, request: web.Request):
+        _, _, action = request.match_info["target"].partition(":")
+        if action not in ("generateContent", "streamGenerateContent"):
+            raise web.HTTPNotFound()
+        body = await request.json()
+        parts = [
+            part.get("text", "")
+            for content in [body.get("systemInstruction", {})] + body.get("contents", [])
+            for part in content.get("parts", [])
+        ]
+        return await self._respond(
+            request, " ".join(parts), action == "streamGenerateContent", "gemini"
+        )
+
+
+def _log_mean(mean: float, sigma: float) -> float:
+    return math.log(mean) - sigma**2 / 2
+
+
+def _messages_text(messages: List[Dict[str, Any]]) -> str:
+    texts = []
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(block.get("text", "") for block in content)
+        texts.append(str(content))
+    return " ".join(texts)
+
+
+def _shape_body(shape: str, text: str, prompt_tokens: int, completion_tokens: int) -> Dict:
+    if shape == "generate":
+        return {
+            "generated_text": text,
+            "details": {"generated_tokens": completion_tokens, "finish_reason": "length"},
+        }
+    if shape == "chat":
+        return {
+            "content": text,
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens},
+        }
+    if shape == "openai":
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "model": "mock",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+    if shape == "anthropic":
+        return {
+            "id": "msg_mock",
+            "type": "message",
+            "role": "assistant",
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": prompt_tokens, "output_tokens": completion_tokens},
+        }
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": completion_tokens,
+        },
+    }
+
+
+def _sse(data: Any, event: Optional[str] = None) -> bytes:
+    prefix = f"event: {event}\n" if event else ""
+    payload = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+    return f"{prefix}data: {payload}\n\n".encode("utf-8")
+
+
+def _stream_prelude(shape: str) -> List[bytes]:
+    if shape == "anthropic":
+        return [
+            _sse({"type": "message_start", "message": {"id": "msg_mock"}}, "message_start"),
+            _sse(
+                {
+                    "type": "content_block_start",
+                    "index": 0,
+                    "content_block": {"type": "text", "text": ""},
+                },
+                "content_block_start",
+            ),
+        ]
+    return []
+
+
+def _stream_chunk(shape: str, piece: str) -> bytes:
+    if shape == "openai":
+        return _sse({"choices": [{"index": 0, "delta": {"content": piece}}]})
+    if shape == "anthropic":
+        return _sse(
+            {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": piece},
+            },
+            "content_block_delta",
+        )
+    if shape == "gemini":
+        return _sse({"candidates": [{"content": {"role": "model", "parts": [{"text": piece}]}}]})
+    # TGI-style token stream for /generate and /chat
+    return _sse({"token": {"text": piece}})
+
+
+def _stream_epilogue(shape: str, prompt_tokens: int, completion_tokens: int) -> List[bytes]:
+    if shape == "openai":
+        return [_sse("[DONE]")]
+    if shape == "anthropic":
+        return [
+            _sse({"type": "content_block_stop", "index": 0}, "content_block_stop"),
+            _sse(
+                {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn"},
+                    "usage": {"input_tokens": prompt_tokens, "output_tokens": completion_tokens},
+                },
+                "message_delta",
+            ),
+            _sse({"type": "message_stop"}, "message_stop"),
+        ]
+    if shape == "gemini":
+        return [
+            _sse(
+                {
+                    "candidates": [],
+                    "usageMetadata": {
+                        "promptTokenCount": prompt_tokens,
+                        "candidatesTokenCount": completion_tokens,
+                    },
+                }
+            )
+        ]
+    return [_sse({"details": {"generated_tokens": completion_tokens}, "token": {"text": ""}})]
@@ -8,20 +8,95 @@ import logging
 import os
 import re
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import aiohttp
 import requests
 from openai import AzureOpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from .budget import TokenBudget
 from .config import *
+from .serialization import loads
+from .records import RUBRICS
+from .status import FAILED_JUSTIFICATION, JUDGE_ERROR, PARSE_ERROR, PARTIAL_RUBRIC, STATUS_OK
+from .telemetry import (
+    ModelResponse,
+    usage_from_anthropic,
+    usage_from_gemini,
+    usage_from_local,
+    usage_from_openai,
+)
+from .tracing import span, trace_retry
 
 # Setup logging
 logging.basicConfig(level=getattr(logging, LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
 
+# Headings of the five-part summary the prompts ask for, with their usual variants
+SECTION_HEADINGS = {
+    "Action Requise": r"actions?\s+requises?",
+    "Délai Legal": r"d[ée]lais?\s+l[ée]ga(?:l|le|ux)",
+    "Documents Obligatoires": r"documents?\s+(?:obligatoires?|emploi)",
+    "Impact Financier": r"impacts?\s+financiers?",
+    "Conséquences Non-Conformité": (
+        r"cons[ée]quences?\s+(?:de\s+la\s+)?non[\s-]+(?:conformit[ée]|cons[ée]quence)"
+    ),
+}
+
+# A heading in any case, bold or not, after a bullet or a number, followed by ":" (French
+# spacing allowed), a dash or the end of the line: "• Action Requise:", "**Action requise** :",
+# "1. Action requise - ..."
+FORMAT_SECTIONS = {
+    section: re.compile(r"(?<!\w)" + heading + r"(?:\s*(?:\*\*|__))?\s*(?:[:\-–—]|$)", re.I | re.M)
+    for section, heading in SECTION_HEADINGS.items()
+}
+
+
+def find_sections(text: str) -> Tuple[List[str], List[str]]:
+    """(found, missing) summary sections of a response"""
+    found, missing = [], []
+    for section, pattern in FORMAT_SECTIONS.items():
+        (found if pattern.search(text) else missing).append(section)
+    return found, missing
+
+
+def detect_repetition(text: str) -> bool:
+    """Detect if the response has excessive repetition"""
+    if not text or len(text) < 100:
+        return False
+
+    # Split into sentences and check for repetition
+    sentences = [s.strip() for s in text.split(".") if len(s.strip()) > 10]
+    if len(sentences) < 3:
+        return False
+
+    # Check for repeated sentences
+    unique_sentences = set(sentences)
+    repetition_ratio = 1 - (len(unique_sentences) / len(sentences))
+
+    # Check for repeated phrases
+    words = text.lower().split()
+    if len(words) < 20:
+        return False
+
+    # Look for repeated 3-word phrases
+    phrases = [" ".join(words[i : i + 3]) for i in range(len(words) - 2)]
+    unique_phrases = set(phrases)
+    phrase_repetition = 1 - (len(unique_phrases) / len(phrases))
+
+    # Detection thresholds
+    is_repetitive = repetition_ratio > 0.3 or phrase_repetition > 0.4
+
+    if is_repetitive:
+        logger.warning(
+            f"Repetition detected - sentences: {repetition_ratio:.2f}, phrases: {phrase_repetition:.2f}"
+        )
+
+    return is_repetitive
+
+
 class ModelClient:
     """Client for the model being evaluated"""
 
@@ -29,6 +104,12 @@ class ModelClient:
         self.endpoint = endpoint
         self.model_name = model_name
         self.session = None
+        self.budget = TokenBudget(
+            model_name,
+            MAX_TOKENS,
+            context_window=MODEL_CONTEXT_WINDOW,
+            tokenizer=TOKENIZER_FILE or None,
+        )
 
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -123,7 +204,11 @@ Question: {question}"""
             logger.error(f"Error extracting solution content: {e}")
             return response
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=trace_retry,
+    )
     async def generate_response(self, question: str) -> str:
         """Generate response from the model being evaluated"""
         if not self.session:
@@ -134,20 +219,21 @@ Question: {question}"""
         payload = {
             "prompt": prompt,
             "stream": False,
-            "max_new_tokens": MAX_TOKENS,
+            "max_new_tokens": self.budget.completion_tokens(prompt),
             "temperature": 0.01,
         }
 
         try:
             # Increased timeout for longer responses with reasoning tokens (up to 10K tokens)
             timeout = aiohttp.ClientTimeout(total=300)  # 5 minutes for reasoning generation
+            start_time = time.time()
             async with self.session.post(self.endpoint, json=payload, timeout=timeout) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     logger.error(f"Model API error {response.status}: {error_text}")
                     raise Exception(f"Model API error {response.status}: {error_text}")
 
-                result = await response.json()
+                result = await response.json(loads=loads)
 
                 # Handle different response formats
                 raw_response = ""
@@ -170,8 +256,15 @@ Question: {question}"""
                 else:
                     raw_response = str(result)
 
+                latency = time.time() - start_time
+
                 # Extract solution content if configured
-                return self._extract_solution_content(raw_response)
+                with span("extract", {"response.chars": len(raw_response)}) as extract_span:
+                    solution = self._extract_solution_content(raw_response)
+                    extract_span.set_attribute("solution.chars", len(solution))
+                return ModelResponse(
+                    solution, usage=usage_from_local(result), latency=latency, model=self.model_name
+                )
 
         except Exception as e:
             logger.error(f"Error generating response: {e}")
@@ -184,16 +277,17 @@ Question: {question}"""
         payload = {
             "prompt": prompt,
             "stream": False,
-            "max_new_tokens": MAX_TOKENS,
+            "max_new_tokens": self.budget.completion_tokens(prompt),
             "temperature": 0.01,
         }
 
         try:
             # Increased timeout for longer responses with reasoning tokens (up to 10K tokens)
+            start_time = time.time()
             response = requests.post(self.endpoint, json=payload, timeout=300)  # 5 minutes
             response.raise_for_status()
 
-            result = response.json()
+            result = loads(response.content)
 
             # Handle different response formats
             raw_response = ""
@@ -215,8 +309,15 @@ Question: {question}"""
             else:
                 raw_response = str(result)
 
+            latency = time.time() - start_time
+
             # Extract solution content if configured
-            return self._extract_solution_content(raw_response)
+            with span("extract", {"response.chars": len(raw_response)}) as extract_span:
+                solution = self._extract_solution_content(raw_response)
+                extract_span.set_attribute("solution.chars", len(solution))
+            return ModelResponse(
+                solution, usage=usage_from_local(result), latency=latency, model=self.model_name
+            )
 
         except Exception as e:
             logger.error(f"Error generating response: {e}")
@@ -226,10 +327,16 @@ Question: {question}"""
 class EvaluatorClient:
     """Flexible client for LLM evaluation supporting multiple providers"""
 
-    def __init__(self):
+    def __init__(self, provider: Optional[str] = None, model: Optional[str] = None):
         # Check for external evaluator provider first
-        self.evaluator_provider = os.getenv("EVALUATOR_PROVIDER", "azure").lower()
-        self.evaluator_model = os.getenv("EVALUATOR_MODEL", "gpt-4o")
+        self.evaluator_provider = (provider or os.getenv("EVALUATOR_PROVIDER", "azure")).lower()
+        self.evaluator_model = model or os.getenv("EVALUATOR_MODEL", "gpt-4o")
+        # An explicit Azure model is the deployment name (e.g. in a judge ensemble)
+        self.azure_deployment = model or AZURE_OPENAI_DEPLOYMENT_NAME
+        self.budget = TokenBudget(
+            self.azure_deployment if self.evaluator_provider == "azure" else self.evaluator_model,
+            JUDGE_MAX_TOKENS,
+        )
 
         logger.info(
             f"Initializing evaluator with provider: {self.evaluator_provider}, model: {self.evaluator_model}"
@@ -312,21 +419,25 @@ class EvaluatorClient:
             raise ValueError("EVALUATOR_ENDPOINT or MODEL_ENDPOINT required for local evaluator")
         self.client_type = "local"
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=trace_retry,
+    )
     def evaluate_response(
         self, question: str, model_response: str, ground_truth: Dict[str, str]
     ) -> Dict[str, Any]:
-        """Evaluate a model response using the configured evaluator"""
+        """Evaluate a model response using the configured evaluator
+
+        Token usage, including prompt tokens served from the provider's or the
+        local server's prefix cache, is returned under `usage`.
+        """
 
         # Format the evaluation prompt
         evaluation_prompt = LLM_EVALUATION_PROMPT.format(
             user_question=question,
             model_response=model_response,
-            action_requise=ground_truth.get("action_requise", ""),
-            delai_legal=ground_truth.get("delai_legal", ""),
-            documents_obligatoires=ground_truth.get("documents_obligatoires", ""),
-            impact_financier=ground_truth.get("impact_financier", ""),
-            consequences_non_conformite=ground_truth.get("consequences_non_conformite", ""),
+            **{rubric: ground_truth.get(rubric, "") for rubric in RUBRICS},
         )
 
         try:
@@ -344,22 +455,37 @@ class EvaluatorClient:
                 return self._evaluate_local(evaluation_prompt)
             else:
                 logger.error(f"Unknown client type: {self.client_type}")
-                return self._create_default_evaluation()
+                return self._create_default_evaluation(JUDGE_ERROR, "unknown client type")
 
         except Exception as e:
             logger.error(f"Error during evaluation with {self.client_type}: {e}")
-            return self._create_default_evaluation()
+            return self._create_default_evaluation(JUDGE_ERROR, str(e))
+
+    def _judge_max_tokens(self, prompt: str) -> int:
+        """Completion budget of the judge request sending `prompt`"""
+        return self.budget.completion_tokens([{"role": "user", "content": prompt}])
+
+    def _with_usage(self, evaluation: Dict[str, Any], usage: Dict[str, int]) -> Dict[str, Any]:
+        evaluation["usage"] = usage
+        if usage.get("cached_tokens"):
+            logger.debug(
+                f"Judge prompt cache hit: {usage['cached_tokens']}/{usage.get('prompt_tokens', 0)} tokens"
+            )
+        return evaluation
 
     def _evaluate_azure_openai(self, evaluation_prompt: str) -> Dict[str, Any]:
         """Evaluate using Azure OpenAI"""
         response = self.client.chat.completions.create(
-            model=AZURE_OPENAI_DEPLOYMENT_NAME,
+            model=self.azure_deployment,
             messages=[{"role": "user", "content": evaluation_prompt}],
             temperature=0.1,
-            max_tokens=12000,
+            max_tokens=self._judge_max_tokens(evaluation_prompt),
             response_format={"type": "json_object"},
         )
-        return self._parse_evaluation_response(response.choices[0].message.content)
+        return self._with_usage(
+            self._parse_evaluation_response(response.choices[0].message.content),
+            usage_from_openai(response.usage),
+        )
 
     def _evaluate_openai(self, evaluation_prompt: str) -> Dict[str, Any]:
         """Evaluate using OpenAI"""
@@ -367,10 +493,13 @@ class EvaluatorClient:
             model=self.evaluator_model,
             messages=[{"role": "user", "content": evaluation_prompt}],
             temperature=0.1,
-            max_tokens=12000,
+            max_tokens=self._judge_max_tokens(evaluation_prompt),
             response_format={"type": "json_object"},
         )
-        return self._parse_evaluation_response(response.choices[0].message.content)
+        return self._with_usage(
+            self._parse_evaluation_response(response.choices[0].message.content),
+            usage_from_openai(response.usage),
+        )
 
     def _evaluate_mistral(self, evaluation_prompt: str) -> Dict[str, Any]:
         """Evaluate using Mistral"""
@@ -384,15 +513,18 @@ class EvaluatorClient:
             "model": self.evaluator_model,
             "messages": [{"role": "user", "content": evaluation_prompt}],
             "temperature": 0.1,
-            "max_tokens": 12000,
+            "max_tokens": self._judge_max_tokens(evaluation_prompt),
             "response_format": {"type": "json_object"},
         }
 
         response = requests.post(self.mistral_endpoint, json=payload, headers=headers, timeout=300)
         response.raise_for_status()
 
-        result = response.json()
-        return self._parse_evaluation_response(result["choices"][0]["message"]["content"])
+        result = loads(response.content)
+        return self._with_usage(
+            self._parse_evaluation_response(result["choices"][0]["message"]["content"]),
+            usage_from_openai(result.get("usage")),
+        )
 
     def _evaluate_claude(self, evaluation_prompt: str) -> Dict[str, Any]:
         """Evaluate using Claude"""
@@ -411,7 +543,7 @@ class EvaluatorClient:
 
         payload = {
             "model": self.evaluator_model,
-            "max_tokens": 12000,
+            "max_tokens": self._judge_max_tokens(claude_prompt),
             "temperature": 0.1,
             "messages": [{"role": "user", "content": claude_prompt}],
         }
@@ -421,8 +553,11 @@ class EvaluatorClient:
         )
         response.raise_for_status()
 
-        result = response.json()
-        return self._parse_evaluation_response(result["content"][0]["text"])
+        result = loads(response.content)
+        return self._with_usage(
+            self._parse_evaluation_response(result["content"][0]["text"]),
+            usage_from_anthropic(result.get("usage")),
+        )
 
     def _evaluate_gemini(self, evaluation_prompt: str) -> Dict[str, Any]:
         """Evaluate using Gemini"""
@@ -439,7 +574,7 @@ class EvaluatorClient:
             "contents": [{"parts": [{"text": gemini_prompt}]}],
             "generationConfig": {
                 "temperature": 0.1,
-                "maxOutputTokens": 12000,
+                "maxOutputTokens": self._judge_max_tokens(gemini_prompt),
                 "responseMimeType": "application/json",
             },
         }
@@ -447,9 +582,10 @@ class EvaluatorClient:
         response = requests.post(url, json=payload, timeout=300)
         response.raise_for_status()
 
-        result = response.json()
-        return self._parse_evaluation_response(
-            result["candidates"][0]["content"]["parts"][0]["text"]
+        result = loads(response.content)
+        return self._with_usage(
+            self._parse_evaluation_response(result["candidates"][0]["content"]["parts"][0]["text"]),
+            usage_from_gemini(result.get("usageMetadata")),
         )
 
     def _evaluate_local(self, evaluation_prompt: str) -> Dict[str, Any]:
@@ -470,21 +606,21 @@ class EvaluatorClient:
                     payload = {
                         "messages": [{"role": "user", "content": local_prompt}],
                         "temperature": 0.1,
-                        "max_tokens": 12000,
+                        "max_tokens": self._judge_max_tokens(local_prompt),
                         "stream": False,
                     }
                 else:
                     payload = {
                         "prompt": local_prompt,
                         "temperature": 0.1,
-                        "max_new_tokens": 12000,
+                        "max_new_tokens": self._judge_max_tokens(local_prompt),
                         "stream": False,
                     }
 
                 response = requests.post(endpoint, json=payload, timeout=300)
                 response.raise_for_status()
 
-                result = response.json()
+                result = loads(response.content)
 
                 # Extract response text from various formats
                 response_text = ""
@@ -507,7 +643,9 @@ class EvaluatorClient:
                 else:
                     response_text = str(result)
 
-                return self._parse_evaluation_response(response_text)
+                return self._with_usage(
+                    self._parse_evaluation_response(response_text), usage_from_local(result)
+                )
 
             except Exception as e:
                 logger.warning(f"Failed to evaluate with {endpoint}: {e}")
@@ -528,25 +666,25 @@ class EvaluatorClient:
                 if json_match:
                     response_text = json_match.group()
 
-            result = json.loads(response_text)
+            result = loads(response_text)
 
             # Validate and fix the response structure
-            required_scores = [
-                "action_requise",
-                "delai_legal",
-                "documents_obligatoires",
-                "impact_financier",
-                "consequences_non_conformite",
-            ]
-
             # Ensure nested dicts exist
             result.setdefault("scores", {})
             result.setdefault("justifications", {})
 
-            for key in required_scores:
+            missing_rubrics = [key for key in RUBRICS if key not in result["scores"]]
+            for key in RUBRICS:
                 result["scores"].setdefault(key, 0)
                 result["justifications"].setdefault(key, "N/A")
 
+            if missing_rubrics:
+                logger.warning(f"Judge response missing rubrics: {missing_rubrics}")
+                result["status"] = PARTIAL_RUBRIC
+                result["missing_rubrics"] = missing_rubrics
+            else:
+                result["status"] = STATUS_OK
+
             # Calculate global score if missing
             if "score_global" not in result or not isinstance(result["score_global"], (int, float)):
                 scores_vals = list(result["scores"].values())
@@ -560,26 +698,18 @@ class EvaluatorClient:
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse evaluation JSON: {response_text}")
             logger.error(f"JSON decode error: {e}")
-            return self._create_default_evaluation()
+            return self._create_default_evaluation(PARSE_ERROR, str(e))
 
-    def _create_default_evaluation(self) -> Dict[str, Any]:
+    def _create_default_evaluation(
+        self, status: str = JUDGE_ERROR, error: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Create a default evaluation response when evaluation fails"""
         return {
+            "status": status,
+            "error": error,
             "score_global": 0,
-            "scores": {
-                "action_requise": 0,
-                "delai_legal": 0,
-                "documents_obligatoires": 0,
-                "impact_financier": 0,
-                "consequences_non_conformite": 0,
-            },
-            "justifications": {
-                "action_requise": "Évaluation échouée",
-                "delai_legal": "Évaluation échouée",
-                "documents_obligatoires": "Évaluation échouée",
-                "impact_financier": "Évaluation échouée",
-                "consequences_non_conformite": "Évaluation échouée",
-            },
+            "scores": {rubric: 0 for rubric in RUBRICS},
+            "justifications": {rubric: FAILED_JUSTIFICATION for rubric in RUBRICS},
         }
 
 
@@ -594,6 +724,12 @@ class ChatModelClient:
             self.endpoint = endpoint + "/chat" if not endpoint.endswith("/chat") else endpoint
         self.model_name = model_name
         self.session = None
+        self.budget = TokenBudget(
+            model_name,
+            MAX_TOKENS,
+            context_window=MODEL_CONTEXT_WINDOW,
+            tokenizer=TOKENIZER_FILE or None,
+        )
         # --- Mistral support ---
         self.api_key = os.getenv("MISTRAL_API_KEY")
         self.is_mistral = "mistral.ai" in self.endpoint
@@ -621,19 +757,24 @@ class ChatModelClient:
         """Format the question as simple chat messages without special formatting"""
         return [{"role": "user", "content": question}]
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=trace_retry,
+    )
     async def generate_response(self, question: str) -> str:
         """Generate response from the model being evaluated using chat endpoint"""
         if not self.session:
             raise RuntimeError("Session not initialized. Use async context manager.")
 
         messages = self._format_chat_messages(question)
+        max_tokens = self.budget.completion_tokens(messages)
 
         if self.is_mistral:
             payload = {
                 "model": os.getenv("MISTRAL_MODEL_ID", self.model_name),
                 "messages": messages,
-                "max_tokens": MAX_TOKENS,
+                "max_tokens": max_tokens,
                 "temperature": TEMPERATURE,
                 "stream": False,
             }
@@ -641,7 +782,7 @@ class ChatModelClient:
             payload = {
                 "messages": messages,
                 "stream": False,
-                "max_new_tokens": MAX_TOKENS,
+                "max_new_tokens": max_tokens,
                 "temperature": TEMPERATURE,
                 "top_p": 0.9,
                 "do_sample": True,
@@ -650,13 +791,14 @@ class ChatModelClient:
         try:
             # Increased timeout for longer responses
             timeout = aiohttp.ClientTimeout(total=300)  # 5 minutes
+            start_time = time.time()
             async with self.session.post(self.endpoint, json=payload, timeout=timeout) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     logger.error(f"Model API error {response.status}: {error_text}")
                     raise Exception(f"Model API error {response.status}: {error_text}")
 
-                result = await response.json()
+                result = await response.json(loads=loads)
 
                 # Handle different response formats
                 raw_response = ""
@@ -680,7 +822,12 @@ class ChatModelClient:
                     raw_response = str(result)
 
                 # Return response without solution tag extraction
-                return raw_response.strip()
+                return ModelResponse(
+                    raw_response.strip(),
+                    usage=usage_from_local(result),
+                    latency=time.time() - start_time,
+                    model=self.model_name,
+                )
 
         except Exception as e:
             logger.error(f"Error generating response: {e}")
@@ -689,12 +836,13 @@ class ChatModelClient:
     def generate_response_sync(self, question: str) -> str:
         """Synchronous version for single requests"""
         messages = self._format_chat_messages(question)
+        max_tokens = self.budget.completion_tokens(messages)
 
         if self.is_mistral:
             payload = {
                 "model": os.getenv("MISTRAL_MODEL_ID", self.model_name),
                 "messages": messages,
-                "max_tokens": MAX_TOKENS,
+                "max_tokens": max_tokens,
                 "temperature": TEMPERATURE,
                 "stream": False,
             }
@@ -702,7 +850,7 @@ class ChatModelClient:
             payload = {
                 "messages": messages,
                 "stream": False,
-                "max_new_tokens": MAX_TOKENS,
+                "max_new_tokens": max_tokens,
                 "temperature": TEMPERATURE,
                 "top_p": 0.9,
                 "do_sample": True,
@@ -710,12 +858,13 @@ class ChatModelClient:
 
         try:
             # Increased timeout for longer responses
+            start_time = time.time()
             response = requests.post(
                 self.endpoint, json=payload, headers=self.headers, timeout=300
             )  # 5 minutes
             response.raise_for_status()
 
-            result = response.json()
+            result = loads(response.content)
 
             # Handle different response formats
             raw_response = ""
@@ -738,7 +887,12 @@ class ChatModelClient:
                 raw_response = str(result)
 
             # Return response without solution tag extraction
-            return raw_response.strip()
+            return ModelResponse(
+                raw_response.strip(),
+                usage=usage_from_local(result),
+                latency=time.time() - start_time,
+                model=self.model_name,
+            )
 
         except Exception as e:
             logger.error(f"Error generating response: {e}")
@@ -756,6 +910,12 @@ class StrictChatModelClient:
             self.endpoint = endpoint + "/chat" if not endpoint.endswith("/chat") else endpoint
         self.model_name = model_name
         self.session = None
+        self.budget = TokenBudget(
+            model_name,
+            MAX_TOKENS,
+            context_window=MODEL_CONTEXT_WINDOW,
+            tokenizer=TOKENIZER_FILE or None,
+        )
         # --- Mistral support ---
         self.api_key = os.getenv("MISTRAL_API_KEY")
         self.is_mistral = "mistral.ai" in self.endpoint
@@ -799,45 +959,20 @@ Question: {question}"""
 
     def _detect_repetition(self, text: str) -> bool:
         """Detect if the response has excessive repetition"""
-        if not text or len(text) < 100:
-            return False
-
-        # Split into sentences and check for repetition
-        sentences = [s.strip() for s in text.split(".") if len(s.strip()) > 10]
-        if len(sentences) < 3:
-            return False
-
-        # Check for repeated sentences
-        unique_sentences = set(sentences)
-        repetition_ratio = 1 - (len(unique_sentences) / len(sentences))
-
-        # Check for repeated phrases
-        words = text.lower().split()
-        if len(words) < 20:
-            return False
-
-        # Look for repeated 3-word phrases
-        phrases = [" ".join(words[i : i + 3]) for i in range(len(words) - 2)]
-        unique_phrases = set(phrases)
-        phrase_repetition = 1 - (len(unique_phrases) / len(phrases))
-
-        # Detection thresholds
-        is_repetitive = repetition_ratio > 0.3 or phrase_repetition > 0.4
+        return detect_repetition(text)
 
-        if is_repetitive:
-            logger.warning(
-                f"Repetition detected - sentences: {repetition_ratio:.2f}, phrases: {phrase_repetition:.2f}"
-            )
-
-        return is_repetitive
-
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=trace_retry,
+    )
     async def generate_response(self, question: str) -> str:
         """Generate response with repetition detection and retry logic"""
         if not self.session:
             raise RuntimeError("Session not initialized. Use async context manager.")
 
         messages = self._format_strict_chat_messages(question)
+        max_tokens = self.budget.completion_tokens(messages)
 
         # Try with different parameters if repetition is detected
         for attempt in range(3):
@@ -863,7 +998,7 @@ Question: {question}"""
                 payload = {
                     "model": os.getenv("MISTRAL_MODEL_ID", self.model_name),
                     "messages": messages,
-                    "max_tokens": MAX_TOKENS,
+                    "max_tokens": max_tokens,
                     "temperature": temperature,
                     "stream": False,
                 }
@@ -871,7 +1006,7 @@ Question: {question}"""
                 payload = {
                     "messages": messages,
                     "stream": False,
-                    "max_new_tokens": MAX_TOKENS,
+                    "max_new_tokens": max_tokens,
                     "temperature": temperature,
                     "top_p": top_p,
                     "do_sample": True,
@@ -880,6 +1015,7 @@ Question: {question}"""
 
             try:
                 timeout = aiohttp.ClientTimeout(total=300)
+                start_time = time.time()
                 async with self.session.post(
                     self.endpoint, json=payload, timeout=timeout
                 ) as response:
@@ -888,7 +1024,7 @@ Question: {question}"""
                         logger.error(f"Model API error {response.status}: {error_text}")
                         raise Exception(f"Model API error {response.status}: {error_text}")
 
-                    result = await response.json()
+                    result = await response.json(loads=loads)
 
                     # Extract response text
                     raw_response = ""
@@ -911,8 +1047,10 @@ Question: {question}"""
                         raw_response = str(result)
 
                     response_text = raw_response.strip()
+                    latency = time.time() - start_time
 
                     # Check for repetition
+                    repetition_abort = False
                     if self._detect_repetition(response_text):
                         if attempt < 2:  # Not the last attempt
                             logger.warning(
@@ -923,63 +1061,23 @@ Question: {question}"""
                             logger.warning(
                                 f"Repetition still detected on final attempt, returning response anyway"
                             )
+                            repetition_abort = True
 
                     # Check format compliance with flexible patterns
-                    section_patterns = {
-                        "Action Requise": [
-                            "Action Requise:",
-                            "Action requise:",
-                            "• Action Requise",
-                            "**Action Requise",
-                        ],
-                        "Délai Legal": [
-                            "Délai Legal:",
-                            "Délais Legal:",
-                            "Délai légal:",
-                            "Délais légal:",
-                            "• Délai Legal",
-                            "**Délai Legal",
-                            "**Délais Legal",
-                        ],
-                        "Documents Obligatoires": [
-                            "Documents Obligatoires:",
-                            "Documents obligatoires:",
-                            "Documents Emploi:",
-                            "• Documents Obligatoires",
-                            "**Documents Obligatoires",
-                            "**Documents Emploi",
-                        ],
-                        "Impact Financier": [
-                            "Impact Financier:",
-                            "Impact financier:",
-                            "• Impact Financier",
-                            "**Impact Financier",
-                        ],
-                        "Conséquences Non-Conformité": [
-                            "Conséquences Non-Conformité:",
-                            "Conséquences non-conformité:",
-                            "Conséquences Non-conséquence:",
-                            "• Conséquences Non-Conformité",
-                            "**Conséquences Non-Conformité",
-                        ],
-                    }
-
-                    found_sections = []
-                    missing_sections = []
-
-                    for section, patterns in section_patterns.items():
-                        found = any(pattern in response_text for pattern in patterns)
-                        if found:
-                            found_sections.append(section)
-                        else:
-                            missing_sections.append(section)
+                    found_sections, missing_sections = find_sections(response_text)
 
                     if missing_sections:
                         logger.warning(f"Missing format sections: {missing_sections}")
                     if found_sections:
                         logger.info(f"Found format sections: {found_sections}")
 
-                    return response_text
+                    return ModelResponse(
+                        response_text,
+                        usage=usage_from_local(result),
+                        latency=latency,
+                        model=self.model_name,
+                        repetition_abort=repetition_abort,
+                    )
 
             except Exception as e:
                 if attempt == 2:  # Last attempt
@@ -992,6 +1090,7 @@ Question: {question}"""
     def generate_response_sync(self, question: str) -> str:
         """Synchronous version with repetition handling"""
         messages = self._format_strict_chat_messages(question)
+        max_tokens = self.budget.completion_tokens(messages)
 
         for attempt in range(3):
             # Adjust parameters based on attempt
@@ -1016,7 +1115,7 @@ Question: {question}"""
                 payload = {
                     "model": os.getenv("MISTRAL_MODEL_ID", self.model_name),
                     "messages": messages,
-                    "max_tokens": MAX_TOKENS,
+                    "max_tokens": max_tokens,
                     "temperature": temperature,
                     "stream": False,
                 }
@@ -1024,7 +1123,7 @@ Question: {question}"""
                 payload = {
                     "messages": messages,
                     "stream": False,
-                    "max_new_tokens": MAX_TOKENS,
+                    "max_new_tokens": max_tokens,
                     "temperature": temperature,
                     "top_p": top_p,
                     "do_sample": True,
@@ -1032,12 +1131,13 @@ Question: {question}"""
                 }
 
             try:
+                start_time = time.time()
                 response = requests.post(
                     self.endpoint, json=payload, headers=self.headers, timeout=300
                 )
                 response.raise_for_status()
 
-                result = response.json()
+                result = loads(response.content)
 
                 # Extract response text
                 raw_response = ""
@@ -1060,8 +1160,10 @@ Question: {question}"""
                     raw_response = str(result)
 
                 response_text = raw_response.strip()
+                latency = time.time() - start_time
 
                 # Check for repetition
+                repetition_abort = False
                 if self._detect_repetition(response_text):
                     if attempt < 2:
                         logger.warning(
@@ -1072,8 +1174,15 @@ Question: {question}"""
                         logger.warning(
                             f"Repetition still detected on final attempt, returning response anyway"
                         )
-
-                return response_text
+                        repetition_abort = True
+
+                return ModelResponse(
+                    response_text,
+                    usage=usage_from_local(result),
+                    latency=latency,
+                    model=self.model_name,
+                    repetition_abort=repetition_abort,
+                )
 
             except Exception as e:
                 if attempt == 2:
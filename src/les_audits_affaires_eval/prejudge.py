@@ -0,0 +1,134 @@
+"""
+Rule-based pre-judge: score degenerate responses without a judge call
+
+Before a response is sent to the judge, a few cheap checks built on the
+format rules of `StrictChatModelClient` look for outputs no judge would give
+points to:
+
+- `error`: the response is a generation error (`ERROR: ...`);
+- `empty`: fewer than `PREJUDGE_MIN_CHARS` characters once stripped;
+- `repetition`: generation was aborted for repetition, or the text is
+  repetitive by the strict client's thresholds;
+- `no_sections`: none of the five summary sections and no legal article
+  citation.
+
+`PREJUDGE_RULES` picks the rules that apply; none by default, since the
+zero scores replace judge scores and change results compared with earlier
+runs (`repetition` in particular applies to every client, not only the strict
+one). A matching response gets a
+deterministic evaluation (all scores 0) tagged with the rule under `prejudge`,
+from which `summarize_prejudge` counts the skipped judge calls.
+"""
+
+import re
+from typing import Any, Dict, Iterable, Optional, Sequence, Union
+
+from .config import PREJUDGE_MIN_CHARS, PREJUDGE_RULES
+from .model_client import detect_repetition, find_sections
+from .records import RUBRICS, SampleResult, as_record
+from .status import GENERATION_ERROR, GENERATION_ERROR_PREFIX, REPETITION_ABORT, STATUS_OK
+
+RULES = ("error", "empty", "repetition", "no_sections")
+
+# Status of the result and justification of the scores, per rule
+_OUTCOMES = {
+    "error": (GENERATION_ERROR, "réponse en erreur"),
+    "empty": (STATUS_OK, "réponse vide"),
+    "repetition": (REPETITION_ABORT, "réponse interrompue par des répétitions"),
+    "no_sections": (STATUS_OK, "aucune des cinq rubriques ni référence légale"),
+}
+
+# "article 1193", "art. L. 136-1", "art 1193", "articles R 123-5", bare "L. 225-100"...
+LEGAL_CITATION = re.compile(
+    r"\b(?:articles?|art\.?)\s*(?:[LRD]\.?\s*)?\d|\b[LRD]\.?\s*\d+-\d+", re.IGNORECASE
+)
+
+
+def parse_rules(spec: Union[str, Iterable[str]]) -> tuple:
+    """Rules of a comma-separated policy (empty or `off` = none)"""
+    if isinstance(spec, str):
+        spec = [] if spec.strip().lower() in ("", "off", "none") else spec.split(",")
+    rules = tuple(rule.strip().lower() for rule in spec if rule.strip())
+    unknown = set(rules) - set(RULES)
+    if unknown:
+        raise ValueError(f"Unknown pre-judge rule(s) {sorted(unknown)}, expected {RULES}")
+    return rules
+
+
+def match_rule(
+    model_response: str, rules: Sequence[str], min_chars: int = PREJUDGE_MIN_CHARS
+) -> Optional[str]:
+    """First rule of `rules` the response falls under, None when it needs the judge"""
+    text = str(model_response or "").strip()
+    for rule in rules:
+        if rule == "error" and text.startswith(GENERATION_ERROR_PREFIX):
+            return rule
+        if rule == "empty" and len(text) < min_chars:
+            return rule
+        if rule == "repetition" and (
+            getattr(model_response, "repetition_abort", False) or detect_repetition(text)
+        ):
+            return rule
+        if rule == "no_sections" and not find_sections(text)[0] and not LEGAL_CITATION.search(text):
+            return rule
+    return None
+
+
+def prejudge_evaluation(rule: str) -> Dict[str, Any]:
+    """Deterministic evaluation of a response caught by `rule`"""
+    status, reason = _OUTCOMES[rule]
+    return {
+        "status": status,
+        "score_global": 0,
+        "scores": {rubric: 0 for rubric in RUBRICS},
+        "justifications": {rubric: f"Score attribué sans juge : {reason}" for rubric in RUBRICS},
+        "prejudge": rule,
+    }
+
+
+class PreJudge:
+    """Judge client applying the pre-judge rules before the wrapped judge
+
+    Exposes `evaluate_response` like `EvaluatorClient`; everything else is
+    delegated to the wrapped client.
+    """
+
+    def __init__(
+        self,
+        judge: Any,
+        rules: Union[str, Iterable[str]] = PREJUDGE_RULES,
+        min_chars: int = PREJUDGE_MIN_CHARS,
+    ):
+        self.judge = judge
+        self.rules = parse_rules(rules)
+        self.min_chars = min_chars
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "judge":
+            raise AttributeError(name)
+        return getattr(self.judge, name)
+
+    def evaluate_response(
+        self, question: str, model_response: str, ground_truth: Dict[str, str]
+    ) -> Dict[str, Any]:
+        rule = match_rule(model_response, self.rules, self.min_chars)
+        if rule is None:
+            return self.judge.evaluate_response(question, model_response, ground_truth)
+        return {**prejudge_evaluation(rule), "usage": {}}
+
+
+def summarize_prejudge(
+    results: Iterable[Union[SampleResult, Dict[str, Any]]],
+    rules: Union[str, Iterable[str]] = PREJUDGE_RULES,
+) -> Dict[str, Any]:
+    """Judge calls skipped by the pre-judge, in total and per rule"""
+    counts = {rule: 0 for rule in parse_rules(rules)}
+    for result in results:
+        rule = (as_record(result).evaluation_extra or {}).get("prejudge")
+        if rule:
+            counts[rule] = counts.get(rule, 0) + 1
+    return {
+        "rules": list(parse_rules(rules)),
+        "skipped_judge_calls": sum(counts.values()),
+        "by_rule": counts,
+    }
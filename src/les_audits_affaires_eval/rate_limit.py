@@ -0,0 +1,100 @@
+"""
+Rate limiting helpers used to respect provider quotas
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from .config import RATE_LIMIT_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRateLimiter:
+    """Spaces out `acquire()` calls to at most `rate` per second (0/None disables it)"""
+
+    def __init__(self, rate: Optional[float] = None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        # Created lazily so the lock binds to the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class SharedRateLimiter(AsyncRateLimiter):
+    """Rate limiter shared by every process using the same state file
+
+    The next free slot (epoch seconds) is stored in `path` and updated under an
+    exclusive `flock`, so N shard processes together stay under `rate` per second.
+    """
+
+    def __init__(self, path: str, rate: Optional[float] = None):
+        super().__init__(rate)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def reserve(self) -> float:
+        """Book the next slot and return how long to wait for it"""
+        with open(self.path, "a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read().strip()
+                now = time.time()
+                slot = max(now, float(raw) if raw else 0.0)
+                f.seek(0)
+                f.truncate()
+                f.write(repr(slot + self.interval).encode())
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return slot - now
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        # The critical section is a few microseconds, no need to leave the loop
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def create_rate_limiter(
+    rate: Optional[float], name: str, state_dir: Optional[str] = RATE_LIMIT_DIR
+) -> AsyncRateLimiter:
+    """Per-process limiter, or one shared across processes when `state_dir` is set"""
+    if not rate or not state_dir:
+        return AsyncRateLimiter(rate)
+    if fcntl is None:
+        logger.warning("Shared rate limiting needs fcntl; limiting per process instead")
+        return AsyncRateLimiter(rate)
+    return SharedRateLimiter(os.path.join(state_dir, f"{name}.ratelimit"), rate)
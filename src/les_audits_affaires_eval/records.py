@@ -0,0 +1,178 @@
+"""
+Compact in-memory form of a detailed result record
+
+`SampleResult` keeps one object per sample instead of five nested dicts: ground
+truth, rubric scores and justifications are fixed-order sequences indexed like
+`RUBRICS`, and scores sit in a single float array. `to_dict` / `from_dict` map
+to the JSON record written to the detailed results file, which is unchanged.
+"""
+
+import math
+from array import array
+from typing import Any, Dict, Iterable, Optional, Sequence, Union
+
+from .status import failure_stage, result_status
+
+# The five rubrics of the benchmark, in report order
+RUBRICS = (
+    "action_requise",
+    "delai_legal",
+    "documents_obligatoires",
+    "impact_financier",
+    "consequences_non_conformite",
+)
+
+# Rubrics a judge did not score are NaN in `SampleResult.scores`
+MISSING = math.nan
+
+_EVALUATION_FIELDS = ("score_global", "scores", "justifications")
+
+
+def _score(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def rubric_values(mapping: Optional[Dict[str, Any]], default: Any = None) -> tuple:
+    """Values of a per-rubric dict in RUBRICS order"""
+    mapping = mapping or {}
+    return tuple(mapping.get(rubric, default) for rubric in RUBRICS)
+
+
+class SampleResult:
+    """One evaluated sample (see the module docstring for the layout)"""
+
+    __slots__ = (
+        "sample_idx",
+        "question",
+        "ground_truth",
+        "model_response",
+        "status",
+        "failure_stage",
+        "score_global",
+        "scores",
+        "justifications",
+        "evaluation_extra",
+        "metadata",
+    )
+
+    def __init__(
+        self,
+        sample_idx: int,
+        question: Optional[str],
+        ground_truth: Optional[Sequence[str]],
+        model_response: Optional[str],
+        status: str,
+        score_global: float = 0.0,
+        scores: Optional[Iterable[float]] = None,
+        justifications: Optional[Sequence[Optional[str]]] = None,
+        evaluation_extra: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self.sample_idx = sample_idx
+        self.question = question
+        self.ground_truth = tuple(ground_truth) if ground_truth is not None else None
+        self.model_response = model_response
+        self.status = status
+        self.failure_stage = failure_stage(status)
+        self.score_global = _score(score_global)
+        self.scores = array("d", scores if scores is not None else [MISSING] * len(RUBRICS))
+        self.justifications = tuple(justifications) if justifications is not None else None
+        self.evaluation_extra = evaluation_extra or None
+        self.metadata = metadata if metadata is not None else {}
+
+    @classmethod
+    def from_evaluation(
+        cls,
+        sample_idx: int,
+        question: str,
+        ground_truth: Sequence[str],
+        model_response: str,
+        status: str,
+        evaluation: Dict[str, Any],
+        metadata: Dict[str, Any],
+    ) -> "SampleResult":
+        """Build a result from a judge evaluation dict (other rubric keys are dropped)"""
+        scores = evaluation.get("scores") or {}
+        return cls(
+            sample_idx,
+            question,
+            ground_truth,
+            model_response,
+            status,
+            score_global=evaluation.get("score_global", 0),
+            scores=[_score(scores[r]) if r in scores else MISSING for r in RUBRICS],
+            justifications=(
+                rubric_values(evaluation["justifications"])
+                if "justifications" in evaluation
+                else None
+            ),
+            evaluation_extra={k: v for k, v in evaluation.items() if k not in _EVALUATION_FIELDS},
+            metadata=metadata,
+        )
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "SampleResult":
+        """Parse a detailed result record (legacy records get an inferred status)"""
+        ground_truth = record.get("ground_truth")
+        return cls.from_evaluation(
+            record["sample_idx"],
+            record.get("question"),
+            rubric_values(ground_truth, "") if ground_truth is not None else None,
+            record.get("model_response"),
+            result_status(record),
+            record.get("evaluation") or {},
+            dict(record.get("metadata") or {}),
+        )
+
+    @property
+    def scored(self) -> bool:
+        """Whether the judge gave any non-zero score"""
+        return self.score_global > 0 or any(score > 0 for score in self.scores)
+
+    def evaluation(self) -> Dict[str, Any]:
+        """The `evaluation` block of the JSON record"""
+        evaluation: Dict[str, Any] = {
+            "score_global": self.score_global,
+            "scores": {
+                rubric: score for rubric, score in zip(RUBRICS, self.scores) if score == score
+            },
+        }
+        if self.justifications is not None:
+            evaluation["justifications"] = dict(zip(RUBRICS, self.justifications))
+        if self.evaluation_extra:
+            evaluation.update(self.evaluation_extra)
+        return evaluation
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The JSON record written to the detailed results file"""
+        record: Dict[str, Any] = {"sample_idx": self.sample_idx}
+        if self.question is not None:
+            record["question"] = self.question
+        if self.ground_truth is not None:
+            record["ground_truth"] = dict(zip(RUBRICS, self.ground_truth))
+        if self.model_response is not None:
+            record["model_response"] = self.model_response
+        record["evaluation"] = self.evaluation()
+        record["status"] = self.status
+        record["failure_stage"] = self.failure_stage
+        record["metadata"] = self.metadata
+        return record
+
+    def __repr__(self) -> str:
+        return (
+            f"SampleResult(sample_idx={self.sample_idx}, status={self.status!r}, "
+            f"score_global={self.score_global})"
+        )
+
+
+def as_record(result: Union[SampleResult, Dict[str, Any]]) -> SampleResult:
+    """`result` as a SampleResult (dict records are parsed)"""
+    return result if isinstance(result, SampleResult) else SampleResult.from_dict(result)
+
+
+def as_dict(result: Union[SampleResult, Dict[str, Any]]) -> Dict[str, Any]:
+    """`result` as a JSON-ready dict record"""
+    return result.to_dict() if isinstance(result, SampleResult) else result
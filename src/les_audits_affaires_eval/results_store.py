@@ -0,0 +1,149 @@
+"""
+Columnar (Parquet) store for detailed evaluation results
+
+One row per sample. Scores, timings and status are plain columns kept apart
+from the large text columns (question, model response, justifications, ground
+truth), so analysis reads a few kilobytes of numbers instead of every response.
+Row groups are small and sorted by `sample_idx`; their min/max statistics let
+`filters=` skip whole groups (predicate pushdown).
+"""
+
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .records import RUBRICS as CATEGORIES
+from .status import failure_stage, result_status
+
+SCORE_COLUMNS = ["score_global"] + [f"score_{c}" for c in CATEGORIES]
+TIMING_COLUMNS = ["generation_time", "evaluation_time", "total_time", "queue_wait_time"]
+STATUS_COLUMNS = ["status", "failure_stage"]
+TEXT_COLUMNS = (
+    ["question", "model_response"]
+    + [f"justification_{c}" for c in CATEGORIES]
+    + [f"ground_truth_{c}" for c in CATEGORIES]
+)
+# Columns needed by reports and plots (no response or justification text)
+ANALYSIS_COLUMNS = ["sample_idx", "question"] + STATUS_COLUMNS + SCORE_COLUMNS + TIMING_COLUMNS
+
+ROW_GROUP_SIZE = 256
+
+_SCHEMA = pa.schema(
+    [("sample_idx", pa.int64())]
+    + [(name, pa.string()) for name in STATUS_COLUMNS]
+    + [(name, pa.float64()) for name in SCORE_COLUMNS + TIMING_COLUMNS]
+    + [("timestamp", pa.string())]
+    + [(name, pa.string()) for name in TEXT_COLUMNS]
+    # Everything else in `metadata` (token usage, errors, …) as a JSON string
+    + [("metadata", pa.string())]
+)
+
+
+def results_frame(results: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Flatten detailed result records into one column per field, sorted by sample_idx"""
+    results = sorted(results, key=lambda result: result["sample_idx"])
+    evaluations = [result.get("evaluation", {}) for result in results]
+    metadatas = [result.get("metadata", {}) for result in results]
+    statuses = [result_status(result) for result in results]
+    columns: Dict[str, list] = {
+        "sample_idx": [result["sample_idx"] for result in results],
+        "status": statuses,
+        "failure_stage": [failure_stage(status) for status in statuses],
+        "score_global": [evaluation.get("score_global", 0) for evaluation in evaluations],
+    }
+    for category in CATEGORIES:
+        columns[f"score_{category}"] = [
+            evaluation.get("scores", {}).get(category, 0) for evaluation in evaluations
+        ]
+    for name in TIMING_COLUMNS:
+        columns[name] = [metadata.get(name) for metadata in metadatas]
+    columns["timestamp"] = [metadata.get("timestamp") for metadata in metadatas]
+    columns["question"] = [result.get("question") for result in results]
+    columns["model_response"] = [result.get("model_response") for result in results]
+    for category in CATEGORIES:
+        columns[f"justification_{category}"] = [
+            evaluation.get("justifications", {}).get(category) for evaluation in evaluations
+        ]
+    for category in CATEGORIES:
+        columns[f"ground_truth_{category}"] = [
+            result.get("ground_truth", {}).get(category) for result in results
+        ]
+    columns["metadata"] = [json.dumps(metadata, ensure_ascii=False) for metadata in metadatas]
+    return pd.DataFrame(columns)
+
+
+def write_results_parquet(results: Iterable[Dict[str, Any]], path: str):
+    """Write result records to Parquet one row group at a time (zstd)
+
+    Records should come in `sample_idx` order so row-group statistics stay tight;
+    only ROW_GROUP_SIZE records are held in memory at once.
+    """
+    iterator = iter(results)
+    with pq.ParquetWriter(path, _SCHEMA, compression="zstd") as writer:
+        while True:
+            chunk = list(islice(iterator, ROW_GROUP_SIZE))
+            if not chunk:
+                break
+            frame = results_frame(chunk)
+            writer.write_table(pa.Table.from_pandas(frame, schema=_SCHEMA, preserve_index=False))
+
+
+def read_results_frame(
+    path: str, columns: Optional[Sequence[str]] = None, filters: Optional[List] = None
+) -> pd.DataFrame:
+    """Read only `columns`, skipping row groups excluded by `filters`
+
+    `filters` uses the pyarrow syntax, e.g. ``[("score_global", "<", 50)]``.
+    """
+    table = pq.read_table(path, columns=list(columns) if columns else None, filters=filters)
+    return table.to_pandas()
+
+
+def frame_to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Rebuild detailed-result dicts from whichever columns were read"""
+    present = set(frame.columns)
+    # Nulls come back as NaN in numeric and all-null columns
+    frame = frame.astype(object).where(frame.notna(), None)
+    records = []
+    for row in frame.to_dict("records"):
+        record: Dict[str, Any] = {
+            key: row[key]
+            for key in ("sample_idx", "question", "model_response", "status", "failure_stage")
+            if key in present
+        }
+        evaluation: Dict[str, Any] = {}
+        if "score_global" in present:
+            evaluation["score_global"] = row["score_global"]
+        scores = {c: row[f"score_{c}"] for c in CATEGORIES if f"score_{c}" in present}
+        if scores:
+            evaluation["scores"] = scores
+        justifications = {
+            c: row[f"justification_{c}"] for c in CATEGORIES if f"justification_{c}" in present
+        }
+        if justifications:
+            evaluation["justifications"] = justifications
+        if evaluation:
+            record["evaluation"] = evaluation
+        ground_truth = {
+            c: row[f"ground_truth_{c}"] for c in CATEGORIES if f"ground_truth_{c}" in present
+        }
+        if ground_truth:
+            record["ground_truth"] = ground_truth
+        metadata = json.loads(row["metadata"]) if row.get("metadata") else {}
+        metadata.update(
+            {
+                name: row[name]
+                for name in TIMING_COLUMNS
+                if name in present and row[name] is not None
+            }
+        )
+        if "timestamp" in present:
+            metadata["timestamp"] = row["timestamp"]
+        if metadata:
+            record["metadata"] = metadata
+        records.append(record)
+    return records
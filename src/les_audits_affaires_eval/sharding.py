@@ -0,0 +1,180 @@
+"""
+Multi-process sharded evaluation
+
+The dataset is split into contiguous index ranges, one per worker process. Each
+shard runs its own event loop and appends to its own detailed results file under
+`<RESULTS_DIR>/shards/shard-XX/`; the parent then merges the shards into the
+usual detailed/summary/CSV outputs. Workers are spawned and configured through
+the environment (like the benchmark levels), and their rate limiters share
+state files so MODEL_RATE_LIMIT / JUDGE_RATE_LIMIT hold for the whole run.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from .config import BATCH_SIZE, CONCURRENT_REQUESTS, RESULTS_DIR
+from .detailed_store import DetailedStore
+
+logger = logging.getLogger(__name__)
+
+SHARDS_DIR = "shards"
+
+
+def shard_ranges(total: int, shards: int) -> List[Tuple[int, int]]:
+    """Split `range(total)` into `shards` contiguous (start, end) ranges of near-equal size"""
+    shards = max(1, min(shards, total))
+    size, extra = divmod(total, shards)
+    ranges = []
+    start = 0
+    for shard_id in range(shards):
+        end = start + size + (1 if shard_id < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def shard_dir(shard_id: int, results_dir: str = RESULTS_DIR) -> str:
+    return os.path.join(results_dir, SHARDS_DIR, f"shard-{shard_id:02d}")
+
+
+def _count_results(results_dir: str) -> int:
+    return len(DetailedStore(results_dir).index())
+
+
+def _run_shard(
+    samples: List[Dict[str, Any]],
+    start_idx: int,
+    use_chat_endpoint: bool,
+    use_strict_mode: bool,
+) -> None:
+    """Child process: evaluate one shard into its own detailed results file"""
+    import asyncio
+
+    from .cassette import cassette_from_env, maybe_activate
+    from .evaluator import LesAuditsAffairesEvaluator
+
+    # Progress is reported by the parent; keep shard consoles quiet
+    for handler in logging.getLogger().handlers:
+        if not isinstance(handler, logging.FileHandler):
+            handler.setLevel(logging.WARNING)
+
+    evaluator = LesAuditsAffairesEvaluator(
+        use_chat_endpoint=use_chat_endpoint, use_strict_mode=use_strict_mode, metrics_file=None
+    )
+
+    async def run():
+        async with evaluator._create_model_client() as model_client:
+            evaluator.model_client = model_client
+            for batch_start in range(0, len(samples), BATCH_SIZE):
+                await evaluator.evaluate_batch(
+                    samples[batch_start : batch_start + BATCH_SIZE], start_idx + batch_start
+                )
+
+    with maybe_activate(cassette_from_env()):
+        asyncio.run(run())
+
+
+def merge_shards(results_dir: str = RESULTS_DIR) -> List[Dict[str, Any]]:
+    """Read every shard's detailed results, ordered by sample index"""
+    root = os.path.join(results_dir, SHARDS_DIR)
+    results = []
+    if not os.path.isdir(root):
+        return results
+    for name in sorted(os.listdir(root)):
+        results.extend(DetailedStore(os.path.join(root, name)))
+    results.sort(key=lambda result: result["sample_idx"])
+    return results
+
+
+def run_sharded_evaluation(
+    evaluator,
+    shards: int,
+    max_samples: Optional[int] = None,
+    start_from: int = 0,
+    extra_env: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """Evaluate with `shards` worker processes, then merge into the usual outputs
+
+    CONCURRENT_REQUESTS is split across shards so the total number of requests in
+    flight stays the same as a single-process run.
+    """
+    run_start_time = time.time()
+    dataset = evaluator.load_dataset()[start_from:]
+    if max_samples:
+        dataset = dataset[:max_samples]
+    ranges = shard_ranges(len(dataset), shards)
+    logger.info(
+        f"Processing {len(dataset)} samples in {len(ranges)} shards "
+        f"(starting from index {start_from})"
+    )
+
+    shards_root = os.path.join(RESULTS_DIR, SHARDS_DIR)
+    shutil.rmtree(shards_root, ignore_errors=True)
+    per_shard_concurrency = max(1, -(-CONCURRENT_REQUESTS // len(ranges)))
+
+    ctx = mp.get_context("spawn")
+    processes = []
+    saved = dict(os.environ)
+    try:
+        for shard_id, (start, end) in enumerate(ranges):
+            os.environ.update(
+                {
+                    "RESULTS_DIR": shard_dir(shard_id),
+                    "RATE_LIMIT_DIR": shards_root,
+                    "CONCURRENT_REQUESTS": str(per_shard_concurrency),
+                    "METRICS_FILE": "",
+                    "TQDM_DISABLE": "1",
+                    **(extra_env or {}),
+                }
+            )
+            process = ctx.Process(
+                target=_run_shard,
+                args=(
+                    dataset[start:end],
+                    start_from + start,
+                    evaluator.use_chat_endpoint,
+                    evaluator.use_strict_mode,
+                ),
+                name=f"shard-{shard_id:02d}",
+            )
+            process.start()
+            processes.append(process)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+    shard_dirs = [shard_dir(i) for i in range(len(ranges))]
+    with tqdm(total=len(dataset), desc=f"Evaluating ({len(ranges)} shards)") as progress:
+        while any(process.is_alive() for process in processes):
+            time.sleep(1)
+            progress.update(sum(map(_count_results, shard_dirs)) - progress.n)
+        progress.update(sum(map(_count_results, shard_dirs)) - progress.n)
+
+    for process in processes:
+        process.join()
+        if process.exitcode != 0:
+            logger.error(f"{process.name} exited with code {process.exitcode}")
+
+    all_results = merge_shards()
+    missing = len(dataset) - len(all_results)
+    if missing:
+        logger.warning(f"{missing} samples missing after merge (see failed shards above)")
+
+    # Shard results only cover this run's range; keep earlier results when resuming
+    if start_from > 0:
+        covered = {result["sample_idx"] for result in all_results}
+        existing = [r for r in evaluator.load_existing_results() if r["sample_idx"] not in covered]
+        all_results = sorted(existing + all_results, key=lambda result: result["sample_idx"])
+
+    evaluator.rewrite_detailed_results(all_results)
+    final_results = evaluator.compute_final_metrics(
+        all_results, wall_time=time.time() - run_start_time
+    )
+    evaluator.save_final_results(final_results, all_results)
+    return final_results
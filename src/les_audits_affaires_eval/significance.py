@@ -0,0 +1,115 @@
+"""
+Bootstrap confidence intervals and paired permutation tests
+
+Both run in bulk with NumPy. A bootstrap draws a seeded (resamples x samples)
+matrix of resampling indices, turns it into per-resample counts and gets every
+resampled mean of every score column from one matrix product. A paired
+permutation test flips the sign of each paired difference at random, which is
+again one matrix product for all resamples and all pairs at once. Resamples
+are processed in blocks so memory stays bounded for large runs.
+"""
+
+import warnings
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from .config import BOOTSTRAP_CONFIDENCE, BOOTSTRAP_RESAMPLES, BOOTSTRAP_SEED
+
+# Elements of the (resamples, samples) block drawn per step
+_BLOCK_ELEMENTS = 1 << 23
+
+
+def _as_columns(values: np.ndarray) -> Tuple[np.ndarray, bool]:
+    values = np.asarray(values, dtype=np.float64)
+    return (values[:, None], True) if values.ndim == 1 else (values, False)
+
+
+def _block_rows(n_samples: int) -> int:
+    return max(1, _BLOCK_ELEMENTS // max(1, n_samples))
+
+
+def bootstrap_means(
+    scores: np.ndarray, resamples: int = BOOTSTRAP_RESAMPLES, seed: int = BOOTSTRAP_SEED
+) -> np.ndarray:
+    """Column means of `scores` (samples x columns) over bootstrap resamples of its rows
+
+    NaN entries are left out of their column's mean. Returns a
+    (resamples, columns) array, or (resamples,) for a 1-D input.
+    """
+    scores, flat = _as_columns(scores)
+    n_samples = scores.shape[0]
+    means = np.full((resamples, scores.shape[1]), np.nan)
+    if n_samples:
+        present = (~np.isnan(scores)).astype(np.float64)
+        filled = np.nan_to_num(scores)
+        rng = np.random.default_rng(seed)
+        step = _block_rows(n_samples)
+        offsets = np.arange(step, dtype=np.int64)[:, None] * n_samples
+        for start in range(0, resamples, step):
+            rows = min(step, resamples - start)
+            indices = rng.integers(0, n_samples, (rows, n_samples), dtype=np.int32)
+            counts = np.bincount(
+                (indices + offsets[:rows]).ravel(), minlength=rows * n_samples
+            ).reshape(rows, n_samples)
+            counts = counts.astype(np.float64)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means[start : start + rows] = (counts @ filled) / (counts @ present)
+    return means[:, 0] if flat else means
+
+
+def bootstrap_ci(
+    scores: np.ndarray,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    confidence: float = BOOTSTRAP_CONFIDENCE,
+    seed: int = BOOTSTRAP_SEED,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Percentile bootstrap interval (low, high) of the mean of each column"""
+    means = bootstrap_means(scores, resamples, seed)
+    tail = (1 - confidence) / 2 * 100
+    with warnings.catch_warnings():
+        # Columns without any score give NaN bounds
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low, high = np.nanpercentile(means, [tail, 100 - tail], axis=0)
+    return low, high
+
+
+def paired_permutation_test(
+    differences: np.ndarray, resamples: int = BOOTSTRAP_RESAMPLES, seed: int = BOOTSTRAP_SEED
+) -> np.ndarray:
+    """Two-sided p-values of paired differences (samples x pairs) having a zero mean
+
+    Each resample flips the sign of every paired difference at random. NaN
+    differences (sample missing on one side) are left out. Returns one p-value
+    per pair, NaN for pairs without a common sample, or a scalar for a 1-D input.
+    """
+    differences, flat = _as_columns(differences)
+    n_samples, n_pairs = differences.shape
+    filled = np.nan_to_num(differences)
+    observed = np.abs(filled.sum(axis=0))
+    # Sums of small integer-valued scores are exact; the margin only absorbs rounding
+    threshold = observed - 1e-9 * np.maximum(1.0, observed)
+    extreme = np.zeros(n_pairs, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    step = _block_rows(n_samples)
+    for start in range(0, resamples, step):
+        rows = min(step, resamples - start)
+        signs = rng.integers(0, 2, (rows, n_samples), dtype=np.int8) * 2 - 1
+        extreme += (np.abs(signs.astype(np.float64) @ filled) >= threshold).sum(axis=0)
+    p_values = (extreme + 1) / (resamples + 1)
+    p_values[np.isnan(differences).all(axis=0)] = np.nan
+    return p_values[0] if flat else p_values
+
+
+def bootstrap_settings(
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    confidence: float = BOOTSTRAP_CONFIDENCE,
+    seed: int = BOOTSTRAP_SEED,
+) -> Dict[str, Any]:
+    """Settings recorded next to the intervals in a summary"""
+    return {
+        "method": "percentile bootstrap",
+        "resamples": resamples,
+        "confidence": confidence,
+        "seed": seed,
+    }
@@ -0,0 +1,107 @@
+"""
+Sample-level status taxonomy for evaluation results
+
+Every result record carries a `status` (one of the constants below) and a
+`failure_stage` ("generation", "judge" or None) so failed samples can be
+re-run for the stage that actually failed. Records written before these fields
+existed are classified from their legacy sentinel strings.
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, Optional
+
+STATUS_OK = "ok"
+
+# Generation stage – the model under evaluation failed
+GENERATION_ERROR = "generation_error"
+TIMEOUT = "timeout"
+REPETITION_ABORT = "repetition_abort"
+
+# Judge stage – the response exists but could not be (fully) scored
+JUDGE_ERROR = "judge_error"
+PARSE_ERROR = "parse_error"
+PARTIAL_RUBRIC = "partial_rubric"
+
+GENERATION_FAILURES = (GENERATION_ERROR, TIMEOUT, REPETITION_ABORT)
+JUDGE_FAILURES = (JUDGE_ERROR, PARSE_ERROR, PARTIAL_RUBRIC)
+FAILURE_STATUSES = GENERATION_FAILURES + JUDGE_FAILURES
+
+STAGE_GENERATION = "generation"
+STAGE_JUDGE = "judge"
+
+# Legacy sentinels written before structured statuses existed
+FAILED_JUSTIFICATION = "Évaluation échouée"
+GENERATION_ERROR_PREFIX = "ERROR:"
+
+
+def failure_stage(status: str) -> Optional[str]:
+    """Return the pipeline stage responsible for `status` (None when ok)"""
+    if status in GENERATION_FAILURES:
+        return STAGE_GENERATION
+    if status in JUDGE_FAILURES:
+        return STAGE_JUDGE
+    return None
+
+
+def classify_exception(exc: BaseException) -> str:
+    """Map a generation exception to `timeout` or `generation_error`"""
+    # tenacity wraps the last failure in a RetryError once attempts are exhausted
+    last_attempt = getattr(exc, "last_attempt", None)
+    if last_attempt is not None and last_attempt.exception() is not None:
+        exc = last_attempt.exception()
+
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+        return TIMEOUT
+    try:
+        import requests
+
+        if isinstance(exc, requests.Timeout):
+            return TIMEOUT
+    except ImportError:  # pragma: no cover
+        pass
+    return GENERATION_ERROR
+
+
+def evaluation_status(evaluation: Dict[str, Any]) -> str:
+    """Status of a judge result (explicit field first, legacy sentinels otherwise)"""
+    if not evaluation:
+        return JUDGE_ERROR
+    if evaluation.get("status"):
+        return evaluation["status"]
+    justifications = evaluation.get("justifications", {}) or {}
+    if evaluation.get("score_global", 0) == 0 and any(
+        "échouée" in str(j).lower() for j in justifications.values()
+    ):
+        return JUDGE_ERROR
+    return STATUS_OK
+
+
+def result_status(result: Dict[str, Any]) -> str:
+    """Status of a detailed result record, inferring it for legacy records"""
+    if result.get("status"):
+        return result["status"]
+    response = result.get("model_response", result.get("response", "")) or ""
+    if response.startswith(GENERATION_ERROR_PREFIX):
+        error = str(result.get("metadata", {}).get("error", response)).lower()
+        return TIMEOUT if "timeout" in error or "timed out" in error else GENERATION_ERROR
+    if response == FAILED_JUSTIFICATION:
+        return JUDGE_ERROR
+    return evaluation_status(result.get("evaluation", {}))
+
+
+def select_statuses(stage: Optional[str] = None, statuses: Optional[Iterable[str]] = None) -> tuple:
+    """Failure classes targeted by a re-run (`stage` and `statuses` intersect)"""
+    if stage == STAGE_GENERATION:
+        selected = GENERATION_FAILURES
+    elif stage == STAGE_JUDGE:
+        selected = JUDGE_FAILURES
+    elif stage is None:
+        selected = FAILURE_STATUSES
+    else:
+        raise ValueError(f"Unknown stage: {stage}. Available: {STAGE_GENERATION}, {STAGE_JUDGE}")
+    if statuses:
+        unknown = set(statuses) - set(FAILURE_STATUSES)
+        if unknown:
+            raise ValueError(f"Unknown failure status: {sorted(unknown)}")
+        selected = tuple(s for s in selected if s in set(statuses))
+    return selected
@@ -0,0 +1,211 @@
+"""
+Difficulty / diversity index of the dataset and representative subsets
+
+The index gives every sample:
+- a question cluster: spherical k-means over hashed TF-IDF word vectors of
+  the questions, in NumPy;
+- a difficulty (100 minus the mean global score across the models under
+  `results/`) and a discrimination (std of that score across models), when
+  historical results exist.
+
+A named subset such as `fast-100` takes its samples from every cluster x
+difficulty-band cell in proportion to the cell size, preferring the most
+discriminating samples of each cell, with a seeded tie-break so the same index
+always gives the same subset. Its correlation with the full-run score across
+the historical models is stored with it.
+"""
+
+import logging
+import math
+import re
+import warnings
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .config import DATASET_NAME, DIFFICULTY_INDEX_FILE
+from .serialization import dump_file, load_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUBSETS = ("fast-100",)
+
+_FEATURES = 1 << 11
+_WORD = re.compile(r"\w{3,}")
+_DIFFICULTY_BANDS = 3
+_KMEANS_ITERATIONS = 25
+
+
+def subset_size(name: str) -> int:
+    """Number of samples of a named subset (`fast-<N>`)"""
+    match = re.fullmatch(r"fast-(\d+)", name)
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Unknown subset {name!r}, expected fast-<N> (e.g. fast-100)")
+    return int(match.group(1))
+
+
+def question_vectors(questions: Sequence[str]) -> np.ndarray:
+    """L2-normalized hashed TF-IDF vectors of the questions (samples x features)"""
+    counts = np.zeros((len(questions), _FEATURES), dtype=np.float32)
+    for row, question in enumerate(questions):
+        for word in _WORD.findall((question or "").lower()):
+            counts[row, zlib.crc32(word.encode()) % _FEATURES] += 1
+    document_frequency = (counts > 0).sum(axis=0)
+    vectors = np.log1p(counts) * np.log((1 + len(questions)) / (1 + document_frequency) + 1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
+
+
+def cluster_questions(questions: Sequence[str], clusters: int = 10, seed: int = 0) -> np.ndarray:
+    """Cluster label of each question (spherical k-means, k-means++ seeding)"""
+    vectors = question_vectors(questions)
+    n_samples = len(vectors)
+    clusters = max(1, min(clusters, n_samples))
+    if n_samples == 0:
+        return np.empty(0, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    centers = [vectors[rng.integers(n_samples)]]
+    distance = 1 - vectors @ centers[0]
+    for _ in range(1, clusters):
+        weights = np.clip(distance, 0, None)
+        total = weights.sum()
+        pick = rng.choice(n_samples, p=weights / total) if total > 0 else rng.integers(n_samples)
+        centers.append(vectors[pick])
+        distance = np.minimum(distance, 1 - vectors @ vectors[pick])
+    centers = np.stack(centers)
+
+    labels = np.full(n_samples, -1)
+    for _ in range(_KMEANS_ITERATIONS):
+        new_labels = (vectors @ centers.T).argmax(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for cluster in range(clusters):
+            members = vectors[labels == cluster]
+            if len(members):
+                center = members.sum(axis=0)
+                centers[cluster] = center / max(np.linalg.norm(center), 1e-12)
+    return labels
+
+
+def _history(n_samples: int, results_root: str):
+    """models x samples global score matrix of the models under `results_root`"""
+    from .compare import ScoreMatrix, find_models
+
+    matrix = ScoreMatrix.from_results(find_models(results_root))
+    scores = np.full((len(matrix.models), n_samples), np.nan, dtype=np.float32)
+    inside = matrix.sample_idx < n_samples
+    scores[:, matrix.sample_idx[inside]] = matrix.scores[:, inside]
+    return matrix.models, scores
+
+
+def select_subset(index: Dict[str, Any], size: int, seed: int = 0) -> List[int]:
+    """Sample indices of a stratified subset of `size` samples (sorted)"""
+    samples = index["samples"]
+    sample_idx = np.asarray(samples["sample_idx"])
+    size = min(size, len(sample_idx))
+    difficulty = np.array(samples["difficulty"], dtype=np.float64)
+    discrimination = np.array(samples["discrimination"], dtype=np.float64)
+
+    # Difficulty band from quantiles of the known difficulties, -1 without history
+    band = np.full(len(sample_idx), -1)
+    known = ~np.isnan(difficulty)
+    if known.any():
+        edges = np.quantile(difficulty[known], np.linspace(0, 1, _DIFFICULTY_BANDS + 1)[1:-1])
+        band[known] = np.searchsorted(edges, difficulty[known], side="right")
+    cells = np.asarray(samples["cluster"]) * (_DIFFICULTY_BANDS + 1) + band + 1
+    _, cell_of, cell_sizes = np.unique(cells, return_inverse=True, return_counts=True)
+
+    # Proportional allocation, largest remainders first
+    quota = cell_sizes * size / len(sample_idx)
+    allocation = np.floor(quota).astype(np.int64)
+    short = size - allocation.sum()
+    allocation[np.argsort(-(quota - allocation), kind="stable")[:short]] += 1
+
+    # Within a cell: most discriminating first, then a seeded random tie-break
+    tie_break = np.random.default_rng(seed).random(len(sample_idx))
+    preference = np.lexsort((tie_break, -np.nan_to_num(discrimination, nan=-1.0), cell_of))
+    rank_in_cell = np.empty(len(sample_idx), dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(cell_sizes)[:-1]])
+    rank_in_cell[preference] = np.arange(len(sample_idx)) - starts[cell_of[preference]]
+    chosen = rank_in_cell < allocation[cell_of]
+    return sorted(sample_idx[chosen].tolist())
+
+
+def subset_correlation(history: np.ndarray, subset: Sequence[int]) -> Optional[float]:
+    """Pearson correlation, across models, of the subset mean with the full mean"""
+    covered = ~np.isnan(history).all(axis=1)
+    if covered.sum() < 3:
+        return None
+    with warnings.catch_warnings():
+        # Models without any score in the subset give NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        full = np.nanmean(history[covered], axis=1)
+        partial = np.nanmean(history[covered][:, list(subset)], axis=1)
+    both = ~np.isnan(full) & ~np.isnan(partial)
+    if both.sum() < 3 or np.std(full[both]) == 0 or np.std(partial[both]) == 0:
+        return None
+    return float(np.corrcoef(full[both], partial[both])[0, 1])
+
+
+def build_difficulty_index(
+    questions: Sequence[str],
+    results_root: str = "results",
+    clusters: int = 10,
+    seed: int = 0,
+    subsets: Sequence[str] = DEFAULT_SUBSETS,
+) -> Dict[str, Any]:
+    """Index of `questions` (dataset order) with the named subsets precomputed"""
+    models, history = _history(len(questions), results_root)
+    with warnings.catch_warnings():
+        # Samples no model has a score for get NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean_scores = np.nanmean(history, axis=0) if models else np.full(len(questions), np.nan)
+        discrimination = np.nanstd(history, axis=0) if models else np.full(len(questions), np.nan)
+    index = {
+        "dataset": DATASET_NAME,
+        "built_at": datetime.utcnow().isoformat(),
+        "sample_count": len(questions),
+        "models": models,
+        "clusters": clusters,
+        "seed": seed,
+        "samples": {
+            "sample_idx": list(range(len(questions))),
+            "cluster": cluster_questions(questions, clusters, seed).tolist(),
+            "difficulty": [_number(100 - score) for score in mean_scores],
+            "discrimination": [_number(value) for value in discrimination],
+            "models_scored": (~np.isnan(history)).sum(axis=0).tolist(),
+        },
+        "subsets": {},
+    }
+    for name in subsets:
+        subset = select_subset(index, subset_size(name), seed)
+        index["subsets"][name] = {
+            "sample_idx": subset,
+            "correlation_with_full": subset_correlation(history, subset),
+        }
+    logger.info(
+        f"Difficulty index: {len(questions)} samples, {clusters} clusters, {len(models)} models"
+    )
+    return index
+
+
+def _number(value: float) -> Optional[float]:
+    return None if math.isnan(value) else float(value)
+
+
+def save_index(index: Dict[str, Any], path: str = DIFFICULTY_INDEX_FILE):
+    dump_file(index, path)
+
+
+def load_index(path: str = DIFFICULTY_INDEX_FILE) -> Dict[str, Any]:
+    return load_file(path)
+
+
+def subset_indices(name: str, index: Dict[str, Any]) -> List[int]:
+    """Sample indices of a named subset, precomputed in `index` or selected from it"""
+    if name in index.get("subsets", {}):
+        return list(index["subsets"][name]["sample_idx"])
+    return select_subset(index, subset_size(name), index.get("seed", 0))
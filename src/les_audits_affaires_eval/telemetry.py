@@ -0,0 +1,272 @@
+"""
+Token accounting and cost telemetry for generation and judge calls
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens: (input, cached input, output). Override or extend with a JSON
+# file pointed to by PRICE_TABLE_FILE: {"model": [input, cached_input, output], ...},
+# or {"model": "priced model"} to alias an id (e.g. an Azure deployment name).
+PRICE_TABLE = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "mistral-large-latest": (2.00, 2.00, 6.00),
+    "mistral-small-latest": (0.20, 0.20, 0.60),
+    "claude-3-5-sonnet-20241022": (3.00, 0.30, 15.00),
+    "claude-3-5-haiku-20241022": (0.80, 0.08, 4.00),
+    "gemini-1.5-pro": (1.25, 0.3125, 5.00),
+    "gemini-1.5-flash": (0.075, 0.01875, 0.30),
+}
+
+# Model ids billed like a PRICE_TABLE entry. Only exact or aliased ids are priced:
+# a prefix match would bill e.g. "gpt-4o-audio-preview" at the gpt-4o rate.
+PRICE_ALIASES = {
+    "gpt-4o-2024-08-06": "gpt-4o",
+    "gpt-4o-2024-11-20": "gpt-4o",
+    "gpt-4o-mini-2024-07-18": "gpt-4o-mini",
+    "gpt-4.1-2025-04-14": "gpt-4.1",
+    "gpt-4.1-mini-2025-04-14": "gpt-4.1-mini",
+    "mistral-large-2411": "mistral-large-latest",
+    "claude-3-5-sonnet-latest": "claude-3-5-sonnet-20241022",
+    "claude-3-5-haiku-latest": "claude-3-5-haiku-20241022",
+    "gemini-1.5-pro-002": "gemini-1.5-pro",
+    "gemini-1.5-flash-002": "gemini-1.5-flash",
+}
+
+# Anthropic bills prompt cache writes at 1.25x the input rate
+CACHE_WRITE_MULTIPLIER = 1.25
+
+_price_table_file = os.getenv("PRICE_TABLE_FILE")
+if _price_table_file:
+    try:
+        with open(_price_table_file, "r", encoding="utf-8") as _f:
+            for _model, _price in json.load(_f).items():
+                if isinstance(_price, str):
+                    PRICE_ALIASES[_model] = _price
+                else:
+                    PRICE_TABLE[_model] = tuple(_price)
+    except Exception as _e:  # pragma: no cover – bad user file should not break runs
+        logger.warning(f"Could not load price table {_price_table_file}: {_e}")
+
+
+class ModelResponse(str):
+    """Response text that also carries token usage and request latency
+
+    A `str` subclass so every caller treating responses as plain strings keeps
+    working; string methods (e.g. `.strip()`) return plain `str` again.
+    """
+
+    usage: Dict[str, int]
+    latency: Optional[float]
+    model: Optional[str]
+    repetition_abort: bool
+
+    def __new__(
+        cls,
+        text: str,
+        usage: Optional[Dict[str, int]] = None,
+        latency: Optional[float] = None,
+        model: Optional[str] = None,
+        repetition_abort: bool = False,
+    ):
+        obj = super().__new__(cls, text)
+        obj.usage = usage or {}
+        obj.latency = latency
+        obj.model = model
+        obj.repetition_abort = repetition_abort
+        return obj
+
+    def __reduce__(self):
+        return (
+            ModelResponse,
+            (str(self), self.usage, self.latency, self.model, self.repetition_abort),
+        )
+
+
+def _usage(prompt: Any = 0, completion: Any = 0, cached: Any = 0) -> Dict[str, int]:
+    return {
+        "prompt_tokens": int(prompt or 0),
+        "completion_tokens": int(completion or 0),
+        "cached_tokens": int(cached or 0),
+    }
+
+
+def usage_from_openai(usage: Any) -> Dict[str, int]:
+    """Usage of an OpenAI/Azure SDK response object or an OpenAI-style `usage` dict"""
+    if not usage:
+        return {}
+    if isinstance(usage, dict):
+        details = usage.get("prompt_tokens_details") or {}
+        return _usage(
+            usage.get("prompt_tokens"), usage.get("completion_tokens"), details.get("cached_tokens")
+        )
+    details = getattr(usage, "prompt_tokens_details", None)
+    return _usage(
+        getattr(usage, "prompt_tokens", 0),
+        getattr(usage, "completion_tokens", 0),
+        getattr(details, "cached_tokens", 0) if details else 0,
+    )
+
+
+def usage_from_anthropic(usage: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Usage of an Anthropic Messages response (input_tokens excludes cached tokens)"""
+    if not usage:
+        return {}
+    cache_read = usage.get("cache_read_input_tokens", 0) or 0
+    cache_write = usage.get("cache_creation_input_tokens", 0) or 0
+    result = _usage(
+        (usage.get("input_tokens", 0) or 0) + cache_read + cache_write,
+        usage.get("output_tokens"),
+        cache_read,
+    )
+    result["cache_creation_tokens"] = int(cache_write)
+    return result
+
+
+def usage_from_gemini(usage: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Usage of a Gemini generateContent response (`usageMetadata`)"""
+    if not usage:
+        return {}
+    return _usage(
+        usage.get("promptTokenCount"),
+        usage.get("candidatesTokenCount"),
+        usage.get("cachedContentTokenCount"),
+    )
+
+
+def usage_from_local(result: Any) -> Dict[str, int]:
+    """Best-effort usage of a local /generate or /chat endpoint response
+
+    Understands OpenAI-compatible `usage` (vLLM, SGLang, llama.cpp), TGI
+    `details` and flat `prompt_tokens` / `completion_tokens` style keys.
+    """
+    if not isinstance(result, dict):
+        return {}
+    if result.get("usage"):
+        return usage_from_openai(result["usage"])
+    details = result.get("details")
+    if isinstance(details, dict) and "generated_tokens" in details:
+        prefill = details.get("prefill")
+        return _usage(len(prefill) if isinstance(prefill, list) else 0, details["generated_tokens"])
+    completion = next(
+        (
+            result[k]
+            for k in ("completion_tokens", "generated_tokens", "num_generated_tokens", "tokens")
+            if isinstance(result.get(k), int)
+        ),
+        0,
+    )
+    prompt = next(
+        (result[k] for k in ("prompt_tokens", "input_tokens") if isinstance(result.get(k), int)),
+        0,
+    )
+    if not (prompt or completion):
+        return {}
+    return _usage(prompt, completion)
+
+
+def estimate_cost(model: Optional[str], usage: Dict[str, int]) -> Optional[float]:
+    """Estimated USD cost of `usage` for `model`, None when the model is not priced"""
+    if not model or not usage:
+        return None
+    prices = PRICE_TABLE.get(model) or PRICE_TABLE.get(PRICE_ALIASES.get(model, ""))
+    if prices is None:
+        return None
+    input_price, cached_price, output_price = prices
+    cached = usage.get("cached_tokens", 0)
+    cache_write = usage.get("cache_creation_tokens", 0)
+    uncached = max(usage.get("prompt_tokens", 0) - cached - cache_write, 0)
+    return (
+        uncached * input_price
+        + cached * cached_price
+        + cache_write * input_price * CACHE_WRITE_MULTIPLIER
+        + usage.get("completion_tokens", 0) * output_price
+    ) / 1_000_000
+
+
+def latency_percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean/max of a list of latencies in seconds"""
+    import numpy as np
+
+    if not values:
+        return {"p50": 0, "p95": 0, "p99": 0, "mean": 0, "max": 0}
+    arr = np.asarray(values, dtype=float)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "mean": float(arr.mean()),
+        "max": float(arr.max()),
+    }
+
+
+def _stage_summary(
+    usages: List[Dict[str, int]], latencies: List[float], model: Optional[str], wall_time: float
+) -> Dict[str, Any]:
+    totals = {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+    cost = 0.0
+    priced = False
+    for usage in usages:
+        for key in totals:
+            totals[key] += usage.get(key, 0) or 0
+        sample_cost = estimate_cost(model, usage)
+        if sample_cost is not None:
+            cost += sample_cost
+            priced = True
+    busy_time = sum(latencies)
+    return {
+        "model": model,
+        **totals,
+        "requests_with_usage": sum(1 for u in usages if u),
+        # Aggregate output throughput over the run, and per-request decode speed
+        "tokens_per_sec": totals["completion_tokens"] / wall_time if wall_time else 0,
+        "tokens_per_sec_per_request": totals["completion_tokens"] / busy_time if busy_time else 0,
+        "latency_s": latency_percentiles(latencies),
+        "cost_usd": round(cost, 6) if priced else None,
+    }
+
+
+def summarize_telemetry(
+    results: Iterable[Any],
+    generation_model: Optional[str] = None,
+    judge_model: Optional[str] = None,
+    wall_time: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Aggregate per-sample usage and latencies into the run-level telemetry block
+
+    `results` are detailed result dicts or `SampleResult` records.
+    """
+    generation_usages, judge_usages = [], []
+    generation_latencies, judge_latencies = [], []
+    sample_count = 0
+    for result in results:
+        sample_count += 1
+        metadata = (result.get("metadata") if isinstance(result, dict) else result.metadata) or {}
+        generation_usages.append(metadata.get("generation_usage") or {})
+        judge_usages.append(metadata.get("judge_usage") or {})
+        if metadata.get("generation_time"):
+            generation_latencies.append(metadata["generation_time"])
+        if metadata.get("evaluation_time"):
+            judge_latencies.append(metadata["evaluation_time"])
+
+    wall_time = wall_time or 0
+    generation = _stage_summary(
+        generation_usages, generation_latencies, generation_model, wall_time
+    )
+    judge = _stage_summary(judge_usages, judge_latencies, judge_model, wall_time)
+    costs = [c for c in (generation["cost_usd"], judge["cost_usd"]) if c is not None]
+    return {
+        "wall_time_s": wall_time,
+        "samples_per_sec": sample_count / wall_time if wall_time else 0,
+        "generation": generation,
+        "judge": judge,
+        "total_cost_usd": round(sum(costs), 6) if costs else None,
+    }
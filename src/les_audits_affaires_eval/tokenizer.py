@@ -0,0 +1,109 @@
+"""
+Local token counting, with tiktoken when installed
+
+`get_tokenizer()` returns a cached tokenizer with `encode`, `decode` and
+`count`. TOKENIZER names a tiktoken encoding ("auto" = o200k_base, the GPT-4o
+family encoding, when `tiktoken` is installed). Without tiktoken, or with
+TOKENIZER=approx, a token is approximated by a 4-character chunk, which
+round-trips exactly and is close to the average for French text; it also
+stands in when a tokenizer fails to load. A path to a Hugging Face
+`tokenizer.json` (TOKENIZER_FILE, for the evaluated model) is loaded with the
+`tokenizers` package.
+"""
+
+import functools
+import logging
+from typing import List, Sequence
+
+from .config import TOKENIZER
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+
+
+class ApproxTokenizer:
+    """4-character chunks standing in for tokens"""
+
+    name = "approx"
+    chars_per_token = 4
+
+    def encode(self, text: str) -> List[str]:
+        step = self.chars_per_token
+        return [text[i : i + step] for i in range(0, len(text), step)]
+
+    def decode(self, tokens: Sequence[str]) -> str:
+        return "".join(tokens)
+
+    def count(self, text: str) -> int:
+        return -(-len(text) // self.chars_per_token)
+
+
+class TiktokenTokenizer:
+    """A tiktoken encoding"""
+
+    def __init__(self, encoding: str = DEFAULT_ENCODING):
+        try:
+            import tiktoken
+        except ImportError as e:
+            raise ImportError(
+                f"TOKENIZER={encoding} needs the tiktoken package: pip install tiktoken"
+            ) from e
+
+        self.name = encoding
+        self._encoding = tiktoken.get_encoding(encoding)
+
+    def encode(self, text: str) -> List[int]:
+        # Special-token markers in model output are plain text here
+        return self._encoding.encode(text, disallowed_special=())
+
+    def decode(self, tokens: Sequence[int]) -> str:
+        return self._encoding.decode(list(tokens))
+
+    def count(self, text: str) -> int:
+        return len(self.encode(text))
+
+
+class HFTokenizer:
+    """A Hugging Face tokenizer file (tokenizer.json)"""
+
+    def __init__(self, path: str):
+        try:
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(
+                f"Tokenizer file {path} needs the tokenizers package: pip install tokenizers"
+            ) from e
+
+        self.name = path
+        self._tokenizer = Tokenizer.from_file(path)
+
+    def encode(self, text: str) -> List[int]:
+        return self._tokenizer.encode(text, add_special_tokens=False).ids
+
+    def decode(self, tokens: Sequence[int]) -> str:
+        return self._tokenizer.decode(list(tokens), skip_special_tokens=False)
+
+    def count(self, text: str) -> int:
+        return len(self.encode(text))
+
+
+@functools.lru_cache(maxsize=None)
+def get_tokenizer(name: str = TOKENIZER):
+    """Tokenizer named `name` (auto, approx, a tiktoken encoding or a tokenizer.json), built once
+
+    Falls back to the approximation when the tokenizer cannot be loaded: missing
+    package, or an encoding tiktoken cannot download (offline and replayed runs).
+    """
+    if name == "approx":
+        return ApproxTokenizer()
+    try:
+        if name.endswith(".json"):
+            return HFTokenizer(name)
+        return TiktokenTokenizer(DEFAULT_ENCODING if name == "auto" else name)
+    except ImportError as e:
+        if name != "auto":
+            logger.warning(f"{e}; counting tokens approximately")
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer {name} ({e}); counting tokens approximately")
+    return ApproxTokenizer()
@@ -0,0 +1,301 @@
+"""
+Optional tracing spans for the evaluation pipeline
+
+Spans follow the OpenTelemetry data model (trace/span ids, parent links,
+attributes, events, status) without depending on the SDK. Finished spans are
+exported either as OTLP/JSON `ExportTraceServiceRequest` lines (one batch per
+line, readable by the OpenTelemetry collector's file receiver, Jaeger or
+otel-desktop-viewer) or as one-line summaries on the console.
+
+Tracing is off unless `TRACING_EXPORTER` is set (or `configure_tracing` is
+called); when off, `span()` returns a shared no-op span and records nothing.
+"""
+
+import atexit
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import TRACE_FILE, TRACING_EXPORTER
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "les-audits-affaires-eval"
+SCOPE_NAME = "les_audits_affaires_eval"
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class Span:
+    """A timed operation with attributes; use through `span()`"""
+
+    recording = True
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent else ""
+        self.attributes = dict(attributes)
+        self.events: List[Dict[str, Any]] = []
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.events.append(
+            {"name": name, "time_ns": time.time_ns(), "attributes": dict(attributes or {})}
+        )
+
+    def record_exception(self, exc: BaseException):
+        self.add_event(
+            "exception", {"exception.type": type(exc).__name__, "exception.message": str(exc)}
+        )
+        self.status_code = STATUS_ERROR
+        self.status_message = str(exc)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON representation (ids hex-encoded, times as strings)"""
+        otlp = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            otlp["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            otlp["status"]["message"] = self.status_message
+        if self.events:
+            otlp["events"] = [
+                {
+                    "timeUnixNano": str(event["time_ns"]),
+                    "name": event["name"],
+                    "attributes": _otlp_attributes(event["attributes"]),
+                }
+                for event in self.events
+            ]
+        return otlp
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is off – every method is a no-op"""
+
+    recording = False
+    duration = 0.0
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        pass
+
+    def record_exception(self, exc: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_NOOP_CONTEXT = nullcontext(NOOP_SPAN)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class ConsoleSpanExporter:
+    """Prints one line per finished span"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+
+    def export(self, spans: List[Span]):
+        for span in spans:
+            attributes = " ".join(f"{k}={v}" for k, v in span.attributes.items())
+            status = " ERROR" if span.status_code == STATUS_ERROR else ""
+            self.stream.write(
+                f"[trace {span.trace_id[:8]}] {span.name} {span.duration * 1000:.1f}ms"
+                f"{status} {attributes}\n"
+            )
+
+    def shutdown(self):
+        self.stream.flush()
+
+
+class OTLPJsonFileExporter:
+    """Appends finished spans to a file as OTLP/JSON lines, one request per batch"""
+
+    def __init__(self, path: str, batch_size: int = 256):
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer: List[Span] = []
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: List[Span]):
+        with self._lock:
+            self._buffer.extend(spans)
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": SCOPE_NAME},
+                            "spans": [span.to_otlp() for span in self._buffer],
+                        }
+                    ],
+                }
+            ]
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+        self._buffer = []
+
+    def shutdown(self):
+        with self._lock:
+            self._flush()
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("lae_current_span", default=None)
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter"""
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(
+        self, name: str, attributes: Optional[Dict[str, Any]] = None, parent: Any = None
+    ) -> Iterator[Any]:
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+        if not isinstance(parent, Span):
+            parent = _current_span.get()
+        span = Span(name, parent, attributes or {})
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            try:
+                self.exporter.export([span])
+            except Exception as e:  # tracing must never break an evaluation
+                logger.warning(f"Span export failed: {e}")
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def _create_exporter(exporter: Optional[str], path: Optional[str]):
+    if not exporter:
+        return None
+    exporter = exporter.lower()
+    if exporter == "console":
+        return ConsoleSpanExporter()
+    if exporter in ("otlp-json", "otlp", "file"):
+        return OTLPJsonFileExporter(path or TRACE_FILE)
+    raise ValueError(f"Unknown tracing exporter: {exporter}. Available: console, otlp-json")
+
+
+_tracer = Tracer(_create_exporter(TRACING_EXPORTER, TRACE_FILE))
+atexit.register(lambda: _tracer.shutdown())
+
+
+def configure_tracing(exporter: Optional[str] = None, path: Optional[str] = None) -> Tracer:
+    """(Re)configure the global tracer; `exporter=None` turns tracing off"""
+    global _tracer
+    _tracer.shutdown()
+    _tracer = Tracer(_create_exporter(exporter, path))
+    return _tracer
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, parent: Any = None):
+    """Context manager timing `name` as a child of `parent` (default: the current span)"""
+    if _tracer.exporter is None:
+        return _NOOP_CONTEXT
+    return _tracer.span(name, attributes, parent)
+
+
+def current_span():
+    """The innermost active span, or the no-op span"""
+    return _current_span.get() or NOOP_SPAN
+
+
+def trace_retry(retry_state) -> None:
+    """tenacity `before_sleep` hook recording retries on the current span"""
+    active = current_span()
+    if not active.recording:
+        return
+    outcome = retry_state.outcome
+    exc = outcome.exception() if outcome is not None else None
+    active.add_event(
+        "retry",
+        {
+            "retry.attempt": retry_state.attempt_number,
+            "exception.message": str(exc) if exc else "",
+        },
+    )
+    active.set_attribute("retry.attempt", retry_state.attempt_number + 1)
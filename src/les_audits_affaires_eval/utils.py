@@ -3,53 +3,167 @@ Utility functions for Les Audits-Affaires evaluation analysis
 """
 
 import json
+import multiprocessing as mp
 import os
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import seaborn as sns
-
-from .config import RESULTS_DIR
-
-
-def load_evaluation_results(results_file: Optional[str] = None) -> Dict[str, Any]:
-    """Load evaluation results from JSON file"""
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .config import OUTPUT_FILE, PARQUET_FILE, RESULTS_DIR, SUMMARY_FILE
+from .detailed_store import DetailedStore
+from .records import RUBRICS, rubric_values
+from .results_store import (
+    ANALYSIS_COLUMNS,
+    SCORE_COLUMNS,
+    TIMING_COLUMNS,
+    frame_to_records,
+    read_results_frame,
+)
+from .status import result_status
+
+
+def load_evaluation_results(
+    results_file: Optional[str] = None, columns: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Load evaluation results (summary + detailed records)
+
+    When the Parquet store sits next to the results file, detailed records are
+    rebuilt from it reading only `columns` (all by default, see ANALYSIS_COLUMNS).
+    Without the results file, they are read from the (possibly compressed)
+    detailed results store.
+    """
     if results_file is None:
-        results_file = os.path.join(RESULTS_DIR, "evaluation_results.json")
+        results_file = os.path.join(RESULTS_DIR, OUTPUT_FILE)
+
+    results_dir = os.path.dirname(results_file)
+    parquet_file = (
+        results_file
+        if results_file.endswith(".parquet")
+        else os.path.join(results_dir, PARQUET_FILE)
+    )
+    summary_file = os.path.join(results_dir, SUMMARY_FILE)
+    if os.path.exists(parquet_file) and os.path.exists(summary_file):
+        with open(summary_file, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+        frame = read_results_frame(parquet_file, columns)
+        results = {"summary": summary, "detailed_results": frame_to_records(frame)}
+        if set(SCORE_COLUMNS) <= set(frame.columns):
+            results["analysis_frame"] = AnalysisFrame(frame)
+        return results
+
+    store = DetailedStore(results_dir)
+    if not os.path.exists(results_file) and store.exists() and os.path.exists(summary_file):
+        with open(summary_file, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+        return {"summary": summary, "detailed_results": list(store)}
 
     with open(results_file, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def create_score_distribution_plot(
-    results: Dict[str, Any], save_path: Optional[str] = None
-) -> None:
-    """Create distribution plots for scores"""
-    detailed_results = results["detailed_results"]
+class AnalysisFrame:
+    """Scores and metadata of a results file as column arrays
+
+    Rows follow `detailed_results`. `scores` is an (n_samples, len(RUBRICS))
+    matrix in RUBRICS order (NaN where a rubric was not scored) and
+    `global_scores` the matching vector; `frame` holds them as `score_*` columns
+    next to sample_idx, question, status and timings.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame.reset_index(drop=True)
+        self.global_scores = self.frame["score_global"].to_numpy(dtype=float)
+        self.scores = self.frame[SCORE_COLUMNS[1:]].to_numpy(dtype=float)
+
+    @classmethod
+    def from_records(cls, detailed_results: List[Dict[str, Any]]) -> "AnalysisFrame":
+        """Build the frame in one pass over detailed result dicts"""
+        n = len(detailed_results)
+        scores = np.full((n, len(RUBRICS)), np.nan)
+        columns: Dict[str, Any] = {
+            name: np.full(n, np.nan) for name in ["score_global"] + TIMING_COLUMNS
+        }
+        for row, result in enumerate(detailed_results):
+            evaluation = result.get("evaluation") or {}
+            columns["score_global"][row] = evaluation.get("score_global", 0) or 0
+            scores[row] = rubric_values(evaluation.get("scores"), np.nan)
+            metadata = result.get("metadata") or {}
+            for name in TIMING_COLUMNS:
+                if metadata.get(name) is not None:
+                    columns[name][row] = metadata[name]
+        frame = pd.DataFrame(
+            {
+                "sample_idx": [result.get("sample_idx") for result in detailed_results],
+                "question": [result.get("question") for result in detailed_results],
+                "status": [result_status(result) for result in detailed_results],
+                **columns,
+            }
+        )
+        frame[SCORE_COLUMNS[1:]] = scores
+        return cls(frame)
 
-    # Extract scores
-    global_scores = [r["evaluation"]["score_global"] for r in detailed_results]
-    category_scores = {
-        "action_requise": [r["evaluation"]["scores"]["action_requise"] for r in detailed_results],
-        "delai_legal": [r["evaluation"]["scores"]["delai_legal"] for r in detailed_results],
-        "documents_obligatoires": [
-            r["evaluation"]["scores"]["documents_obligatoires"] for r in detailed_results
-        ],
-        "impact_financier": [
-            r["evaluation"]["scores"]["impact_financier"] for r in detailed_results
-        ],
-        "consequences_non_conformite": [
-            r["evaluation"]["scores"]["consequences_non_conformite"] for r in detailed_results
-        ],
-    }
-
-    # Create subplots
-    fig, axes = plt.subplots(2, 3, figsize=(15, 10))
-    fig.suptitle("Score Distributions - Les Audits-Affaires Evaluation", fontsize=16)
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def top_k(self, k: int, largest: bool = True) -> np.ndarray:
+        """Row positions of the `k` highest (or lowest) global scores, best first
+
+        `argpartition` selects them in linear time; only those k are sorted.
+        """
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=int)
+        keys = -self.global_scores if largest else self.global_scores
+        selected = np.argpartition(keys, k - 1)[:k]
+        return selected[np.argsort(keys[selected], kind="stable")]
+
+    def score_frame(self) -> pd.DataFrame:
+        """global_score and one column per rubric"""
+        frame = pd.DataFrame(self.scores, columns=list(RUBRICS))
+        frame.insert(0, "global_score", self.global_scores)
+        return frame
+
+    def histograms(self, bins: int = 20) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """(counts, bin edges) of the global score and of every rubric"""
+        histograms = {}
+        for name, values in self.score_frame().items():
+            values = values.to_numpy()
+            histograms[name] = np.histogram(values[~np.isnan(values)], bins=bins)
+        return histograms
+
+
+def analysis_frame(results: Dict[str, Any]) -> AnalysisFrame:
+    """The AnalysisFrame of `results`, built on first use and kept in the dict"""
+    if "analysis_frame" not in results:
+        results["analysis_frame"] = AnalysisFrame.from_records(results["detailed_results"])
+    return results["analysis_frame"]
+
+
+PLOT_FORMATS = ("png", "svg")
+PLOT_NAMES = ("score_distributions", "correlation_heatmap")
+
+
+def _new_figure(figsize: Tuple[float, float]) -> Figure:
+    """A figure on its own Agg canvas (no pyplot state, no display needed)"""
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _draw_score_distributions(
+    histograms: Dict[str, Tuple[np.ndarray, np.ndarray]], save_path: str, dpi: int
+) -> str:
+    figure = _new_figure((15, 10))
+    axes = figure.subplots(2, 3)
+    figure.suptitle("Score Distributions - Les Audits-Affaires Evaluation", fontsize=16)
 
     # Global score distribution
-    axes[0, 0].hist(global_scores, bins=20, alpha=0.7, color="blue")
+    axes[0, 0].stairs(*histograms["global_score"], fill=True, alpha=0.7, color="blue")
     axes[0, 0].set_title("Global Score Distribution")
     axes[0, 0].set_xlabel("Score")
     axes[0, 0].set_ylabel("Frequency")
@@ -58,65 +172,144 @@ def create_score_distribution_plot(
     positions = [(0, 1), (0, 2), (1, 0), (1, 1), (1, 2)]
     colors = ["red", "green", "orange", "purple", "brown"]
 
-    for i, (category, scores) in enumerate(category_scores.items()):
+    for i, category in enumerate(RUBRICS):
         row, col = positions[i]
-        axes[row, col].hist(scores, bins=20, alpha=0.7, color=colors[i])
+        axes[row, col].stairs(*histograms[category], fill=True, alpha=0.7, color=colors[i])
         axes[row, col].set_title(f'{category.replace("_", " ").title()}')
         axes[row, col].set_xlabel("Score")
         axes[row, col].set_ylabel("Frequency")
 
-    plt.tight_layout()
+    figure.tight_layout()
+    figure.savefig(save_path, dpi=dpi, bbox_inches="tight")
+    return save_path
 
-    if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
-    else:
-        plt.savefig(
-            os.path.join(RESULTS_DIR, "score_distributions.png"), dpi=300, bbox_inches="tight"
-        )
-
-    plt.show()
 
+def _draw_correlation_heatmap(correlation_matrix: pd.DataFrame, save_path: str, dpi: int) -> str:
+    figure = _new_figure((10, 8))
+    ax = figure.subplots()
+    sns.heatmap(
+        correlation_matrix,
+        annot=True,
+        cmap="coolwarm",
+        center=0,
+        square=True,
+        linewidths=0.5,
+        ax=ax,
+    )
+    ax.set_title("Score Correlation Matrix")
+    figure.tight_layout()
+    figure.savefig(save_path, dpi=dpi, bbox_inches="tight")
+    return save_path
 
-def create_correlation_heatmap(results: Dict[str, Any], save_path: Optional[str] = None) -> None:
-    """Create correlation heatmap between different score categories"""
-    detailed_results = results["detailed_results"]
 
-    # Create DataFrame
-    data = []
-    for result in detailed_results:
-        scores = result["evaluation"]["scores"]
-        data.append(
-            {
-                "global_score": result["evaluation"]["score_global"],
-                "action_requise": scores["action_requise"],
-                "delai_legal": scores["delai_legal"],
-                "documents_obligatoires": scores["documents_obligatoires"],
-                "impact_financier": scores["impact_financier"],
-                "consequences_non_conformite": scores["consequences_non_conformite"],
-            }
+def create_score_distribution_plot(
+    results: Dict[str, Any], save_path: Optional[str] = None, dpi: int = 300
+) -> str:
+    """Create distribution plots for scores, return the image path"""
+    if save_path is None:
+        save_path = os.path.join(RESULTS_DIR, "score_distributions.png")
+    return _draw_score_distributions(analysis_frame(results).histograms(bins=20), save_path, dpi)
+
+
+def create_correlation_heatmap(
+    results: Dict[str, Any], save_path: Optional[str] = None, dpi: int = 300
+) -> str:
+    """Create correlation heatmap between different score categories, return the image path"""
+    if save_path is None:
+        save_path = os.path.join(RESULTS_DIR, "correlation_heatmap.png")
+    return _draw_correlation_heatmap(analysis_frame(results).score_frame().corr(), save_path, dpi)
+
+
+def _plot_context():
+    """fork where available: workers inherit the imported modules instead of re-importing them"""
+    if "fork" in mp.get_all_start_methods():
+        return mp.get_context("fork")
+    return mp.get_context("spawn")
+
+
+def _plot_jobs(results: Dict[str, Any], output_dir: str, fmt: str) -> List[Tuple]:
+    """(draw function, data, path) for each plot; the data is small and picklable"""
+    if fmt not in PLOT_FORMATS:
+        raise ValueError(f"Unknown plot format {fmt!r}, expected one of {PLOT_FORMATS}")
+    frame = analysis_frame(results)
+    paths = [os.path.join(output_dir, f"{name}.{fmt}") for name in PLOT_NAMES]
+    return [
+        (_draw_score_distributions, frame.histograms(bins=20), paths[0]),
+        (_draw_correlation_heatmap, frame.score_frame().corr(), paths[1]),
+    ]
+
+
+def render_plots(
+    results: Dict[str, Any],
+    output_dir: str = RESULTS_DIR,
+    dpi: int = 300,
+    fmt: str = "png",
+    workers: Optional[int] = None,
+) -> List[str]:
+    """Render every analysis plot of `results` into `output_dir`
+
+    Statistics are computed here; the figures are drawn in up to `workers`
+    processes (one per CPU by default, inline when 1). Returns the image paths.
+    """
+    jobs = _plot_jobs(results, output_dir, fmt)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return [draw(data, path, dpi) for draw, data, path in jobs]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)), mp_context=_plot_context()
+    ) as pool:
+        futures = [pool.submit(draw, data, path, dpi) for draw, data, path in jobs]
+        return [future.result() for future in futures]
+
+
+def find_results_dirs(results_root: str = "results") -> List[str]:
+    """Model directories under `results_root` that hold evaluation results"""
+    if not os.path.isdir(results_root):
+        return []
+    found = []
+    for name in sorted(os.listdir(results_root)):
+        path = os.path.join(results_root, name)
+        has_parquet = os.path.exists(os.path.join(path, PARQUET_FILE)) and os.path.exists(
+            os.path.join(path, SUMMARY_FILE)
         )
+        if has_parquet or os.path.exists(os.path.join(path, OUTPUT_FILE)):
+            found.append(path)
+    return found
 
-    df = pd.DataFrame(data)
-
-    # Calculate correlation matrix
-    correlation_matrix = df.corr()
 
-    # Create heatmap
-    plt.figure(figsize=(10, 8))
-    sns.heatmap(
-        correlation_matrix, annot=True, cmap="coolwarm", center=0, square=True, linewidths=0.5
+def _render_directory(results_dir: str, dpi: int, fmt: str) -> List[str]:
+    results = load_evaluation_results(
+        os.path.join(results_dir, OUTPUT_FILE), columns=ANALYSIS_COLUMNS
     )
-    plt.title("Score Correlation Matrix")
-    plt.tight_layout()
-
-    if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
-    else:
-        plt.savefig(
-            os.path.join(RESULTS_DIR, "correlation_heatmap.png"), dpi=300, bbox_inches="tight"
-        )
-
-    plt.show()
+    return render_plots(results, results_dir, dpi=dpi, fmt=fmt, workers=1)
+
+
+def render_all_plots(
+    results_root: str = "results",
+    dpi: int = 300,
+    fmt: str = "png",
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Render the plots of every model directory under `results_root`, one process per model
+
+    Returns {directory: [image paths]} ({directory: error message} when it failed).
+    """
+    directories = find_results_dirs(results_root)
+    if not directories:
+        return {}
+    rendered: Dict[str, Any] = {}
+    workers = min(workers or os.cpu_count() or 1, len(directories))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_plot_context()) as pool:
+        futures = {
+            directory: pool.submit(_render_directory, directory, dpi, fmt)
+            for directory in directories
+        }
+        for directory, future in futures.items():
+            try:
+                rendered[directory] = future.result()
+            except Exception as e:
+                rendered[directory] = f"{type(e).__name__}: {e}"
+    return rendered
 
 
 def analyze_performance_by_category(results: Dict[str, Any]) -> pd.DataFrame:
@@ -154,23 +347,13 @@ def analyze_performance_by_category(results: Dict[str, Any]) -> pd.DataFrame:
 def find_challenging_samples(results: Dict[str, Any], n_samples: int = 10) -> List[Dict[str, Any]]:
     """Find the most challenging samples (lowest scores)"""
     detailed_results = results["detailed_results"]
-
-    # Sort by global score
-    sorted_results = sorted(detailed_results, key=lambda x: x["evaluation"]["score_global"])
-
-    return sorted_results[:n_samples]
+    return [detailed_results[i] for i in analysis_frame(results).top_k(n_samples, largest=False)]
 
 
 def find_best_samples(results: Dict[str, Any], n_samples: int = 10) -> List[Dict[str, Any]]:
     """Find the best performing samples (highest scores)"""
     detailed_results = results["detailed_results"]
-
-    # Sort by global score (descending)
-    sorted_results = sorted(
-        detailed_results, key=lambda x: x["evaluation"]["score_global"], reverse=True
-    )
-
-    return sorted_results[:n_samples]
+    return [detailed_results[i] for i in analysis_frame(results).top_k(n_samples)]
 
 
 def generate_analysis_report(results: Dict[str, Any], output_file: Optional[str] = None) -> str:
@@ -256,28 +439,20 @@ def export_results_to_excel(results: Dict[str, Any], output_file: str = None):
         summary_data = analyze_performance_by_category(results)
         summary_data.to_excel(writer, sheet_name="Summary", index=False)
 
-        # Detailed results
-        detailed_data = []
-        for result in results["detailed_results"]:
-            row = {
-                "Sample_ID": result["sample_idx"],
-                "Question": result["question"],
-                "Global_Score": result["evaluation"]["score_global"],
-                "Generation_Time": result["metadata"]["generation_time"],
-                "Evaluation_Time": result["metadata"]["evaluation_time"],
-            }
-
-            # Add category scores
-            for category, score in result["evaluation"]["scores"].items():
-                row[f"Score_{category}"] = score
-
-            # Add ground truth
-            for category, value in result["ground_truth"].items():
-                row[f"GT_{category}"] = value
-
-            detailed_data.append(row)
-
-        detailed_df = pd.DataFrame(detailed_data)
+        # Detailed results, built column by column from the analysis frame
+        frame = analysis_frame(results)
+        detailed_results = results["detailed_results"]
+        detailed_df = frame.frame[
+            ["sample_idx", "question", "score_global", "generation_time", "evaluation_time"]
+        ].set_axis(
+            ["Sample_ID", "Question", "Global_Score", "Generation_Time", "Evaluation_Time"],
+            axis=1,
+        )
+        for column, category in enumerate(RUBRICS):
+            detailed_df[f"Score_{category}"] = frame.scores[:, column]
+        ground_truth = [rubric_values(r.get("ground_truth")) for r in detailed_results]
+        for column, category in enumerate(RUBRICS):
+            detailed_df[f"GT_{category}"] = [values[column] for values in ground_truth]
         detailed_df.to_excel(writer, sheet_name="Detailed_Results", index=False)
 
         # Challenging samples
@@ -320,8 +495,7 @@ def main():
 
     if args.plots:
         print("Generating plots...")
-        create_score_distribution_plot(results)
-        create_correlation_heatmap(results)
+        render_plots(results)
 
     if args.report:
         print("Generating analysis report...")
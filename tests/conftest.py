@@ -0,0 +1,43 @@
+"""
+Shared test fixtures
+"""
+
+from typing import Any, Dict, Optional
+
+import pytest
+
+from les_audits_affaires_eval.records import RUBRICS
+
+
+def _make_result(
+    idx: int, score: float = 80.0, rubric_scores: Optional[Dict[str, float]] = None, **fields
+) -> Dict[str, Any]:
+    """Detailed result record as the evaluator writes it; `fields` replace top-level keys"""
+    record = {
+        "sample_idx": idx,
+        "question": f"Question {idx}",
+        "ground_truth": {rubric: f"attendu {rubric}" for rubric in RUBRICS},
+        "model_response": "réponse " * 50,
+        "status": "ok",
+        "failure_stage": None,
+        "evaluation": {
+            "score_global": score,
+            "scores": rubric_scores or {rubric: score for rubric in RUBRICS},
+            "justifications": {rubric: f"justification {rubric}" for rubric in RUBRICS},
+        },
+        "metadata": {
+            "generation_time": 1.5,
+            "evaluation_time": 0.5,
+            "total_time": 2.0,
+            "timestamp": "2026-01-01T00:00:00",
+            "judge_usage": {"prompt_tokens": 900},
+        },
+    }
+    record.update(fields)
+    return record
+
+
+@pytest.fixture
+def make_result():
+    """Factory of detailed result records: make_result(idx, score, rubric_scores, **fields)"""
+    return _make_result
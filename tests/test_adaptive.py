@@ -0,0 +1,47 @@
+"""
+Tests for adaptive early stopping
+"""
+
+import numpy as np
+
+from les_audits_affaires_eval.adaptive import RANK_SETTLED, AdaptiveStopping, stratified_order
+
+
+def test_stratified_order_keeps_strata_proportions_in_every_prefix():
+    """The order is a permutation and each prefix draws evenly from every length quantile."""
+    keys = np.random.default_rng(0).integers(10, 2000, 1000)
+    order = stratified_order(keys, strata=5, seed=3)
+    assert sorted(order.tolist()) == list(range(1000))
+    assert not np.array_equal(order, stratified_order(keys, strata=5, seed=4))
+
+    stratum = np.searchsorted(np.quantile(keys, [0.2, 0.4, 0.6, 0.8]), keys, side="right")
+    for prefix in (50, 100, 250):
+        counts = np.bincount(stratum[order[:prefix]], minlength=5)
+        assert counts.max() - counts.min() <= 2
+
+
+def test_stops_once_the_rank_is_settled_and_the_interval_holds(make_result):
+    """A model far from its neighbours stops at the first look, inside a valid interval."""
+    scores = np.clip(np.random.default_rng(1).normal(55, 25, 1000), 0, 100).round().tolist()
+    dataset = [{"question": "q" * (idx % 300)} for idx in range(1000)]
+    adaptive = AdaptiveStopping(target_width=2, reference_scores=[20, 30, 85], batch_size=20)
+    order = adaptive.order(dataset)
+
+    def results(indices):
+        return [make_result(int(idx), scores[idx]) for idx in indices]
+
+    for start in range(0, 1000, 20):
+        if adaptive.update(results(order[start : start + 20])):
+            break
+
+    summary = adaptive.summary()
+    assert summary["stopped_early"] and summary["stop_reason"] == RANK_SETTLED
+    assert summary["evaluated_samples"] == 100 and summary["rank_range"] == [2, 2]
+    low, high = summary["global_score_interval"]
+    assert low <= np.mean(scores) <= high and 30 < low and high < 85
+
+    exhaustive = AdaptiveStopping(target_width=0, batch_size=500)
+    exhaustive.order(dataset)
+    assert not exhaustive.update(results(range(500)))
+    assert exhaustive.update(results(range(500, 1000)))
+    assert exhaustive.interval()[1:] == (np.mean(scores), np.mean(scores))
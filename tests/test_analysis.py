@@ -0,0 +1,82 @@
+"""
+Tests for the vectorized analysis frame
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+from les_audits_affaires_eval.records import RUBRICS
+from les_audits_affaires_eval.results_store import ANALYSIS_COLUMNS, write_results_parquet
+from les_audits_affaires_eval.utils import (
+    analysis_frame,
+    find_best_samples,
+    find_challenging_samples,
+    load_evaluation_results,
+    render_all_plots,
+)
+
+
+def test_top_k_and_statistics_match_the_records(make_result):
+    """argpartition top-k returns the same samples as a full sort, scores line up by rubric."""
+    rng = np.random.default_rng(0)
+    records = [
+        make_result(idx, float(s), {rubric: (s + i) % 100 for i, rubric in enumerate(RUBRICS)})
+        for idx, s in enumerate(rng.integers(0, 100, 500))
+    ]
+    del records[3]["evaluation"]["scores"]["delai_legal"]
+    results = {"detailed_results": records}
+
+    by_score = sorted(records, key=lambda r: r["evaluation"]["score_global"])
+    scores = [r["evaluation"]["score_global"] for r in find_challenging_samples(results, 10)]
+    assert scores == [r["evaluation"]["score_global"] for r in by_score[:10]]
+    scores = [r["evaluation"]["score_global"] for r in find_best_samples(results, 10)]
+    assert scores == [r["evaluation"]["score_global"] for r in by_score[::-1][:10]]
+
+    frame = analysis_frame(results)
+    assert analysis_frame(results) is frame and frame.scores.shape == (500, len(RUBRICS))
+    assert math.isnan(frame.scores[3, RUBRICS.index("delai_legal")])
+    counts, _ = frame.histograms(bins=10)["delai_legal"]
+    assert counts.sum() == 499
+    assert frame.score_frame().corr().loc["global_score", "action_requise"] == 1.0
+
+
+def test_parquet_results_come_with_their_analysis_frame(tmp_path, make_result):
+    """Results loaded from the Parquet store reuse the columns they were read from."""
+    write_results_parquet(
+        [make_result(idx, float(idx * 10)) for idx in range(5)],
+        str(tmp_path / "detailed_results.parquet"),
+    )
+    (tmp_path / "evaluation_summary.json").write_text(json.dumps({"sample_count": 5}))
+
+    results = load_evaluation_results(
+        str(tmp_path / "evaluation_results.json"), columns=ANALYSIS_COLUMNS
+    )
+    frame = results["analysis_frame"]
+    assert frame.global_scores.tolist() == [0.0, 10.0, 20.0, 30.0, 40.0]
+    assert frame.frame["generation_time"].tolist() == [1.5] * 5
+    assert [r["sample_idx"] for r in find_best_samples(results, 2)] == [4, 3]
+
+
+def test_batch_renders_plots_for_every_model_directory(tmp_path, make_result):
+    """Each model directory gets its plots, headless, in the requested format."""
+    for model in ("model-a", "model-b"):
+        model_dir = tmp_path / model
+        model_dir.mkdir()
+        write_results_parquet(
+            [make_result(idx, float(idx)) for idx in range(20)],
+            str(model_dir / "detailed_results.parquet"),
+        )
+        (model_dir / "evaluation_summary.json").write_text(json.dumps({"sample_count": 20}))
+    (tmp_path / "not-a-model").mkdir()
+
+    rendered = render_all_plots(str(tmp_path), fmt="svg", workers=2)
+    assert sorted(rendered) == [str(tmp_path / "model-a"), str(tmp_path / "model-b")]
+    for paths in rendered.values():
+        assert [os.path.basename(path) for path in paths] == [
+            "score_distributions.svg",
+            "correlation_heatmap.svg",
+        ]
+        assert all(open(path).read().lstrip().startswith("<?xml") for path in paths)
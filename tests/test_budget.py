@@ -0,0 +1,65 @@
+"""
+Tests for the per-request completion budget
+"""
+
+from les_audits_affaires_eval.budget import TokenBudget, model_limits, record_response_lengths
+from les_audits_affaires_eval.records import SampleResult
+from les_audits_affaires_eval.tokenizer import ApproxTokenizer
+
+
+def test_budget_fits_the_context_window():
+    """The cap holds for short prompts; long prompts leave room in the window."""
+    tokenizer = ApproxTokenizer()
+    budget = TokenBudget("local", 32768, context_window=40000, tokenizer=tokenizer)
+    assert budget.completion_tokens("x" * 400) == 32768
+    # 20000 prompt tokens, 1000 of margin for the tokenizer gap
+    assert budget.completion_tokens("x" * 80000) == 19000
+    messages = [
+        {"role": "system", "content": "x" * 40000},
+        {"role": "user", "content": "x" * 40000},
+    ]
+    assert budget.completion_tokens(messages) == 40000 - 20008 - 1000
+    assert budget.completion_tokens("x" * 200000) == 1
+
+    # Known models: exact and aliased ids match, the output cap applies
+    assert model_limits("gpt-4o-2024-08-06") == (128_000, 16_384)
+    assert model_limits("claude-3-5-sonnet-latest") == (200_000, 8_192)
+    assert model_limits("claude-3-5-sonnet-20240620") == (200_000, 4_096)
+    assert model_limits("gpt-4o-audio-preview") == (None, None)
+    assert TokenBudget("gpt-4o-mini", 32768, tokenizer=tokenizer).completion_tokens("q") == 16384
+    assert TokenBudget("unknown", 4000, tokenizer=tokenizer).completion_tokens("x" * 10**6) == 4000
+    assert TokenBudget("local", 100, mode="off", context_window=10).completion_tokens("xx") == 100
+
+
+def test_learned_budget_from_past_runs(tmp_path):
+    """Recorded completion lengths cap later requests once there are enough of them."""
+    history = str(tmp_path / "response_lengths.json")
+    results = [
+        SampleResult(
+            idx,
+            "q",
+            None,
+            "r",
+            "ok",
+            metadata={
+                "generation_usage": {"completion_tokens": 900 + idx},
+                "judge_usage": {"completion_tokens": 300},
+            },
+        )
+        for idx in range(100)
+    ]
+    results.append(SampleResult(100, "q", None, "r", "generation_error", metadata={}))
+
+    recorded = record_response_lengths(
+        results, {"generation_usage": "local", "judge_usage": None}, path=history
+    )
+    assert recorded == {"local": 100}
+    budget = TokenBudget(
+        "local", 32768, mode="learned", tokenizer=ApproxTokenizer(), history_file=history
+    )
+    # 1.5 x the 99th percentile (998)
+    assert budget.learned_tokens == 1497 and budget.completion_tokens("q") == 1497
+
+    record_response_lengths(results, {"generation_usage": "local"}, path=history, keep=150)
+    fresh = TokenBudget("other", 32768, mode="learned", history_file=history)
+    assert fresh.learned_tokens is None and fresh.completion_tokens("q") == 32768
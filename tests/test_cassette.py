@@ -0,0 +1,55 @@
+"""
+Tests for HTTP record/replay cassettes
+"""
+
+import asyncio
+
+import aiohttp
+import pytest
+import requests
+
+from les_audits_affaires_eval.cassette import Cassette, CassetteMiss, request_key
+from les_audits_affaires_eval.mock_server import MockLLMServer, MockServerConfig
+
+
+async def _aiohttp_post(url, payload):
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, json=payload) as response:
+            return response.status, await response.json()
+
+
+def test_recorded_traffic_replays_offline(tmp_path):
+    """Responses recorded from a live server are served back after it is gone."""
+    path = str(tmp_path / "run.cassette.gz")
+    config = MockServerConfig(latency="fixed", latency_mean=0, seed=3)
+    with MockLLMServer(config) as server:
+        url = server.url
+        with Cassette(path, "record").activate():
+            judged = requests.post(
+                f"{url}/chat/completions", json={"messages": [{"role": "user", "content": "Q"}]}
+            ).json()
+            status, generated = asyncio.run(_aiohttp_post(f"{url}/generate", {"prompt": "Q"}))
+
+    with Cassette(path, "replay").activate() as cassette:
+        assert (
+            requests.post(
+                f"{url}/chat/completions", json={"messages": [{"role": "user", "content": "Q"}]}
+            ).json()
+            == judged
+        )
+        assert asyncio.run(_aiohttp_post(f"{url}/generate", {"prompt": "Q"})) == (
+            status,
+            generated,
+        )
+        with pytest.raises(CassetteMiss):
+            requests.post(f"{url}/generate", json={"prompt": "never recorded"})
+    assert cassette.stats["replayed"] == 2
+
+
+def test_request_key_ignores_key_order_and_credentials():
+    """JSON key order and credential query params do not change the key."""
+    url = "https://generativelanguage.googleapis.com/v1beta/models/g:generateContent"
+    assert request_key("post", f"{url}?key=secret", '{"a": 1, "b": 2}') == request_key(
+        "POST", url, {"b": 2, "a": 1}
+    )
+    assert request_key("POST", url, {"a": 1}) != request_key("POST", url, {"a": 2})
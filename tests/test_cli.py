@@ -0,0 +1,29 @@
+"""
+Tests for the lae-eval command line
+"""
+
+from les_audits_affaires_eval import cli
+
+
+class FakeEvaluator:
+    calls = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    async def rerun_failures(self, stage=None, statuses=None):
+        FakeEvaluator.calls.append((self.kwargs, stage, statuses))
+        return {}
+
+
+def test_rerun_parses_and_dispatches(monkeypatch):
+    """`rerun` reaches the evaluator with its own flags only."""
+    monkeypatch.delenv("CASSETTE_FILE", raising=False)
+    monkeypatch.setattr(cli, "LesAuditsAffairesEvaluator", FakeEvaluator)
+
+    cli.main(["rerun", "--only", "judge"])
+    cli.main(["rerun", "--status", "timeout", "--chat"])
+    assert FakeEvaluator.calls == [
+        ({"use_chat_endpoint": False, "use_strict_mode": False}, "judge", None),
+        ({"use_chat_endpoint": True, "use_strict_mode": False}, None, ["timeout"]),
+    ]
@@ -0,0 +1,84 @@
+"""
+Tests for the judge input compaction
+"""
+
+from les_audits_affaires_eval.compaction import (
+    CompactingJudge,
+    compact_response,
+    summarize_compaction,
+)
+from les_audits_affaires_eval.records import SampleResult
+from les_audits_affaires_eval import tokenizer as tokenizer_module
+from les_audits_affaires_eval.tokenizer import ApproxTokenizer, get_tokenizer
+
+SUMMARY = (
+    "• Action Requise: convoquer l'assemblée parce que article L. 223-26 du Code de commerce\n"
+    "• Conséquences Non-Conformité: injonction de faire parce que article L. 238-1"
+)
+
+
+def test_sections_are_kept_and_the_analysis_is_shortened():
+    """Repeated paragraphs go first, then the analysis shrinks around the intact summary."""
+    tokenizer = ApproxTokenizer()
+    reasoning = "\n\n".join(f"Étape {i} du raisonnement sur la SARL." for i in range(400))
+    text = reasoning + "\n\nJe résume.\n\nJe résume.\n\n" + SUMMARY
+
+    compacted, stats = compact_response(text, max_tokens=200, tokenizer=tokenizer)
+    assert stats["steps"] == ["dedupe", "sections"]
+    assert stats["original_tokens"] == tokenizer.count(text)
+    assert stats["compacted_tokens"] == tokenizer.count(compacted) <= 200
+    assert compacted.endswith(SUMMARY) and compacted.startswith("Étape 0")
+    assert compacted.count("Je résume.") == 1 and "tokens omis" in compacted
+
+    # Without a summary, the head and tail of the text are kept
+    compacted, stats = compact_response(reasoning, max_tokens=100, tokenizer=tokenizer)
+    assert stats["steps"] == ["truncate"]
+    assert compacted.startswith("Étape 0") and compacted.endswith(
+        "Étape 399 du raisonnement sur la SARL."
+    )
+    short, stats = compact_response(SUMMARY, max_tokens=100, tokenizer=tokenizer)
+    assert short == SUMMARY and stats["steps"] == []
+
+
+def test_compacting_judge_records_token_counts():
+    """The judge sees the compacted text and the counts land in the summary."""
+    seen = []
+
+    class Judge:
+        def evaluate_response(self, question, model_response, ground_truth):
+            seen.append(model_response)
+            return {"status": "ok", "score_global": 50, "scores": {}}
+
+    judge = CompactingJudge(
+        Judge(), steps="dedupe,sections,truncate", max_tokens=50, tokenizer=ApproxTokenizer()
+    )
+    results = []
+    for idx, response in enumerate(["x" * 1000, SUMMARY[:100]]):
+        evaluation = judge.evaluate_response("q", response, {})
+        results.append(
+            SampleResult.from_evaluation(idx, "q", [""] * 5, response, "ok", evaluation, {})
+        )
+    assert len(seen[0]) < 300 and seen[1] == SUMMARY[:100]
+
+    summary = summarize_compaction(results)
+    assert summary["samples"] == 2 and summary["compacted_samples"] == 1
+    assert summary["original_tokens"] == 250 + 25
+    assert summary["by_step"]["truncate"] == 1
+    assert CompactingJudge(Judge()).evaluate_response("q", "x" * 1000, {})
+    assert len(seen[-1]) == 1000
+
+
+def test_tokenizer_falls_back_when_it_cannot_load(monkeypatch, caplog):
+    """An encoding that cannot be downloaded (offline, replayed runs) counts approximately."""
+
+    def offline(encoding):
+        raise ConnectionError("no network")
+
+    monkeypatch.setattr(tokenizer_module, "TiktokenTokenizer", offline)
+    get_tokenizer.cache_clear()
+    try:
+        assert get_tokenizer("cl100k_base").name == "approx"
+        assert "counting tokens approximately" in caplog.text
+        assert get_tokenizer("missing/tokenizer.json").name == "approx"
+    finally:
+        get_tokenizer.cache_clear()
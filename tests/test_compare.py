@@ -0,0 +1,57 @@
+"""
+Tests for the cross-model comparison
+"""
+
+import json
+
+import numpy as np
+
+from les_audits_affaires_eval.compare import ScoreMatrix, compare_models
+from les_audits_affaires_eval.detailed_store import DetailedStore
+from les_audits_affaires_eval.results_store import write_results_parquet
+
+
+def test_pairwise_statistics_match_a_naive_loop():
+    """Matrix-product differences and blocked win rates agree with per-pair loops."""
+    rng = np.random.default_rng(1)
+    scores = (rng.integers(0, 5, (6, 40)) * 25).astype(np.float32)
+    scores[rng.random(scores.shape) < 0.1] = np.nan
+    pairwise = ScoreMatrix([f"m{i}" for i in range(6)], np.arange(40), scores).pairwise()
+
+    for i in range(6):
+        for j in range(6):
+            both = ~np.isnan(scores[i]) & ~np.isnan(scores[j])
+            diff = scores[i][both] - scores[j][both]
+            assert pairwise["common_samples"][i, j] == both.sum()
+            assert np.isclose(pairwise["mean_difference"][i, j], diff.mean())
+            win_rate = ((diff > 0).sum() + 0.5 * (diff == 0).sum()) / both.sum()
+            assert np.isclose(pairwise["win_rate"][i, j], win_rate)
+
+
+def test_compare_reads_every_storage_format(tmp_path, make_result):
+    """Parquet, detailed-store and JSON models are aligned on their sample indices."""
+    write_results_parquet(
+        [make_result(idx, 80.0) for idx in range(50)], str(tmp_path / "strong.parquet")
+    )
+    store = DetailedStore(str(tmp_path / "middle"), compression="gzip")
+    for idx in range(1, 50):
+        store.append(make_result(idx, 50.0 + idx % 2))
+    (tmp_path / "weak").mkdir()
+    (tmp_path / "weak" / "evaluation_results.json").write_text(
+        json.dumps({"detailed_results": [make_result(idx, 10.0) for idx in range(50)]})
+    )
+
+    comparison = compare_models(str(tmp_path), metric="delai_legal", resamples=200)
+    assert [entry["model"] for entry in comparison["leaderboard"]] == ["strong", "middle", "weak"]
+    strong, middle, _ = comparison["leaderboard"]
+    assert middle["samples"] == 49 and comparison["sample_count"] == 50
+    assert strong["rank_low"] == strong["rank_high"] == 1 and strong["rank_stability"] == 1.0
+    assert strong["mean_win_rate"] == 1.0
+    assert middle["mean_low"] <= middle["mean"] <= middle["mean_high"] < strong["mean_low"]
+    assert strong["p_value_vs_next"] == 1 / 201
+    assert comparison["leaderboard"][2]["p_value_vs_next"] is None
+    row, column = comparison["models"].index("strong"), comparison["models"].index("middle")
+    assert comparison["pairwise"]["common_samples"][row][column] == 49
+    assert compare_models(str(tmp_path), resamples=200) == compare_models(
+        str(tmp_path), resamples=200
+    )
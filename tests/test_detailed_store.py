@@ -0,0 +1,50 @@
+"""
+Tests for the (optionally compressed) detailed results store
+"""
+
+import gzip
+import json
+
+from les_audits_affaires_eval.detailed_store import DetailedStore
+
+
+def test_gzip_frames_are_randomly_readable_and_crash_tolerant(tmp_path, make_result):
+    """Each record is its own frame; the whole file still decompresses, a torn tail is ignored."""
+    store = DetailedStore(str(tmp_path), compression="gzip")
+    for idx in (2, 0, 1):
+        store.append(make_result(idx))
+    assert store.path.endswith("detailed_results.jsonl.gz")
+
+    lines = gzip.decompress(open(store.path, "rb").read()).decode().splitlines()
+    assert [json.loads(line)["sample_idx"] for line in lines] == [2, 0, 1]
+    entries = sorted(store.index(), key=lambda entry: entry.sample_idx)
+    assert [r["sample_idx"] for r in store.read(entries)] == [0, 1, 2]
+    assert store.get(1) == make_result(1)
+
+    # Crash mid-append: half a frame on disk, no index line
+    with open(store.path, "ab") as f:
+        f.write(gzip.compress(b'{"sample_idx": 3}\n')[:10])
+    reopened = DetailedStore(str(tmp_path))
+    assert reopened.compression == "gzip"
+    assert [entry.sample_idx for entry in reopened.index()] == [2, 0, 1]
+    assert [r["sample_idx"] for r in reopened] == [2, 0, 1]
+
+    reopened.rewrite(sorted(reopened, key=lambda r: r["sample_idx"]))
+    assert [entry.sample_idx for entry in reopened.index()] == [0, 1, 2]
+
+
+def test_plain_jsonl_from_older_runs_is_read_and_extended(tmp_path, make_result):
+    """An existing unindexed JSONL file keeps its format and gains an index on append."""
+    with open(tmp_path / "detailed_results.jsonl", "w", encoding="utf-8") as f:
+        f.write(json.dumps(make_result(0)) + "\n\n" + json.dumps(make_result(1)) + "\n")
+
+    store = DetailedStore(str(tmp_path), compression="gzip")
+    assert store.compression == ""
+    store.append(make_result(2))
+    assert [entry.sample_idx for entry in store._read_index()] == [0, 1, 2]
+    assert [r["sample_idx"] for r in store] == [0, 1, 2]
+
+    store.remove()
+    assert not (tmp_path / "detailed_results.jsonl").exists()
+    store.append(make_result(3))
+    assert store.path.endswith(".gz") and store.get(3)["sample_idx"] == 3
@@ -0,0 +1,50 @@
+"""
+Tests for the work-queue brokers behind distributed runs
+"""
+
+import time
+
+from les_audits_affaires_eval.distributed import DEAD, DONE, InProcessBroker, create_broker
+
+
+def test_expired_leases_are_requeued_then_dead():
+    """A crashed worker's items go back to the queue until attempts run out."""
+    broker = InProcessBroker(max_attempts=2)
+    broker.submit([(0, {"question": "a"}), (1, {"question": "b"})])
+
+    assert [item.idx for item in broker.lease("crashed", 2, ttl=0.05)] == [0, 1]
+    assert broker.lease("worker", 2) == []
+    time.sleep(0.06)
+
+    retried = broker.lease("worker", 1, ttl=0.05)
+    assert [(item.idx, item.attempts) for item in retried] == [(0, 1)]
+    assert broker.complete(0, "worker", {"sample_idx": 0})
+    assert not broker.complete(1, "crashed", {"sample_idx": 1})  # lease was lost
+
+    time.sleep(0.06)
+    assert broker.lease("worker", 1, ttl=0.05)[0].idx == 1
+    time.sleep(0.06)
+    assert broker.lease("worker", 1) == []
+    assert broker.counts()[DONE] == 1 and broker.counts()[DEAD] == 1
+    assert broker.is_finished()
+
+
+def test_sqlite_broker_is_shared_between_instances(tmp_path):
+    """Two connections to the same file never lease the same item; results stream in order."""
+    url = f"sqlite:///{tmp_path}/run.db"
+    coordinator, worker_a, worker_b = create_broker(url), create_broker(url), create_broker(url)
+    coordinator.submit([(idx, {"question": f"q{idx}"}) for idx in range(5)])
+
+    leased_a = worker_a.lease("a", 3)
+    leased_b = worker_b.lease("b", 3)
+    assert [item.idx for item in leased_a] == [0, 1, 2]
+    assert [item.idx for item in leased_b] == [3, 4]
+    assert leased_b[0].payload == {"question": "q3"}
+
+    assert worker_b.complete(4, "b", {"sample_idx": 4})
+    assert not worker_a.complete(4, "a", {"sample_idx": 4})
+    assert worker_a.release(0, "a")
+    results, cursor = coordinator.results_since(0)
+    assert results == [{"sample_idx": 4}]
+    assert coordinator.results_since(cursor) == ([], cursor)
+    assert [item.idx for item in worker_b.lease("b", 5)] == [0]
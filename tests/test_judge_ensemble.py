@@ -0,0 +1,91 @@
+"""
+Tests for the judge ensemble
+"""
+
+import threading
+
+from les_audits_affaires_eval.judge_ensemble import JudgeEnsemble, summarize_ensemble
+from les_audits_affaires_eval.records import RUBRICS, SampleResult
+from les_audits_affaires_eval.status import JUDGE_ERROR, PARTIAL_RUBRIC, STATUS_OK
+
+
+class FakeJudge:
+    def __init__(self, score, status=STATUS_OK, barrier=None, missing=()):
+        self.score = score
+        self.status = status
+        self.barrier = barrier
+        self.missing = list(missing)
+        self.calls = 0
+
+    def evaluate_response(self, question, model_response, ground_truth):
+        self.calls += 1
+        if self.barrier:
+            # Only passes when the other judge of the tier is called at the same time
+            self.barrier.wait(timeout=5)
+        evaluation = {
+            "status": self.status,
+            "score_global": self.score,
+            "scores": {rubric: self.score for rubric in RUBRICS},
+            "justifications": {rubric: f"judge {self.score}" for rubric in RUBRICS},
+            "usage": {"prompt_tokens": 100, "completion_tokens": 10},
+        }
+        if self.missing:
+            evaluation["missing_rubrics"] = self.missing
+        return evaluation
+
+
+def test_escalates_only_when_the_cheap_judges_disagree():
+    """Agreeing judges are aggregated alone; a disagreement brings in the expensive judge."""
+    barrier = threading.Barrier(2)
+    expensive = FakeJudge(70)
+    ensemble = JudgeEnsemble(
+        {"a": FakeJudge(60, barrier=barrier), "b": FakeJudge(70, barrier=barrier)},
+        {"big": expensive},
+        method="median",
+        threshold=20,
+    )
+    result = ensemble.evaluate_response("q", "r", {})
+    assert result["score_global"] == 65 and result["status"] == STATUS_OK
+    assert result["ensemble"] == {
+        "judges": {"a": 60, "b": 70},
+        "escalated": False,
+        "disagreement": 10.0,
+    }
+    assert result["usage"] == {"prompt_tokens": 200, "completion_tokens": 20}
+    assert expensive.calls == 0
+
+    ensemble = JudgeEnsemble(
+        {"a": FakeJudge(20, missing=["delai_legal"], status=PARTIAL_RUBRIC), "b": FakeJudge(90)},
+        {"big": expensive},
+        method="median",
+        threshold=20,
+    )
+    result = ensemble.evaluate_response("q", "r", {})
+    assert expensive.calls == 1 and result["ensemble"]["escalated"]
+    assert result["score_global"] == 70 and result["justifications"]["action_requise"] == "judge 70"
+    # The rubric the first judge left out is aggregated over the other two only
+    assert result["scores"]["delai_legal"] == 80 and result["scores"]["action_requise"] == 70
+    assert result["usage"]["prompt_tokens"] == 300
+    ensemble.close()
+
+
+def test_agreement_summary_per_judge():
+    """The summary counts escalations, failed judges and each judge's distance to the result."""
+    ensemble = JudgeEnsemble(
+        {"a": FakeJudge(50), "b": FakeJudge(0, status=JUDGE_ERROR)}, {"big": FakeJudge(60)}
+    )
+    results = []
+    for idx in range(4):
+        evaluation = ensemble.evaluate_response("q", "r", {})
+        evaluation.pop("usage")
+        results.append(
+            SampleResult.from_evaluation(idx, "q", [""] * 5, "r", STATUS_OK, evaluation, {})
+        )
+    ensemble.close()
+
+    summary = summarize_ensemble(results + [{"sample_idx": 9, "status": "ok"}], threshold=20)
+    assert summary["samples"] == 4 and summary["escalation_rate"] == 1.0
+    assert summary["judges"]["b"] == {"samples": 4, "failed": 4}
+    assert summary["judges"]["a"]["mean_absolute_deviation"] == 5.0
+    assert summary["judges"]["big"]["agreement_rate"] == 1.0
+    assert summarize_ensemble([{"sample_idx": 0, "status": "ok"}]) is None
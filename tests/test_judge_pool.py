@@ -0,0 +1,55 @@
+"""
+Tests for the async judge pool
+"""
+
+import asyncio
+import threading
+import time
+
+from les_audits_affaires_eval.judge_pool import AsyncJudgePool
+
+
+class FakeJudge:
+    """Blocking judge recording how many calls overlap"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def evaluate_response(self, question, model_response, ground_truth):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return {"score_global": 80.0, "question": question}
+
+
+def test_pool_bounds_concurrent_judge_calls():
+    """At most `concurrency` calls run at once, and every call gets its own result."""
+    judge = FakeJudge()
+
+    async def run():
+        async with AsyncJudgePool(judge, concurrency=3, rate_limit=None) as pool:
+            return await asyncio.gather(*(pool.evaluate(f"q{i}", "r", {}) for i in range(12)))
+
+    results = asyncio.run(run())
+    assert judge.peak == 3
+    assert [r["question"] for r in results] == [f"q{i}" for i in range(12)]
+
+
+def test_pool_applies_its_rate_limit():
+    """Calls are admitted no faster than the rate limit, whatever the concurrency."""
+    judge = FakeJudge(delay=0)
+
+    async def run():
+        async with AsyncJudgePool(judge, concurrency=8, rate_limit=20) as pool:
+            start = time.monotonic()
+            await asyncio.gather(*(pool.evaluate("q", "r", {}) for _ in range(5)))
+            return time.monotonic() - start
+
+    # 5 calls at 20/s: the last one starts 4 intervals (0.2s) after the first
+    assert asyncio.run(run()) >= 0.19
@@ -0,0 +1,77 @@
+"""
+Tests for the judge prompt layout and prompt-cache accounting
+"""
+
+import json
+
+from les_audits_affaires_eval import model_client
+from les_audits_affaires_eval.config import LLM_EVALUATION_PREFIX, LLM_EVALUATION_PROMPT
+
+VERDICT = {
+    "score_global": 80,
+    "scores": {
+        "action_requise": 80,
+        "delai_legal": 80,
+        "documents_obligatoires": 80,
+        "impact_financier": 80,
+        "consequences_non_conformite": 80,
+    },
+    "justifications": {},
+}
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.content = json.dumps(body).encode()
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def test_judge_prompt_keeps_the_rubric_payload_schema_order():
+    """Only the rubric head is shared; the sample sits before the output schema as before."""
+    prompt = LLM_EVALUATION_PROMPT.format(
+        user_question="QUESTION",
+        model_response="RÉPONSE",
+        action_requise="",
+        delai_legal="",
+        documents_obligatoires="",
+        impact_financier="",
+        consequences_non_conformite="",
+    )
+    assert prompt.startswith(LLM_EVALUATION_PREFIX)
+    assert "{" not in LLM_EVALUATION_PREFIX
+    assert (
+        len(LLM_EVALUATION_PREFIX)
+        < prompt.index("QUESTION")
+        < prompt.index("RÉPONSE")
+        < prompt.index("Donne ta réponse STRICTEMENT")
+    )
+
+
+def test_judge_requests_share_the_prefix_and_report_cached_tokens(monkeypatch):
+    """Every sample is sent behind the same prefix, and server cache hits land in usage."""
+    monkeypatch.setenv("EVALUATOR_PROVIDER", "local")
+    monkeypatch.setenv("EVALUATOR_ENDPOINT", "http://judge.test")
+    sent = []
+
+    def fake_post(url, **kwargs):
+        sent.append(kwargs["json"])
+        usage = {"prompt_tokens": 600, "prompt_tokens_details": {"cached_tokens": 350}}
+        return FakeResponse(
+            {"choices": [{"message": {"content": json.dumps(VERDICT)}}], "usage": usage}
+        )
+
+    monkeypatch.setattr(model_client.requests, "post", fake_post)
+    client = model_client.EvaluatorClient()
+    first = client.evaluate_response("Question A ?", "réponse A", {})
+    client.evaluate_response("Question B ?", "réponse B", {})
+
+    prompts = [request["messages"][0]["content"] for request in sent]
+    assert all(prompt.startswith(LLM_EVALUATION_PREFIX) for prompt in prompts)
+    assert prompts[0] != prompts[1]
+    assert first["score_global"] == 80
+    assert first["usage"] == {"prompt_tokens": 600, "completion_tokens": 0, "cached_tokens": 350}
@@ -0,0 +1,114 @@
+"""
+Tests for the lease backends used to claim leaderboard requests
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from les_audits_affaires_eval.leases import (
+    FileLeaseBackend,
+    Lease,
+    LeaseBackend,
+    LeaseHeartbeat,
+)
+
+
+def test_file_lease_is_exclusive_until_expiry(tmp_path):
+    """A live lease blocks other owners; an expired one can be taken over."""
+    backend = FileLeaseBackend(str(tmp_path))
+
+    assert backend.acquire("req_1", "worker-a", ttl=0.2) is not None
+    assert backend.acquire("req_1", "worker-b", ttl=0.2) is None
+    assert backend.is_leased("req_1")
+
+    time.sleep(0.25)
+    assert not backend.is_leased("req_1")
+    lease = backend.acquire("req_1", "worker-b", ttl=5)
+    assert lease is not None and lease.owner == "worker-b"
+
+    # The previous owner can neither renew nor release a lease it lost
+    assert not backend.renew("req_1", "worker-a")
+    assert not backend.release("req_1", "worker-a")
+    assert backend.release("req_1", "worker-b")
+    assert backend.get("req_1") is None
+
+
+def test_heartbeat_keeps_lease_alive(tmp_path):
+    """The heartbeat renews the lease past its original expiry."""
+    backend = FileLeaseBackend(str(tmp_path))
+    backend.acquire("req_2", "worker-a", ttl=0.3)
+
+    with LeaseHeartbeat(backend, "req_2", "worker-a", ttl=0.3) as heartbeat:
+        time.sleep(0.6)
+        assert backend.is_leased("req_2")
+        assert not heartbeat.lost.is_set()
+
+
+def test_backend_interface_and_blocking_acquire(tmp_path):
+    """Backends must implement the interface; wait_acquire blocks until release."""
+    with pytest.raises(TypeError):
+        LeaseBackend()
+
+    backend = FileLeaseBackend(str(tmp_path))
+    backend.acquire("table", "host-a", ttl=5)
+    assert backend.wait_acquire("table", "host-b", timeout=0.1, poll=0.02) is None
+
+    threading.Timer(0.1, backend.release, args=("table", "host-a")).start()
+    lease = backend.wait_acquire("table", "host-b", timeout=2, poll=0.02)
+    assert lease is not None and lease.owner == "host-b"
+
+
+def test_stale_lock_is_broken_by_a_single_contender(tmp_path):
+    """Concurrent workers break a crashed holder's lock once and only one claims the key."""
+    backend = FileLeaseBackend(str(tmp_path))
+    lock_path = backend._lock_path("req_3")
+    lock_path.write_text("crashed-worker")
+    os.utime(lock_path, (time.time() - 60, time.time() - 60))
+
+    barrier = threading.Barrier(8)
+    leases = []
+
+    def claim(owner):
+        barrier.wait()
+        leases.append(backend.acquire("req_3", owner, ttl=5))
+
+    threads = [threading.Thread(target=claim, args=(f"worker-{i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len([lease for lease in leases if lease is not None]) == 1
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".lease"]
+
+
+def test_broken_lock_is_not_released_by_its_former_holder(tmp_path):
+    """A holder whose lock was broken as stale leaves the new holder's lock alone."""
+    backend = FileLeaseBackend(str(tmp_path))
+    first = backend._lock("req_4")
+    os.utime(backend._lock_path("req_4"), (time.time() - 60, time.time() - 60))
+    second = backend._lock("req_4")
+    assert second is not None and second != first
+
+    backend._unlock("req_4", first)
+    assert backend._lock_path("req_4").exists()
+    backend._unlock("req_4", second)
+    assert not backend._lock_path("req_4").exists()
+
+
+def test_renew_waits_out_lock_contention(tmp_path):
+    """A busy lock delays the renewal; only another owner's lease makes it fail."""
+    backend = FileLeaseBackend(str(tmp_path), lock_timeout=0.1)
+    backend.acquire("req_5", "worker-a", ttl=5)
+
+    token = backend._lock("req_5")
+    threading.Timer(0.3, backend._unlock, args=("req_5", token)).start()
+    assert backend.renew("req_5", "worker-a", ttl=5)
+
+    token = backend._lock("req_5")
+    backend._write(Lease("req_5", "worker-b", time.time() + 5, time.time()))
+    assert not backend.renew("req_5", "worker-a", ttl=5)
+    backend._unlock("req_5", token)
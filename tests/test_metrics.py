@@ -0,0 +1,70 @@
+"""
+Tests for stage latency histograms and the Prometheus exporter
+"""
+
+from les_audits_affaires_eval import evaluator as evaluator_module
+from les_audits_affaires_eval.metrics import (
+    EXPORT_BUCKETS,
+    GENERATION,
+    LatencyHistogram,
+    LiveView,
+    MetricsRegistry,
+    SAMPLES_DONE,
+)
+
+
+def test_histogram_percentiles_stay_within_relative_error():
+    """Log-linear buckets keep percentiles within ~2% over a wide value range."""
+    hist = LatencyHistogram()
+    for ms in range(1, 10_001):
+        hist.observe(ms / 1000)
+    assert abs(hist.percentile(50) - 5.0) / 5.0 < 0.02
+    assert abs(hist.percentile(95) - 9.5) / 9.5 < 0.02
+    assert hist.max == 10.0 and hist.count == 10_000
+
+
+def test_registry_renders_prometheus_text_and_live_line(tmp_path):
+    """Histograms, gauges and counters export in text format and feed the live view."""
+    registry = MetricsRegistry()
+    registry.stage(GENERATION).observe(0.2)
+    registry.stage(GENERATION).observe(3.0)
+    registry.error("judge", "parse_error").inc()
+    registry.counter(SAMPLES_DONE).inc(2)
+    with registry.in_flight(GENERATION).track():
+        assert registry.in_flight(GENERATION).value == 1
+    assert registry.in_flight(GENERATION).value == 0
+
+    path = tmp_path / "metrics.prom"
+    registry.write_prometheus(str(path))
+    text = path.read_text()
+    assert "# TYPE lae_stage_latency_seconds histogram" in text
+    assert 'lae_stage_latency_seconds_bucket{stage="generation",le="0.25"} 1' in text
+    assert 'lae_stage_latency_seconds_count{stage="generation"} 2' in text
+    assert 'lae_errors_total{stage="judge",status="parse_error"} 1' in text
+
+    line = LiveView(total=4, registry=registry).render()
+    assert line.startswith("2/4 samples") and "errors 1" in line
+
+
+def test_bucket_counts_interpolate_across_the_bound():
+    """Values above a bound are not counted under it, even when they share its bucket."""
+    hist = LatencyHistogram()
+    for _ in range(10):
+        hist.observe(0.1003)  # bucket [0.099328, 0.100351] s straddles le=0.1
+    hist.observe(0.3)
+    counts = dict(zip(EXPORT_BUCKETS, hist.cumulative_counts()))
+    # 0.1003 is above 0.1: lower edges would count all 10, interpolation ~7
+    assert counts[0.05] == 0 and counts[0.1] == 7
+    assert counts[0.25] == 10 and counts[0.5] == 11
+
+
+def test_each_run_starts_from_empty_metrics(monkeypatch):
+    """Evaluators own their registry and reset it when a run starts."""
+    monkeypatch.setattr(evaluator_module, "create_evaluator_client", lambda: None)
+    first = evaluator_module.LesAuditsAffairesEvaluator(metrics_file=None)
+    first.metrics.counter(SAMPLES_DONE).inc(5)
+    second = evaluator_module.LesAuditsAffairesEvaluator(metrics_file=None)
+    assert second.metrics.counter(SAMPLES_DONE).value == 0
+
+    with first._monitor(3):
+        assert LiveView(total=3, registry=first.metrics).render().startswith("0/3 samples")
@@ -0,0 +1,44 @@
+"""
+Tests for the bundled mock LLM server
+"""
+
+import json
+
+import requests
+
+from les_audits_affaires_eval.mock_server import MockLLMServer, MockServerConfig
+
+
+def test_mock_server_speaks_provider_shapes_and_judges():
+    """OpenAI, Anthropic and Gemini shapes are served; judge prompts get evaluation JSON."""
+    config = MockServerConfig(latency="fixed", latency_mean=0, output_tokens=50, seed=1)
+    with MockLLMServer(config) as server:
+        openai = requests.post(
+            f"{server.url}/v1/chat/completions",
+            json={"messages": [{"role": "user", "content": "Question ?"}]},
+        ).json()
+        assert "Action Requise" in openai["choices"][0]["message"]["content"]
+        assert openai["usage"]["completion_tokens"] > 0
+
+        judge = requests.post(
+            f"{server.url}/v1/messages",
+            json={"system": 'Réponds en JSON {"score_global": 0}', "messages": []},
+        ).json()
+        evaluation = json.loads(judge["content"][0]["text"])
+        assert set(evaluation["scores"]) == set(evaluation["justifications"])
+
+        stream = requests.post(
+            f"{server.url}/v1beta/models/gemini-1.5-pro:streamGenerateContent",
+            json={"contents": [{"parts": [{"text": "Question ?"}]}]},
+        )
+        events = [line for line in stream.text.splitlines() if line.startswith("data: ")]
+        assert len(events) > 2
+        assert server.stats["streamed"] == 1
+
+
+def test_mock_server_injects_rate_limits():
+    """A rate-limit rate of 1 answers every request with 429 and Retry-After."""
+    config = MockServerConfig(latency="fixed", latency_mean=0, rate_limit_rate=1.0)
+    with MockLLMServer(config) as server:
+        response = requests.post(f"{server.url}/generate", json={"prompt": "Question ?"})
+    assert response.status_code == 429 and response.headers["Retry-After"] == "1"
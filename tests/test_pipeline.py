@@ -0,0 +1,192 @@
+"""
+Tests for the leaderboard pipeline (scripts/laal_pipeline.py)
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("datasets")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+import laal_pipeline  # noqa: E402
+
+from les_audits_affaires_eval.leases import FileLeaseBackend  # noqa: E402
+
+
+class FakeProcess:
+    """Evaluation process that runs until it is terminated"""
+
+    def __init__(self, **kwargs):
+        self.alive = False
+        self.exitcode = None
+
+    def start(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self, timeout=None):
+        pass
+
+    def terminate(self):
+        self.alive = False
+        self.exitcode = -15
+
+
+def test_lost_lease_terminates_evaluation(monkeypatch):
+    """The spawned evaluation is killed once the heartbeat reports the lease lost."""
+    spawned = []
+
+    class FakeContext:
+        def Process(self, **kwargs):
+            spawned.append(FakeProcess(**kwargs))
+            return spawned[-1]
+
+    monkeypatch.setattr(laal_pipeline.multiprocessing, "get_context", lambda method: FakeContext())
+    pipeline = laal_pipeline.EvaluationPipeline.__new__(laal_pipeline.EvaluationPipeline)
+    pipeline.adaptive = False
+
+    lost = threading.Event()
+    threading.Timer(0.2, lost.set).start()
+    assert pipeline._run_evaluation_isolated("org/model", "local", lost) is None
+    assert spawned[0].exitcode == -15
+
+
+def test_table_push_waits_for_other_hosts(tmp_path, monkeypatch):
+    """Two managers sharing a lease directory never push the same table at once."""
+    backend = FileLeaseBackend(str(tmp_path))
+    first = laal_pipeline.ResultsDatasetManager(lease_backend=backend)
+    second = laal_pipeline.ResultsDatasetManager(lease_backend=backend)
+    monkeypatch.setattr(second, "TABLE_LEASE_TIMEOUT", 0.2)
+
+    with first._table_lock(first.RESULTS_DATASET):
+        with pytest.raises(TimeoutError):
+            with second._table_lock(second.RESULTS_DATASET):
+                pass
+        # The requests table is a separate lease
+        with second._table_lock(second.REQUESTS_DATASET):
+            pass
+    with second._table_lock(second.RESULTS_DATASET):
+        assert backend.is_leased(f"table:{second.RESULTS_DATASET}")
+    assert not backend.is_leased(f"table:{second.RESULTS_DATASET}")
+
+
+def test_worker_skips_requests_closed_since_the_queue_was_read(tmp_path, monkeypatch):
+    """A claimed request is re-read and skipped once another worker finished it."""
+    pipeline = laal_pipeline.EvaluationPipeline.__new__(laal_pipeline.EvaluationPipeline)
+    pipeline.manager = laal_pipeline.ResultsDatasetManager()
+    statuses = {"req_a": "finished", "req_b": "pending"}
+    rows = [{"request_id": k, "request_status": v} for k, v in statuses.items()]
+    monkeypatch.setattr(pipeline.manager, "load_requests", lambda: rows)
+    monkeypatch.setattr(pipeline, "_ensure_env_variables", lambda provider: None)
+    processed = []
+    monkeypatch.setattr(
+        pipeline,
+        "_process_single_request",
+        lambda req, retry_failures, **kwargs: processed.append(req["request_id"]),
+    )
+    backend = FileLeaseBackend(str(tmp_path))
+
+    pending = [{"request_id": k, "model_provider": "local"} for k in statuses]
+    pipeline._process_with_workers(pending, True, 1, backend, 5)
+
+    assert processed == ["req_b"]
+    assert backend.get("req_a") is None and backend.get("req_b") is None
+
+
+class FlakyJudge:
+    """Judge that is slower for low indexes and always fails on some questions"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def evaluate_response(self, question, model_response, ground_truth):
+        self.calls.append(question)
+        idx = int(question[1:])
+        time.sleep(0.01 * (10 - idx))
+        if idx in self.failing:
+            raise RuntimeError("judge unavailable")
+        return {"score_global": 70.0, "scores": {}, "justifications": {}}
+
+
+def _sample(idx, failed=False, attempts=0):
+    justification = "Évaluation échouée" if failed else "ok"
+    return {
+        "sample_idx": idx,
+        "question": f"q{idx}",
+        "model_response": "r",
+        "evaluation": {
+            "score_global": 0.0 if failed else 60.0,
+            "justifications": {"action_requise": justification},
+        },
+        "metadata": {"judge_retry_attempts": attempts} if attempts else {},
+    }
+
+
+def test_retry_streaming_rewrites_in_order_within_attempt_budget(tmp_path, monkeypatch):
+    """Failed samples are re-judged concurrently, written back in sample_idx order
+    through an atomic rewrite, and never past their attempt budget."""
+    judge = FlakyJudge(failing={3})
+    monkeypatch.setattr(laal_pipeline, "create_evaluator_client", lambda: judge)
+    retrier = laal_pipeline.FailedEvaluationRetrier(
+        tmp_path, max_attempts=2, concurrency=4, rate_limit=None
+    )
+    for idx in (7, 2, 9, 5, 0, 8, 3, 1, 6, 4):
+        attempts = 2 if idx == 5 else 0
+        retrier.store.append(_sample(idx, idx in (1, 3, 5, 8), attempts))
+    gt = {idx: {"question": f"q{idx}"} for idx in range(10) if idx != 8}
+
+    stats = asyncio.run(retrier._retry_streaming(gt, {}))
+
+    # 5 already spent its budget, 8 has no ground truth: neither is re-judged
+    assert stats == {"retried": 2, "recovered": 1, "skipped": 2}
+    assert sorted(judge.calls) == ["q1", "q3", "q3"]
+    rewritten = list(retrier.store)
+    assert [r["sample_idx"] for r in rewritten] == list(range(10))
+    assert rewritten[1]["evaluation"]["score_global"] == 70.0
+    assert rewritten[1]["metadata"]["judge_retry_attempts"] == 1
+    assert retrier._is_failed(rewritten[3])
+    assert rewritten[3]["metadata"]["judge_retry_attempts"] == 2
+
+    # The previous file is kept as a backup, in its original order
+    (backup,) = tmp_path.glob("detailed_results.jsonl*.bak_*")
+    with open(backup, "rb") as f:
+        order = [json.loads(line)["sample_idx"] for _, _, line in retrier.store.codec.scan(f)]
+    assert order == [7, 2, 9, 5, 0, 8, 3, 1, 6, 4]
+
+
+def test_recomputed_summary_keeps_every_non_score_block(tmp_path, monkeypatch):
+    """Retries and refreshes rebuild the scores but keep the run's other blocks."""
+    monkeypatch.setattr(laal_pipeline, "create_evaluator_client", lambda: FlakyJudge())
+    retrier = laal_pipeline.FailedEvaluationRetrier(tmp_path)
+    for idx, failed in enumerate((False, False, True)):
+        retrier.store.append(_sample(idx, failed))
+    previous = {
+        "sample_count": 99,
+        "status_counts": {"judge_error": 99},
+        "global_score": {"mean": 1.0},
+        "subset": {"name": "fiscal"},
+        "telemetry": {"total_cost_usd": 0.5},
+        "prejudge": {"skipped_judge_calls": 1},
+        "adaptive": {"stopped_early": True},
+    }
+    summary_path = tmp_path / laal_pipeline.SUMMARY_FILE
+    summary_path.write_text(json.dumps(previous))
+
+    retrier._recompute_summary(retrier.store.iter_scores())
+    pipeline = laal_pipeline.EvaluationPipeline.__new__(laal_pipeline.EvaluationPipeline)
+    pipeline.refresh_summary(str(tmp_path))
+
+    summary = json.loads(summary_path.read_text())
+    for key in ("subset", "telemetry", "prejudge", "adaptive"):
+        assert summary[key] == previous[key]
+    assert summary["sample_count"] == 3 and summary["successful_evaluations"] == 2
+    assert summary["status_counts"] == {"ok": 2, "judge_error": 1}
+    assert summary["global_score_mean"] == 60.0 and "global_score" not in summary
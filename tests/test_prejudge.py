@@ -0,0 +1,88 @@
+"""
+Tests for the rule-based pre-judge
+"""
+
+from les_audits_affaires_eval.prejudge import PreJudge, match_rule, summarize_prejudge
+from les_audits_affaires_eval.records import SampleResult
+from les_audits_affaires_eval.status import GENERATION_ERROR, REPETITION_ABORT, STATUS_OK
+from les_audits_affaires_eval.telemetry import ModelResponse
+
+RULES = ("error", "empty", "repetition", "no_sections")
+
+FORMATTED = (
+    "Analyse de la situation de la SARL.\n"
+    "• Action Requise: convoquer l'assemblée parce que article L. 223-26 du Code de commerce\n"
+    "• Délai Legal: six mois parce que article L. 223-26 du Code de commerce"
+)
+
+
+class CountingJudge:
+    evaluator_provider = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    def evaluate_response(self, question, model_response, ground_truth):
+        self.calls += 1
+        return {"status": STATUS_OK, "score_global": 80, "scores": {}, "usage": {"x": 1}}
+
+
+def test_degenerate_responses_skip_the_judge():
+    """Each rule catches its case; well-formed or cited answers still go to the judge."""
+    repetitive = "La société doit payer la taxe annuelle. " * 30
+    assert match_rule("ERROR: timeout", RULES) == "error"
+    assert match_rule("   ", RULES) == "empty"
+    assert match_rule(repetitive, RULES) == "repetition"
+    assert match_rule(ModelResponse(FORMATTED, repetition_abort=True), RULES) == "repetition"
+    assert match_rule("La société doit réunir ses associés chaque année. " * 2, RULES) == (
+        "no_sections"
+    )
+    assert match_rule(FORMATTED, RULES) is None
+    assert match_rule("Voir l'art. 1193 du Code civil pour la révision du contrat.", RULES) is None
+    assert match_rule("ERROR: timeout", ("repetition",)) is None
+
+    judge = CountingJudge()
+    prejudge = PreJudge(judge, rules="error,empty,repetition")
+    assert prejudge.evaluator_provider == "fake"
+    skipped = prejudge.evaluate_response("q", "ERROR: boom", {})
+    assert skipped["status"] == GENERATION_ERROR and skipped["score_global"] == 0
+    assert skipped["prejudge"] == "error" and skipped["usage"] == {} and judge.calls == 0
+    assert prejudge.evaluate_response("q", repetitive, {})["status"] == REPETITION_ABORT
+    assert prejudge.evaluate_response("q", FORMATTED, {})["score_global"] == 80
+    assert judge.calls == 1
+    assert PreJudge(judge, rules="off").evaluate_response("q", "", {})["score_global"] == 80
+
+
+def test_summary_counts_skipped_judge_calls():
+    """Skipped calls are counted per rule from the stored results."""
+    prejudge = PreJudge(CountingJudge(), rules=RULES)
+    results = []
+    for idx, response in enumerate(["", "ERROR: x", "", FORMATTED]):
+        evaluation = prejudge.evaluate_response("q", response, {})
+        evaluation.pop("usage")
+        results.append(
+            SampleResult.from_evaluation(
+                idx, "q", [""] * 5, response, evaluation["status"], evaluation, {}
+            ).to_dict()
+        )
+
+    summary = summarize_prejudge(results, rules=RULES)
+    assert summary["skipped_judge_calls"] == 3
+    assert summary["by_rule"] == {"error": 1, "empty": 2, "repetition": 0, "no_sections": 0}
+
+
+def test_real_answer_shapes_go_to_the_judge():
+    """French spacing, bold, numbered headings and bare code citations are not `no_sections`."""
+    answers = [
+        "**Action requise** : convoquer l'assemblée générale (C. com., L. 225-100)",
+        "1. Action requise - approuver les comptes dans les six mois, voir L232-21",
+        "Action requise : déposer les comptes au greffe du tribunal de commerce.",
+        "Délais légaux : le contrat peut être révisé, voir art 1193 du Code civil.",
+        "La révision suit les règles des contrats, rien de plus à dire ici.",
+    ]
+    assert [match_rule(answer, ("no_sections",)) for answer in answers] == [None] * 4 + [
+        "no_sections"
+    ]
+    assert match_rule("Les statuts prévoient L. 225-100 en la matière.", ("no_sections",)) is None
+    # The policy is opt-in
+    assert PreJudge(CountingJudge()).rules == ()
@@ -0,0 +1,45 @@
+"""
+Tests for the per-process and shared rate limiters
+"""
+
+import asyncio
+import time
+
+from les_audits_affaires_eval.rate_limit import (
+    AsyncRateLimiter,
+    SharedRateLimiter,
+    create_rate_limiter,
+)
+
+
+async def _release_delays(limiters, calls):
+    """Seconds from the start to each release, in release order"""
+    start = time.monotonic()
+    delays = []
+
+    async def one(limiter):
+        await limiter.acquire()
+        delays.append(time.monotonic() - start)
+
+    await asyncio.gather(*(one(limiters[i % len(limiters)]) for i in range(calls)))
+    return sorted(delays)
+
+
+def test_async_limiter_spaces_acquires():
+    """Concurrent acquires are released one interval apart; no rate means no wait."""
+    delays = asyncio.run(_release_delays([AsyncRateLimiter(20)], 5))
+    # A sleeper can wake late, never early: release k comes after k intervals
+    assert all(delay >= k * 0.05 - 0.005 for k, delay in enumerate(delays))
+
+    assert asyncio.run(_release_delays([AsyncRateLimiter(None)], 50))[-1] < 0.05
+
+
+def test_shared_limiter_spaces_acquires_across_instances(tmp_path):
+    """Limiters sharing a state file (one per process) stay under the rate together."""
+    path = str(tmp_path / "state" / "judge.ratelimit")
+    limiters = [SharedRateLimiter(path, 20), SharedRateLimiter(path, 20)]
+    delays = asyncio.run(_release_delays(limiters, 6))
+    assert all(delay >= k * 0.05 - 0.005 for k, delay in enumerate(delays))
+
+    assert isinstance(create_rate_limiter(20, "judge", str(tmp_path)), SharedRateLimiter)
+    assert type(create_rate_limiter(20, "judge", None)) is AsyncRateLimiter
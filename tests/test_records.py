@@ -0,0 +1,33 @@
+"""
+Tests for the compact SampleResult records
+"""
+
+import json
+import math
+
+from les_audits_affaires_eval.records import RUBRICS, SampleResult, as_dict, as_record
+from les_audits_affaires_eval.status import PARTIAL_RUBRIC
+
+
+def test_round_trip_keeps_the_json_schema(make_result):
+    """A parsed record serializes back to the same JSON document."""
+    record = make_result(3, 72.5)
+    result = SampleResult.from_dict(record)
+    assert list(result.scores) == [72.5] * len(RUBRICS)
+    assert result.ground_truth[RUBRICS.index("delai_legal")] == "attendu delai_legal"
+    assert json.dumps(as_dict(result), sort_keys=True) == json.dumps(record, sort_keys=True)
+    assert as_record(result) is result and as_dict(record) is record
+
+
+def test_unscored_rubrics_and_legacy_records():
+    """Missing rubrics are NaN (dropped on output); legacy records get an inferred status."""
+    evaluation = {"score_global": 40, "scores": {"delai_legal": 40}, "status": PARTIAL_RUBRIC}
+    result = SampleResult.from_evaluation(1, "Q", [""] * 5, "R", PARTIAL_RUBRIC, evaluation, {})
+    assert result.failure_stage == "judge" and result.scored
+    assert math.isnan(result.scores[0]) and result.scores[1] == 40
+    assert result.to_dict()["evaluation"]["scores"] == {"delai_legal": 40}
+
+    legacy = {"sample_idx": 2, "model_response": "ERROR: timed out", "evaluation": {}}
+    result = as_record(legacy)
+    assert result.status == "timeout" and not result.scored
+    assert "ground_truth" not in result.to_dict()
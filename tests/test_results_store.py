@@ -0,0 +1,45 @@
+"""
+Tests for the Parquet results store
+"""
+
+import json
+
+import pyarrow.parquet as pq
+
+from les_audits_affaires_eval.results_store import (
+    ANALYSIS_COLUMNS,
+    frame_to_records,
+    read_results_frame,
+    write_results_parquet,
+)
+from les_audits_affaires_eval.utils import load_evaluation_results
+
+
+def test_parquet_round_trip_and_predicate_pushdown(tmp_path, make_result):
+    """Records survive a round trip; filters skip row groups by their statistics."""
+    path = str(tmp_path / "detailed_results.parquet")
+    results = [make_result(idx, float(idx % 100)) for idx in range(600)]
+    write_results_parquet(results, path)
+
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    assert frame_to_records(read_results_frame(path))[7] == results[7]
+
+    late = read_results_frame(path, ["sample_idx", "score_global"], [("sample_idx", ">=", 520)])
+    assert list(late.columns) == ["sample_idx", "score_global"]
+    assert late["sample_idx"].tolist() == list(range(520, 600))
+
+
+def test_load_evaluation_results_reads_only_requested_columns(tmp_path, make_result):
+    """With the Parquet store present, analysis gets scores but no response text."""
+    path = str(tmp_path / "detailed_results.parquet")
+    write_results_parquet([make_result(0, 80.0), make_result(1, 20.0)], path)
+    (tmp_path / "evaluation_summary.json").write_text(json.dumps({"sample_count": 2}))
+
+    results = load_evaluation_results(
+        str(tmp_path / "evaluation_results.json"), columns=ANALYSIS_COLUMNS
+    )
+    assert results["summary"] == {"sample_count": 2}
+    record = results["detailed_results"][1]
+    assert record["evaluation"]["scores"]["delai_legal"] == 20.0
+    assert record["metadata"]["generation_time"] == 1.5
+    assert "model_response" not in record and "justifications" not in record["evaluation"]
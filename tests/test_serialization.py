@@ -0,0 +1,78 @@
+"""
+Tests for the pluggable JSON backends
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from les_audits_affaires_eval import serialization
+from les_audits_affaires_eval.compare import load_model_scores
+from les_audits_affaires_eval.detailed_store import DetailedStore
+from les_audits_affaires_eval.serialization import BACKENDS, decode_scores, make_codec
+from les_audits_affaires_eval.telemetry import ModelResponse
+
+
+def test_backends_are_interchangeable():
+    """Every installed backend writes the same data and raises JSONDecodeError."""
+    response = ModelResponse("Délai légal : 1 mois", usage={"completion_tokens": 6})
+    record = {"sample_idx": 1, "model_response": response, "score": np.float64(7.5)}
+    for backend in BACKENDS:
+        try:
+            dumps, loads = make_codec(backend)
+        except ImportError:
+            continue
+        data = dumps(record)
+        assert "Délai légal".encode() in data
+        assert json.loads(data) == loads(data) == {**record, "score": 7.5}
+        assert json.loads(dumps(record, indent=2)) == loads(data)
+        with pytest.raises(json.JSONDecodeError):
+            loads(b'{"sample_idx": ')
+
+
+def test_decode_scores_skips_text_fields(tmp_path):
+    """Summaries read identity and scores only, whatever else the record holds."""
+    store = DetailedStore(str(tmp_path), compression="")
+    store.append(
+        {
+            "sample_idx": 4,
+            "model_response": "texte " * 1000,
+            "status": "ok",
+            "evaluation": {"score_global": 80, "scores": {"delai_legal": 75}, "justifications": {}},
+        }
+    )
+    assert list(store.iter_scores()) == [
+        {
+            "sample_idx": 4,
+            "status": "ok",
+            "failure_stage": None,
+            "evaluation": {"score_global": 80.0, "scores": {"delai_legal": 75.0}},
+        }
+    ]
+    assert decode_scores(b'{"sample_idx": 5}')["evaluation"]["score_global"] == 0.0
+
+
+def test_decode_scores_accepts_mistyped_legacy_records(monkeypatch, tmp_path):
+    """String numbers, null scores and a null evaluation decode the same on every backend."""
+    records = [
+        b'{"sample_idx": "3", "evaluation": '
+        b'{"score_global": "80", "scores": {"delai_legal": null}}}',
+        b'{"sample_idx": 4, "status": "ok", "evaluation": null}',
+        b'{"sample_idx": 5, "evaluation": {"score_global": "n/a", "scores": null}}',
+    ]
+    decoded = [decode_scores(record) for record in records]
+    assert decoded[0]["sample_idx"] == 3
+    assert decoded[0]["evaluation"] == {"score_global": 80.0, "scores": {"delai_legal": None}}
+    assert decoded[1]["evaluation"] == {"score_global": 0.0, "scores": {}}
+    assert decoded[2]["evaluation"] == {"score_global": None, "scores": {}}
+
+    # One legacy record no longer aborts a comparison
+    store = DetailedStore(str(tmp_path), compression="")
+    store.append({"sample_idx": 0, "evaluation": {"score_global": "80", "scores": {}}})
+    store.append({"sample_idx": 1, "evaluation": None})
+    sample_idx, scores = load_model_scores(str(tmp_path))
+    assert sample_idx.tolist() == [0, 1] and scores.tolist() == [80.0, 0.0]
+
+    monkeypatch.setattr(serialization, "msgspec", None)
+    assert [decode_scores(record) for record in records] == decoded
@@ -0,0 +1,33 @@
+"""
+Tests for sharded evaluation and the cross-process rate limiter
+"""
+
+import jsonlines
+
+from les_audits_affaires_eval.rate_limit import SharedRateLimiter
+from les_audits_affaires_eval.sharding import merge_shards, shard_dir, shard_ranges
+
+
+def test_shards_cover_the_dataset_and_merge_in_order(tmp_path):
+    """Ranges are contiguous and balanced; merged results are sorted by sample index."""
+    ranges = shard_ranges(10, 3)
+    assert ranges == [(0, 4), (4, 7), (7, 10)]
+    assert shard_ranges(2, 8) == [(0, 1), (1, 2)]
+
+    for shard_id, (start, end) in enumerate(ranges):
+        directory = tmp_path / "shards" / f"shard-{shard_id:02d}"
+        directory.mkdir(parents=True)
+        with jsonlines.open(directory / "detailed_results.jsonl", mode="w") as writer:
+            writer.write_all({"sample_idx": idx} for idx in reversed(range(start, end)))
+    assert shard_dir(1, str(tmp_path)).endswith("shard-01")
+    assert [r["sample_idx"] for r in merge_shards(str(tmp_path))] == list(range(10))
+
+
+def test_shared_rate_limiter_spaces_slots_across_instances(tmp_path):
+    """Two limiters on the same state file book consecutive slots."""
+    path = str(tmp_path / "judge.ratelimit")
+    first, second = SharedRateLimiter(path, rate=10), SharedRateLimiter(path, rate=10)
+    delays = [first.reserve(), second.reserve(), first.reserve()]
+    assert delays[0] <= 0.01
+    assert 0.08 < delays[1] <= 0.1
+    assert 0.18 < delays[2] <= 0.2
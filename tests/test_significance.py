@@ -0,0 +1,49 @@
+"""
+Tests for the bulk bootstrap intervals and permutation tests
+"""
+
+import itertools
+import math
+
+import numpy as np
+
+from les_audits_affaires_eval.significance import (
+    bootstrap_ci,
+    bootstrap_means,
+    paired_permutation_test,
+)
+
+
+def test_bootstrap_intervals_per_column():
+    """Intervals bracket each column mean, ignore NaN and are reproducible from the seed."""
+    rng = np.random.default_rng(3)
+    scores = rng.normal(50, 10, (1000, 3))
+    scores[::4, 1] = np.nan
+    scores[:, 2] = np.nan
+
+    means = bootstrap_means(scores, resamples=2000, seed=7)
+    assert means.shape == (2000, 3) and np.isnan(means[:, 2]).all()
+    low, high = bootstrap_ci(scores, resamples=2000, seed=7)
+    for column in (0, 1):
+        values = scores[:, column][~np.isnan(scores[:, column])]
+        half_width = 1.96 * values.std() / math.sqrt(len(values))
+        assert low[column] < values.mean() < high[column]
+        assert math.isclose(high[column] - low[column], 2 * half_width, rel_tol=0.1)
+    assert math.isnan(low[2]) and math.isnan(high[2])
+    assert np.array_equal(
+        bootstrap_means(scores[:, 0], 500, seed=1), bootstrap_means(scores[:, 0], 500, seed=1)
+    )
+
+
+def test_permutation_p_values_match_exact_enumeration():
+    """Sign-flip p-values approach the exact test; missing and identical pairs are handled."""
+    differences = np.array([[25.0, 0.0, 25.0, 50.0, -25.0, 25.0, 0.0, 25.0, 50.0, 25.0]]).T
+    flips = np.array(list(itertools.product([-1, 1], repeat=10)))
+    observed = abs(differences.sum())
+    exact = (np.abs(flips @ differences[:, 0]) >= observed).mean()
+
+    pairs = np.hstack([differences, np.zeros_like(differences), np.full_like(differences, np.nan)])
+    p_values = paired_permutation_test(pairs, resamples=20000, seed=0)
+    assert abs(p_values[0] - exact) < 0.01
+    assert p_values[1] == 1.0 and math.isnan(p_values[2])
+    assert paired_permutation_test(np.full(200, 10.0), resamples=999) == 1 / 1000
@@ -0,0 +1,58 @@
+"""
+Tests for the sample-level failure taxonomy
+"""
+
+import asyncio
+
+import pytest
+from tenacity import RetryError, retry, stop_after_attempt
+
+from les_audits_affaires_eval.status import (
+    GENERATION_ERROR,
+    JUDGE_ERROR,
+    PARSE_ERROR,
+    STATUS_OK,
+    TIMEOUT,
+    classify_exception,
+    result_status,
+    select_statuses,
+)
+
+
+def test_legacy_records_are_classified_from_sentinels():
+    """Records written before the status field existed still get a status."""
+    assert result_status({"model_response": "ERROR: boom", "metadata": {"error": "boom"}}) == (
+        GENERATION_ERROR
+    )
+    assert (
+        result_status(
+            {
+                "model_response": "réponse",
+                "evaluation": {"score_global": 0, "justifications": {"a": "Évaluation échouée"}},
+            }
+        )
+        == JUDGE_ERROR
+    )
+    assert result_status({"model_response": "réponse", "evaluation": {"score_global": 80}}) == (
+        STATUS_OK
+    )
+    assert result_status({"status": PARSE_ERROR}) == PARSE_ERROR
+
+
+def test_timeouts_are_unwrapped_from_tenacity():
+    """A timeout that exhausted tenacity retries is still reported as a timeout."""
+
+    @retry(stop=stop_after_attempt(2))
+    def always_times_out():
+        raise asyncio.TimeoutError()
+
+    with pytest.raises(RetryError) as exc_info:
+        always_times_out()
+    assert classify_exception(exc_info.value) == TIMEOUT
+    assert classify_exception(ValueError("bad payload")) == GENERATION_ERROR
+
+
+def test_select_statuses_intersects_stage_and_classes():
+    assert select_statuses("judge", ["timeout", "parse_error"]) == (PARSE_ERROR,)
+    with pytest.raises(ValueError):
+        select_statuses("extraction")
@@ -0,0 +1,73 @@
+"""
+Tests for the difficulty index and representative subsets
+"""
+
+import numpy as np
+
+from les_audits_affaires_eval.results_store import write_results_parquet
+from les_audits_affaires_eval.subsets import (
+    build_difficulty_index,
+    cluster_questions,
+    load_index,
+    save_index,
+    select_subset,
+    subset_indices,
+)
+
+TOPICS = [
+    "bail commercial loyer résiliation préavis bailleur",
+    "société capital social associés assemblée gérant",
+    "licenciement salarié contrat travail indemnité prud'hommes",
+]
+
+
+def _questions(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [" ".join(rng.choice(TOPICS[idx % 3].split(), 5)) for idx in range(count)]
+
+
+def test_clusters_follow_topics_and_subsets_are_proportional_and_stable():
+    """Questions on one topic share a cluster; subsets draw from clusters by size."""
+    questions = _questions(300)
+    labels = cluster_questions(questions, clusters=3, seed=1)
+    for topic in range(3):
+        assert len(set(labels[topic::3].tolist())) == 1
+    assert len(set(labels.tolist())) == 3
+
+    index = {
+        "samples": {
+            "sample_idx": list(range(300)),
+            "cluster": labels.tolist(),
+            "difficulty": [None] * 300,
+            "discrimination": [None] * 300,
+        }
+    }
+    subset = select_subset(index, 30, seed=2)
+    assert len(subset) == 30 and subset == select_subset(index, 30, seed=2)
+    assert np.bincount(labels[subset]).tolist() == [10, 10, 10]
+
+
+def test_index_from_historical_results_gives_a_correlated_subset(tmp_path):
+    """Per-sample history sets difficulty; the fast subset tracks the full-run score."""
+    rng = np.random.default_rng(3)
+    difficulty = rng.normal(0, 1, 400)
+    for model, ability in enumerate(np.linspace(-1, 1, 8)):
+        scores = np.clip(50 + 25 * (ability - difficulty) + rng.normal(0, 10, 400), 0, 100)
+        write_results_parquet(
+            [
+                {"sample_idx": idx, "status": "ok", "evaluation": {"score_global": float(score)}}
+                for idx, score in enumerate(scores)
+            ],
+            str(tmp_path / f"model-{model}.parquet"),
+        )
+
+    index = build_difficulty_index(_questions(400), str(tmp_path), clusters=3, subsets=["fast-40"])
+    assert len(index["models"]) == 8 and index["samples"]["models_scored"] == [8] * 400
+    assert np.corrcoef(index["samples"]["difficulty"], difficulty)[0, 1] > 0.9
+    fast = index["subsets"]["fast-40"]
+    assert len(fast["sample_idx"]) == 40 and fast["correlation_with_full"] > 0.95
+
+    save_index(index, str(tmp_path / "difficulty_index.json"))
+    loaded = load_index(str(tmp_path / "difficulty_index.json"))
+    assert subset_indices("fast-40", loaded) == fast["sample_idx"]
+    assert len(subset_indices("fast-20", loaded)) == 20
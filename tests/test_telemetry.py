@@ -0,0 +1,50 @@
+"""
+Tests for token accounting and cost telemetry
+"""
+
+import pickle
+
+import pytest
+
+from les_audits_affaires_eval.telemetry import (
+    ModelResponse,
+    estimate_cost,
+    summarize_telemetry,
+    usage_from_anthropic,
+)
+
+
+def test_model_response_is_a_string_carrying_usage():
+    """Responses behave like plain strings and keep their usage through pickling."""
+    response = ModelResponse(" texte ", usage={"prompt_tokens": 3}, latency=0.5, model="m")
+    assert response == " texte " and response.strip() == "texte"
+    restored = pickle.loads(pickle.dumps(response))
+    assert restored.usage == {"prompt_tokens": 3} and restored.latency == 0.5
+
+
+def test_cached_tokens_are_priced_and_aggregated():
+    """Anthropic cache reads bill at the cached rate, cache writes at 1.25x input."""
+    usage = usage_from_anthropic(
+        {
+            "input_tokens": 100_000,
+            "cache_read_input_tokens": 900_000,
+            "cache_creation_input_tokens": 1_000_000,
+            "output_tokens": 0,
+        }
+    )
+    assert usage["prompt_tokens"] == 2_000_000 and usage["cached_tokens"] == 900_000
+    # 0.1M x 3.00 + 0.9M x 0.30 + 1M x 3.00 x 1.25
+    assert estimate_cost("claude-3-5-sonnet-latest", usage) == pytest.approx(0.30 + 0.27 + 3.75)
+    # Only exact or aliased ids are priced, never a prefix
+    assert estimate_cost("gpt-4o-2024-08-06", {"prompt_tokens": 1_000_000}) == 2.50
+    assert estimate_cost("gpt-4o-audio-preview", {"prompt_tokens": 1_000_000}) is None
+
+    results = [
+        {"metadata": {"generation_usage": {"completion_tokens": 10}, "generation_time": 1.0}},
+        {"metadata": {"generation_usage": {"completion_tokens": 30}, "generation_time": 3.0}},
+    ]
+    telemetry = summarize_telemetry(results, generation_model="unpriced", wall_time=2.0)
+    assert telemetry["generation"]["completion_tokens"] == 40
+    assert telemetry["generation"]["tokens_per_sec"] == 20
+    assert telemetry["generation"]["cost_usd"] is None
+    assert telemetry["samples_per_sec"] == 1
@@ -0,0 +1,40 @@
+"""
+Tests for the optional tracing layer
+"""
+
+import json
+
+from les_audits_affaires_eval import tracing
+
+
+def test_spans_are_noops_when_tracing_is_off():
+    """With no exporter configured, span() hands out the shared no-op span."""
+    tracing.configure_tracing(None)
+    with tracing.span("generate", {"sample_idx": 1}) as span:
+        span.set_attribute("tokens.completion", 10)
+    assert span is tracing.NOOP_SPAN and not span.recording
+
+
+def test_nested_spans_export_as_otlp_json(tmp_path):
+    """Child spans share the trace id, link to their parent and keep typed attributes."""
+    path = tmp_path / "traces.jsonl"
+    tracing.configure_tracing("otlp-json", str(path))
+    try:
+        with tracing.span("sample", {"sample_idx": 3}) as sample_span:
+            with tracing.span("judge", {"provider": "azure"}) as judge_span:
+                judge_span.set_attribute("tokens.prompt", 1200)
+        try:
+            with tracing.span("persist", parent=sample_span):
+                raise OSError("disk full")
+        except OSError:
+            pass
+    finally:
+        tracing.configure_tracing(None)
+
+    (request,) = [json.loads(line) for line in path.read_text().splitlines()]
+    spans = {s["name"]: s for s in request["resourceSpans"][0]["scopeSpans"][0]["spans"]}
+    assert spans["judge"]["parentSpanId"] == spans["sample"]["spanId"]
+    assert spans["persist"]["parentSpanId"] == spans["sample"]["spanId"]
+    assert {s["traceId"] for s in spans.values()} == {spans["sample"]["traceId"]}
+    assert {"key": "tokens.prompt", "value": {"intValue": "1200"}} in spans["judge"]["attributes"]
+    assert spans["persist"]["status"] == {"code": tracing.STATUS_ERROR, "message": "disk full"}